@@ -363,8 +363,9 @@ def explain(topic, start, end, func):
     """
     import asyncio
     from src.explain import run_Explain
+    from src.utils.ai.http_pool import closing_sessions
     
-    result = asyncio.run(run_Explain(topic, start, end_date=end, only_function=func))
+    result = asyncio.run(closing_sessions(run_Explain(topic, start, end_date=end, only_function=func)))
     if not result:
         print(f"解读失败: {topic} - {start} 到 {end}")
 
@@ -0,0 +1,150 @@
+"""Benchmark the vectorised clean engine against the row-wise reference.
+
+Builds a synthetic channel (1M rows by default), runs each clean step both
+row-wise (the previous ``apply`` implementation) and vectorised, checks the
+outputs are identical and prints the timings.
+
+Usage:
+    python scripts/benchmark_clean.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.clean.data_clean import (  # noqa: E402
+    CONTENT_FIELDS,
+    MYSQL_TIME_FORMAT,
+    TIME_FORMATS,
+    _clean_whitespace_series,
+    _format_published_at,
+    _merge_contents,
+    _normalize_region_series,
+    _sequential_ids,
+    clean_channel_frame,
+    clean_text_whitespace,
+    normalize_region,
+    parse_datetime,
+)
+
+REGIONS = ["广东深圳", "北京", "浙江省杭州市", "海外", "", None, "内蒙古呼和浩特", " 上海 ", "未知"]
+TIMES = [
+    "2025-01-{day:02d} {hour:02d}:15:30",
+    "2025/01/{day:02d} {hour:02d}:45",
+    "2025-01-{day:02d}",
+    "2025-01-{day:02d}T{hour:02d}:00:00+08:00",
+    "Jan {day} 2025 {hour}:05",
+    "2025-1-{day} {hour}:5:7",
+    "not a date",
+]
+
+
+def build_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = rng.integers(1, 29, rows)
+    hours = rng.integers(0, 24, rows)
+    time_kind = rng.choice(len(TIMES), rows, p=[0.8, 0.06, 0.04, 0.04, 0.03, 0.02, 0.01])
+    published = [
+        TIMES[kind].format(day=day, hour=hour) if index % 97 else None
+        for index, (kind, day, hour) in enumerate(zip(time_kind, days, hours))
+    ]
+    ordinals = np.arange(rows)
+    return pd.DataFrame(
+        {
+            "title": [f"标题 {i}\t样本" if i % 5 else None for i in ordinals],
+            "summary": ["未知" if i % 3 else f" 摘要\n{i} " for i in ordinals],
+            "ocr": [None] * rows,
+            "content": [f"正文  第{i}条\n\n内容   结尾 " for i in ordinals],
+            "region": rng.choice(np.array(REGIONS, dtype=object), rows),
+            "published_at": published,
+            "author": "作者",
+            "url": [f"https://example.com/{i}" for i in ordinals],
+        }
+    )
+
+
+def _rowwise_contents(df: pd.DataFrame) -> pd.Series:
+    def _merge_with_labels(row):
+        parts = []
+        for col in CONTENT_FIELDS:
+            if col in row and str(row[col]).strip() != '未知':
+                parts.append(f"{col}: {clean_text_whitespace(row[col])}")
+        return ' '.join(parts).strip() if parts else '未知'
+
+    return df.apply(_merge_with_labels, axis=1).apply(clean_text_whitespace)
+
+
+def _rowwise_published_at(series: pd.Series) -> pd.Series:
+    parsed = series.apply(lambda x: parse_datetime(x, TIME_FORMATS))
+    return parsed.apply(lambda x: x.strftime(MYSQL_TIME_FORMAT) if pd.notna(x) and x is not None else None)
+
+
+def _timed(func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    return result, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark row-wise vs vectorised clean steps.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic channel size.")
+    args = parser.parse_args()
+
+    df = build_frame(args.rows)
+    for col in CONTENT_FIELDS:
+        df[col] = df[col].fillna("未知").astype(str)
+    print(f"synthetic channel: {len(df)} rows")
+
+    steps = [
+        (
+            "contents",
+            lambda: _rowwise_contents(df),
+            lambda: _clean_whitespace_series(_merge_contents(df)),
+        ),
+        (
+            "region",
+            lambda: df["region"].apply(lambda x: normalize_region(x, "未知")),
+            lambda: _normalize_region_series(df["region"], "未知"),
+        ),
+        ("published_at", lambda: _rowwise_published_at(df["published_at"]), lambda: _format_published_at(df["published_at"])),
+        (
+            "id",
+            lambda: pd.Series(pd.RangeIndex(len(df)).map(lambda i: int(f"20250101{i + 1}"))),
+            lambda: pd.Series(_sequential_ids("20250101", len(df))),
+        ),
+    ]
+
+    total_rowwise = total_vectorised = 0.0
+    print(f"{'step':<14}{'row-wise (s)':>14}{'vectorised (s)':>16}{'speed-up':>10}  identical")
+    for name, rowwise, vectorised in steps:
+        expected, rowwise_time = _timed(rowwise)
+        actual, vectorised_time = _timed(vectorised)
+        identical = (
+            expected.reset_index(drop=True).to_json(orient="values", force_ascii=False)
+            == actual.reset_index(drop=True).to_json(orient="values", force_ascii=False)
+        )
+        total_rowwise += rowwise_time
+        total_vectorised += vectorised_time
+        print(
+            f"{name:<14}{rowwise_time:>14.2f}{vectorised_time:>16.2f}"
+            f"{rowwise_time / max(vectorised_time, 1e-9):>9.1f}x  {identical}"
+        )
+        if not identical:
+            raise SystemExit(f"{name}: vectorised output differs from row-wise reference")
+    print(f"{'total':<14}{total_rowwise:>14.2f}{total_vectorised:>16.2f}{total_rowwise / max(total_vectorised, 1e-9):>9.1f}x")
+
+    _, frame_time = _timed(lambda: clean_channel_frame(build_frame(args.rows), "新闻", "20250101", {}, {}))
+    print(f"clean_channel_frame end-to-end (incl. synthetic build): {frame_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
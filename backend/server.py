@@ -89,6 +89,7 @@ from server_support import (  # type: ignore
     serialise_result,
     success,
     split_folder_range,
+    subscribe_filter_status,
     validate_rag_config,
     DATA_PROJECTS_ROOT,
     create_deduplicate_job,
@@ -1805,24 +1806,34 @@ def filter_status_stream():
         start_time = time.time()
         last_snapshot = ""
         yield f"retry: {int(interval * 1500)}\n\n"
-        while True:
-            try:
-                status_payload = _build_filter_status_payload(topic_identifier, resolved_date, fallback_from)
-            except Exception as exc:  # pragma: no cover - defensive
-                error_payload = {"message": str(exc)}
-                yield f"event: error\ndata: {json.dumps(error_payload, ensure_ascii=False)}\n\n"
-                break
-
-            message = json.dumps({"data": status_payload}, ensure_ascii=False)
-            if message != last_snapshot:
-                yield f"data: {message}\n\n"
-                last_snapshot = message
-
-            if not status_payload.get("running"):
-                break
-            if (time.time() - start_time) >= FILTER_STATUS_STREAM_TIMEOUT:
-                break
-            time.sleep(interval)
+        # 同一专题/日期的所有连接共享一个状态源，进度文件有变化时才重新汇总并推送
+        with subscribe_filter_status(
+            topic_identifier,
+            resolved_date,
+            lambda: _build_filter_status_payload(topic_identifier, resolved_date, fallback_from),
+            key_suffix=fallback_from or "",
+        ) as subscription:
+            pending = [subscription.source.latest] if subscription.source.latest is not None else []
+            while True:
+                finished = False
+                for kind, status_payload in pending:
+                    if kind == "error":
+                        yield f"event: error\ndata: {json.dumps(status_payload, ensure_ascii=False)}\n\n"
+                        finished = True
+                        break
+                    message = json.dumps({"data": status_payload}, ensure_ascii=False)
+                    if message != last_snapshot:
+                        yield f"data: {message}\n\n"
+                        last_snapshot = message
+                    if not status_payload.get("running"):
+                        finished = True
+                        break
+                if finished:
+                    break
+                remaining = FILTER_STATUS_STREAM_TIMEOUT - (time.time() - start_time)
+                if remaining <= 0:
+                    break
+                pending = subscription.get(timeout=remaining)
 
         yield "event: done\ndata: {}\n\n"
 
@@ -2655,6 +2666,15 @@ def fetch_endpoint():
     # 优先使用请求中的 topic，其次展示名，最后回退内部标识。
     db_topic = (topic or "").strip() or display_name or topic_identifier
 
+    incremental_value = payload.get("incremental")
+    incremental: Optional[bool] = None
+    if incremental_value is not None and str(incremental_value).strip() != "":
+        incremental = (
+            incremental_value
+            if isinstance(incremental_value, bool)
+            else str(incremental_value).strip().lower() in {"1", "true", "yes", "on"}
+        )
+
     from src.fetch import run_fetch  # type: ignore
 
     response, code = _execute_operation(
@@ -2664,6 +2684,7 @@ def fetch_endpoint():
         start,
         end,
         db_topic=db_topic,
+        incremental=incremental,
         log_context={
             "project": log_project,
             "params": {
@@ -2672,6 +2693,7 @@ def fetch_endpoint():
                 "source": "api",
                 "topic": display_name,
                 "bucket": topic_identifier,
+                "incremental": incremental,
             },
         },
     )
@@ -52,7 +52,7 @@ from .filter_jobs import (
     mark_filter_job_finished,
     mark_filter_job_running,
 )
-from .filter_progress import collect_filter_status
+from .filter_progress import collect_filter_status, subscribe_filter_status
 from .postclean_jobs import (
     create_postclean_job,
     get_postclean_job,
@@ -183,6 +183,7 @@ __all__ = [
     "update_dataset_source_references",
     # Filter helpers
     "collect_filter_status",
+    "subscribe_filter_status",
     "create_postclean_job",
     "create_deduplicate_job",
     "create_fetch_refresh_job",
@@ -89,7 +89,7 @@ def _summarise_date_dir(layer: str, date_dir: Path, dataset_id: Optional[str]) -
         files.append(child.name)
         if dataset_id and dataset_id in child.name:
             dataset_hit = True
-        if child.suffix.lower() == ".jsonl":
+        if child.suffix.lower() in {".jsonl", ".parquet"} and child.stem not in channels:
             channels.append(child.stem)
 
     summary: Dict[str, Optional[str]] = {
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 from src.utils.setting.paths import get_data_root  # type: ignore
+from src.utils.task_store import task_family  # type: ignore
 
 from .fetch_refresh_jobs import (
     list_fetch_refresh_jobs,
@@ -163,8 +162,13 @@ def _collect_netinsight_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]
     return tasks, workers
 
 
+def _family_tasks(name: str, dirname: str, *, active_only: bool) -> List[Dict[str, Any]]:
+    """从统一任务存储读取某个任务族的任务（按更新时间倒序）。"""
+    family = task_family(name, get_data_root() / dirname)
+    return family.list(statuses=ACTIVE_STATUSES if active_only else None, order_by="updated_at")
+
+
 def _collect_stopword_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    task_dir = get_data_root() / "_stopword_suggestions" / "tasks"
     raw_worker = load_stopword_worker_status()
     worker_payload = _normalise_worker(
         source="stopword",
@@ -172,10 +176,7 @@ def _collect_stopword_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]],
         payload=raw_worker,
     )
     tasks: List[Dict[str, Any]] = []
-    for path in sorted(task_dir.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True):
-        payload = _load_json(path)
-        if not isinstance(payload, dict):
-            continue
+    for payload in _family_tasks("stopword-suggestions", "_stopword_suggestions", active_only=active_only):
         if not _include_task(payload, active_only=active_only):
             continue
         tasks.append(_normalise_stopword_task(payload, worker_payload))
@@ -183,7 +184,6 @@ def _collect_stopword_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]],
 
 
 def _collect_publisher_detection_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    task_dir = get_data_root() / "_publisher_detection" / "tasks"
     raw_worker = load_publisher_detection_worker_status()
     worker_payload = _normalise_worker(
         source="publisher-detection",
@@ -191,10 +191,7 @@ def _collect_publisher_detection_tasks(*, active_only: bool) -> Tuple[List[Dict[
         payload=raw_worker,
     )
     tasks: List[Dict[str, Any]] = []
-    for path in sorted(task_dir.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True):
-        payload = _load_json(path)
-        if not isinstance(payload, dict):
-            continue
+    for payload in _family_tasks("publisher-detection", "_publisher_detection", active_only=active_only):
         if not _include_task(payload, active_only=active_only):
             continue
         tasks.append(_normalise_publisher_detection_task(payload, worker_payload))
@@ -202,7 +199,6 @@ def _collect_publisher_detection_tasks(*, active_only: bool) -> Tuple[List[Dict[
 
 
 def _collect_media_tagging_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    task_dir = get_data_root() / "_media_tagging" / "tasks"
     raw_worker = load_media_tagging_worker_status()
     worker_payload = _normalise_worker(
         source="media-tagging",
@@ -210,10 +206,7 @@ def _collect_media_tagging_tasks(*, active_only: bool) -> Tuple[List[Dict[str, A
         payload=raw_worker,
     )
     tasks: List[Dict[str, Any]] = []
-    for path in sorted(task_dir.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True):
-        payload = _load_json(path)
-        if not isinstance(payload, dict):
-            continue
+    for payload in _family_tasks("media-tagging", "_media_tagging", active_only=active_only):
         if not _include_task(payload, active_only=active_only):
             continue
         tasks.append(_normalise_media_tagging_task(payload, worker_payload))
@@ -221,7 +214,6 @@ def _collect_media_tagging_tasks(*, active_only: bool) -> Tuple[List[Dict[str, A
 
 
 def _collect_fluid_analysis_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    task_dir = get_data_root() / "_fluid_analysis" / "tasks"
     raw_worker = load_fluid_analysis_worker_status()
     worker_payload = _normalise_worker(
         source="fluid-analysis",
@@ -229,10 +221,7 @@ def _collect_fluid_analysis_tasks(*, active_only: bool) -> Tuple[List[Dict[str,
         payload=raw_worker,
     )
     tasks: List[Dict[str, Any]] = []
-    for path in sorted(task_dir.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True):
-        payload = _load_json(path)
-        if not isinstance(payload, dict):
-            continue
+    for payload in _family_tasks("fluid-analysis", "_fluid_analysis", active_only=active_only):
         if not _include_task(payload, active_only=active_only):
             continue
         tasks.append(_normalise_fluid_analysis_task(payload, worker_payload))
@@ -240,7 +229,6 @@ def _collect_fluid_analysis_tasks(*, active_only: bool) -> Tuple[List[Dict[str,
 
 
 def _collect_basic_analysis_tasks(*, active_only: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    task_dir = get_data_root() / "_basic_analysis" / "tasks"
     raw_worker = load_basic_analysis_worker_status()
     worker_payload = _normalise_worker(
         source="basic-analysis",
@@ -248,10 +236,7 @@ def _collect_basic_analysis_tasks(*, active_only: bool) -> Tuple[List[Dict[str,
         payload=raw_worker,
     )
     tasks: List[Dict[str, Any]] = []
-    for path in sorted(task_dir.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True):
-        payload = _load_json(path)
-        if not isinstance(payload, dict):
-            continue
+    for payload in _family_tasks("basic-analysis", "_basic_analysis", active_only=active_only):
         if not _include_task(payload, active_only=active_only):
             continue
         tasks.append(_normalise_basic_analysis_task(payload, worker_payload))
@@ -879,14 +864,6 @@ def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _load_json(path: Path) -> Any:
-    try:
-        with path.open("r", encoding="utf-8") as stream:
-            return json.load(stream)
-    except Exception:
-        return {}
-
-
 def _timestamp_to_sort_value(value: Any) -> float:
     text = str(value or "").strip()
     if not text:
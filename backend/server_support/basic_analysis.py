@@ -15,6 +15,7 @@ from uuid import uuid4
 from filelock import FileLock
 
 from src.utils.setting.paths import get_data_root  # type: ignore
+from src.utils.task_store import TaskFamily, task_family  # type: ignore
 
 LOGGER = logging.getLogger(__name__)
 
@@ -79,14 +80,8 @@ def task_state_path(task_id: str) -> Path:
     return TASK_STATE_DIR / f"{task_id}.json"
 
 
-def _load_all_tasks() -> List[Dict[str, Any]]:
-    _ensure_state_dirs()
-    tasks: List[Dict[str, Any]] = []
-    for path in TASK_STATE_DIR.glob("*.json"):
-        payload = _load_json(path, {})
-        if isinstance(payload, dict) and payload.get("id"):
-            tasks.append(payload)
-    return tasks
+def _task_family() -> TaskFamily:
+    return task_family("basic-analysis", STATE_ROOT, task_dir=TASK_STATE_DIR)
 
 
 def _load_task(task_id: str) -> Optional[Dict[str, Any]]:
@@ -100,6 +95,7 @@ def _save_task(task: Dict[str, Any]) -> None:
     with lock:
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
 
 
 def _update_task(task_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
@@ -112,6 +108,7 @@ def _update_task(task_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict
         mutate(task)
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
         return task
 
 
@@ -207,7 +204,7 @@ def find_latest_task(
     """查找最近的任务。"""
     desired_statuses = set(statuses or [])
     matches = []
-    for task in _load_all_tasks():
+    for task in _task_family().list(topic=topic_identifier, statuses=desired_statuses):
         if str(task.get("topic_identifier") or "") != topic_identifier:
             continue
         if str(task.get("start_date") or "") != start_date:
@@ -268,13 +265,10 @@ def get_latest_task(
 
 def reserve_next_task() -> Optional[Dict[str, Any]]:
     """预留下一个待处理任务。"""
-    queued = sorted(
-        (item for item in _load_all_tasks() if str(item.get("status") or "") == "queued"),
-        key=lambda item: item.get("created_at") or "",
-    )
+    queued = _task_family().next_queued()
     if not queued:
         return None
-    task_id = str(queued[0].get("id") or "")
+    task_id = str(queued.get("id") or "")
     if not task_id:
         return None
     return mark_task_progress(
@@ -486,15 +480,14 @@ def delete_task(task_id: str) -> None:
     with lock:
         if path.exists():
             path.unlink()
+    _task_family().drop(task_id)
 
 
 def _reconcile_orphaned_running_tasks(worker_status: Dict[str, Any]) -> None:
     """清理孤儿任务。"""
     if worker_status.get("running"):
         return
-    for task in _load_all_tasks():
-        if str(task.get("status") or "") != "running":
-            continue
+    for task in _task_family().list(statuses=["running"]):
         task_id = str(task.get("id") or "")
         if not task_id:
             continue
@@ -524,9 +517,7 @@ def build_status_payload(
 def list_tasks(*, limit: int = 20) -> Dict[str, Any]:
     """列出所有任务。"""
     worker = load_worker_status()
-    tasks = _load_all_tasks()
-    tasks.sort(key=lambda item: item.get("created_at") or "", reverse=True)
-    tasks = tasks[: max(limit, 1)]
+    tasks = _task_family().list(limit=max(limit, 1))
     return {
         "tasks": tasks,
         "worker": worker,
@@ -35,6 +35,7 @@ from src.utils.setting.editor import (  # type: ignore
     load_config as load_settings_config,
     save_config as save_settings_config,
 )
+from src.utils.io.db import DatabaseManager  # type: ignore
 from src.utils.setting.settings import settings  # type: ignore
 
 from .paths import CONFIG_PATH, CONFIGS_DIR
@@ -254,6 +255,8 @@ def persist_databases_config(config: Dict[str, Any]) -> None:
 
     save_settings_config(DATABASES_CONFIG_NAME, _normalise_databases_config(config))
     reload_settings()
+    # Pooled engines were built from the previous connection settings
+    DatabaseManager.dispose_shared_engines()
 
 
 def load_llm_config() -> Dict[str, Any]:
@@ -405,6 +408,8 @@ def filter_ai_overview() -> Dict[str, Any]:
         "model": str(cfg.get("model") or "").strip(),
         "qps": cfg.get("qps"),
         "batch_size": cfg.get("batch_size"),
+        "max_concurrency": cfg.get("max_concurrency"),
+        "tokens_per_minute": cfg.get("tokens_per_minute"),
         "truncation": cfg.get("truncation"),
     }
 
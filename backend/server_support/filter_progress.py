@@ -7,12 +7,15 @@
 2. 读取过滤流水线的进度文件和汇总文件，支持断点续跑和异常容错。
 3. 提供最近处理记录、无关样本等摘要信息，便于前端展示和问题排查。
 4. 支持判断过滤任务是否正在运行，结合内存状态与进度文件。
-5. 适用于后端接口、管理后台、前端进度轮询等场景。
+5. 为进度流（SSE）提供按专题+日期共享的状态源：一个后台线程只检查进度文件的元数据，
+   有变化时才重新汇总并推送给所有订阅者。
+6. 适用于后端接口、管理后台、前端进度轮询等场景。
 
 主要导出函数：
 - collect_filter_status：聚合过滤进度与摘要信息
 - count_jsonl_rows：统计JSONL文件行数
 - load_filter_summary_data：读取过滤流水线汇总数据
+- subscribe_filter_status：订阅过滤进度推送
 
 适用场景：
 - 过滤任务进度监控与展示
@@ -23,9 +26,12 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from src.utils.broadcast import Broadcaster, Subscription  # type: ignore
+from src.utils.io.layers import count_layer_rows, find_layer_file, list_layer_files  # type: ignore
 from src.utils.setting.paths import bucket  # type: ignore
 
 from .filter_jobs import is_filter_job_running
@@ -34,16 +40,18 @@ from .paths import FILTER_PROGRESS_DIR, FILTER_SUMMARY_FILENAME
 _RECENT_RECORD_LIMIT = 40
 _IRRELEVANT_SAMPLE_LIMIT = 10
 _RELEVANT_SAMPLE_LIMIT = 10
+_STATUS_WATCH_INTERVAL = 0.1
 
+_STATUS_HUB = Broadcaster(poll_interval=_STATUS_WATCH_INTERVAL, name="filter-status")
 
-def count_jsonl_rows(path: Path) -> int:
-    """Return the number of non-empty rows inside a JSONL file."""
 
-    if not path.exists():
+def count_jsonl_rows(path: Optional[Path]) -> int:
+    """Return the number of non-empty rows inside a layer file (JSONL or Parquet)."""
+
+    if path is None or not path.exists():
         return 0
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            return sum(1 for line in fh if line.strip())
+        return count_layer_rows(path)
     except Exception:  # pragma: no cover - defensive for partial files
         return 0
 
@@ -70,6 +78,12 @@ def load_filter_summary_data(topic: str, date: str) -> Dict[str, Any]:
         "kept_rows": int(payload.get("kept_rows") or 0),
         "discarded_rows": int(payload.get("discarded_rows") or 0),
         "token_usage": int(payload.get("token_usage") or 0),
+        "verdict_cache": payload.get("verdict_cache")
+        if isinstance(payload.get("verdict_cache"), dict)
+        else {},
+        "near_duplicates": payload.get("near_duplicates")
+        if isinstance(payload.get("near_duplicates"), dict)
+        else {},
         "source": str(payload.get("source") or "").strip(),
         "relevant_samples": payload.get("relevant_samples")
         if isinstance(payload.get("relevant_samples"), list)
@@ -101,7 +115,7 @@ def collect_filter_status(topic: str, date: str) -> Dict[str, Any]:
     kept_rows = 0
     running = False
 
-    clean_files = sorted(clean_dir.glob("*.jsonl")) if clean_dir.exists() else []
+    clean_files = list_layer_files(clean_dir)
     for file_path in clean_files:
         channel = file_path.stem
         if channel == "all":
@@ -130,7 +144,7 @@ def collect_filter_status(topic: str, date: str) -> Dict[str, Any]:
         if not isinstance(channel_failed, int):
             channel_failed = len(progress_data.get("failed_indices", []))
 
-        channel_kept = count_jsonl_rows(filter_dir / f"{channel}.jsonl")
+        channel_kept = count_jsonl_rows(find_layer_file(filter_dir, channel))
 
         total_rows += channel_total
         completed_rows += min(channel_total, channel_completed)
@@ -201,8 +215,99 @@ def collect_filter_status(topic: str, date: str) -> Dict[str, Any]:
     }
 
 
+def _stat_signature(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return (-1, 0)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _dir_signature(directory: Path) -> Tuple[Tuple[str, int, int], ...]:
+    entries = []
+    try:
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    except OSError:
+        return ()
+    return tuple(sorted(entries))
+
+
+class FilterStatusFeed:
+    """Shared status source for one topic/date: rebuilds the payload only when inputs change."""
+
+    def __init__(self, topic: str, date: str, build: Callable[[], Dict[str, Any]]):
+        self.topic = topic
+        self.date = date
+        self._build = build
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._message = ""
+        self.latest: Optional[Tuple[str, Any]] = None
+
+    def signature(self) -> Tuple[Any, ...]:
+        """Metadata of every file collect_filter_status reads, plus the in-memory running flag."""
+
+        clean_dir = bucket("clean", self.topic, self.date)
+        filter_dir = bucket("filter", self.topic, self.date)
+        clean_entries = _dir_signature(clean_dir)
+        progress = tuple(
+            _stat_signature(FILTER_PROGRESS_DIR / f"{self.topic}_{self.date}_{Path(name).stem}_progress.json")
+            for name, _, _ in clean_entries
+        )
+        return (
+            clean_entries,
+            progress,
+            _dir_signature(filter_dir),
+            is_filter_job_running(self.topic, self.date),
+        )
+
+    def poll(self) -> List[Tuple[str, Any]]:
+        signature = self.signature()
+        if signature == self._signature:
+            return []
+        self._signature = signature
+        try:
+            payload = self._build()
+        except Exception as exc:  # pragma: no cover - defensive
+            item: Tuple[str, Any] = ("error", {"message": str(exc)})
+        else:
+            item = ("data", payload)
+        message = json.dumps(item, ensure_ascii=False)
+        if message == self._message:
+            return []
+        self._message = message
+        self.latest = item
+        return [item]
+
+
+def subscribe_filter_status(
+    topic: str,
+    date: str,
+    build: Callable[[], Dict[str, Any]],
+    *,
+    key_suffix: str = "",
+) -> Subscription:
+    """
+    Subscribe to filter status updates for a topic/date.
+
+    All subscriptions with the same key share one FilterStatusFeed (``subscription.source``)
+    and one watcher thread. Messages are ``("data", payload)`` or ``("error", detail)``;
+    ``source.latest`` holds the most recent message for late subscribers.
+    """
+
+    key = "/".join(part for part in (topic, date, key_suffix) if part)
+    return _STATUS_HUB.subscribe(key, lambda: FilterStatusFeed(topic, date, build))
+
+
 __all__ = [
+    "FilterStatusFeed",
     "collect_filter_status",
     "count_jsonl_rows",
     "load_filter_summary_data",
+    "subscribe_filter_status",
 ]
@@ -14,6 +14,7 @@ from uuid import uuid4
 from filelock import FileLock
 
 from src.utils.setting.paths import get_data_root  # type: ignore
+from src.utils.task_store import TaskFamily, task_family  # type: ignore
 
 LOGGER = logging.getLogger(__name__)
 
@@ -93,14 +94,8 @@ def task_state_path(task_id: str) -> Path:
     return TASK_STATE_DIR / f"{task_id}.json"
 
 
-def _load_all_tasks() -> List[Dict[str, Any]]:
-    _ensure_state_dirs()
-    tasks: List[Dict[str, Any]] = []
-    for path in TASK_STATE_DIR.glob("*.json"):
-        payload = _load_json(path, {})
-        if isinstance(payload, dict) and payload.get("id"):
-            tasks.append(payload)
-    return tasks
+def _task_family() -> TaskFamily:
+    return task_family("publisher-detection", STATE_ROOT, task_dir=TASK_STATE_DIR)
 
 
 def _load_task(task_id: str) -> Optional[Dict[str, Any]]:
@@ -114,6 +109,7 @@ def _save_task(task: Dict[str, Any]) -> None:
     with lock:
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
 
 
 def _update_task(task_id: str, mutate) -> Dict[str, Any]:
@@ -126,6 +122,7 @@ def _update_task(task_id: str, mutate) -> Dict[str, Any]:
         mutate(task)
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
         return task
 
 
@@ -215,7 +212,7 @@ def find_latest_task(
     desired_statuses = set(statuses or [])
     scope_key = _scope_key(topic_identifier, database, tables)
     matches = []
-    for task in _load_all_tasks():
+    for task in _task_family().list(statuses=desired_statuses):
         if str(task.get("scope_key") or "") != scope_key:
             continue
         if desired_statuses and str(task.get("status") or "") not in desired_statuses:
@@ -274,13 +271,10 @@ def create_or_reuse_task(
 
 
 def reserve_next_task() -> Optional[Dict[str, Any]]:
-    queued = sorted(
-        (item for item in _load_all_tasks() if str(item.get("status") or "") == "queued"),
-        key=lambda item: item.get("created_at") or "",
-    )
+    queued = _task_family().next_queued()
     if not queued:
         return None
-    task_id = str(queued[0].get("id") or "")
+    task_id = str(queued.get("id") or "")
     if not task_id:
         return None
     return mark_task_progress(
@@ -386,9 +380,7 @@ def mark_task_progress(
 def _reconcile_orphaned_running_tasks(worker_status: Dict[str, Any]) -> None:
     if worker_status.get("running"):
         return
-    for task in _load_all_tasks():
-        if str(task.get("status") or "") != "running":
-            continue
+    for task in _task_family().list(statuses=["running"]):
         task_id = str(task.get("id") or "")
         if not task_id:
             continue
@@ -504,6 +496,7 @@ def delete_task(task_id: str) -> None:
     with lock:
         if path.exists():
             path.unlink()
+    _task_family().drop(task_id)
 
 
 __all__ = [
@@ -10,7 +10,7 @@ import time
 import lancedb
 
 from src.utils.setting.paths import get_data_root, bucket
-from src.utils.io.excel import read_jsonl
+from src.utils.io.layers import find_layer_file, list_layer_files, read_layer
 from src.utils.logging.logging import setup_logger, log_success, log_error
 from src.utils.rag.tagrag.tag_vec_data import vectorize_and_store, to_pinyin
 from src.utils.rag.ragrouter.router_vec_data import run_ragrouter
@@ -141,10 +141,10 @@ def _fetch_dir_for_range(project: str, start: str, end: str) -> Path:
 def _extract_texts_from_fetch(fetch_dir: Path) -> List[str]:
     text_cols = ["contents", "content", "text", "正文"]
     files: List[Path] = []
-    overall = fetch_dir / "总体.jsonl"
-    if overall.exists():
+    overall = find_layer_file(fetch_dir, "总体")
+    if overall is not None:
         files.append(overall)
-    for candidate in sorted(fetch_dir.glob("*.jsonl")):
+    for candidate in list_layer_files(fetch_dir):
         if candidate not in files:
             files.append(candidate)
 
@@ -168,7 +168,7 @@ def _extract_texts_from_fetch(fetch_dir: Path) -> List[str]:
     for path in files:
         df = None
         try:
-            df = read_jsonl(path)
+            df = read_layer(path)
         except Exception:
             df = None
         if df is not None and not df.empty:
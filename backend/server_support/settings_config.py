@@ -536,7 +536,7 @@ def register_settings_endpoints(app: Flask, project_manager: Any):
             if field in payload:
                 filter_llm[field] = str(payload[field]).strip()
 
-        for field in ["qps", "batch_size", "truncation"]:
+        for field in ["qps", "batch_size", "truncation", "max_concurrency", "tokens_per_minute"]:
             if field in payload:
                 try:
                     filter_llm[field] = int(payload[field])
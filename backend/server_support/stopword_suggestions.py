@@ -17,7 +17,10 @@ from filelock import FileLock
 
 from src.topic.config import load_bertopic_stopwords  # type: ignore
 from src.topic.prompt_config import load_topic_bertopic_prompt_config  # type: ignore
+from src.utils.io.layers import count_layer_rows, iter_layer_records, list_layer_files  # type: ignore
+from src.utils.segmentation import JIEBA_AVAILABLE, segment_texts, token_cache_path  # type: ignore
 from src.utils.setting.paths import get_data_root  # type: ignore
+from src.utils.task_store import TaskFamily, task_family  # type: ignore
 
 LOGGER = logging.getLogger(__name__)
 
@@ -47,14 +50,6 @@ DEFAULT_EN_STOPWORDS = {
     "when", "where", "which", "while", "who", "will", "with", "would", "you", "your",
 }
 
-try:
-    import jieba  # type: ignore
-
-    JIEBA_AVAILABLE = True
-    jieba.setLogLevel(60)
-except Exception:  # pragma: no cover - optional dependency
-    jieba = None
-    JIEBA_AVAILABLE = False
 
 
 def _utc_now() -> str:
@@ -109,14 +104,8 @@ def task_state_path(task_id: str) -> Path:
     return TASK_STATE_DIR / f"{task_id}.json"
 
 
-def _load_all_tasks() -> List[Dict[str, Any]]:
-    _ensure_state_dirs()
-    tasks: List[Dict[str, Any]] = []
-    for path in TASK_STATE_DIR.glob("*.json"):
-        payload = _load_json(path, {})
-        if isinstance(payload, dict) and payload.get("id"):
-            tasks.append(payload)
-    return tasks
+def _task_family() -> TaskFamily:
+    return task_family("stopword-suggestions", STATE_ROOT, task_dir=TASK_STATE_DIR)
 
 
 def _load_task(task_id: str) -> Optional[Dict[str, Any]]:
@@ -130,6 +119,7 @@ def _save_task(task: Dict[str, Any]) -> None:
     with lock:
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
 
 
 def _update_task(task_id: str, mutate) -> Dict[str, Any]:
@@ -142,6 +132,7 @@ def _update_task(task_id: str, mutate) -> Dict[str, Any]:
         mutate(task)
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
         return task
 
 
@@ -220,13 +211,15 @@ def _looks_like_noise_token(token: str) -> bool:
     return False
 
 
-def _iter_tokens(text: str, excluded_terms: set[str]) -> Iterable[str]:
+def _iter_tokens(text: str, excluded_terms: set[str], segmented: Optional[List[str]] = None) -> Iterable[str]:
     source = str(text or "").strip()
     if not source:
         return
 
     if JIEBA_AVAILABLE:
-        for raw in jieba.lcut(source, cut_all=False):
+        if segmented is None:
+            segmented = segment_texts([source])[0]
+        for raw in segmented:
             token = str(raw or "").strip()
             if _looks_like_noise_token(token):
                 continue
@@ -336,7 +329,7 @@ def find_latest_task(
 ) -> Optional[Dict[str, Any]]:
     desired_statuses = set(statuses or [])
     matches = []
-    for task in _load_all_tasks():
+    for task in _task_family().list(topic=topic_identifier, statuses=desired_statuses):
         if str(task.get("topic_identifier") or "") != topic_identifier:
             continue
         if str(task.get("date") or "") != date:
@@ -377,13 +370,10 @@ def get_latest_task(topic_identifier: str, date: str, *, stage: str = "pre") ->
 
 
 def reserve_next_task() -> Optional[Dict[str, Any]]:
-    queued = sorted(
-        (item for item in _load_all_tasks() if str(item.get("status") or "") == "queued"),
-        key=lambda item: item.get("created_at") or "",
-    )
+    queued = _task_family().next_queued()
     if not queued:
         return None
-    task_id = str(queued[0].get("id") or "")
+    task_id = str(queued.get("id") or "")
     if not task_id:
         return None
     return mark_task_progress(
@@ -485,9 +475,7 @@ def mark_task_progress(
 def _reconcile_orphaned_running_tasks(worker_status: Dict[str, Any]) -> None:
     if worker_status.get("running"):
         return
-    for task in _load_all_tasks():
-        if str(task.get("status") or "") != "running":
-            continue
+    for task in _task_family().list(statuses=["running"]):
         task_id = str(task.get("id") or "")
         if not task_id:
             continue
@@ -520,7 +508,7 @@ def _pick_source_layer(topic_identifier: str, date: str, stage: str) -> tuple[st
     priorities = STAGE_SOURCE_PRIORITY.get(str(stage or "pre"), STAGE_SOURCE_PRIORITY["pre"])
     for layer in priorities:
         layer_dir = _source_dir(topic_identifier, layer, date)
-        files = sorted(path for path in layer_dir.glob("*.jsonl") if path.is_file())
+        files = list_layer_files(layer_dir)
         if files:
             return layer, files
     checked = ", ".join(priorities)
@@ -542,10 +530,7 @@ def analyse_archive_terms(
     excluded_terms = _load_excluded_terms(topic_identifier)
     total_docs = 0
     for file_path in files:
-        with file_path.open("r", encoding="utf-8") as handle:
-            for raw_line in handle:
-                if raw_line.strip():
-                    total_docs += 1
+        total_docs += count_layer_rows(file_path)
 
     processed_docs = 0
     doc_counter: Counter[str] = Counter()
@@ -566,25 +551,25 @@ def analyse_archive_terms(
             },
         )
 
+    # 分词结果缓存在数据目录下，重复生成建议或其他模块分析同一批数据时直接复用
+    cache_path = token_cache_path(_source_dir(topic_identifier, source_layer, date))
     for index, file_path in enumerate(files, start=1):
-        with file_path.open("r", encoding="utf-8") as handle:
-            for raw_line in handle:
-                line = raw_line.strip()
-                if not line:
-                    continue
-                try:
-                    payload = json.loads(line)
-                except Exception:
-                    continue
-                if not isinstance(payload, dict):
-                    continue
-                document_tokens: List[str] = []
-                for text in _iter_text_fields(payload):
-                    document_tokens.extend(_iter_tokens(text, excluded_terms))
-                if document_tokens:
-                    total_counter.update(document_tokens)
-                    doc_counter.update(set(document_tokens))
-                processed_docs += 1
+        documents = [
+            [str(text).strip() for text in _iter_text_fields(payload)]
+            for payload in iter_layer_records(file_path)
+        ]
+        # 按文件批量分词：命中缓存的文本不再重复切分，未命中较多时多进程并行
+        flat_texts = [text for texts in documents for text in texts]
+        segmented = iter(segment_texts(flat_texts, cache_path=cache_path)) if JIEBA_AVAILABLE else None
+        for texts in documents:
+            document_tokens: List[str] = []
+            for text in texts:
+                words = next(segmented) if segmented is not None else None
+                document_tokens.extend(_iter_tokens(text, excluded_terms, words))
+            if document_tokens:
+                total_counter.update(document_tokens)
+                doc_counter.update(set(document_tokens))
+            processed_docs += 1
 
         if progress_callback:
             percentage = 8 + int(index / max(total_files, 1) * 87)
@@ -649,6 +634,7 @@ def delete_task(task_id: str) -> None:
     with lock:
         if path.exists():
             path.unlink()
+    _task_family().drop(task_id)
 
 
 __all__ = [
@@ -0,0 +1,296 @@
+"""
+单次加载的分析引擎
+
+- 每个渠道层文件只读取一次（按已配置分析函数需要的列裁剪），所有分析函数共享同一份数据框；
+- 每个 (分析函数, 渠道) 组合计算一份可相加的中间计数，组合之间互不依赖，交给线程池并行执行；
+- 渠道结果由自身计数生成，总体结果由各渠道计数相加得到，不再读取并重算 总体 文件
+  （总体 层即各渠道数据的拼接）；没有渠道文件、或有渠道计算失败时才退回读取 总体。
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ..utils.io.layers import count_layer_rows, find_layer_file, list_layer_files, read_layer
+from ..utils.logging.logging import log_error, log_success
+from .functions.attitude import ATTITUDE_COLUMNS, build_attitude_result, count_attitudes
+from .functions.classification import CLASSIFICATION_COLUMNS, build_classification_result, count_classifications
+from .functions.geography import REGION_COLUMNS, build_geography_result, count_geography
+from .functions.keywords import build_keywords_result, count_keywords, is_content_column
+from .functions.publishers import PUBLISHERS_COLUMNS, build_publishers_result, count_publishers
+from .functions.trends import TRENDS_COLUMNS, build_trends_result, count_trends
+from .functions.volume import build_volume_result
+
+OVERALL = "总体"
+CHANNEL_TARGET = "渠道"
+
+Counts = Dict[str, int]
+
+
+class FrameCache:
+    """
+    按名称缓存层数据框，每个文件最多读取一次（线程安全）
+
+    Args:
+        sources: {名称: 层文件路径}
+        column_filter: 需要保留的列，返回 False 的列不解码（Parquet）或读取后丢弃（JSONL）；为空时保留全部列
+    """
+
+    def __init__(self, sources: Dict[str, Path], column_filter: Optional[Callable[[str], bool]] = None):
+        self.sources = dict(sources)
+        self.column_filter = column_filter
+        self.loads: Counter = Counter()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._locks = {name: threading.Lock() for name in self.sources}
+
+    def _read(self, path: Path) -> pd.DataFrame:
+        if self.column_filter is None:
+            return read_layer(path)
+        if path.suffix.lower() == ".parquet":
+            import pyarrow.parquet as pq
+
+            columns = [name for name in pq.read_schema(path).names if self.column_filter(name)]
+            return read_layer(path, columns=columns)
+        df = read_layer(path)
+        return df[[column for column in df.columns if self.column_filter(str(column))]]
+
+    def get(self, name: str) -> pd.DataFrame:
+        with self._locks[name]:
+            if name not in self._frames:
+                self._frames[name] = self._read(self.sources[name])
+                self.loads[name] += 1
+            return self._frames[name]
+
+    def row_count(self, name: str) -> int:
+        """行数：已加载时直接取数据框长度，否则读取文件元数据（Parquet）或逐行计数"""
+        frame = self._frames.get(name)
+        if frame is not None:
+            return len(frame)
+        return count_layer_rows(self.sources[name])
+
+
+@dataclass
+class AnalysisContext:
+    """单个 (分析函数, 数据源) 组合的运行上下文"""
+
+    source: str
+    frames: FrameCache
+    cache_dir: Optional[Path] = None
+    logger: Any = None
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self.frames.get(self.source)
+
+
+@dataclass(frozen=True)
+class AnalysisSpec:
+    """
+    分析函数描述
+
+    Attributes:
+        name: 分析函数名（与 analysis.yaml 中 functions.name 一致）
+        count: 计算某个数据源的中间计数，返回 None 表示数据不适用（如缺少必需列）
+        build: 由（相加后的）计数生成结果
+        columns: 需要读取的列
+        column_filter: 按列名判断是否需要读取（列名不固定时使用）
+        empty: 数据不适用或计算失败时的结果
+    """
+
+    name: str
+    count: Callable[[AnalysisContext], Optional[Counts]]
+    build: Callable[[Counts], Dict[str, Any]]
+    columns: Tuple[str, ...] = ()
+    column_filter: Optional[Callable[[str], bool]] = None
+    empty: Optional[Dict[str, Any]] = None
+
+    def wants(self, column: str) -> bool:
+        return column in self.columns or bool(self.column_filter and self.column_filter(column))
+
+    def empty_result(self) -> Dict[str, Any]:
+        return dict(self.empty) if self.empty is not None else {"data": []}
+
+
+def _count_volume(ctx: AnalysisContext) -> Counts:
+    # 声量按渠道统计，只有 总体 文件时没有可对比的渠道
+    if ctx.source == OVERALL:
+        return {}
+    return {ctx.source: ctx.frames.row_count(ctx.source)}
+
+
+ANALYSIS_SPECS: Dict[str, AnalysisSpec] = {
+    spec.name: spec
+    for spec in (
+        AnalysisSpec("volume", _count_volume, build_volume_result),
+        AnalysisSpec(
+            "attitude",
+            lambda ctx: count_attitudes(ctx.frame, ctx.logger, ctx.progress_callback),
+            build_attitude_result,
+            columns=ATTITUDE_COLUMNS,
+        ),
+        AnalysisSpec("trends", lambda ctx: count_trends(ctx.frame), build_trends_result, columns=TRENDS_COLUMNS),
+        AnalysisSpec(
+            "keywords",
+            lambda ctx: count_keywords(ctx.frame, ctx.cache_dir),
+            build_keywords_result,
+            column_filter=is_content_column,
+        ),
+        AnalysisSpec("geography", lambda ctx: count_geography(ctx.frame), build_geography_result, columns=REGION_COLUMNS),
+        AnalysisSpec(
+            "publishers", lambda ctx: count_publishers(ctx.frame), build_publishers_result, columns=PUBLISHERS_COLUMNS
+        ),
+        AnalysisSpec(
+            "classification",
+            lambda ctx: count_classifications(ctx.frame),
+            build_classification_result,
+            columns=CLASSIFICATION_COLUMNS,
+            empty={},
+        ),
+    )
+}
+
+
+def combine_counts(partials: Iterable[Optional[Counts]]) -> Optional[Counts]:
+    """
+    相加各数据源的中间计数（保持首次出现的顺序）
+
+    Returns:
+        Optional[Counts]: 全部不适用时返回 None
+    """
+    combined: Optional[Counts] = None
+    for partial in partials:
+        if partial is None:
+            continue
+        if combined is None:
+            combined = {}
+        for key, value in partial.items():
+            combined[key] = combined.get(key, 0) + int(value)
+    return combined
+
+
+def _column_filter(specs: Sequence[AnalysisSpec]) -> Optional[Callable[[str], bool]]:
+    if any(spec.name != "volume" for spec in specs):
+        return lambda column: any(spec.wants(column) for spec in specs)
+    # 只有声量时不需要读取任何数据，直接统计行数
+    return lambda column: False
+
+
+def run_analysis_engine(
+    fetch_dir: Path,
+    functions: Sequence[Dict[str, Any]],
+    *,
+    logger=None,
+    max_workers: int = 4,
+    on_result: Callable[[str, str, Dict[str, Any]], None],
+    progress_factory: Optional[Callable[[str, str], Optional[Callable[[Dict[str, Any]], None]]]] = None,
+    on_progress: Optional[Callable[[int, int, str, str], None]] = None,
+) -> Dict[Tuple[str, str], bool]:
+    """
+    对 fetch 目录运行已配置的分析函数
+
+    Args:
+        fetch_dir: fetch 数据目录（含各渠道层文件与 总体）
+        functions: analysis.yaml 的 functions 配置（name/target）
+        logger: 日志记录器
+        max_workers: 并行计算 (分析函数, 渠道) 组合的线程数
+        on_result: 结果回调 on_result(函数名, 渠道名或 总体, 结果)，在调用线程中按完成顺序执行
+        progress_factory: 返回某个 (函数名, 数据源) 组合的子进度回调（如情感分析的 AI 分类进度）
+        on_progress: 组合完成回调 on_progress(已完成数, 总数, 函数名, 数据源)
+
+    Returns:
+        Dict[Tuple[str, str], bool]: 每个 (函数名, 目标) 是否产出了结果
+    """
+    targets: Dict[str, set] = {}
+    for func_config in functions:
+        name = str(func_config.get('name') or '').strip()
+        target = str(func_config.get('target') or '').strip()
+        targets.setdefault(name, set()).add(target)
+
+    specs: List[AnalysisSpec] = []
+    for name in targets:
+        spec = ANALYSIS_SPECS.get(name)
+        if spec is None:
+            log_error(logger, f"未知的分析函数: {name}", "Analysis")
+            continue
+        specs.append(spec)
+
+    channel_files = {path.stem: path for path in list_layer_files(fetch_dir, exclude=(OVERALL,))}
+    sources = dict(channel_files)
+    overall_file = find_layer_file(fetch_dir, OVERALL)
+    if overall_file is not None:
+        sources[OVERALL] = overall_file
+    frames = FrameCache(sources, _column_filter(specs))
+    # 没有渠道文件时，总体 直接作为唯一数据源
+    channels = list(channel_files) or ([OVERALL] if overall_file is not None else [])
+
+    def _run(spec: AnalysisSpec, source: str) -> Optional[Counts]:
+        callback = progress_factory(spec.name, source) if progress_factory else None
+        ctx = AnalysisContext(source, frames, cache_dir=Path(fetch_dir), logger=logger, progress_callback=callback)
+        return spec.count(ctx)
+
+    status: Dict[Tuple[str, str], bool] = {}
+    partials: Dict[str, Dict[str, Any]] = {spec.name: {} for spec in specs}
+    total = len(specs) * len(channels)
+    completed = 0
+
+    def _finish_overall(spec: AnalysisSpec) -> None:
+        results = partials[spec.name]
+        failed = [source for source in channels if isinstance(results.get(source), Exception)]
+        if failed and OVERALL in sources and channels != [OVERALL]:
+            # 有渠道计算失败时退回在 总体 上重新计算，避免总体结果缺少部分渠道
+            log_error(logger, f"{spec.name} | 渠道 {', '.join(failed)} 计算失败，改用总体数据", "Analysis")
+            try:
+                counts = _run(spec, OVERALL)
+            except Exception as exc:
+                log_error(logger, f"{spec.name} | {OVERALL} 分析失败: {exc}", "Analysis")
+                counts = None
+        elif failed and len(failed) == len(channels):
+            counts = None
+        else:
+            counts = combine_counts(
+                results.get(source) for source in channels if not isinstance(results.get(source), Exception)
+            )
+        result = spec.build(counts) if counts is not None else spec.empty_result()
+        log_success(logger, f"{spec.name} | {OVERALL} 分析完成", "Analyze")
+        on_result(spec.name, OVERALL, result)
+        status[(spec.name, OVERALL)] = True
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(max_workers or 1))) as executor:
+        futures = {
+            executor.submit(_run, spec, source): (spec, source)
+            for spec in specs
+            for source in channels
+        }
+        for future in concurrent.futures.as_completed(futures):
+            spec, source = futures[future]
+            try:
+                counts = future.result()
+            except Exception as exc:
+                log_error(logger, f"{spec.name} | {source} 分析失败: {exc}", "Analysis")
+                counts = exc
+            partials[spec.name][source] = counts
+            completed += 1
+
+            if CHANNEL_TARGET in targets[spec.name] and source != OVERALL:
+                if isinstance(counts, Exception):
+                    result = spec.empty_result()
+                else:
+                    result = spec.build(counts) if counts is not None else spec.empty_result()
+                    log_success(logger, f"{spec.name} | {source} 分析完成", "Analyze")
+                on_result(spec.name, source, result)
+                status[(spec.name, CHANNEL_TARGET)] = True
+
+            if on_progress:
+                on_progress(completed, total, spec.name, source)
+
+            if OVERALL in targets[spec.name] and len(partials[spec.name]) == len(channels):
+                _finish_overall(spec)
+
+    return status
@@ -12,6 +12,11 @@ SENTIMENT_MAX_RETRIES = 3  # 最大重试次数
 SENTIMENT_RETRY_DELAY = 1.0  # 重试间隔（秒）
 SENTIMENT_TEXT_MAX_LENGTH = 500  # 文本截断长度
 
+# 情感候选列与 AI 分类使用的文本列（读取数据时的列裁剪）
+ATTITUDE_SOURCE_COLUMNS = ('polarity', 'sentiment', '情感', '情绪', '情感倾向', 'att', 'label')
+SENTIMENT_TEXT_COLUMNS = ('contents', 'content', 'text', '正文', '内容', 'title')
+ATTITUDE_COLUMNS = ('attitude',) + ATTITUDE_SOURCE_COLUMNS + SENTIMENT_TEXT_COLUMNS
+
 
 def _normalize_attitude_column(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -27,10 +32,7 @@ def _normalize_attitude_column(df: pd.DataFrame) -> pd.DataFrame:
         return df
     df = df.copy()
     # 候选列名（按常见命名）
-    candidate_cols = [
-        'polarity', 'sentiment', '情感', '情绪', '情感倾向', 'att', 'label'
-    ]
-    col = next((c for c in candidate_cols if c in df.columns), None)
+    col = next((c for c in ATTITUDE_SOURCE_COLUMNS if c in df.columns), None)
     if col is None:
         df['attitude'] = 'unknown'
         return df
@@ -221,11 +223,7 @@ def _classify_unknown_sentiments(
     df = df.copy()
 
     # 获取文本内容列
-    text_col = None
-    for col in ['contents', 'content', 'text', '正文', '内容', 'title']:
-        if col in df.columns:
-            text_col = col
-            break
+    text_col = next((col for col in SENTIMENT_TEXT_COLUMNS if col in df.columns), None)
 
     if text_col is None:
         if logger:
@@ -336,6 +334,33 @@ def _classify_unknown_sentiments(
     return df
 
 
+def count_attitudes(
+    df: pd.DataFrame,
+    logger=None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, int]:
+    """
+    标准化情感字段并对 unknown 做 AI 分类后统计态度分布（可跨渠道相加的中间结果）
+
+    Args:
+        df (pd.DataFrame): 数据框
+        logger: 日志记录器
+        progress_callback: 进度回调函数
+
+    Returns:
+        Dict[str, int]: {态度: 条数}
+    """
+    df = _normalize_attitude_column(df)
+    df = _classify_unknown_sentiments(df, logger, progress_callback)
+    return {k: int(v) for k, v in df['attitude'].value_counts().items()}
+
+
+def build_attitude_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """将态度计数按数量降序整理为结果"""
+    ordered = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return {"data": [{"name": k, "value": v} for k, v in ordered]}
+
+
 def analyze_attitude_overall(
     df: pd.DataFrame,
     logger=None,
@@ -458,14 +483,7 @@ def analyze_attitude_by_channel(
         logger = setup_logger("attitude", "channel")
 
     try:
-        df = _normalize_attitude_column(df)
-        df = _classify_unknown_sentiments(df, logger, progress_callback)
-        attitude_counts = df['attitude'].value_counts().to_dict()
-        attitude_data = [{"name": k, "value": v} for k, v in attitude_counts.items()]
-
-        result = {
-            "data": attitude_data
-        }
+        result = build_attitude_result(count_attitudes(df, logger, progress_callback))
 
         log_success(logger, f"attitude | {channel_name} 分析完成", "Analyze")
         return result
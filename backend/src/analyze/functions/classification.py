@@ -2,10 +2,37 @@
 分类分析模块 - 对classification字段进行统计分析
 """
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from ...utils.logging.logging import log_success, log_error, log_skip
 
 
+CLASSIFICATION_COLUMNS = ('classification',)
+
+
+def count_classifications(df: pd.DataFrame) -> Optional[Dict[str, int]]:
+    """
+    统计分类分布（可跨渠道相加的中间结果）
+    
+    Args:
+        df (pd.DataFrame): 数据框
+    
+    Returns:
+        Optional[Dict[str, int]]: {分类: 条数}，缺少 classification 字段时返回 None
+    """
+    if 'classification' not in df.columns:
+        return None
+    # 清理分类数据
+    df_classification = df['classification'].fillna('未知').astype(str).str.strip()
+    df_classification = df_classification.replace(['', 'nan', 'None', 'null'], '未知')
+    return {k: int(v) for k, v in df_classification.value_counts().items()}
+
+
+def build_classification_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """将分类计数按数量降序整理为结果"""
+    ordered = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return {"data": [{"name": name, "value": int(count)} for name, count in ordered]}
+
+
 def analyze_classification_overall(df: pd.DataFrame, logger) -> Dict[str, Any]:
     """
     分析总体分类统计
@@ -22,33 +49,13 @@ def analyze_classification_overall(df: pd.DataFrame, logger) -> Dict[str, Any]:
             log_skip(logger, "总体数据为空，跳过分类分析", "Analyze")
             return {}
         
-        # 检查classification字段是否存在
-        if 'classification' not in df.columns:
+        # 统计分类分布
+        counts = count_classifications(df)
+        if counts is None:
             log_error(logger, "数据中缺少classification字段", "Analyze")
             return {}
         
-        # 清理分类数据
-        df_classification = df['classification'].fillna('未知').astype(str).str.strip()
-        df_classification = df_classification.replace(['', 'nan', 'None', 'null'], '未知')
-        
-        # 统计分类分布
-        classification_counts = df_classification.value_counts()
-        total_count = len(df_classification)
-        
-        # 计算百分比
-        classification_percentages = (classification_counts / total_count * 100).round(2)
-        
-        # 构建结果 - 按照指定格式
-        data_list = []
-        for classification, count in classification_counts.items():
-            data_list.append({
-                "name": classification,
-                "value": int(count)
-            })
-        
-        result = {
-            "data": data_list
-        }
+        result = build_classification_result(counts)
         
         log_success(logger, "classification | 总体 分析完成", "Analyze")
         return result
@@ -75,33 +82,13 @@ def analyze_classification_by_channel(df: pd.DataFrame, channel_name: str, logge
             log_skip(logger, f"渠道 {channel_name} 数据为空，跳过分类分析", "Analyze")
             return {}
         
-        # 检查classification字段是否存在
-        if 'classification' not in df.columns:
+        # 统计分类分布
+        counts = count_classifications(df)
+        if counts is None:
             log_error(logger, f"渠道 {channel_name} 数据中缺少classification字段", "Analyze")
             return {}
         
-        # 清理分类数据
-        df_classification = df['classification'].fillna('未知').astype(str).str.strip()
-        df_classification = df_classification.replace(['', 'nan', 'None', 'null'], '未知')
-        
-        # 统计分类分布
-        classification_counts = df_classification.value_counts()
-        total_count = len(df_classification)
-        
-        # 计算百分比
-        classification_percentages = (classification_counts / total_count * 100).round(2)
-        
-        # 构建结果 - 按照指定格式
-        data_list = []
-        for classification, count in classification_counts.items():
-            data_list.append({
-                "name": classification,
-                "value": int(count)
-            })
-        
-        result = {
-            "data": data_list
-        }
+        result = build_classification_result(counts)
         
         log_success(logger, f"classification | {channel_name} 分析完成", "Analyze")
         return result
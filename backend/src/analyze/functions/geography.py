@@ -7,6 +7,7 @@ from ...utils.logging.logging import setup_logger, log_success, log_error, log_m
 
 
 INVALID_REGION_VALUES = {"", "-", "--", "—", "未知", "nan", "none", "null"}
+REGION_COLUMNS = ('region', '地区', '省份', 'province', 'Province', 'location_province')
 
 def _detect_region_col(df: pd.DataFrame) -> str:
     """
@@ -18,8 +19,7 @@ def _detect_region_col(df: pd.DataFrame) -> str:
     Returns:
         str: 地域列名，如果未找到则返回None
     """
-    candidate_cols = ['region', '地区', '省份', 'province', 'Province', 'location_province']
-    return next((c for c in candidate_cols if c in df.columns), None)
+    return next((c for c in REGION_COLUMNS if c in df.columns), None)
 
 def _count_regions(df: pd.DataFrame) -> Dict[str, int]:
     """
@@ -41,6 +41,17 @@ def _count_regions(df: pd.DataFrame) -> Dict[str, int]:
     return counts
 
 
+def count_geography(df: pd.DataFrame) -> Dict[str, int]:
+    """统计地域分布（可跨渠道相加的中间结果）"""
+    return {k: int(v) for k, v in _count_regions(df).items()}
+
+
+def build_geography_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """将地域计数按数量降序整理为结果"""
+    sorted_counts = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return {"data": [{"name": k, "value": v} for k, v in sorted_counts]}
+
+
 def analyze_geography_overall(df: pd.DataFrame, logger=None) -> Dict[str, Any]:
     """
     分析总体地域分布
@@ -56,16 +67,8 @@ def analyze_geography_overall(df: pd.DataFrame, logger=None) -> Dict[str, Any]:
         logger = setup_logger("default", "default")
         
     try:
-        # 统计地域分布
-        region_counts = _count_regions(df)
-        sorted_counts = sorted(region_counts.items(), key=lambda item: item[1], reverse=True)
-
-        # 转换为JSON格式
-        region_data = [{"name": k, "value": v} for k, v in sorted_counts]
-
-        result = {
-            "data": region_data
-        }
+        # 统计地域分布并转换为JSON格式
+        result = build_geography_result(count_geography(df))
 
         log_success(logger, "geography | 总体 分析完成", "Analyze")
         return result
@@ -90,16 +93,8 @@ def analyze_geography_by_channel(df: pd.DataFrame, channel_name: str, logger=Non
         logger = setup_logger("default", "default")
 
     try:
-        # 统计地域分布
-        region_counts = _count_regions(df)
-        sorted_counts = sorted(region_counts.items(), key=lambda item: item[1], reverse=True)
-
-        # 转换为JSON格式
-        region_data = [{"name": k, "value": v} for k, v in sorted_counts]
-
-        result = {
-            "data": region_data
-        }
+        # 统计地域分布并转换为JSON格式
+        result = build_geography_result(count_geography(df))
 
         log_success(logger, f"geography | {channel_name} 分析完成", "Analyze")
         return result
@@ -6,20 +6,18 @@ import re
 import json
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from ...utils.logging.logging import setup_logger, log_success, log_error, log_module_start
 from ...utils.setting.paths import bucket
 from ...utils.io.excel import read_excel, read_csv
+from ...utils.segmentation import JIEBA_AVAILABLE, segment_texts, token_cache_path
 
-# 导入jieba分词
-try:
-    import jieba
-    import jieba.posseg as pseg
-    JIEBA_AVAILABLE = True
-    # 静默设置jieba日志级别
-    jieba.setLogLevel(60)  # 设置为ERROR级别，减少输出
-except ImportError:
-    JIEBA_AVAILABLE = False
+# 保留的词性：n(名词)、v(动词)、a(形容词)、nr(人名)、ns(地名)、nt(机构名)
+KEYWORD_FLAGS = ('n', 'v', 'a', 'nr', 'ns', 'nt')
+# 列名包含这些片段的列视为内容列；都没有时退回常见文本列
+CONTENT_COLUMN_MARKERS = ('content', 'contents', '内容', '正文', '摘要', 'ocr', 'segment')
+FALLBACK_TEXT_COLUMNS = ('title', 'summary', 'content', 'contents', '正文', '摘要')
+TOP_KEYWORDS = 100
 
 def load_stopwords() -> set:
     """
@@ -57,6 +55,43 @@ def load_stopwords() -> set:
         # 加载停用词失败，返回空集合
         return set()
 
+def _filter_tagged_words(tagged: List[Tuple[str, str]], stopwords: set, min_length: int) -> List[str]:
+    """按词性、长度与停用词过滤 (词, 词性) 列表"""
+    return [
+        word for word, flag in tagged
+        if flag.startswith(KEYWORD_FLAGS) and len(word) >= min_length and word not in stopwords
+    ]
+
+
+def extract_keywords_batch(
+    texts: List[str],
+    stopwords: set,
+    min_length: int = 2,
+    cache_path: Optional[Path] = None,
+) -> List[str]:
+    """
+    按文档批量提取关键词（共享分词服务：分词结果按文本缓存，文本较多时多进程并行）
+    
+    Args:
+        texts (List[str]): 文档文本列表
+        stopwords (set): 停用词集合
+        min_length (int, optional): 最小词长度，默认2
+        cache_path (Path, optional): 分词磁盘缓存路径
+    
+    Returns:
+        List[str]: 全部文档的关键词列表
+    """
+    texts = [str(text).strip() for text in texts if text is not None and not pd.isna(text) and str(text).strip()]
+    if not texts:
+        return []
+    if not JIEBA_AVAILABLE:
+        return [word for text in texts for word in extract_keywords(text, stopwords, min_length)]
+    words: List[str] = []
+    for tagged in segment_texts(texts, pos=True, cache_path=cache_path):
+        words.extend(_filter_tagged_words(tagged, stopwords, min_length))
+    return words
+
+
 def extract_keywords(text: str, stopwords: set, min_length: int = 2) -> List[str]:
     """
     提取关键词
@@ -78,16 +113,8 @@ def extract_keywords(text: str, stopwords: set, min_length: int = 2) -> List[str
         return []
     
     if JIEBA_AVAILABLE:
-        # 使用jieba进行智能分词
-        words = []
-        for word, flag in pseg.cut(text):
-            # 只保留有意义的词性：n(名词)、v(动词)、a(形容词)、nr(人名)、ns(地名)、nt(机构名)
-            if flag.startswith(('n', 'v', 'a', 'nr', 'ns', 'nt')) and len(word) >= min_length:
-                # 过滤停用词
-                if word not in stopwords:
-                    words.append(word)
-        
-        return words
+        # 使用jieba进行智能分词（共享分词服务）
+        return _filter_tagged_words(segment_texts([text], pos=True)[0], stopwords, min_length)
     else:
         # 降级到简单分词
         # 去除标点符号、数字和特殊字符，保留中文和英文
@@ -101,7 +128,56 @@ def extract_keywords(text: str, stopwords: set, min_length: int = 2) -> List[str
         
         return keywords
 
-def _analyze_keywords(df: pd.DataFrame, topic: str, channel_name: str, logger=None) -> Dict[str, Any]:
+def is_content_column(column: str) -> bool:
+    """判断列是否参与关键词分析（用于读取数据时的列裁剪）"""
+    name = str(column)
+    return name in FALLBACK_TEXT_COLUMNS or any(marker in name.lower() for marker in CONTENT_COLUMN_MARKERS)
+
+
+def _content_columns(df: pd.DataFrame) -> List[str]:
+    # 合并所有文本内容 - 支持多种列名
+    content_columns = [
+        col for col in df.columns
+        if any(marker in str(col).lower() for marker in CONTENT_COLUMN_MARKERS)
+    ]
+    if not content_columns:
+        # 如果没有找到内容列，使用所有可能包含文本的列
+        content_columns = [col for col in FALLBACK_TEXT_COLUMNS if col in df.columns]
+    return content_columns
+
+
+def count_keywords(df: pd.DataFrame, cache_dir: Optional[Path] = None) -> Optional[Dict[str, int]]:
+    """
+    统计全部关键词词频（可跨渠道相加的中间结果）
+    
+    Args:
+        df (pd.DataFrame): 数据框
+        cache_dir (Path, optional): 数据目录（fetch 桶），分词结果缓存在其 .cache 下，总体与各渠道复用
+    
+    Returns:
+        Optional[Dict[str, int]]: {关键词: 词频}，没有可用内容列时返回 None
+    """
+    content_columns = _content_columns(df)
+    if not content_columns:
+        return None
+    
+    # 每条记录的内容列合并为一个文档，按文档分词（相同文档跨渠道/重跑命中缓存）
+    documents = [' '.join(row) for row in df[content_columns].fillna('').astype(str).values.tolist()]
+    if not any(doc.strip() for doc in documents):
+        return {}
+    
+    cache_path = token_cache_path(cache_dir) if cache_dir else None
+    return dict(Counter(extract_keywords_batch(documents, load_stopwords(), cache_path=cache_path)))
+
+
+def build_keywords_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """获取top关键词，转换为要求的格式（返回100个供前端词云使用）"""
+    top_keywords = Counter(counts).most_common(TOP_KEYWORDS)
+    return {"data": [{"name": word, "value": count} for word, count in top_keywords]}
+
+
+def _analyze_keywords(df: pd.DataFrame, topic: str, channel_name: str, logger=None,
+                      cache_dir: Optional[Path] = None) -> Dict[str, Any]:
     """
     关键词分析核心函数
     
@@ -110,6 +186,7 @@ def _analyze_keywords(df: pd.DataFrame, topic: str, channel_name: str, logger=No
         topic (str): 话题名称
         channel_name (str): 渠道名称
         logger: 日志记录器
+        cache_dir (Path, optional): 数据目录（fetch 桶），分词结果缓存在其 .cache 下，总体与各渠道复用
     
     Returns:
         Dict[str, Any]: 关键词分析结果
@@ -118,45 +195,16 @@ def _analyze_keywords(df: pd.DataFrame, topic: str, channel_name: str, logger=No
         logger = setup_logger("Analyze", "default")
     
     try:
-        # 合并所有文本内容 - 支持多种列名
-        content_columns = []
-        for col in df.columns:
-            if any(keyword in col.lower() for keyword in ['content', 'contents', '内容', '正文', '摘要', 'ocr', 'segment']):
-                content_columns.append(col)
-        
-        if not content_columns:
-            # 如果没有找到内容列，使用所有可能包含文本的列
-            text_columns = ['title', 'summary', 'content', 'contents', '正文', '摘要']
-            content_columns = [col for col in text_columns if col in df.columns]
-        
-        if not content_columns:
+        keyword_counts = count_keywords(df, cache_dir)
+        if keyword_counts is None:
             log_error(logger, "未找到任何可用的内容列", "Analyze")
             return {"data": []}
         
-        all_text = ' '.join(df[content_columns].fillna('').astype(str).values.flatten())
-        
-        if not all_text.strip():
-            log_error(logger, "文本内容为空", "Analyze")
-            return {"data": []}
-        
-        # 加载停用词
-        stopwords = load_stopwords()
-        
-        # 提取关键词
-        keywords = extract_keywords(all_text, stopwords)
-        
-        if not keywords:
+        if not keyword_counts:
             log_error(logger, "未提取到关键词", "Analyze")
             return {"data": []}
         
-        # 统计词频
-        keyword_counts = Counter(keywords)
-
-        # 获取top关键词，转换为要求的格式（返回100个供前端词云使用）
-        top_keywords = keyword_counts.most_common(100)
-        data = [{"name": word, "value": count} for word, count in top_keywords]
-        
-        result = {"data": data}
+        result = build_keywords_result(keyword_counts)
         
         log_success(logger, f"keywords | {channel_name} 分析完成", "Analyze")
         return result
@@ -165,7 +213,7 @@ def _analyze_keywords(df: pd.DataFrame, topic: str, channel_name: str, logger=No
         log_error(logger, f"关键词分析失败: {e}", "Analyze")
         return {"data": []}
 
-def analyze_keywords_overall(df: pd.DataFrame, topic: str, logger=None) -> Dict[str, Any]:
+def analyze_keywords_overall(df: pd.DataFrame, topic: str, logger=None, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
     """
     分析总体关键词
     
@@ -173,13 +221,15 @@ def analyze_keywords_overall(df: pd.DataFrame, topic: str, logger=None) -> Dict[
         df (pd.DataFrame): 数据框
         topic (str): 话题名称
         logger: 日志记录器
+        cache_dir (Path, optional): 分词缓存所在的数据目录
     
     Returns:
         Dict[str, Any]: 关键词分析结果
     """
-    return _analyze_keywords(df, topic, "总体", logger)
+    return _analyze_keywords(df, topic, "总体", logger, cache_dir)
 
-def analyze_keywords_by_channel(df: pd.DataFrame, topic: str, channel_name: str, logger=None) -> Dict[str, Any]:
+def analyze_keywords_by_channel(df: pd.DataFrame, topic: str, channel_name: str, logger=None,
+                                cache_dir: Optional[Path] = None) -> Dict[str, Any]:
     """
     分析渠道关键词
     
@@ -188,8 +238,9 @@ def analyze_keywords_by_channel(df: pd.DataFrame, topic: str, channel_name: str,
         topic (str): 话题名称
         channel_name (str): 渠道名称
         logger: 日志记录器
+        cache_dir (Path, optional): 分词缓存所在的数据目录
     
     Returns:
         Dict[str, Any]: 关键词分析结果
     """
-    return _analyze_keywords(df, topic, channel_name, logger)
+    return _analyze_keywords(df, topic, channel_name, logger, cache_dir)
@@ -2,13 +2,43 @@
 发布机构分析函数
 """
 import json
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 from ...utils.logging.logging import setup_logger, log_success, log_error, log_module_start
 from ...utils.setting.paths import bucket
 from ...utils.io.excel import read_csv
 
+PUBLISHERS_COLUMNS = ('author',)
+INVALID_PUBLISHERS = {"", "-", "--", "—", "未知", "nan", "none", "null"}
+TOP_PUBLISHERS = 20
+
+
+def count_publishers(df: pd.DataFrame) -> Optional[Dict[str, int]]:
+    """
+    统计全部发布者的发文量（可跨渠道相加的中间结果）
+    
+    Args:
+        df (pd.DataFrame): 数据框
+    
+    Returns:
+        Optional[Dict[str, int]]: {发布者: 条数}，缺少 author 列时返回 None
+    """
+    if 'author' not in df.columns:
+        return None
+    # 过滤缺失占位值，避免把未获取到的 author 当成真实发布者主体
+    _clean = df['author'].dropna().astype(str).map(lambda x: x.strip())
+    _clean = _clean[~_clean.str.lower().isin(INVALID_PUBLISHERS)]
+    return {k: int(v) for k, v in _clean.value_counts().items()}
+
+
+def build_publishers_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """取发文量前 20 的发布者"""
+    top_publishers = Counter(counts).most_common(TOP_PUBLISHERS)
+    return {"data": [{"name": pub, "value": count} for pub, count in top_publishers]}
+
+
 def _analyze_publishers(df: pd.DataFrame, channel_name: str, logger=None) -> Dict[str, Any]:
     """
     发布机构分析核心函数
@@ -25,20 +55,12 @@ def _analyze_publishers(df: pd.DataFrame, channel_name: str, logger=None) -> Dic
         logger = setup_logger("Analyze", "default")
     
     try:
-        if 'author' not in df.columns:
+        counts = count_publishers(df)
+        if counts is None:
             log_error(logger, "数据缺少 author 列", "Analyze")
             return {"data": []}
 
-        # 计算发布机构统计，过滤缺失占位值，避免把未获取到的 author 当成真实发布者主体
-        _clean = df['author'].dropna().astype(str).map(lambda x: x.strip())
-        invalid_publishers = {"", "-", "--", "—", "未知", "nan", "none", "null"}
-        _clean = _clean[~_clean.str.lower().isin(invalid_publishers)]
-        publisher_counts = _clean.value_counts().to_dict()
-        top_publishers = list(publisher_counts.items())[:20]
-        
-        # 转换为要求的格式
-        data = [{"name": pub, "value": count} for pub, count in top_publishers]
-        result = {"data": data}
+        result = build_publishers_result(counts)
         
         log_success(logger, f"publishers | {channel_name} 分析完成", "Analyze")
         return result
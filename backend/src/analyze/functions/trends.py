@@ -4,12 +4,36 @@
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 from ...utils.logging.logging import setup_logger, log_success, log_error, log_module_start
 from ...utils.setting.paths import bucket
 from ...utils.io.excel import read_csv
 
+TRENDS_COLUMNS = ('published_at',)
+
+
+def count_trends(df: pd.DataFrame) -> Optional[Dict[str, int]]:
+    """
+    按发布日期统计条数（可跨渠道相加的中间结果）
+    
+    Args:
+        df (pd.DataFrame): 数据框
+    
+    Returns:
+        Optional[Dict[str, int]]: {日期: 条数}，缺少 published_at 列时返回 None
+    """
+    if 'published_at' not in df.columns:
+        return None
+    dates = pd.to_datetime(df['published_at'], errors='coerce').dropna().dt.date
+    return {str(k): int(v) for k, v in dates.value_counts().items()}
+
+
+def build_trends_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """将日期计数整理为按日期排序的结果"""
+    return {"data": [{"name": k, "value": int(v)} for k, v in sorted(counts.items())]}
+
+
 def _analyze_trends(df: pd.DataFrame, channel_name: str, logger=None) -> Dict[str, Any]:
     """
     趋势分析核心函数
@@ -31,27 +55,17 @@ def _analyze_trends(df: pd.DataFrame, channel_name: str, logger=None) -> Dict[st
             log_error(logger, "数据框为空，无法进行趋势分析", "Analyze")
             return {"data": []}
         
-        # 检查必要的列是否存在
-        if 'published_at' not in df.columns:
+        # 按日期统计趋势
+        counts = count_trends(df)
+        if counts is None:
             log_error(logger, "缺少必要的列: published_at", "Analyze")
             return {"data": []}
         
-        # 确保时间字段是datetime类型
-        df = df.copy()  # 创建副本避免警告
-        df['published_at'] = pd.to_datetime(df['published_at'], errors='coerce')
-        df = df.dropna(subset=['published_at'])
-        
-        if df.empty:
+        if not counts:
             log_error(logger, "时间字段处理后数据为空，无法进行趋势分析", "Analyze")
             return {"data": []}
         
-        # 按日期统计趋势
-        df['date'] = df['published_at'].dt.date
-        daily_counts = df['date'].value_counts().sort_index()
-        
-        # 转换为要求的格式
-        data = [{"name": str(k), "value": int(v)} for k, v in daily_counts.items()]
-        result = {"data": data}
+        result = build_trends_result(counts)
         
         log_success(logger, f"trends | {channel_name} 分析完成", "Analyze")
         return result
@@ -7,7 +7,12 @@ from pathlib import Path
 from typing import Dict, List, Any
 from ...utils.logging.logging import setup_logger, log_success, log_error, log_module_start
 from ...utils.setting.paths import bucket
-from ...utils.io.excel import read_jsonl
+from ...utils.io.layers import count_layer_rows, find_layer_file, list_layer_files
+
+
+def build_volume_result(counts: Dict[str, int]) -> Dict[str, Any]:
+    """将 {渠道: 条数} 整理为声量结果"""
+    return {"data": [{"name": k, "value": int(v)} for k, v in counts.items()]}
 
 
 def analyze_volume_overall(df: pd.DataFrame, topic: str, date: str, logger=None, end_date: str = None) -> Dict[str, Any]:
@@ -38,22 +43,19 @@ def analyze_volume_overall(df: pd.DataFrame, topic: str, date: str, logger=None,
             log_error(logger, f"fetch目录不存在: {fetch_dir}", "Analyze")
             return {"data": []}
         
-        # 获取所有JSONL文件（排除 总体.jsonl）
-        jsonl_files = [f for f in fetch_dir.glob('*.jsonl') if f.name != '总体.jsonl']
-        if not jsonl_files:
-            log_error(logger, f"fetch目录中没有找到渠道JSONL文件: {fetch_dir}", "Analyze")
+        # 获取所有渠道层文件（JSONL/Parquet，排除 总体）
+        layer_files = list_layer_files(fetch_dir, exclude=('总体',))
+        if not layer_files:
+            log_error(logger, f"fetch目录中没有找到渠道数据文件: {fetch_dir}", "Analyze")
             return {"data": []}
         
-        # 统计每个渠道JSONL文件的行数
+        # 统计每个渠道文件的行数（Parquet 直接读取元数据）
         channel_counts = {}
-        for jsonl_path in jsonl_files:
+        for layer_path in layer_files:
             try:
-                df_channel = read_jsonl(jsonl_path)
-                channel_name = jsonl_path.stem
-                record_count = len(df_channel)
-                channel_counts[channel_name] = record_count
+                channel_counts[layer_path.stem] = count_layer_rows(layer_path)
             except Exception as e:
-                log_error(logger, f"读取 {jsonl_path.name} 失败: {e}", "Analyze")
+                log_error(logger, f"读取 {layer_path.name} 失败: {e}", "Analyze")
                 continue
         
         if not channel_counts:
@@ -96,15 +98,14 @@ def analyze_volume_by_channel(df: pd.DataFrame, channel_name: str, topic: str, d
         else:
             folder_name = date
         fetch_dir = bucket("fetch", topic, folder_name)
-        jsonl_file = fetch_dir / f"{channel_name}.jsonl"
+        layer_file = find_layer_file(fetch_dir, channel_name)
         
-        if not jsonl_file.exists():
-            log_error(logger, f"渠道JSONL文件不存在: {jsonl_file}", "Analyze")
+        if layer_file is None:
+            log_error(logger, f"渠道数据文件不存在: {fetch_dir / channel_name}", "Analyze")
             return {"data": []}
         
-        # 读取并统计记录数量
-        df_channel = read_jsonl(jsonl_file)
-        record_count = len(df_channel)
+        # 统计记录数量
+        record_count = count_layer_rows(layer_file)
         
         # 转换为要求的格式
         data = [{"name": channel_name, "value": record_count}]
@@ -11,15 +11,9 @@ from typing import Dict, List, Any, Optional, Tuple
 from ..utils.setting.paths import bucket
 from ..utils.logging.logging import setup_logger, log_module_start, log_success, log_error, log_save_success, log_skip
 from ..utils.setting.settings import settings
-from ..utils.io.excel import read_jsonl
-from ..utils.ai import call_langchain_chat, get_qwen_client
-from .functions.volume import analyze_volume_overall, analyze_volume_by_channel
-from .functions.attitude import analyze_attitude_overall, analyze_attitude_by_channel
-from .functions.trends import analyze_trends_overall, analyze_trends_by_channel
-from .functions.geography import analyze_geography_overall, analyze_geography_by_channel
-from .functions.publishers import analyze_publishers_overall, analyze_publishers_by_channel
-from .functions.keywords import analyze_keywords_overall, analyze_keywords_by_channel
-from .functions.classification import analyze_classification_overall, analyze_classification_by_channel
+from ..utils.io.layers import find_layer_file
+from ..utils.ai import call_langchain_chat, closing_sessions, get_qwen_client
+from .engine import run_analysis_engine
 
 
 FUNCTION_LABELS = {
@@ -70,11 +64,11 @@ def _get_ai_client(logger) -> Optional[Any]:
 
 def _safe_async_call(coro):
     try:
-        return asyncio.run(coro)
+        return asyncio.run(closing_sessions(coro))
     except RuntimeError:
         loop = asyncio.new_event_loop()
         try:
-            return loop.run_until_complete(coro)
+            return loop.run_until_complete(closing_sessions(coro))
         finally:
             loop.close()
 
@@ -424,6 +418,24 @@ def _post_process_result(func_name: str, target: str, target_dir: Path, result:
         ai_state['dirty'] = True
 
 
+def _save_analyze_result(
+    analyze_root: Path,
+    func_name: str,
+    target: str,
+    result: Any,
+    ai_entries: Dict[str, Dict[str, Any]],
+    ai_state: Dict[str, bool],
+    logger,
+) -> None:
+    """按功能/渠道写出分析结果并生成文本快照（总体同时生成AI摘要）"""
+    func_dir = analyze_root / func_name / target
+    func_dir.mkdir(parents=True, exist_ok=True)
+    output_file = func_dir / _resolve_analyze_filename(func_name)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(result or {}, f, ensure_ascii=False, indent=2, default=str)
+    _post_process_result(func_name, target, func_dir, result, ai_entries, ai_state, logger)
+
+
 def _supplement_ai_summary_from_analyze(
     topic: str,
     date: str,
@@ -565,7 +577,8 @@ def delete_analyze_function_from_folder(
     }
 
 
-def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, end_date: str = None) -> bool:
+def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, end_date: str = None,
+                max_workers: int = 4) -> bool:
     """
     运行分析任务
     
@@ -574,6 +587,8 @@ def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, e
         date (str): 日期字符串
         logger: 日志记录器
         only_function (str, optional): 仅运行指定分析函数
+        end_date (str, optional): 结束日期
+        max_workers (int): 并行计算 (分析函数, 渠道) 组合的线程数，默认4
     
     Returns:
         bool: 是否成功
@@ -591,7 +606,7 @@ def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, e
         log_error(logger, "未配置分析函数", "Analysis")
         return False
     
-    # 读取数据：总体.jsonl 与各渠道 *.jsonl（排除 总体.jsonl）
+    # 读取数据：总体层文件与各渠道层文件（JSONL/Parquet，排除 总体）
     folder_name = _compose_analyze_folder(date, end_date)
     if not folder_name:
         log_error(logger, "无效日期参数，无法定位分析目录", "Analysis")
@@ -605,7 +620,7 @@ def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, e
             return True
         log_error(logger, f"未找到数据目录: {fetch_dir}", "Analysis")
         return False
-    overall_file = fetch_dir / "总体.jsonl"
+    overall_file = find_layer_file(fetch_dir, "总体") or fetch_dir / "总体.jsonl"
     if not overall_file.exists():
         log_skip(logger, f"未找到总体数据文件，尝试基于已有 analyze 结果补充AI摘要: {overall_file}", "Analysis")
         if _supplement_ai_summary_from_analyze(topic, date, logger, only_function=only_function, end_date=end_date):
@@ -613,19 +628,7 @@ def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, e
             return True
         log_error(logger, f"未找到总体数据文件: {overall_file}", "Analysis")
         return False
-    try:
-        df_overall = read_jsonl(overall_file)
-    except Exception as e:
-        log_error(logger, f"读取总体数据失败: {e}", "Analysis")
-        return False
-    # 收集渠道文件
-    channel_files: Dict[str, Path] = {}
-    for jsonl_path in fetch_dir.glob("*.jsonl"):
-        if jsonl_path.name == "总体.jsonl":
-            continue
-        channel_name = jsonl_path.stem
-        channel_files[channel_name] = jsonl_path
-    
+
     # 创建输出目录（按功能/渠道分层）
     analyze_root = bucket("analyze", topic, folder_name)
     analyze_root.mkdir(parents=True, exist_ok=True)
@@ -635,8 +638,6 @@ def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, e
     ai_state = {"dirty": False}
     main_finding = previous_main_finding
     
-    success_count = 0
-    
     # 若仅运行单功能，先做一次过滤（支持别名与大小写不敏感）
     if only_function:
         alias = only_function.strip()
@@ -646,86 +647,12 @@ def run_Analyze(topic: str, date: str, logger=None, only_function: str = None, e
             log_error(logger, f"--func 未匹配到任何分析项：{only_function}", "Analysis")
             return False
             
-    # 运行分析函数
-    for func_config in functions:
-        func_name = func_config.get('name')
-        target = func_config.get('target')
-        # 这里不再逐项跳过，已在上方统一过滤
-        try:
-            # 根据函数名和目标调用对应的分析函数，并按功能/渠道存储
-            if target == '总体':
-                # 运行总体
-                result = None
-                if func_name == 'volume':
-                    result = analyze_volume_overall(df_overall, topic, date, logger, end_date)
-                elif func_name == 'attitude':
-                    result = analyze_attitude_overall(df_overall, logger)
-                elif func_name == 'trends':
-                    result = analyze_trends_overall(df_overall, logger)
-                elif func_name == 'keywords':
-                    result = analyze_keywords_overall(df_overall, topic, logger)
-                elif func_name == 'geography':
-                    result = analyze_geography_overall(df_overall, logger)
-                elif func_name == 'publishers':
-                    result = analyze_publishers_overall(df_overall, logger)
-                elif func_name == 'classification':
-                    result = analyze_classification_overall(df_overall, logger)
-
-                # 保存总体
-                func_dir = analyze_root / func_name / '总体'
-                func_dir.mkdir(parents=True, exist_ok=True)
-                filename = _resolve_analyze_filename(func_name)
-                output_file = func_dir / filename
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(result or {}, f, ensure_ascii=False, indent=2, default=str)
-
-                _post_process_result(func_name, '总体', func_dir, result, ai_summary_entries, ai_state, logger)
-
-                success_count += 1
-
-            elif target == '渠道':
-                # 逐渠道运行
-                any_success = False
-                for channel_name, jsonl_path in channel_files.items():
-                    try:
-                        df_channel = read_jsonl(jsonl_path)
-                    except Exception as e:
-                        log_error(logger, f"读取渠道 {channel_name} 数据失败: {e}", "Analysis")
-                        continue
-
-                    result = None
-                    if func_name == 'volume':
-                        result = analyze_volume_by_channel(df_channel, channel_name, topic, date, logger, end_date)
-                    elif func_name == 'trends':
-                        result = analyze_trends_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'publishers':
-                        result = analyze_publishers_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'keywords':
-                        result = analyze_keywords_by_channel(df_channel, topic, channel_name, logger)
-                    elif func_name == 'attitude':
-                        result = analyze_attitude_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'geography':
-                        result = analyze_geography_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'classification':
-                        result = analyze_classification_by_channel(df_channel, channel_name, logger)
-
-                    func_dir = analyze_root / func_name / channel_name
-                    func_dir.mkdir(parents=True, exist_ok=True)
-                    filename = _resolve_analyze_filename(func_name)
-                    output_file = func_dir / filename
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(result or {}, f, ensure_ascii=False, indent=2, default=str)
-
-                    _post_process_result(func_name, channel_name, func_dir, result, ai_summary_entries, ai_state, logger)
-
-                    any_success = True
-
-                if any_success:
-                    success_count += 1
-
-        except Exception as e:
-            log_error(logger, f"{func_name}_{target}: {e}", "Analysis")
-            continue
+    # 运行分析函数：各渠道只读取一次，总体由渠道结果合并
+    def _on_result(func_name: str, target: str, result: Dict[str, Any]) -> None:
+        _save_analyze_result(analyze_root, func_name, target, result, ai_summary_entries, ai_state, logger)
+
+    status = run_analysis_engine(fetch_dir, functions, logger=logger, max_workers=max_workers, on_result=_on_result)
+    success_count = sum(1 for f in functions if status.get((f.get('name'), f.get('target'))))
     
     main_finding = _build_main_finding(ai_summary_entries, previous_main_finding, topic, date, end_date, logger)
     if main_finding and main_finding is not previous_main_finding:
@@ -771,7 +698,6 @@ def run_Analyze_with_progress(
     Returns:
         bool: 是否成功
     """
-    import concurrent.futures
     from datetime import datetime, timezone
 
     def _emit_progress(
@@ -843,7 +769,7 @@ def run_Analyze_with_progress(
         _emit_progress("error", 0, f"未找到数据目录: {fetch_dir}")
         return False
 
-    overall_file = fetch_dir / "总体.jsonl"
+    overall_file = find_layer_file(fetch_dir, "总体") or fetch_dir / "总体.jsonl"
     if not overall_file.exists():
         log_skip(logger, f"未找到总体数据文件，尝试基于已有 analyze 结果补充AI摘要: {overall_file}", "Analysis")
         if _supplement_ai_summary_from_analyze(topic, date, logger, only_function=only_function, end_date=end_date):
@@ -854,21 +780,6 @@ def run_Analyze_with_progress(
         _emit_progress("error", 0, f"未找到总体数据文件: {overall_file}")
         return False
 
-    try:
-        df_overall = read_jsonl(overall_file)
-    except Exception as e:
-        log_error(logger, f"读取总体数据失败: {e}", "Analysis")
-        _emit_progress("error", 0, f"读取总体数据失败: {e}")
-        return False
-
-    # 收集渠道文件
-    channel_files: Dict[str, Path] = {}
-    for jsonl_path in fetch_dir.glob("*.jsonl"):
-        if jsonl_path.name == "总体.jsonl":
-            continue
-        channel_name = jsonl_path.stem
-        channel_files[channel_name] = jsonl_path
-
     # 创建输出目录
     analyze_root = bucket("analyze", topic, folder_name)
     analyze_root.mkdir(parents=True, exist_ok=True)
@@ -891,159 +802,62 @@ def run_Analyze_with_progress(
             return False
 
     total_functions = len(functions)
-    completed_functions = 0
-    success_count = 0
+    progress_state = {"percentage": 10, "completed_functions": 0}
 
-    # 运行分析函数
-    for func_config in functions:
-        func_name = func_config.get('name')
-        target = func_config.get('target')
+    def _on_result(func_name: str, target: str, result: Dict[str, Any]) -> None:
+        _save_analyze_result(analyze_root, func_name, target, result, ai_summary_entries, ai_state, logger)
 
-        # 执行前的进度：显示当前正在处理哪个任务
-        pending_percentage = 10 + int((completed_functions / max(total_functions, 1)) * 85)
+    def _on_progress(completed: int, total: int, func_name: str, source: str) -> None:
+        # 按已完成的 (分析函数, 渠道) 组合折算整体进度
+        progress_state["percentage"] = 10 + int((completed / max(total, 1)) * 85)
+        progress_state["completed_functions"] = int(completed / max(total, 1) * total_functions)
         _emit_progress(
-            "analyze", pending_percentage,
-            f"正在运行 {FUNCTION_LABELS.get(func_name, func_name)} ({target})",
+            "analyze", progress_state["percentage"],
+            f"已完成 {FUNCTION_LABELS.get(func_name, func_name)} ({source})",
             total_functions=total_functions,
-            completed_functions=completed_functions,
+            completed_functions=progress_state["completed_functions"],
             current_function=func_name,
-            current_target=target,
+            current_target=source,
         )
 
-        try:
-            # 情感分析子任务进度回调
-            def _attitude_progress_cb(payload: Dict[str, Any]) -> None:
-                sub_pct = int(payload.get("percentage") or 0)
-                sub_msg = str(payload.get("message") or "").strip()
-                # 情感分析详细进度
-                sent_phase = str(payload.get("phase") or "").strip()
-                sent_total = int(payload.get("total_unknown") or payload.get("sentiment_total") or 0)
-                sent_processed = int(payload.get("processed_unknown") or payload.get("sentiment_processed") or 0)
-                sent_classified = int(payload.get("classified") or payload.get("sentiment_classified") or 0)
-                sent_remaining = int(payload.get("remaining") or payload.get("sentiment_remaining") or 0)
-                # 将子任务进度映射到整体进度区间
-                sub_base = pending_percentage
-                sub_range = int(85 / max(total_functions, 1))
-                overall_pct = sub_base + int((sub_pct / 100) * sub_range)
-                _emit_progress(
-                    "analyze", overall_pct,
-                    f"{FUNCTION_LABELS.get(func_name, func_name)} ({target}) - {sub_msg}",
-                    total_functions=total_functions,
-                    completed_functions=completed_functions,
-                    current_function=func_name,
-                    current_target=target,
-                    sentiment_phase=sent_phase,
-                    sentiment_total=sent_total,
-                    sentiment_processed=sent_processed,
-                    sentiment_classified=sent_classified,
-                    sentiment_remaining=sent_remaining,
-                )
-
-            if target == '总体':
-                # 运行总体
-                result = None
-                if func_name == 'volume':
-                    result = analyze_volume_overall(df_overall, topic, date, logger, end_date)
-                elif func_name == 'attitude':
-                    result = analyze_attitude_overall(df_overall, logger, progress_callback=_attitude_progress_cb)
-                elif func_name == 'trends':
-                    result = analyze_trends_overall(df_overall, logger)
-                elif func_name == 'keywords':
-                    result = analyze_keywords_overall(df_overall, topic, logger)
-                elif func_name == 'geography':
-                    result = analyze_geography_overall(df_overall, logger)
-                elif func_name == 'publishers':
-                    result = analyze_publishers_overall(df_overall, logger)
-                elif func_name == 'classification':
-                    result = analyze_classification_overall(df_overall, logger)
-
-                # 保存总体
-                func_dir = analyze_root / func_name / '总体'
-                func_dir.mkdir(parents=True, exist_ok=True)
-                filename = _resolve_analyze_filename(func_name)
-                output_file = func_dir / filename
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(result or {}, f, ensure_ascii=False, indent=2, default=str)
-
-                _post_process_result(func_name, '总体', func_dir, result, ai_summary_entries, ai_state, logger)
-                success_count += 1
-                completed_functions += 1
-
-            elif target == '渠道':
-                # 逐渠道运行（使用线程池并行处理）
-                any_success = False
-                channel_items = list(channel_files.items())
-
-                def _process_channel(channel_item):
-                    channel_name, jsonl_path = channel_item
-                    try:
-                        df_channel = read_jsonl(jsonl_path)
-                    except Exception as e:
-                        log_error(logger, f"读取渠道 {channel_name} 数据失败: {e}", "Analysis")
-                        return None
-
-                    # 渠道级别的进度回调
-                    def _channel_progress_cb(payload: Dict[str, Any]) -> None:
-                        sub_msg = str(payload.get("message") or "").strip()
-                        _emit_progress(
-                            "analyze", pending_percentage,
-                            f"{FUNCTION_LABELS.get(func_name, func_name)} ({channel_name}) - {sub_msg}",
-                            total_functions=total_functions,
-                            completed_functions=completed_functions,
-                            current_function=func_name,
-                            current_target=f"渠道/{channel_name}",
-                            sentiment_phase=str(payload.get("phase") or "").strip(),
-                            sentiment_total=int(payload.get("sentiment_total") or 0),
-                            sentiment_processed=int(payload.get("sentiment_processed") or 0),
-                            sentiment_classified=int(payload.get("sentiment_classified") or 0),
-                            sentiment_remaining=int(payload.get("sentiment_remaining") or 0),
-                        )
-
-                    result = None
-                    if func_name == 'volume':
-                        result = analyze_volume_by_channel(df_channel, channel_name, topic, date, logger, end_date)
-                    elif func_name == 'trends':
-                        result = analyze_trends_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'publishers':
-                        result = analyze_publishers_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'keywords':
-                        result = analyze_keywords_by_channel(df_channel, topic, channel_name, logger)
-                    elif func_name == 'attitude':
-                        result = analyze_attitude_by_channel(df_channel, channel_name, logger, progress_callback=_channel_progress_cb)
-                    elif func_name == 'geography':
-                        result = analyze_geography_by_channel(df_channel, channel_name, logger)
-                    elif func_name == 'classification':
-                        result = analyze_classification_by_channel(df_channel, channel_name, logger)
-
-                    return (channel_name, result)
-
-                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    futures = {executor.submit(_process_channel, item): item for item in channel_items}
-                    for future in concurrent.futures.as_completed(futures):
-                        try:
-                            result = future.result(timeout=300)  # 5分钟超时，AI分类需要足够时间
-                            if result is None:
-                                continue
-                            channel_name, channel_result = result
-                            func_dir = analyze_root / func_name / channel_name
-                            func_dir.mkdir(parents=True, exist_ok=True)
-                            filename = _resolve_analyze_filename(func_name)
-                            output_file = func_dir / filename
-                            with open(output_file, 'w', encoding='utf-8') as f:
-                                json.dump(channel_result or {}, f, ensure_ascii=False, indent=2, default=str)
-                            _post_process_result(func_name, channel_name, func_dir, channel_result, ai_summary_entries, ai_state, logger)
-                            any_success = True
-                        except Exception as exc:
-                            log_error(logger, f"处理渠道失败: {exc}", "Analysis")
-
-                if any_success:
-                    success_count += 1
-                    completed_functions += 1
-
-        except Exception as e:
-            log_error(logger, f"{func_name}_{target}: {e}", "Analysis")
-            completed_functions += 1
-            continue
+    def _progress_factory(func_name: str, source: str):
+        # 情感分析子任务进度回调（AI 分类进度）
+        if func_name != 'attitude':
+            return None
+
+        def _attitude_progress_cb(payload: Dict[str, Any]) -> None:
+            sub_msg = str(payload.get("message") or "").strip()
+            _emit_progress(
+                "analyze", progress_state["percentage"],
+                f"{FUNCTION_LABELS.get(func_name, func_name)} ({source}) - {sub_msg}",
+                total_functions=total_functions,
+                completed_functions=progress_state["completed_functions"],
+                current_function=func_name,
+                current_target=f"渠道/{source}",
+                sentiment_phase=str(payload.get("phase") or "").strip(),
+                sentiment_total=int(payload.get("sentiment_total") or 0),
+                sentiment_processed=int(payload.get("sentiment_processed") or 0),
+                sentiment_classified=int(payload.get("sentiment_classified") or 0),
+                sentiment_remaining=int(payload.get("sentiment_remaining") or 0),
+            )
+
+        return _attitude_progress_cb
+
+    _emit_progress(
+        "analyze", 10, "正在并行运行分析项（各渠道数据只读取一次）。",
+        total_functions=total_functions,
+    )
+    # 运行分析函数：各渠道只读取一次，(分析函数, 渠道) 组合并行计算，总体由渠道结果合并
+    status = run_analysis_engine(
+        fetch_dir,
+        functions,
+        logger=logger,
+        max_workers=max_workers,
+        on_result=_on_result,
+        progress_factory=_progress_factory,
+        on_progress=_on_progress,
+    )
+    success_count = sum(1 for f in functions if status.get((f.get('name'), f.get('target'))))
 
     main_finding = _build_main_finding(ai_summary_entries, previous_main_finding, topic, date, end_date, logger)
     if main_finding and main_finding is not previous_main_finding:
@@ -2,16 +2,19 @@
 数据清洗功能
 """
 import re
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Optional
 from dateutil import parser
 import pytz
 from ..utils.setting.paths import bucket, ensure_bucket
 from ..utils.logging.logging import setup_logger, log_success, log_error, log_module_start
 from ..utils.setting.settings import settings
-from ..utils.io.excel import read_jsonl, write_jsonl
+from ..utils.io.layers import list_layer_files, read_layer, resolve_layer_format, write_layer
+from ..utils.parallel import progress_event, resolve_process_workers, run_process_jobs
 
 
 def parse_datetime(time_str: str, formats: List[str] = None) -> Optional[datetime]:
@@ -64,6 +67,32 @@ def clean_text_whitespace(text: str) -> str:
     return re.sub(r'\s+', ' ', text).strip()
 
 
+PROVINCE_MAP: Dict[str, str] = {
+    '北京': '北京市', '天津': '天津市', '上海': '上海市', '重庆': '重庆市',
+    '河北': '河北省', '山西': '山西省', '辽宁': '辽宁省', '吉林': '吉林省',
+    '黑龙江': '黑龙江省', '江苏': '江苏省', '浙江': '浙江省', '安徽': '安徽省',
+    '福建': '福建省', '江西': '江西省', '山东': '山东省', '河南': '河南省',
+    '湖北': '湖北省', '湖南': '湖南省', '广东': '广东省', '海南': '海南省',
+    '四川': '四川省', '贵州': '贵州省', '云南': '云南省', '陕西': '陕西省',
+    '甘肃': '甘肃省', '青海': '青海省', '台湾': '台湾省', '内蒙古': '内蒙古自治区',
+    '广西': '广西壮族自治区', '西藏': '西藏自治区', '宁夏': '宁夏回族自治区',
+    '新疆': '新疆维吾尔自治区', '香港': '香港特别行政区', '澳门': '澳门特别行政区'
+}
+
+# 文本合并的字段顺序与标签前缀
+CONTENT_FIELDS = ['title', 'summary', 'ocr', 'content']
+TIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M", "%Y-%m-%d"]
+MYSQL_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 规范写法的时间字符串可直接由字符串切片得到输出，无需逐行解析
+_CANONICAL_TIME_PATTERNS = [
+    (r'[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}', "%Y-%m-%d %H:%M:%S"),
+    (r'[0-9]{4}/[0-9]{2}/[0-9]{2} [0-9]{2}:[0-9]{2}', "%Y/%m/%d %H:%M"),
+    (r'[0-9]{4}-[0-9]{2}-[0-9]{2}', "%Y-%m-%d"),
+]
+_INT64_MAX = np.iinfo(np.int64).max
+
+
 def normalize_region(region: str, fillna: str = "未知") -> str:
     """
     标准化地域信息（省级化）
@@ -80,21 +109,8 @@ def normalize_region(region: str, fillna: str = "未知") -> str:
     
     region = str(region).strip()
     
-    # 省级映射
-    province_map = {
-        '北京': '北京市', '天津': '天津市', '上海': '上海市', '重庆': '重庆市',
-        '河北': '河北省', '山西': '山西省', '辽宁': '辽宁省', '吉林': '吉林省',
-        '黑龙江': '黑龙江省', '江苏': '江苏省', '浙江': '浙江省', '安徽': '安徽省',
-        '福建': '福建省', '江西': '江西省', '山东': '山东省', '河南': '河南省',
-        '湖北': '湖北省', '湖南': '湖南省', '广东': '广东省', '海南': '海南省',
-        '四川': '四川省', '贵州': '贵州省', '云南': '云南省', '陕西': '陕西省',
-        '甘肃': '甘肃省', '青海': '青海省', '台湾': '台湾省', '内蒙古': '内蒙古自治区',
-        '广西': '广西壮族自治区', '西藏': '西藏自治区', '宁夏': '宁夏回族自治区',
-        '新疆': '新疆维吾尔自治区', '香港': '香港特别行政区', '澳门': '澳门特别行政区'
-    }
-    
     # 查找匹配的省份
-    for short, full in province_map.items():
+    for short, full in PROVINCE_MAP.items():
         if short in region or full in region:
             return full
     
@@ -102,7 +118,300 @@ def normalize_region(region: str, fillna: str = "未知") -> str:
     return region if region else fillna
 
 
-def run_clean(topic: str, date: str, logger=None) -> bool:
+@lru_cache(maxsize=65536)
+def _lookup_region(region: str, fillna: str) -> str:
+    return normalize_region(region, fillna)
+
+
+def _clean_whitespace_series(series: pd.Series) -> pd.Series:
+    """clean_text_whitespace 的向量化版本（输入为字符串列）。"""
+    return series.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def _merge_contents(df: pd.DataFrame) -> pd.Series:
+    """
+    按 title/summary/ocr/content 顺序合并带标签前缀的文本，值为"未知"的字段跳过，全部缺失时为"未知"
+    
+    调用前各字段已 fillna("未知").astype(str)。
+    """
+    merged = pd.Series('', index=df.index, dtype=object)
+    has_part = pd.Series(False, index=df.index)
+    for col in CONTENT_FIELDS:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        present = values.str.strip() != '未知'
+        if not present.any():
+            continue
+        piece = f"{col}: " + _clean_whitespace_series(values[present])
+        joined = merged[present].where(~has_part[present], merged[present] + ' ')
+        merged.loc[present] = joined + piece
+        has_part |= present
+    merged = merged.str.strip()
+    merged[~has_part] = '未知'
+    return merged
+
+
+def _normalize_region_series(series: pd.Series, fillna: str) -> pd.Series:
+    """
+    normalize_region 的向量化版本：只对去重后的取值计算一次，再按编码映射回各行
+    """
+    if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+        return series.apply(lambda x: normalize_region(x, fillna))
+    codes, uniques = pd.factorize(series)
+    lookup = np.array([_lookup_region(value, fillna) for value in uniques] + [fillna], dtype=object)
+    return pd.Series(lookup[codes], index=series.index, dtype=object)
+
+
+def _format_published_at(series: pd.Series) -> pd.Series:
+    """
+    将发布时间统一为 MySQL 格式字符串，无法解析时为 None
+
+    规范写法（与 TIME_FORMATS 严格对应的零填充字符串）经 pd.to_datetime 校验后直接切片输出；
+    其余取值按去重结果逐个调用 parse_datetime，结果与逐行解析一致。
+    """
+    result = pd.Series(None, index=series.index, dtype=object)
+    is_text = series.map(type) == str
+    pending = ~is_text
+    text = series[is_text]
+    for pattern, fmt in _CANONICAL_TIME_PATTERNS:
+        if text.empty:
+            break
+        matched = text[text.str.fullmatch(pattern)]
+        if not matched.empty:
+            valid = pd.to_datetime(matched, format=fmt, errors='coerce').notna()
+            canonical = matched[valid]
+            if fmt == "%Y-%m-%d %H:%M:%S":
+                result.loc[canonical.index] = canonical
+            elif fmt == "%Y/%m/%d %H:%M":
+                result.loc[canonical.index] = canonical.str.replace('/', '-', regex=False) + ':00'
+            else:
+                result.loc[canonical.index] = canonical + ' 00:00:00'
+            text = text.drop(canonical.index)
+    pending.loc[text.index] = True
+
+    rest = series[pending]
+    if not rest.empty:
+        cache: Dict[Any, Optional[str]] = {}
+
+        def _convert(value):
+            try:
+                if value in cache:
+                    return cache[value]
+            except TypeError:
+                cache_key = None
+            else:
+                cache_key = value
+            parsed = parse_datetime(value, TIME_FORMATS)
+            formatted = parsed.strftime(MYSQL_TIME_FORMAT) if parsed is not None else None
+            if cache_key is not None:
+                cache[cache_key] = formatted
+            return formatted
+
+        result.loc[rest.index] = [_convert(value) for value in rest]
+    return result
+
+
+def _sequential_ids(date_digits: str, count: int) -> np.ndarray:
+    """
+    生成 id = int(日期数字 + 序号)（序号从 1 开始）；超出 int64 范围时退回逐个拼接
+    """
+    ordinals = np.arange(1, count + 1, dtype=np.int64)
+    try:
+        prefix = int(date_digits)
+    except ValueError:
+        prefix = None
+    if (
+        prefix is None
+        or prefix < 0
+        or str(prefix) != date_digits
+        or prefix > (_INT64_MAX - count) // (10 ** len(str(count)))
+    ):
+        return pd.RangeIndex(count).map(lambda i: int(f"{date_digits}{i + 1}")).to_numpy()
+    powers = 10 ** np.arange(0, len(str(count)) + 1, dtype=np.int64)
+    digit_counts = np.searchsorted(powers, ordinals, side='right')
+    return prefix * powers[digit_counts] + ordinals
+
+
+def clean_channel_frame(
+    df: pd.DataFrame,
+    channel_name: str,
+    date_digits: str,
+    field_alias: Dict[str, List[str]],
+    region_config: Dict[str, Any],
+    logger=None,
+) -> pd.DataFrame:
+    """
+    清洗单个渠道的数据框（列映射、去重、文本合并、地域/时间规范化、重编号）
+    
+    Args:
+        df (pd.DataFrame): merge 层读取的渠道数据
+        channel_name (str): 渠道名称
+        date_digits (str): 去掉连字符的日期，用作 id 前缀
+        field_alias (Dict[str, List[str]]): channels.yaml 中的字段别名
+        region_config (Dict[str, Any]): channels.yaml 中的地域配置
+        logger: 日志记录器
+    
+    Returns:
+        pd.DataFrame: 仅包含保留列的清洗结果
+    """
+    original_count = len(df)
+
+    # 列名映射
+    rename_map: Dict[str, str] = {}
+    for std_field, aliases in field_alias.items():
+        for alias in aliases:
+            if alias in df.columns:
+                rename_map[alias] = std_field
+                break
+    if rename_map:
+        df = df.rename(columns=rename_map)
+    else:
+        log_error(logger, "无列名映射", "Clean")
+
+    # 内容去重（基于 content）
+    if 'content' in df.columns:
+        df = df.drop_duplicates(subset=['content'], keep='first')
+    else:
+        log_error(logger, "无content列，跳过内容去重", "Clean")
+
+    # 合并文本 -> contents（仅空白清理，不去除标点；缺失填"未知"；带标签前缀）
+    for col in CONTENT_FIELDS:
+        if col in df.columns:
+            df[col] = df[col].fillna("未知").astype(str)
+    if any(col in df.columns for col in CONTENT_FIELDS):
+        df['contents'] = _merge_contents(df)
+    else:
+        df['contents'] = "未知"
+
+    # 仅规范空白（不去标点）
+    df['contents'] = _clean_whitespace_series(df['contents'])
+
+    # region 省级化（按去重取值查表）
+    fillna_region = region_config.get('fillna', '未知')
+    if 'region' in df.columns:
+        df['region'] = _normalize_region_series(df['region'], fillna_region)
+    else:
+        df['region'] = fillna_region
+
+    # 时间解析与格式化
+    if 'published_at' in df.columns:
+        df['published_at'] = _format_published_at(df['published_at'])
+    else:
+        df['published_at'] = None
+        log_error(logger, "无published_at列，时间设为NULL", "Clean")
+
+    # 发布平台（platform）：微博/微信固定；其他渠道优先用重命名后的标准列，其次按别名从原始列取
+    if channel_name in ['微博', '微信']:
+        df['platform'] = channel_name
+    else:
+        if 'platform' in df.columns:
+            df['platform'] = df['platform'].astype(str).replace('', '未知').fillna('未知')
+        else:
+            platform_aliases = field_alias.get('platform', [])
+            platform_col = next((a for a in platform_aliases if a in df.columns), None)
+            if platform_col is not None:
+                df['platform'] = df[platform_col].astype(str).replace('', '未知').fillna('未知')
+            else:
+                df['platform'] = '未知'
+                log_error(logger, "无platform信息，设为'未知'", "Clean")
+
+    # 微博的 title 用 content 替代
+    if channel_name == '微博' and 'content' in df.columns:
+        df['title'] = df['content']
+
+    # 补全并保留列（保留 title；缺失统一填充"未知"）
+    keep_cols = [
+        'id',
+        'title',
+        'contents',
+        'platform',
+        'author',
+        'published_at',
+        'url',
+        'region',
+        'hit_words',
+        'polarity',
+        'like_count',
+        'comment_count',
+        'favorite_count',
+        'share_count',
+        # 兼容旧链路：部分分析代码仍读取 likecount
+        'likecount',
+    ]
+    missing_cols = []
+    for col in ['title', 'author', 'url', 'hit_words', 'polarity']:
+        if col not in df.columns:
+            df[col] = "未知"
+            missing_cols.append(col)
+        else:
+            # 将空字符串/NaN 填充为 "未知"
+            df[col] = df[col].replace('', '未知').fillna('未知')
+    
+    # 数值列处理：统一保留互动指标，并兼容旧字段 likecount
+    numeric_metric_defaults = {
+        'like_count': 0,
+        'comment_count': 0,
+        'favorite_count': 0,
+        'share_count': 0,
+    }
+    for metric_name, default_value in numeric_metric_defaults.items():
+        if metric_name not in df.columns:
+            df[metric_name] = default_value
+        else:
+            df[metric_name] = pd.to_numeric(df[metric_name], errors='coerce').fillna(default_value).astype(int)
+    df['likecount'] = df['like_count']
+
+    # 重编号（每表独立）
+    df = df.reset_index(drop=True)
+    df['id'] = _sequential_ids(date_digits, len(df))
+
+    # 基于 contents 再次去重
+    df = df.drop_duplicates(subset=['contents'], keep='first')
+    final_count = len(df)
+    log_success(logger, f"清洗完成: {channel_name} {original_count} -> {final_count} 条", "Clean")
+
+    return df[[c for c in keep_cols]]
+
+
+def _clean_channel_file(
+    date: str,
+    file_path: Path,
+    clean_dir: Path,
+    layer_format: str,
+    field_alias: Dict[str, List[str]],
+    region_config: Dict[str, Any],
+    logger=None,
+) -> Optional[int]:
+    """
+    读取、清洗并写出单个渠道文件，返回写出的行数；空文件返回 None（可在子进程中执行）
+    """
+    channel_name = file_path.stem
+    try:
+        df = read_layer(file_path)
+    except Exception as e:
+        raise RuntimeError(f"读取 {file_path.name} 失败：{e}") from e
+
+    if df.empty:
+        log_error(logger, f"{file_path.name} 无数据，跳过", "Clean")
+        return None
+
+    df_out = clean_channel_frame(df, channel_name, date.replace('-', ''), field_alias, region_config, logger)
+
+    try:
+        write_layer(df_out, clean_dir, channel_name, fmt=layer_format)
+    except Exception as e:
+        raise RuntimeError(f"保存 {channel_name} 失败：{e}") from e
+    return len(df_out)
+
+
+def run_clean(
+    topic: str,
+    date: str,
+    logger=None,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> bool:
     """
     运行清洗流水线（直接读取 merge/<topic>/<date> 下各渠道 JSONL）
     
@@ -114,12 +423,15 @@ def run_clean(topic: str, date: str, logger=None) -> bool:
     - 将 title、summary、ocr、content 合并为 contents（存在则拼接）
     - 保留列：id、contents、author、published_at、url、region、hit_words、polarity
     - 清洗 contents 文本；region 省级化；published_at 解析为 MySQL 格式
-    - 保存到 backend/data/projects/<topic>/clean/<date>/<channel>.jsonl
+    - 保存到 backend/data/projects/<topic>/clean/<date>/<channel>.jsonl（或 .parquet，按层存储格式）
+    - 各渠道按 channels.yaml 的 processing.workers 多进程并行，子进程日志回传主进程写出，单个渠道失败不影响其他渠道
     
     Args:
         topic (str): 专题名称
         date (str): 日期字符串
         logger: 日志记录器
+        workers (Optional[int]): 进程数，None 时读取配置（0 为按 CPU 核数）
+        progress_callback: 每个渠道完成时回调进度字典（phase/channel/completed/total/percentage/status/rows/message）
     
     Returns:
         bool: 是否成功
@@ -136,176 +448,52 @@ def run_clean(topic: str, date: str, logger=None) -> bool:
     field_alias = channel_config.get('field_alias', {})
     region_config = channel_config.get('region', {})
 
-    jsonl_files = sorted(merge_dir.glob("*.jsonl"))
-    if not jsonl_files:
-        log_error(logger, f"未在 {merge_dir} 找到任何渠道 JSONL 文件", "Clean")
+    layer_files = list_layer_files(merge_dir)
+    if not layer_files:
+        log_error(logger, f"未在 {merge_dir} 找到任何渠道数据文件（JSONL/Parquet）", "Clean")
         return False
+    layer_format = resolve_layer_format(topic)
 
-    date_digits = date.replace('-', '')
-    total_rows = 0
-    success_files = 0
-
-    for file_path in jsonl_files:
-        channel_name = file_path.stem
-        try:
-            df = read_jsonl(file_path)
-            original_count = len(df)
-        except Exception as e:
-            log_error(logger, f"读取 {file_path.name} 失败：{e}", "Clean")
-            continue
-
-        if df.empty:
-            log_error(logger, f"{file_path.name} 无数据，跳过", "Clean")
-            continue
-
-        # 列名映射
-        rename_map: Dict[str, str] = {}
-        for std_field, aliases in field_alias.items():
-            for alias in aliases:
-                if alias in df.columns:
-                    rename_map[alias] = std_field
-                    break
-        if rename_map:
-            df = df.rename(columns=rename_map)
-        else:
-            log_error(logger, "无列名映射", "Clean")
+    if workers is None:
+        workers = (channel_config.get('processing', {}) or {}).get('workers')
+    jobs = [
+        (date, file_path, clean_dir, layer_format, field_alias, region_config)
+        for file_path in layer_files
+    ]
 
-        # 内容去重（基于 content）
-        if 'content' in df.columns:
-            df = df.drop_duplicates(subset=['content'], keep='first')
-        else:
-            log_error(logger, "无content列，跳过内容去重", "Clean")
-
-        # 合并文本 -> contents（仅空白清理，不去除标点；缺失填"未知"；带标签前缀）
-        for col in ['title', 'summary', 'ocr', 'content']:
-            if col in df.columns:
-                df[col] = df[col].fillna("未知").astype(str)
-        pieces = [df[col] for col in ['title', 'summary', 'ocr', 'content'] if col in df.columns]
-        if pieces:
-            def _merge_with_labels(row):
-                """
-                合并文本字段，添加标签前缀
-                
-                Args:
-                    row (pd.Series): 数据行
-                
-                Returns:
-                    str: 合并后的文本内容
-                """
-                parts = []
-                if 'title' in row and str(row['title']).strip() != '未知':
-                    parts.append(f"title: {clean_text_whitespace(row['title'])}")
-                if 'summary' in row and str(row['summary']).strip() != '未知':
-                    parts.append(f"summary: {clean_text_whitespace(row['summary'])}")
-                if 'ocr' in row and str(row['ocr']).strip() != '未知':
-                    parts.append(f"ocr: {clean_text_whitespace(row['ocr'])}")
-                if 'content' in row and str(row['content']).strip() != '未知':
-                    parts.append(f"content: {clean_text_whitespace(row['content'])}")
-                return ' '.join(parts).strip() if parts else '未知'
-            df['contents'] = df.apply(_merge_with_labels, axis=1)
-        else:
-            df['contents'] = "未知"
+    def _error_message(channel_name: str, exc: Exception) -> str:
+        # 读写失败的消息已带文件名；其余异常补充渠道名
+        return str(exc) if isinstance(exc, RuntimeError) else f"清洗渠道 {channel_name} 失败：{exc}"
 
-        # 仅规范空白（不去标点）
-        df['contents'] = df['contents'].apply(clean_text_whitespace)
+    completed = {"count": 0}
 
-        # region 省级化
-        fillna_region = region_config.get('fillna', '未知')
-        if 'region' in df.columns:
-            df['region'] = df['region'].apply(lambda x: normalize_region(x, fillna_region))
-        else:
-            df['region'] = fillna_region
-
-        # 时间解析与格式化
-        time_formats = ["%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M", "%Y-%m-%d"]
-        if 'published_at' in df.columns:
-            df['published_at'] = df['published_at'].apply(lambda x: parse_datetime(x, time_formats))
-            df['published_at'] = df['published_at'].apply(
-                lambda x: x.strftime('%Y-%m-%d %H:%M:%S') if pd.notna(x) and x is not None else None
+    def _on_result(index: int, outcome: Any) -> None:
+        completed["count"] += 1
+        if progress_callback is None:
+            return
+        channel_name = layer_files[index].stem
+        failed = isinstance(outcome, Exception)
+        progress_callback(
+            progress_event(
+                "clean",
+                channel_name,
+                completed["count"],
+                len(jobs),
+                outcome,
+                rows=outcome if isinstance(outcome, int) else 0,
+                message=_error_message(channel_name, outcome) if failed else "",
             )
-        else:
-            df['published_at'] = None
-            log_error(logger, "无published_at列，时间设为NULL", "Clean")
-
-        # 发布平台（platform）：微博/微信固定；其他渠道优先用重命名后的标准列，其次按别名从原始列取
-        if channel_name in ['微博', '微信']:
-            df['platform'] = channel_name
-        else:
-            if 'platform' in df.columns:
-                df['platform'] = df['platform'].astype(str).replace('', '未知').fillna('未知')
-            else:
-                platform_aliases = field_alias.get('platform', [])
-                platform_col = next((a for a in platform_aliases if a in df.columns), None)
-                if platform_col is not None:
-                    df['platform'] = df[platform_col].astype(str).replace('', '未知').fillna('未知')
-                else:
-                    df['platform'] = '未知'
-                    log_error(logger, "无platform信息，设为'未知'", "Clean")
-
-        # 微博的 title 用 content 替代
-        if channel_name == '微博' and 'content' in df.columns:
-            df['title'] = df['content']
-
-        # 补全并保留列（保留 title；缺失统一填充"未知"）
-        keep_cols = [
-            'id',
-            'title',
-            'contents',
-            'platform',
-            'author',
-            'published_at',
-            'url',
-            'region',
-            'hit_words',
-            'polarity',
-            'like_count',
-            'comment_count',
-            'favorite_count',
-            'share_count',
-            # 兼容旧链路：部分分析代码仍读取 likecount
-            'likecount',
-        ]
-        missing_cols = []
-        for col in ['title', 'author', 'url', 'hit_words', 'polarity']:
-            if col not in df.columns:
-                df[col] = "未知"
-                missing_cols.append(col)
-            else:
-                # 将空字符串/NaN 填充为 "未知"
-                df[col] = df[col].replace('', '未知').fillna('未知')
-        
-        # 数值列处理：统一保留互动指标，并兼容旧字段 likecount
-        numeric_metric_defaults = {
-            'like_count': 0,
-            'comment_count': 0,
-            'favorite_count': 0,
-            'share_count': 0,
-        }
-        for metric_name, default_value in numeric_metric_defaults.items():
-            if metric_name not in df.columns:
-                df[metric_name] = default_value
-            else:
-                df[metric_name] = pd.to_numeric(df[metric_name], errors='coerce').fillna(default_value).astype(int)
-        df['likecount'] = df['like_count']
-
-        # 重编号（每表独立）
-        df = df.reset_index(drop=True)
-        df['id'] = df.index.map(lambda i: int(f"{date_digits}{i+1}"))
-
-        # 基于 contents 再次去重
-        df = df.drop_duplicates(subset=['contents'], keep='first')
-        final_count = len(df)
-        log_success(logger, f"清洗完成: {channel_name} {original_count} -> {final_count} 条", "Clean")
-
-        df_out = df[[c for c in keep_cols]]
-
-        out_file = clean_dir / f"{channel_name}.jsonl"
-        try:
-            write_jsonl(df_out, out_file)
-            total_rows += len(df_out)
-            success_files += 1
-        except Exception as e:
-            log_error(logger, f"保存 {out_file.name} 失败：{e}", "Clean")
-            continue
+        )
 
+    results = run_process_jobs(
+        _clean_channel_file,
+        jobs,
+        resolve_process_workers(workers, len(jobs)),
+        logger=logger,
+        on_result=_on_result,
+    )
+    for file_path, outcome in zip(layer_files, results):
+        if isinstance(outcome, Exception):
+            log_error(logger, _error_message(file_path.stem, outcome), "Clean")
+    success_files = sum(1 for outcome in results if isinstance(outcome, int))
     return success_files > 0
@@ -14,6 +14,7 @@ from ..utils.setting.settings import settings
 from ..utils.setting.env_loader import get_api_key
 from ..utils.logging.logging import setup_logger, log_success, log_error, log_module_start
 from ..utils.io.excel import read_csv
+from ..utils.ai.http_pool import closing_sessions, pooled_session
 
 
 class ContentAnalyze:
@@ -249,9 +250,8 @@ class ContentAnalyze:
         
         all_results = []
         
-        # 创建HTTP会话
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20)
-        async with aiohttp.ClientSession(connector=connector) as session:
+        # 复用共享HTTP连接池
+        async with pooled_session() as session:
             # 分批处理
             for i in range(0, len(texts), self.batch_size):
                 batch_texts = texts[i:i + self.batch_size]
@@ -453,4 +453,4 @@ def run_content_analysis_sync(topic: str, start_date: str, end_date: str) -> boo
     Returns:
         bool: 是否成功
     """
-    return asyncio.run(run_content_analysis(topic, start_date, end_date))
+    return asyncio.run(closing_sessions(run_content_analysis(topic, start_date, end_date)))
@@ -15,6 +15,7 @@ from ...utils.rag.tagrag.tag_retrieve_data import retrieve_documents as retrieve
 from ...utils.rag.ragrouter.router_retrieve_data import AdvancedRAGSearcher, SearchParams
 from ...utils.setting.paths import get_configs_root
 from ...utils.setting.env_loader import get_api_key
+from ...utils.ai.http_pool import pooled_session
 
 
 class ExplainBase:
@@ -454,11 +455,12 @@ class ExplainBase:
         for attempt in range(cfg_retry):
             try:
                 timeout = aiohttp.ClientTimeout(total=timeout_total, connect=timeout_connect, sock_read=timeout_read)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with pooled_session() as session:
                     async with session.post(
                         "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation",
                         json=payload,
-                        headers=headers
+                        headers=headers,
+                        timeout=timeout,
                     ) as resp:
                         if resp.status == 200:
                             data = await resp.json()
@@ -1,20 +1,36 @@
 """
 数据提取功能
 """
+import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
-from typing import List, Optional, Tuple, Dict, Any
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict, Any, Iterator, Callable
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 
 from ..utils.setting.paths import ensure_bucket
 from ..utils.setting.settings import settings
 from ..utils.logging.logging import setup_logger, log_module_start, log_success, log_error, log_skip
-from ..utils.io.excel import write_jsonl, read_jsonl
+from ..utils.io.excel import write_jsonl
 from ..utils.io.db import DatabaseManager
+from ..utils.io.layers import (
+    append_layer,
+    conform_arrow_table,
+    find_layer_file,
+    layer_exists,
+    layer_part_files,
+    read_layer,
+    remove_layer,
+    resolve_layer_format,
+    write_layer,
+)
 
 
 def fetch_range(
@@ -24,6 +40,8 @@ def fetch_range(
     output_date: str,
     logger=None,
     db_topic: Optional[str] = None,
+    streaming: Optional[bool] = None,
+    incremental: Optional[bool] = None,
 ) -> Optional[int]:
     """
     从数据库提取指定时间范围的数据
@@ -34,123 +52,509 @@ def fetch_range(
         end_date (str): 结束日期
         output_date (str): 输出日期（用于分桶）
         logger: 日志记录器
+        streaming (Optional[bool]): 是否使用流式提取，不传则读取 channels.fetch.streaming
+        incremental (Optional[bool]): 是否只追加高水位之后的新数据，不传则读取 channels.fetch.incremental；
+            分桶内尚无高水位记录时自动回退为全量提取
     
     Returns:
-        Optional[int]: 成功返回提取条数，失败返回 None
+        Optional[int]: 成功返回提取条数（增量模式为追加后的总条数），失败返回 None
     """
     
     # 1. 获取渠道配置
     channels_config = settings.get_channel_config()
     channels = channels_config.get('keep', [])
+    fetch_options = _fetch_options(channels_config)
+    if streaming is None:
+        streaming = fetch_options["streaming"]
+    if incremental is None:
+        incremental = fetch_options["incremental"]
     
     # 2. 创建输出目录
     folder_name = f"{start_date}_{end_date}"
     fetch_dir = ensure_bucket("fetch", topic, folder_name)
+    layer_format = resolve_layer_format(topic)
     
     db_name = _normalise_db_topic(db_topic or topic)
 
-    # 3. 获取数据库连接（统一走 DatabaseManager，兼容 active MySQL/PostgreSQL）
-    engine = _create_topic_engine(db_name, logger=logger)
+    # 3. 获取数据库连接（统一走 DatabaseManager 的共享连接池，兼容 active MySQL/PostgreSQL）
+    workers = fetch_options["workers"]
+    engine = _create_topic_engine(db_name, logger=logger, pool_size=workers)
     if engine is None:
         return None
-    
-    all_data = []
+
+    merge_config = channels_config.get('merge_for_analysis', {}) or {}
+    if incremental:
+        state = _load_watermarks(fetch_dir)
+        if state is not None and layer_exists(fetch_dir, "总体"):
+            return _fetch_range_incremental(
+                engine,
+                db_name,
+                channels,
+                merge_config,
+                fetch_dir,
+                start_date,
+                end_date,
+                state,
+                layer_format=layer_format,
+                workers=workers,
+                logger=logger,
+            )
+        log_skip(logger, f"{folder_name} 无增量高水位记录，执行全量提取", "Fetch")
+
+    if streaming:
+        return _fetch_range_streaming(
+            engine,
+            db_name,
+            channels,
+            merge_config,
+            fetch_dir,
+            start_date,
+            end_date,
+            chunk_size=fetch_options["chunk_size"],
+            mirror_jsonl=layer_format == "jsonl",
+            workers=workers,
+            logger=logger,
+        )
+
     channel_files = {}
-    
-    try:
-        # 4. 提取各渠道数据（每个渠道独立连接，降低长连接断开影响）
-        for channel in channels:
+    watermarks: Dict[str, Dict[str, Any]] = {}
+
+    # 4. 并发提取各渠道数据（每个渠道独立连接，降低长连接断开影响）
+    outcomes = _run_channel_jobs(
+        channels,
+        lambda channel: _fetch_channel_to_layer(
+            engine, db_name, channel, fetch_dir, start_date, end_date, layer_format, logger=logger
+        ),
+        workers,
+    )
+    for channel, outcome in outcomes.items():
+        if isinstance(outcome, Exception):
+            log_error(logger, f"提取渠道 {channel} 失败: {outcome}", "Fetch")
+        elif outcome is None:
+            log_skip(logger, f"表 {db_name}.{channel} 不存在，跳过", "Fetch")
+        elif outcome[0] > 0:
+            rows, watermarks[channel] = outcome
+            channel_files[channel] = find_layer_file(fetch_dir, channel)
+            log_success(logger, f"成功提取: {channel} -- 共{rows}条", "Fetch")
+        else:
+            log_skip(logger, f"渠道 {channel} 无数据", "Fetch")
+
+    # 5. 合并渠道数据
+    files_to_remove = set()
+
+    for merge_name, source_channels in merge_config.items():
+        try:
+            merge_data = []
+            for source_channel in source_channels:
+                if source_channel in channel_files and channel_files[source_channel].exists():
+                    df = read_layer(channel_files[source_channel])
+                    if len(df) > 0:
+                        merge_data.append(df)
+                        files_to_remove.add(source_channel)
+
+            if merge_data:
+                merged_df = pd.concat(merge_data, ignore_index=True)
+                write_layer(merged_df, fetch_dir, merge_name, fmt=layer_format)
+                log_success(logger, f"合并完成: {merge_name} -- {len(merged_df)}条)", "Fetch")
+
+        except Exception as e:
+            log_error(logger, f"合并 {merge_name} 失败: {e}", "Fetch")
+            continue
+
+    # 6. 删除已合并的原始文件
+    for channel in files_to_remove:
+        if channel in channel_files and channel_files[channel].exists():
             try:
-                df = _fetch_channel_dataframe(engine, db_name, channel, start_date, end_date, logger=logger)
-                if df is None:
-                    log_skip(logger, f"表 {db_name}.{channel} 不存在，跳过", "Fetch")
-                    continue
+                remove_layer(fetch_dir, channel)
+            except Exception as e:
+                log_error(logger, f"删除文件 {channel_files[channel].name} 失败: {e}", "Fetch")
 
+    # 7. 保存总体数据
+    if channel_files:
+        # 重新收集未合并的数据
+        final_data = []
+        for channel in channels:
+            if channel not in files_to_remove and channel in channel_files and channel_files[channel].exists():
+                df = read_layer(channel_files[channel])
                 if len(df) > 0:
-                    # 确保classification字段存在
-                    if 'classification' not in df.columns:
-                        df['classification'] = '未知'
-                    else:
-                        df['classification'] = df['classification'].fillna('未知')
-
-                    # 保存渠道数据
-                    channel_file = fetch_dir / f"{channel}.jsonl"
-                    write_jsonl(df, channel_file)
-                    channel_files[channel] = channel_file
-                    all_data.append(df)
-
-                    log_success(logger, f"成功提取: {channel} -- 共{len(df)}条", "Fetch")
-                else:
-                    log_skip(logger, f"渠道 {channel} 无数据", "Fetch")
-            except Exception as e:
-                log_error(logger, f"提取渠道 {channel} 失败: {e}", "Fetch")
-                continue
+                    final_data.append(df)
+
+        # 添加合并后的数据
+        for merge_name in merge_config.keys():
+            merged_file = find_layer_file(fetch_dir, merge_name)
+            if merged_file is not None:
+                df = read_layer(merged_file)
+                if len(df) > 0:
+                    final_data.append(df)
+
+        if final_data:
+            all_df = pd.concat(final_data, ignore_index=True)
+            write_layer(all_df, fetch_dir, "总体", fmt=layer_format)
+            _save_watermarks(fetch_dir, watermarks, len(all_df))
+            return len(all_df)
+        else:
+            log_error(logger, "没有提取到任何数据", "Fetch")
+            return None
+    else:
+        log_error(logger, "没有提取到任何数据", "Fetch")
+        return None
+
+
+DEFAULT_STREAM_CHUNK_SIZE = 20000
+DEFAULT_FETCH_WORKERS = 4
+
+
+def _fetch_options(channels_config: Dict[str, Any]) -> Dict[str, Any]:
+    """读取 channels.yaml 中的 fetch 配置段。"""
+    raw = channels_config.get('fetch') if isinstance(channels_config, dict) else None
+    if not isinstance(raw, dict):
+        raw = {}
+    try:
+        chunk_size = int(raw.get('chunk_size') or DEFAULT_STREAM_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        chunk_size = DEFAULT_STREAM_CHUNK_SIZE
+    try:
+        workers = int(raw.get('workers') or DEFAULT_FETCH_WORKERS)
+    except (TypeError, ValueError):
+        workers = DEFAULT_FETCH_WORKERS
+    return {
+        "streaming": bool(raw.get('streaming', False)),
+        "incremental": bool(raw.get('incremental', False)),
+        "chunk_size": max(1, chunk_size),
+        "workers": max(1, workers),
+    }
 
-        # 5. 合并渠道数据
-        merge_config = channels_config.get('merge_for_analysis', {})
-        files_to_remove = set()
 
-        for merge_name, source_channels in merge_config.items():
+def _run_channel_jobs(channels: List[str], job: Callable[[str], Any], workers: int) -> Dict[str, Any]:
+    """
+    并发执行各渠道任务，结果按 channels 原顺序返回；任务抛出的异常作为结果值返回，不影响其他渠道。
+    """
+    results: Dict[str, Any] = {}
+    if workers <= 1 or len(channels) <= 1:
+        for channel in channels:
             try:
-                merge_data = []
-                for source_channel in source_channels:
-                    if source_channel in channel_files and channel_files[source_channel].exists():
-                        df = read_jsonl(channel_files[source_channel])
-                        if len(df) > 0:
-                            merge_data.append(df)
-                            files_to_remove.add(source_channel)
-
-                if merge_data:
-                    merged_df = pd.concat(merge_data, ignore_index=True)
-                    merged_file = fetch_dir / f"{merge_name}.jsonl"
-                    write_jsonl(merged_df, merged_file)
-                    all_data.append(merged_df)
-                    log_success(logger, f"合并完成: {merge_name} -- {len(merged_df)}条)", "Fetch")
+                results[channel] = job(channel)
+            except Exception as exc:
+                results[channel] = exc
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(channels))) as executor:
+        futures = {executor.submit(job, channel): channel for channel in channels}
+        for future in as_completed(futures):
+            channel = futures[future]
+            try:
+                results[channel] = future.result()
+            except Exception as exc:
+                results[channel] = exc
+    return {channel: results[channel] for channel in channels}
 
-            except Exception as e:
-                log_error(logger, f"合并 {merge_name} 失败: {e}", "Fetch")
+
+class _ChunkedLayerWriter:
+    """
+    按块追加写入 Parquet，可选同步写出 JSONL 副本（项目层格式为 jsonl 时）。
+
+    Parquet 的列结构由 schema 参数或第一块确定，后续块按该结构对齐。
+    """
+
+    def __init__(self, stem: Path, schema: Optional[pa.Schema] = None, mirror_jsonl: bool = True):
+        self.parquet_path = stem.parent / f"{stem.name}.parquet"
+        self.jsonl_path = stem.parent / f"{stem.name}.jsonl"
+        self.rows = 0
+        self._mirror_jsonl = mirror_jsonl
+        self._schema = _stable_schema(schema) if schema is not None else None
+        self._writer: Optional[pq.ParquetWriter] = None
+        remove_layer(stem.parent, stem.name)
+
+    def write(self, table: pa.Table) -> None:
+        if table.num_rows == 0:
+            return
+        if self._writer is None:
+            if self._schema is None:
+                self._schema = _stable_schema(table.schema)
+            self._writer = pq.ParquetWriter(self.parquet_path, self._schema, compression="zstd")
+        table = conform_arrow_table(table, self._schema)
+        self._writer.write_table(table)
+        if self._mirror_jsonl:
+            write_jsonl(table.to_pandas(), self.jsonl_path, mode="a")
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def discard(self) -> None:
+        self.close()
+        self.rows = 0
+        for path in (self.parquet_path, self.jsonl_path):
+            if path.exists():
+                path.unlink()
+
+
+def _stable_schema(schema: pa.Schema) -> pa.Schema:
+    """把首块中全空（null 类型）的列提升为字符串，避免后续块无法写入。"""
+    fields = [
+        pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+        for field in schema
+    ]
+    return pa.schema(fields)
+
+
+def _ensure_classification(df: pd.DataFrame) -> pd.DataFrame:
+    if 'classification' not in df.columns:
+        df['classification'] = '未知'
+    else:
+        df['classification'] = df['classification'].fillna('未知')
+    return df
+
+
+def _frame_to_table(df: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_pandas(_ensure_classification(df), preserve_index=False)
+
+
+def _iter_channel_chunks(conn, channel: str, start_date: str, end_date: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """通过服务端游标分块读取渠道数据，每块最多 chunk_size 行。"""
+    query = _build_fetch_query(conn, channel)
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+        query, {"start_date": start_date, "end_date": end_date}
+    )
+    columns = list(result.keys())
+    for rows in result.partitions(chunk_size):
+        yield pd.DataFrame(rows, columns=columns)
+
+
+def _stream_channel(
+    engine,
+    db_name: str,
+    channel: str,
+    writer: _ChunkedLayerWriter,
+    start_date: str,
+    end_date: str,
+    chunk_size: int,
+    logger=None,
+) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+    """流式写出单个渠道，返回 (写入条数, 高水位)；表不存在时返回 None。"""
+    max_attempts = 2
+    for attempt in range(1, max_attempts + 1):
+        watermark: Optional[Dict[str, Any]] = None
+        try:
+            with engine.connect() as conn:
+                if not table_exists(conn, channel, db_name):
+                    return None
+                for df in _iter_channel_chunks(conn, channel, start_date, end_date, chunk_size):
+                    watermark = _advance_watermark(watermark, df)
+                    writer.write(_frame_to_table(df))
+            writer.close()
+            return writer.rows, watermark
+        except OperationalError as exc:
+            writer.discard()
+            if attempt < max_attempts and _is_disconnect_error(exc):
+                log_skip(logger, f"渠道 {channel} 连接中断，正在重试({attempt}/{max_attempts})", "Fetch")
                 continue
+            raise
+        except Exception:
+            writer.discard()
+            raise
+    return None
 
-        # 6. 删除已合并的原始文件
-        for channel in files_to_remove:
-            if channel in channel_files and channel_files[channel].exists():
-                try:
-                    channel_files[channel].unlink()
-                except Exception as e:
-                    log_error(logger, f"删除文件 {channel}.jsonl 失败: {e}", "Fetch")
-
-        # 7. 保存总体数据
-        if all_data:
-            # 重新收集未合并的数据
-            final_data = []
-            for channel in channels:
-                if channel not in files_to_remove and channel in channel_files and channel_files[channel].exists():
-                    df = read_jsonl(channel_files[channel])
-                    if len(df) > 0:
-                        final_data.append(df)
 
-            # 添加合并后的数据
-            for merge_name in merge_config.keys():
-                merged_file = fetch_dir / f"{merge_name}.jsonl"
-                if merged_file.exists():
-                    df = read_jsonl(merged_file)
-                    if len(df) > 0:
-                        final_data.append(df)
-
-            if final_data:
-                all_df = pd.concat(final_data, ignore_index=True)
-                all_file = fetch_dir / "总体.jsonl"
-                write_jsonl(all_df, all_file)
-                return len(all_df)
-            else:
-                log_error(logger, "没有提取到任何数据", "Fetch")
-                return None
+def _concat_parquet_files(sources: List[Path], stem: Path, chunk_size: int, mirror_jsonl: bool = True) -> int:
+    """按批次拼接多个 Parquet 层（含增量追加的分片）到 stem 对应的输出，列结构取所有来源的并集。"""
+    if not sources:
+        return 0
+    files = [part_path for path in sources for part_path in layer_part_files(path)]
+    schemas = [pq.read_schema(path) for path in files]
+    try:
+        union = pa.unify_schemas(schemas, promote_options="permissive")
+    except TypeError:
+        union = pa.unify_schemas(schemas)
+    writer = _ChunkedLayerWriter(stem, schema=union, mirror_jsonl=mirror_jsonl)
+    try:
+        for path in files:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+                writer.write(pa.Table.from_batches([batch]))
+    except Exception:
+        writer.discard()
+        raise
+    writer.close()
+    return writer.rows
+
+
+def _fetch_range_streaming(
+    engine,
+    db_name: str,
+    channels: List[str],
+    merge_config: Dict[str, List[str]],
+    fetch_dir: Path,
+    start_date: str,
+    end_date: str,
+    chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    mirror_jsonl: bool = True,
+    workers: int = 1,
+    logger=None,
+) -> Optional[int]:
+    """
+    流式提取：服务端游标分块读取各渠道，直接写出渠道 Parquet（mirror_jsonl 时同步 JSONL），
+    合并渠道与总体数据由已写出的 Parquet 批次拼接而成，内存占用只与 chunk_size 相关。
+    """
+    def _job(channel: str) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+        writer = _ChunkedLayerWriter(fetch_dir / channel, mirror_jsonl=mirror_jsonl)
+        return _stream_channel(engine, db_name, channel, writer, start_date, end_date, chunk_size, logger=logger)
+
+    channel_files: Dict[str, Path] = {}
+    watermarks: Dict[str, Dict[str, Any]] = {}
+    for channel, outcome in _run_channel_jobs(channels, _job, workers).items():
+        if isinstance(outcome, Exception):
+            log_error(logger, f"提取渠道 {channel} 失败: {outcome}", "Fetch")
+        elif outcome is None:
+            log_skip(logger, f"表 {db_name}.{channel} 不存在，跳过", "Fetch")
+        elif outcome[0] > 0:
+            rows, watermarks[channel] = outcome
+            channel_files[channel] = fetch_dir / f"{channel}.parquet"
+            log_success(logger, f"成功提取: {channel} -- 共{rows}条", "Fetch")
         else:
-            log_error(logger, "没有提取到任何数据", "Fetch")
+            log_skip(logger, f"渠道 {channel} 无数据", "Fetch")
+
+    if not channel_files:
+        log_error(logger, "没有提取到任何数据", "Fetch")
+        return None
+
+    merged_files: Dict[str, Path] = {}
+    files_to_remove = set()
+    for merge_name, source_channels in merge_config.items():
+        sources = [channel_files[name] for name in source_channels or [] if name in channel_files]
+        if not sources:
+            continue
+        try:
+            rows = _concat_parquet_files(sources, fetch_dir / merge_name, chunk_size, mirror_jsonl=mirror_jsonl)
+        except Exception as e:
+            log_error(logger, f"合并 {merge_name} 失败: {e}", "Fetch")
+            continue
+        merged_files[merge_name] = fetch_dir / f"{merge_name}.parquet"
+        files_to_remove.update(name for name in source_channels if name in channel_files)
+        log_success(logger, f"合并完成: {merge_name} -- {rows}条)", "Fetch")
+
+    for channel in files_to_remove:
+        remove_layer(fetch_dir, channel)
+        channel_files.pop(channel, None)
+
+    final_sources = [channel_files[name] for name in channels if name in channel_files]
+    final_sources.extend(merged_files[name] for name in merge_config.keys() if name in merged_files)
+    total = _concat_parquet_files(final_sources, fetch_dir / "总体", chunk_size, mirror_jsonl=mirror_jsonl)
+    if total <= 0:
+        log_error(logger, "没有提取到任何数据", "Fetch")
+        return None
+    _save_watermarks(fetch_dir, watermarks, total)
+    return total
+
+
+WATERMARK_FILENAME = ".fetch_watermarks.json"
+
+
+def _advance_watermark(watermark: Optional[Dict[str, Any]], df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    用一块数据推进渠道高水位：记录最大 published_at 以及该时刻已写出的 id，
+    增量查询以 published_at >= 高水位读取，再按 id 排除同一时刻的已有记录。
+    """
+    if df is None or df.empty or 'published_at' not in df.columns:
+        return watermark
+    published = pd.to_datetime(df['published_at'], errors='coerce')
+    latest = published.max()
+    if pd.isna(latest):
+        return watermark
+    current = pd.Timestamp(watermark["published_at"]) if watermark else None
+    if current is not None and latest < current:
+        return watermark
+    ids = df.loc[published == latest, 'id'].astype(str).tolist() if 'id' in df.columns else []
+    if current is not None and latest == current:
+        ids = list(dict.fromkeys([*watermark.get("ids", []), *ids]))
+    return {"published_at": latest.isoformat(sep=" "), "ids": ids}
+
+
+def _load_watermarks(fetch_dir: Path) -> Optional[Dict[str, Any]]:
+    path = fetch_dir / WATERMARK_FILENAME
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("channels"), dict):
+        return None
+    return payload
+
+
+def _save_watermarks(fetch_dir: Path, watermarks: Dict[str, Dict[str, Any]], total_rows: int) -> None:
+    payload = {
+        "version": 1,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "total_rows": int(total_rows),
+        "channels": {channel: mark for channel, mark in watermarks.items() if mark},
+    }
+    path = fetch_dir / WATERMARK_FILENAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _fetch_range_incremental(
+    engine,
+    db_name: str,
+    channels: List[str],
+    merge_config: Dict[str, List[str]],
+    fetch_dir: Path,
+    start_date: str,
+    end_date: str,
+    state: Dict[str, Any],
+    layer_format: str = "jsonl",
+    workers: int = 1,
+    logger=None,
+) -> Optional[int]:
+    """
+    增量提取：各渠道只查询高水位之后的新数据，追加到渠道（或所属合并）文件并补写总体。
+
+    只处理新增记录；数据库中被删除或早于高水位补录的数据需要全量提取才能同步。
+    """
+    watermarks: Dict[str, Dict[str, Any]] = dict(state.get("channels") or {})
+    merge_targets: Dict[str, List[str]] = {}
+    for merge_name, source_channels in merge_config.items():
+        for source_channel in source_channels or []:
+            merge_targets.setdefault(source_channel, []).append(merge_name)
+
+    def _job(channel: str) -> Optional[pd.DataFrame]:
+        mark = watermarks.get(channel)
+        since = pd.Timestamp(mark["published_at"]).to_pydatetime() if mark else None
+        df = _fetch_channel_dataframe(
+            engine, db_name, channel, start_date, end_date, logger=logger, since=since
+        )
+        if df is None:
             return None
+        if mark and mark.get("ids") and 'id' in df.columns:
+            df = df[~df['id'].astype(str).isin(set(mark["ids"]))]
+        return _ensure_classification(df.reset_index(drop=True))
+
+    new_frames: List[pd.DataFrame] = []
+    for channel, outcome in _run_channel_jobs(channels, _job, workers).items():
+        if isinstance(outcome, Exception):
+            log_error(logger, f"增量提取渠道 {channel} 失败: {outcome}", "Fetch")
+        elif outcome is None:
+            log_skip(logger, f"表 {db_name}.{channel} 不存在，跳过", "Fetch")
+        elif len(outcome) > 0:
+            for target in merge_targets.get(channel, [channel]):
+                append_layer(outcome, fetch_dir, target, fmt=layer_format)
+            watermarks[channel] = _advance_watermark(watermarks.get(channel), outcome)
+            new_frames.append(outcome)
+            log_success(logger, f"增量提取: {channel} -- 新增{len(outcome)}条", "Fetch")
+        else:
+            log_skip(logger, f"渠道 {channel} 无新增数据", "Fetch")
 
-    finally:
-        engine.dispose()
+    new_rows = sum(len(frame) for frame in new_frames)
+    if new_frames:
+        append_layer(pd.concat(new_frames, ignore_index=True), fetch_dir, "总体", fmt=layer_format)
+    total = int(state.get("total_rows") or 0) + new_rows
+    _save_watermarks(fetch_dir, watermarks, total)
+    log_success(logger, f"增量提取完成: 新增{new_rows}条，总计{total}条", "Fetch")
+    return total
 
 
 _PROJECT_ID_PATTERN = re.compile(r"^(\d{8})-(\d{6})-(.+)$")
@@ -191,22 +595,24 @@ def _quote_identifier(conn, identifier: str) -> str:
     return f'"{safe}"'
 
 
-def _create_topic_engine(db_topic: str, logger=None):
-    """创建并返回指定专题数据库的引擎（兼容 active MySQL/PostgreSQL）。"""
+def _create_topic_engine(db_topic: str, logger=None, pool_size: Optional[int] = None):
+    """返回指定专题数据库的进程级共享引擎（兼容 active MySQL/PostgreSQL），调用方不应 dispose。"""
     try:
         db_manager = DatabaseManager()
-        return db_manager.get_engine_for_database(db_topic)
+        return db_manager.get_shared_engine_for_database(db_topic, pool_size=pool_size)
     except Exception as exc:
         log_error(logger, f"创建数据库引擎失败({db_topic}): {exc}", "Fetch")
         return None
 
 
-def _build_fetch_query(conn, table_name: str):
+def _build_fetch_query(conn, table_name: str, incremental: bool = False):
     quoted_table = _quote_identifier(conn, table_name)
     date_expr = "CAST(published_at AS DATE)" if conn.dialect.name == 'postgresql' else "DATE(published_at)"
+    since_clause = "AND published_at >= :since" if incremental else ""
     query = f"""
     SELECT * FROM {quoted_table}
     WHERE {date_expr} BETWEEN :start_date AND :end_date
+    {since_clause}
     ORDER BY published_at DESC
     """
     return text(query)
@@ -224,15 +630,26 @@ def _is_disconnect_error(exc: Exception) -> bool:
     return any(marker in message for marker in markers)
 
 
-def _fetch_channel_dataframe(engine, db_name: str, channel: str, start_date: str, end_date: str, logger=None):
+def _fetch_channel_dataframe(
+    engine,
+    db_name: str,
+    channel: str,
+    start_date: str,
+    end_date: str,
+    logger=None,
+    since: Optional[datetime] = None,
+):
     max_attempts = 2
+    params: Dict[str, Any] = {"start_date": start_date, "end_date": end_date}
+    if since is not None:
+        params["since"] = since
     for attempt in range(1, max_attempts + 1):
         try:
             with engine.connect() as conn:
                 if not table_exists(conn, channel, db_name):
                     return None
-                query = _build_fetch_query(conn, channel)
-                result = conn.execute(query, {"start_date": start_date, "end_date": end_date})
+                query = _build_fetch_query(conn, channel, incremental=since is not None)
+                result = conn.execute(query, params)
                 return pd.DataFrame(result.fetchall(), columns=result.keys())
         except OperationalError as exc:
             if attempt < max_attempts and _is_disconnect_error(exc):
@@ -242,6 +659,27 @@ def _fetch_channel_dataframe(engine, db_name: str, channel: str, start_date: str
     return None
 
 
+def _fetch_channel_to_layer(
+    engine,
+    db_name: str,
+    channel: str,
+    fetch_dir: Path,
+    start_date: str,
+    end_date: str,
+    layer_format: str,
+    logger=None,
+) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+    """提取单个渠道并按层格式写出，返回 (条数, 高水位)；表不存在时返回 None。"""
+    df = _fetch_channel_dataframe(engine, db_name, channel, start_date, end_date, logger=logger)
+    if df is None:
+        return None
+    if len(df) > 0:
+        # 确保classification字段存在
+        _ensure_classification(df)
+        write_layer(df, fetch_dir, channel, fmt=layer_format)
+    return len(df), _advance_watermark(None, df)
+
+
 def _query_table_date_range(conn, table_name: str, topic: str, logger=None) -> Tuple[Optional[date], Optional[date]]:
     if not table_exists(conn, table_name, topic):
         log_skip(logger, f"表 {topic}.{table_name} 不存在", "Fetch")
@@ -272,6 +710,43 @@ def _query_table_date_range(conn, table_name: str, topic: str, logger=None) -> T
     return result.get("start_date"), result.get("end_date")
 
 
+DATE_RANGE_BATCH_SIZE = 50
+
+
+def _query_tables_date_ranges(
+    conn,
+    tables: List[str],
+    logger=None,
+) -> Dict[str, Tuple[Optional[date], Optional[date]]]:
+    """
+    用 UNION ALL 一次查询多张表的日期区间，每批最多 DATE_RANGE_BATCH_SIZE 张表。
+
+    某一批查询失败时跳过该批（返回结果中不含这些表），由调用方逐表回退。
+    """
+    date_expr = "CAST(published_at AS DATE)" if conn.dialect.name == 'postgresql' else "DATE(published_at)"
+    ranges: Dict[str, Tuple[Optional[date], Optional[date]]] = {}
+    for offset in range(0, len(tables), DATE_RANGE_BATCH_SIZE):
+        batch = tables[offset:offset + DATE_RANGE_BATCH_SIZE]
+        selects = [
+            f"SELECT {index} AS table_index, MIN({date_expr}) AS start_date, MAX({date_expr}) AS end_date "
+            f"FROM {_quote_identifier(conn, table_name)}"
+            for index, table_name in enumerate(batch)
+        ]
+        try:
+            rows = conn.execute(text("\nUNION ALL\n".join(selects))).mappings().all()
+        except Exception as exc:
+            log_skip(logger, f"批量查询日期区间失败，改为逐表查询: {exc}", "Fetch")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            continue
+        for row in rows:
+            index = int(row.get("table_index"))
+            ranges[batch[index]] = (row.get("start_date"), row.get("end_date"))
+    return ranges
+
+
 def _list_topic_tables(conn, topic: str, logger=None) -> List[str]:
     """
     获取专题数据库中包含 published_at 字段的所有表。
@@ -371,8 +846,6 @@ def get_available_date_range(topic: str, table_name: str, logger=None):
     except Exception as e:
         log_error(logger, f"查询表 {table_name} 日期区间失败: {e}", "Fetch")
         return None, None
-    finally:
-        engine.dispose()
 
 
 def get_topic_available_date_range(topic: str, logger=None):
@@ -406,8 +879,12 @@ def get_topic_available_date_range(topic: str, logger=None):
             tables = _list_topic_tables(conn, db_topic, logger)
             if not tables:
                 log_skip(logger, f"专题 {db_topic} 无可用表，返回默认空区间", "Fetch")
+            batched_ranges = _query_tables_date_ranges(conn, tables, logger)
             for table_name in tables:
-                start_value, end_value = _query_table_date_range(conn, table_name, db_topic, logger)
+                if table_name in batched_ranges:
+                    start_value, end_value = batched_ranges[table_name]
+                else:
+                    start_value, end_value = _query_table_date_range(conn, table_name, db_topic, logger)
                 table_ranges[table_name] = {
                     "start": _format_date(start_value),
                     "end": _format_date(end_value)
@@ -422,8 +899,6 @@ def get_topic_available_date_range(topic: str, logger=None):
         log_error(logger, f"汇总专题 {db_topic} 日期区间失败: {e}", "Fetch")
     except Exception as e:
         log_error(logger, f"汇总专题 {db_topic} 日期区间失败: {e}", "Fetch")
-    finally:
-        engine.dispose()
 
     return {
         "start": _format_date(min_date),
@@ -433,7 +908,15 @@ def get_topic_available_date_range(topic: str, logger=None):
     }
 
 
-def run_fetch(topic: str, start: str, end: str, logger=None, db_topic: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def run_fetch(
+    topic: str,
+    start: str,
+    end: str,
+    logger=None,
+    db_topic: Optional[str] = None,
+    streaming: Optional[bool] = None,
+    incremental: Optional[bool] = None,
+) -> Optional[Dict[str, Any]]:
     """
     运行数据提取
     
@@ -443,6 +926,8 @@ def run_fetch(topic: str, start: str, end: str, logger=None, db_topic: Optional[
         end (str): 结束日期
         logger: 日志记录器
         db_topic (Optional[str]): 远程数据库名称（可选），不传则使用 topic
+        streaming (Optional[bool]): 是否使用流式提取，不传则读取配置
+        incremental (Optional[bool]): 是否按高水位增量追加，不传则读取配置
     
     Returns:
         Optional[Dict[str, Any]]: 成功返回包含计数的结果字典，失败返回 None
@@ -453,7 +938,16 @@ def run_fetch(topic: str, start: str, end: str, logger=None, db_topic: Optional[
     log_module_start(logger, "Fetch")
     
     try:
-        count = fetch_range(topic, start, end, start, logger, db_topic=db_topic)
+        count = fetch_range(
+            topic,
+            start,
+            end,
+            start,
+            logger,
+            db_topic=db_topic,
+            streaming=streaming,
+            incremental=incremental,
+        )
         if count is not None:
             return {"count": count}
         else:
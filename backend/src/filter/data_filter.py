@@ -8,11 +8,12 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from ..utils.ai import OpenAIClient, QwenClient
+from ..utils.ai import OpenAIClient, QwenClient, RateLimitError, RateLimiter, closing_sessions, get_pool_stats
 from ..utils.ai.token import count_tokens
-from ..utils.io.excel import read_jsonl, write_jsonl
+from ..utils.io.layers import find_layer_file, is_layer_file, list_layer_files, read_layer, write_layer
 from ..utils.logging.logging import (
     log_error,
     log_module_start,
@@ -22,6 +23,8 @@ from ..utils.logging.logging import (
 )
 from ..utils.setting.paths import bucket, ensure_bucket
 from ..utils.setting.settings import settings
+from .near_duplicates import build_clusterer, cluster_sizes, label_channels
+from .verdict_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL_DAYS, VerdictCache
 
 # Path(__file__).resolve() -> .../backend/src/filter/data_filter.py
 BACKEND_DIR = Path(__file__).resolve().parents[2]
@@ -30,6 +33,12 @@ BACKEND_DIR = Path(__file__).resolve().parents[2]
 PROGRESS_CACHE_DIR = Path(__file__).parent / "cache"
 PROGRESS_CACHE_DIR.mkdir(exist_ok=True)
 
+# 跨专题/日期共享的判定缓存
+VERDICT_CACHE_PATH = PROGRESS_CACHE_DIR / "verdicts.sqlite3"
+
+# 近重复簇编号列（写入筛选结果，供后续分析使用）
+CLUSTER_COLUMN = "dup_cluster"
+
 
 def _current_timestamp() -> str:
     """Return ISO 8601 timestamp in UTC."""
@@ -105,7 +114,9 @@ def _clear_filter_outputs(topic: str, date: str) -> None:
 
     try:
         filter_dir = ensure_bucket("filter", topic, date)
-        for path in filter_dir.glob("*.jsonl"):
+        for path in filter_dir.iterdir():
+            if not path.is_file() or not is_layer_file(path):
+                continue
             try:
                 path.unlink()
             except OSError:
@@ -123,7 +134,7 @@ def _clear_filter_outputs(topic: str, date: str) -> None:
 
 def _save_partial_results(topic: str, date: str, channel: str, results_df: pd.DataFrame) -> None:
     """
-    保存部分结果到JSONL文件
+    保存部分结果到渠道层文件（格式沿用已有文件，否则按项目层存储格式）
 
     Args:
         topic (str): 专题名称
@@ -136,19 +147,19 @@ def _save_partial_results(topic: str, date: str, channel: str, results_df: pd.Da
 
     try:
         dst = ensure_bucket("filter", topic, date)
-        output_file = dst / f"{channel}.jsonl"
+        output_file = find_layer_file(dst, channel)
 
-        if output_file.exists():
+        if output_file is not None:
             try:
-                existing_df = read_jsonl(output_file)
+                existing_df = read_layer(output_file)
             except Exception:
                 existing_df = pd.DataFrame()
             combined_df = pd.concat([existing_df, results_df], ignore_index=True)
             if "contents" in combined_df.columns:
                 combined_df = combined_df.drop_duplicates(subset=["contents"], keep="last")
-            write_jsonl(combined_df, output_file)
+            write_layer(combined_df, dst, channel, fmt=output_file.suffix.lstrip("."))
         else:
-            write_jsonl(results_df, output_file)
+            write_layer(results_df, dst, channel, topic=topic)
     except Exception as exc:  # pragma: no cover - 写入失败不应中断整体流程
         print(f"保存部分结果失败: {exc}")
 
@@ -215,15 +226,93 @@ def _summarise_text(value: Any, limit: int = 120) -> str:
     return text[: limit - 1].rstrip() + "…"
 
 
-def _parse_response(raw: str) -> Dict[str, Any]:
+def _open_verdict_cache(
+    llm_cfg: Dict[str, Any],
+    template: str,
+    provider: str,
+    model: str,
+    logger=None,
+) -> Optional[VerdictCache]:
     """
-    解析API响应
+    按 filter_llm.verdict_cache 配置打开判定缓存；关闭或打开失败时返回 None
+    """
+    cache_cfg = llm_cfg.get("verdict_cache") or {}
+    if not isinstance(cache_cfg, dict) or not cache_cfg.get("enabled", True):
+        return None
+    try:
+        cache = VerdictCache(
+            Path(cache_cfg.get("path") or VERDICT_CACHE_PATH),
+            template,
+            f"{provider}/{model}",
+            ttl_days=float(cache_cfg.get("ttl_days", DEFAULT_TTL_DAYS)),
+            max_entries=int(cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES)),
+        )
+        cache.prune()
+        return cache
+    except Exception as exc:
+        log_error(logger, f"判定缓存不可用，将直接调用模型: {exc}", "Filter")
+        return None
+
+
+def _verdict_cache_stats(cache: Optional[VerdictCache]) -> Dict[str, Any]:
+    if cache is None:
+        return {"enabled": False, "hits": 0, "misses": 0, "hit_rate": 0.0}
+    return cache.stats()
+
+
+def _label_near_duplicates(
+    llm_cfg: Dict[str, Any],
+    files: List[Path],
+    logger=None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    按 filter_llm.near_duplicates 配置对全部渠道的清洗文本做近重复聚类
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: ({渠道: 各行簇编号}, 聚类统计)；关闭或失败时为空
+    """
+    stats: Dict[str, Any] = {"enabled": False, "clusters": 0, "clustered_rows": 0, "redundant_rows": 0}
+    dedup_cfg = llm_cfg.get("near_duplicates") or {}
+    if not isinstance(dedup_cfg, dict):
+        dedup_cfg = {}
+    try:
+        clusterer = build_clusterer(dedup_cfg)
+        if clusterer is None:
+            return {}, stats
+        started = time.time()
+        channel_texts: Dict[str, List[Any]] = {}
+        for fp in files:
+            if fp.stem == "all":
+                continue
+            frame = read_layer(fp, columns=["contents"])
+            channel_texts[fp.stem] = frame["contents"].tolist() if "contents" in frame.columns else [None] * len(frame)
+        labels = label_channels(clusterer, channel_texts)
+    except Exception as exc:
+        log_error(logger, f"近重复聚类失败，将逐条调用模型: {exc}", "Filter")
+        return {}, stats
+
+    combined = [values for values in labels.values() if len(values)]
+    if combined:
+        stats.update(cluster_sizes(np.concatenate(combined)))
+    stats["enabled"] = True
+    log_success(
+        logger,
+        f"近重复聚类完成 | 簇:{stats['clusters']}, 近重复行:{stats['clustered_rows']}, "
+        f"可省调用:{stats['redundant_rows']}, 耗时:{time.time() - started:.1f}s",
+        "Filter",
+    )
+    return labels, stats
+
+
+def _try_parse_response(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    解析API响应，无法提取 JSON 时返回 None
     
     Args:
         raw (str): 原始响应文本
     
     Returns:
-        Dict[str, Any]: 解析后的响应数据
+        Optional[Dict[str, Any]]: 解析后的响应数据
     """
     try:
         s = raw.strip()
@@ -239,7 +328,23 @@ def _parse_response(raw: str) -> Dict[str, Any]:
             return json.loads(s[i:j+1])
     except Exception:
         pass
-    return {"相关": False, "分类": "未知", "理由": "解析失败"}
+    return None
+
+
+def _parse_response(raw: str) -> Dict[str, Any]:
+    """
+    解析API响应
+    
+    Args:
+        raw (str): 原始响应文本
+    
+    Returns:
+        Dict[str, Any]: 解析后的响应数据
+    """
+    parsed = _try_parse_response(raw)
+    if parsed is None:
+        return {"相关": False, "分类": "未知", "理由": "解析失败"}
+    return parsed
 
 
 def _is_high(parsed: Dict[str, Any]) -> bool:
@@ -320,10 +425,15 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
     qps = int(llm_cfg.get("qps", 200))
     max_tokens = int(llm_cfg.get("truncation", 200))
     batch_size = int(llm_cfg.get("batch_size", 32))
+    # 同时在途的请求数，未单独配置时沿用 batch_size
+    max_concurrency = max(1, int(llm_cfg.get("max_concurrency") or batch_size))
+    tokens_per_minute = int(llm_cfg.get("tokens_per_minute") or 0)
+    checkpoint_interval = float(llm_cfg.get("checkpoint_interval", 5))
 
     log_success(
         logger,
-        f"使用模型: {model} (provider={provider}), QPS: {qps}, 截断长度: {max_tokens}, 批次大小: {batch_size}",
+        f"使用模型: {model} (provider={provider}), QPS: {qps}, 截断长度: {max_tokens}, "
+        f"并发上限: {max_concurrency}, Token/分钟: {tokens_per_minute or '不限'}",
         "Filter",
     )
 
@@ -346,7 +456,7 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
         return False
 
     clean_dir = bucket("clean", topic, date)
-    files = sorted(clean_dir.glob("*.jsonl"))
+    files = list_layer_files(clean_dir)
     if not files:
         log_error(logger, f"未找到清洗数据: {clean_dir}", "Filter")
         return False
@@ -365,6 +475,11 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
         client = OpenAIClient()
     else:
         client = QwenClient()
+    verdict_cache = _open_verdict_cache(llm_cfg, template, provider, model, logger)
+    channel_clusters, near_duplicate_stats = _label_near_duplicates(llm_cfg, files, logger)
+    # 簇编号 -> 代表文本的模型响应，跨渠道共享
+    cluster_verdicts: Dict[int, str] = {}
+    near_duplicate_saved = 0
     total_tasks = 0
     successful_tasks = 0
     total_tokens = 0
@@ -373,44 +488,39 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
     aggregated_irrelevant_samples: List[Dict[str, Any]] = []
     aggregated_relevant_samples: List[Dict[str, Any]] = []
 
-    # QPS控制
-    last_request_time = time.time()
+    # 令牌桶限流：请求数/秒 + Token 数/分钟，遇到 429 自动降速
+    limiter = RateLimiter(qps, tokens_per_minute)
 
-    async def call_with_qps(
+    async def call_with_limits(
         prompt: str,
         idx: int,
         channel: str,
         max_retries: int = 3,
+        max_rate_limited: int = 10,
     ) -> Tuple[int, Optional[str], int, bool]:
         """
-        带QPS控制和重试机制的API调用
+        经限流器调度并带重试机制的API调用；429 不计入普通重试次数，由限流器退避
 
         Args:
             prompt (str): 提示词
             idx (int): 任务索引
             channel (str): 渠道名称
             max_retries (int): 最大重试次数
+            max_rate_limited (int): 连续被限流的最大次数
 
         Returns:
             Tuple[int, Optional[str], int, bool]: (索引, 响应内容, token消耗, 是否成功)
         """
-        nonlocal last_request_time
+        estimated_tokens = count_tokens(prompt, model, provider) + max_tokens if limiter.tokens else 0
+        attempt = 0
+        rate_limited = 0
 
-        for attempt in range(max_retries + 1):
+        while attempt <= max_retries:
             try:
-                # QPS控制 - 更保守的延迟
-                current_time = time.time()
-                time_diff = current_time - last_request_time
-                min_interval = 1.0 / qps
-                
-                # 添加额外的安全间隔，避免API过载
-                if time_diff < min_interval * 1.2:  # 增加20%的安全间隔
-                    await asyncio.sleep(min_interval * 1.2 - time_diff)
-                
-                last_request_time = time.time()
+                await limiter.acquire(estimated_tokens)
 
                 # 调用模型客户端执行推理
-                result = await client.call(prompt, model, max_tokens)
+                result = await client.call(prompt, model, max_tokens, raise_on_rate_limit=True)
 
                 if result and result.get("text"):
                     text_response = result["text"]
@@ -428,6 +538,8 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
                         input_tokens = count_tokens(prompt, model, provider)
                         output_tokens = count_tokens(text_response, model, provider)
                         total_token_usage = input_tokens + output_tokens
+                    limiter.settle(estimated_tokens, total_token_usage)
+                    limiter.on_success()
 
                     # 显示判断结果而不是原始响应
                     result_text = "相关" if is_relevant else "不相关"
@@ -454,12 +566,27 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
                             f"[{channel}] 任务{idx} 失败，{wait_time}秒后重试 (第{attempt + 1}次)",
                             "Filter",
                         )
+                        attempt += 1
                         await asyncio.sleep(wait_time)
                         continue
                     else:
                         log_error(logger, f"[{channel}] 任务{idx} 失败 | 无响应 (已重试{max_retries}次)", "Filter")
                         return idx, None, 0, False
 
+            except RateLimitError as exc:
+                limiter.settle(estimated_tokens, 0)
+                rate_limited += 1
+                pause = limiter.on_rate_limited(exc.retry_after)
+                if rate_limited > max_rate_limited:
+                    log_error(logger, f"[{channel}] 任务{idx} 持续被限流，放弃 (已限流{rate_limited}次)", "Filter")
+                    return idx, None, 0, False
+                log_error(
+                    logger,
+                    f"[{channel}] 任务{idx} 被限流，暂停{pause:.1f}秒并降速至 {limiter.rate_factor:.0%}",
+                    "Filter",
+                )
+                continue
+
             except Exception as e:
                 if attempt < max_retries:
                     wait_time = (attempt + 1) * 2
@@ -468,6 +595,7 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
                         f"[{channel}] 任务{idx} 异常，{wait_time}秒后重试 (第{attempt + 1}次) | {str(e)}",
                         "Filter",
                     )
+                    attempt += 1
                     await asyncio.sleep(wait_time)
                     continue
                 else:
@@ -476,6 +604,71 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
 
         return idx, None, 0, False
 
+    # 近重复簇/相同文本 -> 已成功的模型响应（跨渠道共享），以及正在调用中的代表任务
+    group_verdicts: Dict[Tuple[str, Any], str] = {}
+    inflight: Dict[Tuple[str, Any], "asyncio.Future[Tuple[int, Optional[str], int, bool]]"] = {}
+    fresh_verdicts: List[Tuple[str, str]] = []
+
+    async def _resolve_item(
+        prompt: str,
+        idx: int,
+        key: Optional[str],
+        cluster: Optional[int],
+        channel: str,
+        cached: Dict[str, str],
+    ) -> Tuple[int, Optional[str], int, bool]:
+        """
+        依次复用近重复簇已有判定、判定缓存与进行中的同簇调用，都没有时才调用模型
+        """
+        nonlocal near_duplicate_saved
+
+        if cluster is not None:
+            group: Optional[Tuple[str, Any]] = ("cluster", cluster)
+        elif key is not None:
+            group = ("text", key)
+        else:
+            group = None
+
+        if group is not None and group in group_verdicts:
+            if group[0] == "cluster":
+                near_duplicate_saved += 1
+            elif verdict_cache is not None:
+                verdict_cache.record(1, 0)
+            return idx, group_verdicts[group], 0, True
+        if key is not None and key in cached:
+            if verdict_cache is not None:
+                verdict_cache.record(1, 0)
+            if group is not None:
+                group_verdicts[group] = cached[key]
+            return idx, cached[key], 0, True
+        if group is not None and group in inflight:
+            _, response, _, success = await asyncio.shield(inflight[group])
+            if group[0] == "cluster":
+                near_duplicate_saved += 1
+            elif verdict_cache is not None:
+                verdict_cache.record(1, 0)
+            return idx, response, 0, success
+
+        leader = asyncio.get_running_loop().create_future() if group is not None else None
+        if leader is not None:
+            inflight[group] = leader
+        outcome: Tuple[int, Optional[str], int, bool] = (idx, None, 0, False)
+        try:
+            outcome = await call_with_limits(prompt, idx, channel)
+        finally:
+            if leader is not None:
+                inflight.pop(group, None)
+                leader.set_result(outcome)
+        if verdict_cache is not None:
+            verdict_cache.record(0, 1)
+        _, response, _, success = outcome
+        if success and response and _try_parse_response(response) is not None:
+            if group is not None:
+                group_verdicts[group] = response
+            if key is not None:
+                fresh_verdicts.append((key, response))
+        return outcome
+
     # 处理每个渠道
     for fp in files:
         channel = fp.stem
@@ -484,7 +677,7 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
 
         log_success(logger, f"开始处理渠道: {channel}", "Filter")
         try:
-            df = read_jsonl(fp)
+            df = read_layer(fp)
             if df.empty:
                 log_skip(logger, f"{channel} 空数据，跳过", "Filter")
                 continue
@@ -529,6 +722,13 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
                 continue
 
             prompts = [template.replace("{text}", t) for t in texts]
+            cache_keys = [verdict_cache.key_for(t) for t in texts] if verdict_cache else []
+            cluster_labels = channel_clusters.get(channel)
+            if cluster_labels is not None and len(cluster_labels) != len(df):
+                cluster_labels = None
+            pending_clusters = (
+                [int(cluster_labels[idx]) for idx in pending_indices] if cluster_labels is not None else []
+            )
 
             if completed_indices or failed_indices:
                 log_success(
@@ -537,145 +737,199 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
                     "Filter",
                 )
 
-            actual_batch_size = batch_size
             channel_tokens = 0
-
-            try:
-                for i in range(0, len(prompts), actual_batch_size):
-                    batch_prompts = prompts[i : i + actual_batch_size]
-                    batch_indices = pending_indices[i : i + actual_batch_size]
-
-                    batch_tasks = [
-                        asyncio.create_task(call_with_qps(prompt, batch_indices[j], channel))
-                        for j, prompt in enumerate(batch_prompts)
+            cached_verdicts: Dict[str, str] = {}
+            if verdict_cache is not None:
+                try:
+                    cached_verdicts = verdict_cache.get_many(cache_keys)
+                except Exception as exc:
+                    log_error(logger, f"查询判定缓存失败: {exc}", "Filter")
+
+            # 滑动窗口：max_concurrency 个 worker 持续从队列取任务，不再等待整批完成；
+            # 结果按原始顺序连续落盘，检查点按时间间隔写入
+            finished: Dict[int, Tuple[int, Optional[str], int, bool]] = {}
+            next_position = 0
+            applied_position = 0
+            last_checkpoint = time.monotonic()
+
+            def _checkpoint() -> None:
+                """将按原始顺序已连续完成的结果写入筛选产物、进度记录与汇总"""
+                nonlocal applied_position, channel_tokens, recent_records
+                nonlocal total_tasks, successful_tasks, total_tokens, summary_kept_rows
+
+                if verdict_cache is not None and fresh_verdicts:
+                    try:
+                        verdict_cache.put_many(fresh_verdicts)
+                    except Exception as exc:
+                        log_error(logger, f"写入判定缓存失败: {exc}", "Filter")
+                    fresh_verdicts.clear()
+
+                ready: List[int] = []
+                while applied_position in finished:
+                    ready.append(applied_position)
+                    applied_position += 1
+                if not ready:
+                    return
+                batch_indices = [pending_indices[j] for j in ready]
+                current_batch_results = [finished.pop(j) for j in ready]
+
+                batch_tokens = 0
+                batch_responses: List[Optional[str]] = []
+                batch_records: List[Dict[str, Any]] = []
+                batch_irrelevant: List[Dict[str, Any]] = []
+                batch_relevant: List[Dict[str, Any]] = []
+                for (idx, response, tokens, success), original_idx in zip(
+                    current_batch_results, batch_indices
+                ):
+                    total_tasks += 1
+                    batch_tokens += tokens
+                    channel_tokens += tokens
+                    total_tokens += tokens
+                    batch_responses.append(response)
+
+                    if response and success:
+                        successful_tasks += 1
+                        completed_indices.add(idx)
+                        failed_indices.discard(idx)
+                    else:
+                        failed_indices.add(original_idx)
+
+                parsed_batch = [_parse_response(r or "") for r in batch_responses]
+                mask_batch = [_is_high(p) for p in parsed_batch]
+                classifications_batch = [_get_classification(p) for p in parsed_batch]
+
+                batch_df = df.iloc[batch_indices].copy()
+                batch_df["rel_raw"] = parsed_batch
+                batch_df["rel_score"] = mask_batch
+                batch_df["classification"] = classifications_batch
+                if cluster_labels is not None:
+                    batch_df[CLUSTER_COLUMN] = [int(cluster_labels[idx]) for idx in batch_indices]
+
+                relevant_batch = batch_df[batch_df["rel_score"] == True]  # noqa: E712
+                if not relevant_batch.empty:
+                    added_cols = ["classification"] + (
+                        [CLUSTER_COLUMN] if CLUSTER_COLUMN in relevant_batch.columns else []
+                    )
+                    original_cols = [
+                        c for c in df.columns if c not in ["rel_raw", "rel_score"] + added_cols
                     ]
-
-                    current_batch_results = await asyncio.gather(*batch_tasks)
-
-                    batch_tokens = 0
-                    batch_responses: List[Optional[str]] = []
-                    batch_records: List[Dict[str, Any]] = []
-                    batch_irrelevant: List[Dict[str, Any]] = []
-                    batch_relevant: List[Dict[str, Any]] = []
-                    for (idx, response, tokens, success), original_idx in zip(
-                        current_batch_results, batch_indices
-                    ):
-                        total_tasks += 1
-                        batch_tokens += tokens
-                        channel_tokens += tokens
-                        total_tokens += tokens
-                        batch_responses.append(response)
-
-                        if response and success:
-                            successful_tasks += 1
-                            completed_indices.add(idx)
-                            failed_indices.discard(idx)
-                        else:
-                            failed_indices.add(original_idx)
-
-                    parsed_batch = [_parse_response(r or "") for r in batch_responses]
-                    mask_batch = [_is_high(p) for p in parsed_batch]
-                    classifications_batch = [_get_classification(p) for p in parsed_batch]
-
-                    batch_df = df.iloc[batch_indices].copy()
-                    batch_df["rel_raw"] = parsed_batch
-                    batch_df["rel_score"] = mask_batch
-                    batch_df["classification"] = classifications_batch
-
-                    relevant_batch = batch_df[batch_df["rel_score"] == True]  # noqa: E712
-                    if not relevant_batch.empty:
-                        original_cols = [
-                            c for c in df.columns if c not in ["rel_raw", "rel_score", "classification"]
-                        ]
-                        if all(col in relevant_batch.columns for col in original_cols):
-                            to_save = relevant_batch[original_cols + ["classification"]]
-                        else:
-                            to_save = relevant_batch.drop(columns=["rel_raw", "rel_score"], errors="ignore")
-                        _save_partial_results(topic, date, channel, to_save)
-                        summary_kept_rows += len(to_save)
-
-                    for row_idx, row in batch_df.iterrows():
-                        status = "kept" if bool(row.get("rel_score")) else "discarded"
-                        title = row.get("title") or row.get("headline") or ""
-                        preview_source = (
-                            row.get("contents")
-                            or row.get("content")
-                            or row.get("summary")
-                            or row.get("text")
-                            or ""
-                        )
-                        try:
-                            index_value = int(row_idx)
-                        except Exception:
-                            index_value = row_idx
-                        record = {
+                    if all(col in relevant_batch.columns for col in original_cols):
+                        to_save = relevant_batch[original_cols + added_cols]
+                    else:
+                        to_save = relevant_batch.drop(columns=["rel_raw", "rel_score"], errors="ignore")
+                    _save_partial_results(topic, date, channel, to_save)
+                    summary_kept_rows += len(to_save)
+
+                for row_idx, row in batch_df.iterrows():
+                    status = "kept" if bool(row.get("rel_score")) else "discarded"
+                    title = row.get("title") or row.get("headline") or ""
+                    preview_source = (
+                        row.get("contents")
+                        or row.get("content")
+                        or row.get("summary")
+                        or row.get("text")
+                        or ""
+                    )
+                    try:
+                        index_value = int(row_idx)
+                    except Exception:
+                        index_value = row_idx
+                    record = {
+                        "channel": channel,
+                        "index": index_value,
+                        "status": status,
+                        "title": _summarise_text(title, 80),
+                        "preview": _summarise_text(preview_source, 120),
+                        "classification": row.get("classification") or "",
+                        "updated_at": _current_timestamp(),
+                    }
+                    batch_records.append(record)
+
+                    if status == "kept" and len(aggregated_relevant_samples) < 20:
+                        sample = {
                             "channel": channel,
                             "index": index_value,
-                            "status": status,
-                            "title": _summarise_text(title, 80),
-                            "preview": _summarise_text(preview_source, 120),
-                            "classification": row.get("classification") or "",
-                            "updated_at": _current_timestamp(),
+                            "title": record["title"],
+                            "preview": record["preview"],
                         }
-                        batch_records.append(record)
-
-                        if status == "kept" and len(aggregated_relevant_samples) < 20:
-                            sample = {
-                                "channel": channel,
-                                "index": index_value,
-                                "title": record["title"],
-                                "preview": record["preview"],
-                            }
-                            aggregated_relevant_samples.append(sample)
-                            batch_relevant.append(sample)
-                        if status == "discarded" and len(aggregated_irrelevant_samples) < 20:
-                            sample = {
-                                "channel": channel,
-                                "index": index_value,
-                                "title": record["title"],
-                                "preview": record["preview"],
-                            }
-                            aggregated_irrelevant_samples.append(sample)
-                            batch_irrelevant.append(sample)
-
-                    progress["completed_indices"] = list(completed_indices)
-                    progress["failed_indices"] = list(failed_indices)
-                    progress["total_count"] = len(df)
-                    progress["completed_count"] = len(completed_indices)
-                    progress["failed_count"] = len(failed_indices)
-                    progress["recent_records"] = (batch_records + recent_records)[:50]
-                    if batch_relevant:
-                        existing_relevant = progress.get("relevant_samples", [])
-                        progress["relevant_samples"] = (batch_relevant + existing_relevant)[:20]
-                    if batch_irrelevant:
-                        existing_irrelevant = progress.get("irrelevant_samples", [])
-                        progress["irrelevant_samples"] = (batch_irrelevant + existing_irrelevant)[:20]
-                    progress["token_usage"] = channel_tokens
-                    progress["updated_at"] = _current_timestamp()
-                    recent_records = progress["recent_records"]
-                    _save_progress(topic, date, channel, progress)
-                    _write_filter_summary(
-                        topic,
-                        date,
-                        {
-                            "topic": topic,
-                            "date": date,
-                            "total_rows": summary_total_rows,
-                            "kept_rows": summary_kept_rows,
-                            "discarded_rows": max(summary_total_rows - summary_kept_rows, 0),
-                            "relevant_samples": aggregated_relevant_samples[:20],
-                            "irrelevant_samples": aggregated_irrelevant_samples[:20],
-                            "token_usage": total_tokens,
-                            "completed": False,
-                            "source": "ai-filter",
-                        },
-                    )
+                        aggregated_relevant_samples.append(sample)
+                        batch_relevant.append(sample)
+                    if status == "discarded" and len(aggregated_irrelevant_samples) < 20:
+                        sample = {
+                            "channel": channel,
+                            "index": index_value,
+                            "title": record["title"],
+                            "preview": record["preview"],
+                        }
+                        aggregated_irrelevant_samples.append(sample)
+                        batch_irrelevant.append(sample)
 
-                    log_success(
-                        logger,
-                        f"{channel} 批次完成 | 进度:{len(completed_indices)}/{len(df)}, Token:{batch_tokens}",
-                        "Filter",
+                progress["completed_indices"] = list(completed_indices)
+                progress["failed_indices"] = list(failed_indices)
+                progress["total_count"] = len(df)
+                progress["completed_count"] = len(completed_indices)
+                progress["failed_count"] = len(failed_indices)
+                progress["recent_records"] = (batch_records + recent_records)[:50]
+                if batch_relevant:
+                    existing_relevant = progress.get("relevant_samples", [])
+                    progress["relevant_samples"] = (batch_relevant + existing_relevant)[:20]
+                if batch_irrelevant:
+                    existing_irrelevant = progress.get("irrelevant_samples", [])
+                    progress["irrelevant_samples"] = (batch_irrelevant + existing_irrelevant)[:20]
+                progress["token_usage"] = channel_tokens
+                progress["updated_at"] = _current_timestamp()
+                recent_records = progress["recent_records"]
+                _save_progress(topic, date, channel, progress)
+                _write_filter_summary(
+                    topic,
+                    date,
+                    {
+                        "topic": topic,
+                        "date": date,
+                        "total_rows": summary_total_rows,
+                        "kept_rows": summary_kept_rows,
+                        "discarded_rows": max(summary_total_rows - summary_kept_rows, 0),
+                        "relevant_samples": aggregated_relevant_samples[:20],
+                        "irrelevant_samples": aggregated_irrelevant_samples[:20],
+                        "token_usage": total_tokens,
+                        "verdict_cache": _verdict_cache_stats(verdict_cache),
+                        "near_duplicates": {**near_duplicate_stats, "saved_calls": near_duplicate_saved},
+                        "completed": False,
+                        "source": "ai-filter",
+                    },
+                )
+
+                log_success(
+                    logger,
+                    f"{channel} 检查点 | 进度:{len(completed_indices)}/{len(df)}, 本次写入:{len(ready)}, Token:{batch_tokens}",
+                    "Filter",
+                )
+
+            async def _worker() -> None:
+                nonlocal next_position, last_checkpoint
+                while next_position < len(prompts):
+                    j = next_position
+                    next_position += 1
+                    finished[j] = await _resolve_item(
+                        prompts[j],
+                        pending_indices[j],
+                        cache_keys[j] if cache_keys else None,
+                        pending_clusters[j] if pending_clusters and pending_clusters[j] >= 0 else None,
+                        channel,
+                        cached_verdicts,
                     )
+                    if time.monotonic() - last_checkpoint >= checkpoint_interval:
+                        last_checkpoint = time.monotonic()
+                        _checkpoint()
+
+            try:
+                workers = [asyncio.create_task(_worker()) for _ in range(min(max_concurrency, len(prompts)))]
+                try:
+                    await asyncio.gather(*workers)
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    _checkpoint()
 
             except KeyboardInterrupt:
                 log_error(logger, f"{channel} 用户中断，保存当前进度", "Filter")
@@ -761,10 +1015,31 @@ async def run_filter_async(topic: str, date: str, logger=None) -> bool:
         "relevant_samples": aggregated_relevant_samples[:20],
         "irrelevant_samples": aggregated_irrelevant_samples[:20],
         "token_usage": total_tokens,
+        "verdict_cache": _verdict_cache_stats(verdict_cache),
+        "near_duplicates": {**near_duplicate_stats, "saved_calls": near_duplicate_saved},
+        "http_pool": get_pool_stats(),
         "completed": all_channels_fully_completed,
         "source": "ai-filter",
     }
     _write_filter_summary(topic, date, summary_payload)
+    if verdict_cache is not None:
+        stats = verdict_cache.stats()
+        log_success(
+            logger,
+            f"判定缓存 | 命中:{stats['hits']}, 调用:{stats['misses']}, 命中率:{stats['hit_rate']:.1%}",
+            "Filter",
+        )
+        verdict_cache.close()
+    if near_duplicate_stats.get("enabled"):
+        log_success(logger, f"近重复聚类 | 节省模型调用:{near_duplicate_saved}", "Filter")
+    pool_stats = get_pool_stats()
+    log_success(
+        logger,
+        f"连接池 | 请求:{pool_stats['requests']}, 新建连接:{pool_stats['connections_created']}, "
+        f"复用连接:{pool_stats['connections_reused']}, 平均耗时:{pool_stats['avg_latency_ms']}ms, "
+        f"P95:{pool_stats['p95_latency_ms']}ms",
+        "Filter",
+    )
 
     return successful_tasks > 0
 
@@ -781,4 +1056,4 @@ def run_filter(topic: str, date: str, logger=None) -> bool:
     Returns:
         bool: 是否成功
     """
-    return asyncio.run(run_filter_async(topic, date, logger))
+    return asyncio.run(closing_sessions(run_filter_async(topic, date, logger)))
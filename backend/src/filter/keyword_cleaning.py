@@ -14,7 +14,7 @@ from sqlalchemy import inspect, text
 
 from ..topic.prompt_config import load_topic_bertopic_prompt_config
 from ..utils.io.db import db_manager
-from ..utils.io.excel import read_jsonl, write_jsonl
+from ..utils.io.layers import is_layer_file, list_layer_files, read_layer, resolve_layer_format, write_layer
 from ..utils.logging.logging import (
     log_error,
     log_module_start,
@@ -106,12 +106,15 @@ def _preview_text(row: pd.Series) -> str:
 def _remove_existing_filter_outputs(filter_dir: Path) -> None:
     if not filter_dir.exists():
         return
-    for pattern in ("*.jsonl", PRECLEAN_SUMMARY_FILENAME, PRECLEAN_REPORT_FILENAME):
-        for path in filter_dir.glob(pattern):
-            try:
-                path.unlink()
-            except OSError:
-                continue
+    for path in filter_dir.iterdir():
+        if not path.is_file():
+            continue
+        if not is_layer_file(path) and path.name not in (PRECLEAN_SUMMARY_FILENAME, PRECLEAN_REPORT_FILENAME):
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            continue
 
 
 def _clear_progress_cache(topic: str, date: str) -> None:
@@ -142,13 +145,14 @@ def run_keyword_preclean(topic: str, date: str, logger=None) -> Dict[str, Any]:
     terms_payload = load_shared_noise_terms(topic)
     terms = list(terms_payload.get("terms") or [])
     clean_dir = bucket("clean", topic, date)
-    files = sorted(clean_dir.glob("*.jsonl")) if clean_dir.exists() else []
+    files = list_layer_files(clean_dir)
     if not files:
         message = f"未找到可用的 Clean 产物: {clean_dir}"
         log_error(logger, message, "FilterPreclean")
         return {"status": "error", "message": message}
 
     filter_dir = ensure_bucket("filter", topic, date)
+    layer_format = resolve_layer_format(topic)
     _remove_existing_filter_outputs(filter_dir)
     _clear_progress_cache(topic, date)
 
@@ -167,7 +171,7 @@ def run_keyword_preclean(topic: str, date: str, logger=None) -> Dict[str, Any]:
         if channel == "all":
             continue
         try:
-            df = read_jsonl(file_path)
+            df = read_layer(file_path)
         except Exception as exc:
             detail = f"读取 {file_path.name} 失败: {exc}"
             log_error(logger, detail, "FilterPreclean")
@@ -234,8 +238,7 @@ def run_keyword_preclean(topic: str, date: str, logger=None) -> Dict[str, Any]:
                 term_hits.update(matched_terms)
 
         kept_df = df.loc[keep_mask].copy()
-        output_path = filter_dir / file_path.name
-        write_jsonl(kept_df, output_path)
+        output_path = write_layer(kept_df, filter_dir, channel, fmt=layer_format)
 
         channel_total = len(df)
         channel_kept = len(kept_df)
@@ -0,0 +1,215 @@
+"""
+AI 相关性筛选前的近重复聚类（MinHash-LSH）
+
+社交媒体数据中大量内容是转发、搬运或只改动少量字词的近似文本。筛选前按清洗后的
+文本做 MinHash-LSH 聚类，同一簇只需将代表文本送入模型，判定结果与分类直接同步给
+簇内其余成员。
+
+- 文本先做 NFKC 与空白规范化，再取字符 n-gram 作为 shingle；
+- 签名矩阵按 bands × rows 分段分桶，桶内成员与桶内首条文本构成候选对；
+- 候选对以签名一致比例估计 Jaccard 相似度，达到阈值才合并为同一簇；
+- 簇编号按首个成员出现的顺序从 0 递增，空文本记为 -1。
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .verdict_cache import normalise_text
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_SHINGLE_SIZE = 3
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+
+_SEED = 20240601
+_ROLL_BASE = np.uint64(1099511628211)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _shingle_hashes(text: str, size: int) -> np.ndarray:
+    """字符 n-gram 的 64 位滚动哈希（去重），文本短于 n 时整体作为一个 shingle。"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if codes.size == 0:
+        return codes
+    width = min(size, int(codes.size))
+    hashes = np.zeros(codes.size - width + 1, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(width):
+            hashes = hashes * _ROLL_BASE + codes[offset : offset + hashes.size]
+    return np.unique(hashes)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = np.arange(size, dtype=np.int64)
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return int(root)
+
+    def union(self, left: int, right: int) -> None:
+        left_root, right_root = self.find(left), self.find(right)
+        if left_root == right_root:
+            return
+        # 以较小下标为根，使簇根即为簇内首个成员
+        if left_root < right_root:
+            self.parent[right_root] = left_root
+        else:
+            self.parent[left_root] = right_root
+
+
+class NearDuplicateClusterer:
+    """
+    MinHash-LSH 近重复聚类器
+
+    Args:
+        threshold: 估计 Jaccard 相似度阈值，达到后视为近重复
+        shingle_size: 字符 n-gram 长度
+        num_perm: MinHash 签名长度
+        bands: LSH 分段数，需整除 num_perm
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+    ):
+        if num_perm <= 0 or bands <= 0 or num_perm % bands:
+            raise ValueError(f"num_perm({num_perm}) 必须为 bands({bands}) 的正整数倍")
+        self.threshold = float(threshold)
+        self.shingle_size = max(1, int(shingle_size))
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        rng = np.random.default_rng(_SEED)
+        # multiply-shift 哈希族：(a * x + b) mod 2^64 取高 32 位
+        self._a = rng.integers(1, 2**63, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=self.num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """返回 (len(texts), num_perm) 的 uint32 签名矩阵；空文本整行为最大值。"""
+        empty = np.iinfo(np.uint32).max
+        matrix = np.full((len(texts), self.num_perm), empty, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            for row, text in enumerate(texts):
+                hashes = _shingle_hashes(text, self.shingle_size)
+                if hashes.size == 0:
+                    continue
+                mixed = self._a[:, None] * hashes[None, :] + self._b[:, None]
+                matrix[row] = (mixed >> np.uint64(32)).min(axis=1).astype(np.uint32)
+        return matrix
+
+    def _band_keys(self, matrix: np.ndarray, band: int) -> np.ndarray:
+        block = matrix[:, band * self.rows : (band + 1) * self.rows].astype(np.uint64)
+        keys = np.zeros(matrix.shape[0], dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for column in range(block.shape[1]):
+                keys = (keys ^ block[:, column]) * _MIX
+        return keys
+
+    def cluster(self, texts: Sequence[Any]) -> np.ndarray:
+        """
+        对文本聚类
+
+        Args:
+            texts: 文本序列（非字符串或空白文本不参与聚类）
+
+        Returns:
+            np.ndarray: 与 texts 等长的簇编号（int64），空文本为 -1
+        """
+        normalised = [normalise_text(t) if isinstance(t, str) else "" for t in texts]
+        valid = np.array([bool(t) for t in normalised], dtype=bool)
+        labels = np.full(len(normalised), -1, dtype=np.int64)
+        positions = np.flatnonzero(valid)
+        if positions.size == 0:
+            return labels
+
+        matrix = self.signatures([normalised[i] for i in positions])
+        union_find = _UnionFind(positions.size)
+        for band in range(self.bands):
+            keys = self._band_keys(matrix, band)
+            _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            heads = first_index[inverse]
+            members = np.flatnonzero(heads != np.arange(positions.size))
+            if members.size == 0:
+                continue
+            heads = heads[members]
+            agreement = (matrix[heads] == matrix[members]).mean(axis=1)
+            accepted = agreement >= self.threshold
+            for head, member in zip(heads[accepted].tolist(), members[accepted].tolist()):
+                union_find.union(head, member)
+
+        roots = np.array([union_find.find(i) for i in range(positions.size)], dtype=np.int64)
+        _, cluster_ids = np.unique(roots, return_inverse=True)
+        labels[positions] = cluster_ids
+        return labels
+
+
+def build_clusterer(config: Optional[Dict[str, Any]]) -> Optional[NearDuplicateClusterer]:
+    """
+    按 filter_llm.near_duplicates 配置创建聚类器，关闭时返回 None
+
+    Args:
+        config: 配置字典，支持 enabled/threshold/shingle_size/num_perm/bands
+    """
+    config = config or {}
+    if not config.get("enabled", True):
+        return None
+    return NearDuplicateClusterer(
+        threshold=float(config.get("threshold", DEFAULT_THRESHOLD)),
+        shingle_size=int(config.get("shingle_size", DEFAULT_SHINGLE_SIZE)),
+        num_perm=int(config.get("num_perm", DEFAULT_NUM_PERM)),
+        bands=int(config.get("bands", DEFAULT_BANDS)),
+    )
+
+
+def cluster_sizes(labels: np.ndarray) -> Dict[str, int]:
+    """统计簇数量、处于多成员簇中的行数以及可节省的模型调用次数。"""
+    valid = labels[labels >= 0]
+    if valid.size == 0:
+        return {"clusters": 0, "clustered_rows": 0, "redundant_rows": 0}
+    counts = np.bincount(valid)
+    counts = counts[counts > 0]
+    multi = counts[counts > 1]
+    return {
+        "clusters": int(counts.size),
+        "clustered_rows": int(multi.sum()),
+        "redundant_rows": int(valid.size - counts.size),
+    }
+
+
+def label_channels(
+    clusterer: NearDuplicateClusterer,
+    channel_texts: Dict[str, List[Any]],
+) -> Dict[str, np.ndarray]:
+    """
+    跨渠道统一聚类，簇编号在本次筛选的全部渠道内唯一
+
+    Args:
+        clusterer: 聚类器
+        channel_texts: {渠道: 按行顺序的文本列表}，按字典顺序拼接
+
+    Returns:
+        Dict[str, np.ndarray]: {渠道: 该渠道各行的簇编号}
+    """
+    names = list(channel_texts)
+    combined: List[Any] = []
+    for name in names:
+        combined.extend(channel_texts[name])
+    labels = clusterer.cluster(combined)
+    result: Dict[str, np.ndarray] = {}
+    offset = 0
+    for name in names:
+        size = len(channel_texts[name])
+        result[name] = labels[offset : offset + size]
+        offset += size
+    return result
@@ -0,0 +1,188 @@
+"""
+AI 相关性筛选的判定结果缓存
+
+以 (规范化文本哈希, 提示词模板哈希, 模型) 为键持久化模型原始响应，跨专题、日期与重跑共享：
+同一段转载文本在任何渠道/日期再次出现时直接复用已有判定，不再消耗 Token。
+缓存存放在 SQLite 文件中，按 TTL 过期并限制最大条目数（超出时淘汰最久未命中的记录）。
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 200000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalise_text(text: str) -> str:
+    """全角/半角统一（NFKC）并折叠空白，作为缓存键的文本部分。"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", str(text or ""))).strip()
+
+
+def _sha1(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return _sha1(normalise_text(text))
+
+
+def template_hash(template: str) -> str:
+    return _sha1(str(template or ""))
+
+
+class VerdictCache:
+    """
+    筛选判定缓存
+
+    Args:
+        path: SQLite 文件路径
+        template: 当前提示词模板（参与缓存键）
+        model: 模型标识（建议带 provider 前缀）
+        ttl_days: 记录有效期（天），<=0 表示不过期
+        max_entries: 最大条目数，<=0 表示不限制
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        template: str,
+        model: str,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.template_hash = template_hash(template)
+        self.model = str(model or "")
+        self.ttl_seconds = float(ttl_days) * 86400 if ttl_days and float(ttl_days) > 0 else 0.0
+        self.max_entries = int(max_entries or 0)
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                text_hash TEXT NOT NULL,
+                template_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_hit_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (text_hash, template_hash, model)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_last_hit ON verdicts (last_hit_at)")
+        self._conn.commit()
+
+    def key_for(self, text: str) -> str:
+        """返回文本对应的缓存键（规范化文本哈希）。"""
+        return text_hash(text)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        批量查询未过期的缓存响应，并更新命中时间与命中/未命中计数
+
+        Returns:
+            Dict[str, str]: 命中的 {缓存键: 模型原始响应}
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+        now = time.time()
+        min_created = now - self.ttl_seconds if self.ttl_seconds else 0.0
+        found: Dict[str, str] = {}
+        # SQLite 默认参数上限为 999，按块查询
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start : start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = self._conn.execute(
+                f"""
+                SELECT text_hash, response FROM verdicts
+                WHERE template_hash = ? AND model = ? AND created_at >= ?
+                  AND text_hash IN ({placeholders})
+                """,
+                (self.template_hash, self.model, min_created, *chunk),
+            ).fetchall()
+            found.update({row[0]: row[1] for row in rows})
+        if found:
+            self._conn.executemany(
+                """
+                UPDATE verdicts SET last_hit_at = ?, hit_count = hit_count + 1
+                WHERE text_hash = ? AND template_hash = ? AND model = ?
+                """,
+                [(now, key, self.template_hash, self.model) for key in found],
+            )
+            self._conn.commit()
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """写入 (缓存键, 模型原始响应)，已存在时覆盖。"""
+        now = time.time()
+        rows = [(key, self.template_hash, self.model, response, now, now) for key, response in items if response]
+        if not rows:
+            return
+        self._conn.executemany(
+            """
+            INSERT OR REPLACE INTO verdicts
+                (text_hash, template_hash, model, response, created_at, last_hit_at, hit_count)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+            """,
+            rows,
+        )
+        self._conn.commit()
+
+    def record(self, hits: int, misses: int) -> None:
+        self.hits += int(hits)
+        self.misses += int(misses)
+
+    def prune(self) -> int:
+        """删除过期记录，并在超出 max_entries 时淘汰最久未命中的记录，返回删除条数。"""
+        removed = 0
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM verdicts WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            removed += max(cursor.rowcount, 0)
+        if self.max_entries > 0:
+            total = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+            overflow = int(total) - self.max_entries
+            if overflow > 0:
+                cursor = self._conn.execute(
+                    """
+                    DELETE FROM verdicts WHERE rowid IN (
+                        SELECT rowid FROM verdicts ORDER BY last_hit_at ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                removed += max(cursor.rowcount, 0)
+        self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """本次运行的命中统计，写入筛选汇总。"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
@@ -1,7 +1,6 @@
 import logging
 import sys
 import os
-import shutil
 import pandas as pd
 from pathlib import Path
 
@@ -17,6 +16,7 @@ from src.graph.event_clustering import cluster_and_link_events
 from src.graph.neo4j_client import get_driver, get_session
 from src.topic.data_bertopic_qwen_v2 import run_topic_bertopic
 from src.utils.setting.paths import bucket
+from src.utils.io.layers import find_layer_file, read_layer, write_layer
 from src.utils.logging.logging import setup_logger
 
 def clear_graph_data(topic: str, clear_all: bool = False):
@@ -102,32 +102,32 @@ def rebuild_graph(topic: str, date_range: str, use_llm: bool = False, clear_topi
     if dataset_name_arg and os.path.exists(dataset_name_arg):
         fetch_dir = bucket("fetch", topic, date_range)
         fetch_dir.mkdir(parents=True, exist_ok=True)
-        target_file = fetch_dir / "总体.jsonl"
-        
-        if not target_file.exists():
-            print(f"Converting custom source {dataset_name_arg} to {target_file} for BERTopic...")
+        if find_layer_file(fetch_dir, "总体") is None:
+            print(f"Converting custom source {dataset_name_arg} to {fetch_dir / '总体'} layer for BERTopic...")
             try:
                 source_path = Path(dataset_name_arg)
+                df = None
                 if source_path.suffix.lower() == '.csv':
                     # Force read id as string to avoid scientific notation or float conversion
                     df = pd.read_csv(source_path, dtype={'id': str, 'post_id': str})
+                elif source_path.suffix.lower() in ('.jsonl', '.parquet'):
+                    df = read_layer(source_path, dtype={'id': str, 'post_id': str})
+                if df is not None:
                     # Ensure content column exists (BERTopic needs it)
                     if 'contents' not in df.columns:
                         for col in ['content', 'text', 'body', '正文']:
                             if col in df.columns:
                                 df.rename(columns={col: 'contents'}, inplace=True)
                                 break
-                    
+
                     # Add channel column (filename without extension)
                     channel_name = source_path.stem
                     if 'channel' not in df.columns:
                         df['channel'] = channel_name
-                        
-                    df.to_json(target_file, orient='records', lines=True, force_ascii=False)
+
+                    # Stored in the project's layer format so the BERTopic readers find it
+                    target_file = write_layer(df, fetch_dir, "总体", topic=topic)
                     print(f"Conversion successful. Saved to {target_file}")
-                elif source_path.suffix.lower() == '.jsonl':
-                     shutil.copy2(source_path, target_file)
-                     print(f"Copied jsonl to {target_file}")
             except Exception as e:
                 print(f"Warning: Failed to prepare data for BERTopic: {e}")
 
@@ -14,6 +14,7 @@ import pandas as pd
 
 from ..utils.setting.paths import bucket
 from ..utils.io.db import db_manager
+from ..utils.io.layers import list_layer_files
 from ..utils.logging.logging import setup_logger, log_module_start, log_success, log_error
 from .config import get_graph_config, is_neo4j_configured
 from .neo4j_client import get_driver, get_session
@@ -106,14 +107,14 @@ def sync_after_upload(
                 return {"status": "error", "message": "不支持的文件类型"}
         elif custom_path.is_dir():
             filter_dir = custom_path
-            jsonl_files = list(filter_dir.glob("*.jsonl"))
+            jsonl_files = list_layer_files(filter_dir)
             csv_files = list(filter_dir.glob("*.csv"))
         else:
              log_error(logger, f"路径不存在: {custom_path}", "GraphSync")
              return {"status": "error", "message": "路径不存在"}
     else:
         filter_dir = bucket(source_bucket, topic, date)
-        jsonl_files = list(filter_dir.glob("*.jsonl")) if filter_dir.exists() else []
+        jsonl_files = list_layer_files(filter_dir)
         csv_files = list(filter_dir.glob("*.csv")) if filter_dir.exists() else []
 
     if not jsonl_files and not csv_files:
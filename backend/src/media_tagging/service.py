@@ -8,9 +8,8 @@ from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List, Optional
 from uuid import uuid4
 
-import pandas as pd
-
 from server_support.archive_locator import compose_folder_name
+from src.utils.io.layers import find_layer_file, iter_layer_chunks, list_layer_files
 from src.utils.setting.paths import bucket, ensure_bucket, get_data_root
 
 ALLOWED_MEDIA_LEVELS = {"official_media", "local_media", "network_media", "comprehensive_media"}
@@ -320,19 +319,17 @@ def _resolve_fetch_dir(topic_identifier: str, start: str, end: Optional[str]) ->
 
 
 def _iter_input_files(fetch_dir: Path) -> List[Path]:
-    overall = fetch_dir / "总体.jsonl"
-    if overall.exists():
+    overall = find_layer_file(fetch_dir, "总体")
+    if overall is not None:
         return [overall]
-    return sorted(path for path in fetch_dir.glob("*.jsonl") if path.is_file())
+    return list_layer_files(fetch_dir)
 
 
-def _iter_jsonl_records(file_path: Path) -> Iterable[Dict[str, Any]]:
+def _iter_layer_records(file_path: Path) -> Iterable[Dict[str, Any]]:
     try:
-        reader = pd.read_json(file_path, lines=True, chunksize=READ_CHUNK_SIZE)
+        reader = iter_layer_chunks(file_path, READ_CHUNK_SIZE)
     except Exception:
         return
-    if reader is None:
-        return
     for chunk in reader:
         if chunk is None or chunk.empty:
             continue
@@ -421,7 +418,7 @@ def run_media_tagging(
     processed_files = 0
 
     for file_path in files:
-        for record in _iter_jsonl_records(file_path):
+        for record in _iter_layer_records(file_path):
             publisher_name = _safe_text(record.get("publisher"))
             if not publisher_name:
                 publisher_name = _safe_text(record.get("author"))
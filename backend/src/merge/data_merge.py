@@ -2,13 +2,14 @@
 TRS数据合并功能
 """
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import pandas as pd
 from ..utils.setting.paths import bucket, ensure_bucket
 from ..utils.setting.settings import settings
 from ..utils.logging.logging import setup_logger, log_module_start, log_success, log_error
-from ..utils.io.excel import write_jsonl
+from ..utils.io.layers import read_layer, resolve_layer_format, write_layer
+from ..utils.parallel import progress_event, resolve_process_workers, run_process_jobs
 
 
 def _normalise_keep_channels(channels: List[str]) -> Dict[str, str]:
@@ -182,8 +183,9 @@ def _iter_channel_frames(
                     channel_df = channel_df.rename(columns=field_alias_map)
                 channel_df = _collapse_duplicate_columns(channel_df)
                 yield channel_name, channel_df
-        elif suffix == ".jsonl":
-            df = pd.read_json(file_path, lines=True)
+        elif suffix in {".jsonl", ".parquet"}:
+            # read_layer 同时读取 Parquet 层的增量追加分片
+            df = read_layer(file_path)
             for channel_name, channel_df in _split_dataframe_by_channel(df, file_path, keep_lookup, logger):
                 if field_alias_map:
                     channel_df = channel_df.rename(columns=field_alias_map)
@@ -195,18 +197,47 @@ def _iter_channel_frames(
         log_error(logger, f"处理文件失败: {file_path.name} - {e}", "Merge")
 
 
-def merge_trs_data(topic: str, date: str, logger=None) -> bool:
+def _read_source_file(
+    file_path: Path,
+    keep_lookup: Dict[str, str],
+    field_alias_map: Dict[str, str],
+    logger=None,
+) -> List[Tuple[str, pd.DataFrame]]:
+    """解析单个原始文件为 (渠道, 数据框) 列表（可在子进程中执行）。"""
+    return list(_iter_channel_frames(file_path, keep_lookup, field_alias_map, logger))
+
+
+def merge_trs_data(
+    topic: str,
+    date: str,
+    logger=None,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> bool:
     """
-    合并TRS原始表（支持Excel/CSV/JSONL）并输出JSONL
+    合并TRS原始表（支持Excel/CSV/JSONL/Parquet）并按层存储格式输出
+    
+    原始文件按 channels.yaml 的 processing.workers 多进程并行解析，子进程日志回传主进程写出；
+    解析结果按文件顺序归入各渠道后，在主进程合并、去重并写出（每行只跨进程传递一次），
+    单个文件或渠道失败不影响其他部分。
     
     Args:
         topic (str): 专题名称
         date (str): 日期字符串
         logger: 日志记录器
+        workers (Optional[int]): 进程数，None 时读取配置（0 为按 CPU 核数）
+        progress_callback: 进度回调：每个原始文件解析完成时 phase 为 merge_read（channel 为文件名），
+            每个渠道写出完成时 phase 为 merge，字段见 utils.parallel.progress_event
     
     Returns:
         bool: 是否成功
     """
+    if logger is None:
+        logger = setup_logger(topic, date)
+
+    def _report(event: Dict[str, Any]) -> None:
+        if progress_callback is not None:
+            progress_callback(event)
 
     # 1. 定位文件
     raw_dir = bucket("raw", topic, date)
@@ -224,12 +255,15 @@ def merge_trs_data(topic: str, date: str, logger=None) -> bool:
 
     keep_lookup = _normalise_keep_channels(keep_channels)
     field_alias_map = _build_field_alias_map(channels_config)
+    if workers is None:
+        workers = (channels_config.get("processing", {}) or {}).get("workers")
 
     # 3. 创建输出目录
     merge_dir = ensure_bucket("merge", topic, date)
+    layer_format = resolve_layer_format(topic)
 
     # 4. 收集所有支持的原始文件（大小写不敏感）
-    supported_suffixes = {".xlsx", ".xls", ".csv", ".jsonl"}
+    supported_suffixes = {".xlsx", ".xls", ".csv", ".jsonl", ".parquet"}
     source_files = sorted(
         path
         for path in raw_dir.iterdir()
@@ -241,50 +275,60 @@ def merge_trs_data(topic: str, date: str, logger=None) -> bool:
         if available_files:
             preview = ", ".join(available_files[:10])
             hint = f"当前目录文件: {preview}"
-        log_error(logger, f"未找到可用的 Excel/CSV/JSONL 文件（{hint}）", "Merge")
+        log_error(logger, f"未找到可用的 Excel/CSV/JSONL/Parquet 文件（{hint}）", "Merge")
         return False
 
-    # 5. 按渠道分组处理
-    channel_data: Dict[str, List[pd.DataFrame]] = {}
-    success_count = 0
+    # 5. 并行解析原始文件，按文件顺序按渠道分组
+    read_completed = {"count": 0}
+
+    def _on_read(index: int, outcome: Any) -> None:
+        read_completed["count"] += 1
+        rows = 0 if isinstance(outcome, Exception) else sum(len(df) for _, df in outcome)
+        _report(
+            progress_event(
+                "merge_read", source_files[index].name, read_completed["count"], len(source_files), outcome, rows=rows
+            )
+        )
+
+    read_results = run_process_jobs(
+        _read_source_file,
+        [(file_path, keep_lookup, field_alias_map) for file_path in source_files],
+        resolve_process_workers(workers, len(source_files)),
+        logger=logger,
+        on_result=_on_read,
+    )
 
-    for file_path in source_files:
-        for channel_name, df in _iter_channel_frames(file_path, keep_lookup, field_alias_map, logger):
-            if channel_name not in channel_data:
-                channel_data[channel_name] = []
-            channel_data[channel_name].append(df)
+    channel_data: Dict[str, List[pd.DataFrame]] = {}
+    for file_path, frames in zip(source_files, read_results):
+        if isinstance(frames, Exception):
+            log_error(logger, f"处理文件失败: {file_path.name} - {frames}", "Merge")
+            continue
+        for channel_name, df in frames:
+            channel_data.setdefault(channel_name, []).append(df)
 
+    channel_data = {channel: data_list for channel, data_list in channel_data.items() if data_list}
     if not channel_data:
         log_error(logger, "未收集到任何渠道数据，可能渠道名称未在 keep 配置中", "Merge")
         return False
 
-    # 6. 合并并保存数据
-    for channel, data_list in channel_data.items():
-        if not data_list:
-            continue
-
+    # 6. 合并并保存各渠道数据
+    success_count = 0
+    for position, (channel, data_list) in enumerate(channel_data.items(), start=1):
         try:
-            # 合并同一渠道的所有数据
             merged_df = pd.concat(data_list, ignore_index=True)
-
-            # 去重
             before_count = len(merged_df)
             merged_df = merged_df.drop_duplicates()
-            after_count = len(merged_df)
-
-            if before_count != after_count:
-                log_success(logger, f"渠道 {channel} 去重: {before_count} -> {after_count}", "Merge")
-
-            # 保存为 JSONL 格式
-            output_file = merge_dir / f"{channel}.jsonl"
-            write_jsonl(merged_df, output_file)
-
-            success_count += 1
-            log_success(logger, f"成功保存: {channel} -- 共{len(merged_df)}条", "Merge")
-
+            # 按层存储格式保存（JSONL 或 Parquet）
+            write_layer(merged_df, merge_dir, channel, fmt=layer_format)
         except Exception as e:
             log_error(logger, f"合并渠道 {channel} 失败: {e}", "Merge")
+            _report(progress_event("merge", channel, position, len(channel_data), e))
             continue
+        if before_count != len(merged_df):
+            log_success(logger, f"渠道 {channel} 去重: {before_count} -> {len(merged_df)}", "Merge")
+        success_count += 1
+        log_success(logger, f"成功保存: {channel} -- 共{len(merged_df)}条", "Merge")
+        _report(progress_event("merge", channel, position, len(channel_data), merged_df, rows=len(merged_df)))
 
     if success_count > 0:
         return True
@@ -292,7 +336,13 @@ def merge_trs_data(topic: str, date: str, logger=None) -> bool:
     return False
 
 
-def run_merge(topic: str, date: str, logger=None):
+def run_merge(
+    topic: str,
+    date: str,
+    logger=None,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+):
     """
     运行TRS数据合并
     
@@ -300,6 +350,8 @@ def run_merge(topic: str, date: str, logger=None):
         topic (str): 专题名称
         date (str): 日期字符串
         logger: 日志记录器
+        workers (Optional[int]): 进程数，None 时读取 channels.yaml 的 processing.workers
+        progress_callback: 文件/渠道级进度回调，见 merge_trs_data
     
     Returns:
         bool: 是否成功
@@ -310,7 +362,7 @@ def run_merge(topic: str, date: str, logger=None):
     log_module_start(logger, "Merge")
 
     try:
-        result = merge_trs_data(topic, date, logger)
+        result = merge_trs_data(topic, date, logger, workers=workers, progress_callback=progress_callback)
         if result:
             return True
         else:
@@ -15,6 +15,7 @@ from filelock import FileLock
 
 from ..project import get_project_manager
 from ..utils.setting.paths import get_data_root
+from ..utils.task_store import TaskFamily, task_family
 from .planner import normalize_keywords, normalize_platforms
 
 STATE_ROOT = get_data_root() / "_netinsight"
@@ -116,13 +117,7 @@ def list_tasks(*, project: str = "", status: str = "", limit: int = 100) -> Dict
     worker = load_worker_status()
     _reconcile_orphaned_running_tasks(worker)
 
-    tasks = _load_all_tasks()
-    if project:
-        tasks = [task for task in tasks if str(task.get("project") or "") == project]
-    if status:
-        tasks = [task for task in tasks if str(task.get("status") or "") == status]
-    tasks.sort(key=lambda item: item.get("created_at") or "", reverse=True)
-    tasks = tasks[: max(limit, 1)]
+    tasks = _task_family().list(topic=project, statuses=[status] if status else None, limit=max(limit, 1))
     return {
         "tasks": tasks,
         "summary": _summarise_tasks(tasks),
@@ -198,6 +193,7 @@ def delete_task(task_id: str) -> None:
     with lock:
         if path.exists():
             path.unlink()
+    _task_family().drop(task_id)
     if output_dir.exists():
         shutil.rmtree(output_dir, ignore_errors=True)
 
@@ -247,16 +243,10 @@ def load_worker_status() -> Dict[str, Any]:
 
 
 def reserve_next_task() -> Optional[Dict[str, Any]]:
-    candidates = sorted(
-        (
-            task for task in _load_all_tasks()
-            if str(task.get("status") or "") == "queued"
-        ),
-        key=lambda item: item.get("created_at") or "",
-    )
-    if not candidates:
+    candidate = _task_family().next_queued()
+    if not candidate:
         return None
-    task_id = str(candidates[0].get("id") or "")
+    task_id = str(candidate.get("id") or "")
 
     def _mutate(task: Dict[str, Any]) -> None:
         if str(task.get("status") or "") != "queued":
@@ -447,14 +437,8 @@ def _ensure_state_dirs() -> None:
     TASK_STATE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def _load_all_tasks() -> List[Dict[str, Any]]:
-    _ensure_state_dirs()
-    tasks: List[Dict[str, Any]] = []
-    for path in TASK_STATE_DIR.glob("*.json"):
-        payload = _load_json(path, {})
-        if isinstance(payload, dict) and payload.get("id"):
-            tasks.append(payload)
-    return tasks
+def _task_family() -> TaskFamily:
+    return task_family("netinsight", STATE_ROOT, task_dir=TASK_STATE_DIR, topic_fields=("project",))
 
 
 def _load_task(task_id: str) -> Optional[Dict[str, Any]]:
@@ -471,6 +455,7 @@ def _save_task(task: Dict[str, Any]) -> None:
     with lock:
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
 
 
 def _update_task(task_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
@@ -485,6 +470,7 @@ def _update_task(task_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict
         mutate(task)
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
         return task
 
 
@@ -548,9 +534,7 @@ def _resolve_project(project_name: Any) -> Tuple[str, str]:
 def _reconcile_orphaned_running_tasks(worker_status: Dict[str, Any]) -> None:
     if worker_status.get("running"):
         return
-    for task in _load_all_tasks():
-        if str(task.get("status") or "") != "running":
-            continue
+    for task in _task_family().list(statuses=["running"]):
         task_id = str(task.get("id") or "")
         if not task_id:
             continue
@@ -2,117 +2,66 @@
 
 from typing import List, Union, Dict, Any, Optional
 import logging
-import hashlib
-import json
-import pickle
 from pathlib import Path
 
+import numpy as np
+
 from .base import BaseEmbedder
+from ...utils.rag.embedding_cache import DEFAULT_MEMORY_MB, EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 
 class CachedEmbedder(BaseEmbedder):
-    """Wrapper that caches embeddings to avoid recomputation."""
+    """Wrapper that caches embeddings to avoid recomputation.
+
+    Vectors are stored in the shared SQLite embedding store
+    (``src/utils/rag/embedding_cache.py``) with a byte-bounded LRU memory tier,
+    instead of one pickle file per text.
+    """
 
     def __init__(self, embedder: BaseEmbedder, cache_dir: Optional[Union[str, Path]] = None, config: Optional[Dict[str, Any]] = None):
-        super().__init__(config)
+        super().__init__(getattr(embedder, "model_name", None), getattr(embedder, "dimension", None))
+        self.config = config or {}
         self.embedder = embedder
         self.cache_dir = Path(cache_dir) if cache_dir else Path("./cache/embeddings")
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.memory_cache = {}
-        self.use_memory_cache = config.get("use_memory_cache", True) if config else True
-
-    def _get_cache_key(self, text: str) -> str:
-        """Generate cache key for text."""
-        # Include model info if available
-        model_info = ""
+        use_memory_cache = self.config.get("use_memory_cache", True)
+        memory_mb = float(self.config.get("memory_mb", DEFAULT_MEMORY_MB)) if use_memory_cache else 0
+        self.cache = EmbeddingCache(
+            self.cache_dir / "embeddings.sqlite3",
+            self._model_key(),
+            self.dimension or 0,
+            dtype=self.config.get("dtype", "float32"),
+            memory_bytes=int(memory_mb * 1024 * 1024),
+            max_entries=int(self.config.get("max_entries", 0) or 0),
+        )
+
+    def _model_key(self) -> str:
+        """Model identifier stored alongside each vector."""
         if hasattr(self.embedder, 'model_name'):
-            model_info = self.embedder.model_name
-        elif hasattr(self.embedder, 'model'):
-            model_info = str(self.embedder.model)
-
-        content = f"{model_info}:{text}"
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+            return str(self.embedder.model_name)
+        if hasattr(self.embedder, 'model'):
+            return str(self.embedder.model)
+        return type(self.embedder).__name__
 
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Get cache file path for key."""
-        return self.cache_dir / f"{cache_key}.pkl"
-
-    def _load_from_disk(self, cache_key: str) -> Optional[List[float]]:
-        """Load embedding from disk cache."""
-        cache_path = self._get_cache_path(cache_key)
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache for {cache_key}: {e}")
-        return None
-
-    def _save_to_disk(self, cache_key: str, embedding: List[float]):
-        """Save embedding to disk cache."""
-        cache_path = self._get_cache_path(cache_key)
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(embedding, f)
-        except Exception as e:
-            logger.warning(f"Failed to save cache for {cache_key}: {e}")
+    def initialize(self, **kwargs) -> None:
+        self.embedder.initialize(**kwargs)
 
     def embed(self, texts: Union[str, List[str]], **kwargs) -> Union[List[float], List[List[float]]]:
         """Generate embeddings with caching."""
-        # Handle single text input
         single_input = isinstance(texts, str)
         if single_input:
             texts = [texts]
 
-        embeddings = []
-        uncached_texts = []
-        uncached_indices = []
-
-        # Check cache for each text
-        for i, text in enumerate(texts):
-            cache_key = self._get_cache_key(text)
-
-            # Check memory cache first
-            if self.use_memory_cache and cache_key in self.memory_cache:
-                embeddings.append(self.memory_cache[cache_key])
-                continue
-
-            # Check disk cache
-            embedding = self._load_from_disk(cache_key)
-            if embedding is not None:
-                embeddings.append(embedding)
-                # Store in memory cache
-                if self.use_memory_cache:
-                    self.memory_cache[cache_key] = embedding
-            else:
-                embeddings.append(None)
-                uncached_texts.append(text)
-                uncached_indices.append(i)
-
-        # Generate embeddings for uncached texts
-        if uncached_texts:
+        def _embed_missing(missing: List[str]) -> List[Optional[np.ndarray]]:
             try:
-                new_embeddings = self.embedder.embed(uncached_texts, **kwargs)
-
-                # Update cache and results
-                for text, idx, embedding in zip(uncached_texts, uncached_indices, new_embeddings):
-                    cache_key = self._get_cache_key(text)
-                    embeddings[idx] = embedding
-
-                    # Save to caches
-                    if self.use_memory_cache:
-                        self.memory_cache[cache_key] = embedding
-                    self._save_to_disk(cache_key, embedding)
-
+                return list(self.embedder.embed(missing, **kwargs))
             except Exception as e:
                 logger.error(f"Failed to generate embeddings: {e}")
-                # Fill with None for failed embeddings
-                for idx in uncached_indices:
-                    embeddings[idx] = None
+                return [None] * len(missing)
 
-        # Return single embedding for single input
+        matrix = self.cache.encode(list(texts), _embed_missing)
+        embeddings = [row.tolist() if row.any() else None for row in matrix] if matrix.size else [None] * len(texts)
         return embeddings[0] if single_input else embeddings
 
     def get_dimension(self) -> int:
@@ -127,19 +76,24 @@ class CachedEmbedder(BaseEmbedder):
             except:
                 raise ValueError("Cannot determine embedding dimension")
 
+    def compact(self, max_entries: Optional[int] = None, max_age_days: float = 0) -> int:
+        """Evict least recently used vectors and reclaim disk space."""
+        return self.cache.compact(max_entries=max_entries, max_age_days=max_age_days)
+
     def clear_cache(self):
         """Clear all caches."""
-        self.memory_cache.clear()
-        # Clear disk cache
-        for cache_file in self.cache_dir.glob("*.pkl"):
-            cache_file.unlink()
+        self.cache.clear()
         logger.info("Cleared all caches")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        disk_cache_files = list(self.cache_dir.glob("*.pkl"))
+        stats = self.cache.stats()
+        disk = self.cache.disk_stats()
         return {
-            "memory_cache_size": len(self.memory_cache),
-            "disk_cache_size": len(disk_cache_files),
-            "disk_cache_dir": str(self.cache_dir)
-        }
\ No newline at end of file
+            "memory_cache_size": stats["memory_entries"],
+            "memory_cache_bytes": stats["memory_bytes"],
+            "disk_cache_size": disk["entries"],
+            "disk_cache_bytes": disk["file_bytes"],
+            "disk_cache_dir": str(self.cache_dir),
+            "hit_rate": stats["hit_rate"],
+        }
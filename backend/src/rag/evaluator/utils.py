@@ -411,6 +411,7 @@ async def call_judge_async(
     judge_mode: "with_reference" 用问题+标准答案+模型答案；"no_reference" 仅用问题+模型答案，输出 1-5 后归一化。
     """
     from src.utils.setting.paths import get_configs_root
+    from src.utils.ai.http_pool import pooled_session
     from src.utils.ai.qwen import QwenClient
 
     config_path = config_path or (get_configs_root() / "llm.yaml")
@@ -445,11 +446,12 @@ async def call_judge_async(
     }
     try:
         timeout = aiohttp.ClientTimeout(total=60, connect=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with pooled_session() as session:
             async with session.post(
                 "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation",
                 json=data,
                 headers=headers,
+                timeout=timeout,
             ) as resp:
                 if resp.status != 200:
                     return 0.0
@@ -471,6 +473,8 @@ def call_judge_sync(
     **kwargs: Any,
 ) -> float:
     """同步封装：调用 Judge LLM。有参考返回 0.0/1.0；无参考返回 [0,1]。judge_mode 同 call_judge_async。"""
+    from src.utils.ai.http_pool import closing_sessions
+
     return asyncio.run(
-        call_judge_async(question, answer_gold, answer_pred, judge_mode=judge_mode, **kwargs)
+        closing_sessions(call_judge_async(question, answer_gold, answer_pred, judge_mode=judge_mode, **kwargs))
     )
@@ -19,6 +19,10 @@ class BaseRetriever(CoreBaseRetriever):
         self.documents = None
         self.embeddings = None
 
+    def process(self, query: str, top_k: int = 10, **kwargs) -> List[Dict[str, Any]]:
+        """Process a query by retrieving documents."""
+        return self.retrieve(query, top_k, **kwargs)
+
     @abstractmethod
     def build_index(self, documents: List[Dict[str, Any]], **kwargs) -> None:
         """Build index from documents."""
@@ -2,18 +2,38 @@
 
 from typing import List, Dict, Any, Optional, Union
 import logging
-import math
 import json
+import re
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter
+
+import numpy as np
+
+try:
+    import jieba
+    jieba.setLogLevel(60)
+except ImportError:  # pragma: no cover - jieba is a hard dependency of the backend
+    jieba = None
 
 from .base import BaseRetriever
 
 logger = logging.getLogger(__name__)
 
+INDEX_FILE = "bm25_index.npz"
+LEGACY_INDEX_FILE = "bm25_index.json"
+
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_WORD_RE = re.compile(r"\w+")
+
 
 class BM25Retriever(BaseRetriever):
-    """BM25 retriever for keyword-based search."""
+    """BM25 retriever for keyword-based search.
+
+    The index is an inverted index in CSR form: the postings of term ``t`` are
+    ``postings[indptr[t]:indptr[t + 1]]`` (document ids) with matching ``tfs``.
+    A query only touches the postings of its own terms, and scores are
+    accumulated with numpy.
+    """
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
@@ -24,20 +44,54 @@ class BM25Retriever(BaseRetriever):
         self.epsilon = config.get("epsilon", 0.25) if config else 0.25
 
         # Index data
-        self.doc_freqs = []
-        self.idf = {}
-        self.doc_lengths = []
-        self.avgdl = 0
+        self.vocabulary: Dict[str, int] = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.avgdl = 0.0
         self.corpus_size = 0
-        self.vocabulary = set()
 
     def _tokenize(self, text: str) -> List[str]:
-        """Simple tokenization."""
-        # In a real implementation, you might want more sophisticated tokenization
-        import re
-        # Remove punctuation and split on whitespace
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        return text.split()
+        """Tokenize text: jieba for Chinese, lower-cased word characters otherwise."""
+        text = str(text or "").lower()
+        if jieba is not None and _CJK_RE.search(text):
+            tokens = jieba.lcut(text)
+        else:
+            tokens = _WORD_RE.findall(text)
+        return [token for token in (t.strip() for t in tokens) if token and _WORD_RE.fullmatch(token)]
+
+    @staticmethod
+    def _document_text(doc: Dict[str, Any]) -> str:
+        text = doc.get("text", "")
+        if not text:
+            # Fall back to concatenating other string fields
+            text = " ".join([str(v) for v in doc.values() if isinstance(v, str)])
+        return text
+
+    def _build_postings(self, doc_counts: List[Dict[str, int]]) -> None:
+        """Build the CSR inverted index and IDF table from per-document term counts."""
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        tfs: List[int] = []
+        for doc_idx, counts in enumerate(doc_counts):
+            for term, tf in counts.items():
+                term_id = self.vocabulary.setdefault(term, len(self.vocabulary))
+                term_ids.append(term_id)
+                doc_ids.append(doc_idx)
+                tfs.append(tf)
+
+        term_array = np.asarray(term_ids, dtype=np.int64)
+        # Stable sort keeps postings of each term in ascending document order
+        order = np.argsort(term_array, kind="stable")
+        self.postings = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.tfs = np.asarray(tfs, dtype=np.float32)[order]
+        doc_freq = np.bincount(term_array, minlength=len(self.vocabulary)).astype(np.float64)
+        self.indptr = np.concatenate(([0], np.cumsum(doc_freq))).astype(np.int64)
+
+        idf = np.log((self.corpus_size - doc_freq + 0.5) / (doc_freq + 0.5))
+        self.idf = np.where(idf > 0, idf, self.epsilon).astype(np.float32)
 
     def build_index(self, documents: List[Dict[str, Any]], **kwargs) -> None:
         """Build BM25 index from documents."""
@@ -45,86 +99,60 @@ class BM25Retriever(BaseRetriever):
 
         self.documents = documents
         self.corpus_size = len(documents)
+        self.vocabulary = {}
 
-        # Extract texts from documents
-        texts = []
+        doc_counts = []
+        lengths = []
         for doc in documents:
-            # Try to get text field
-            text = doc.get("text", "")
-            if not text:
-                # Fall back to concatenating other string fields
-                text = " ".join([str(v) for v in doc.values() if isinstance(v, str)])
-            texts.append(text)
-
-        # Calculate document frequencies
-        self.doc_freqs = []
-        self.doc_lengths = []
-        total_length = 0
-        term_doc_freq = defaultdict(int)
-
-        for text in texts:
-            tokens = self._tokenize(text)
-            self.doc_lengths.append(len(tokens))
-            total_length += len(tokens)
-
-            # Count token frequencies in document
-            token_counts = Counter(tokens)
-            self.doc_freqs.append(token_counts)
-
-            # Update document frequencies
-            for token in set(tokens):
-                term_doc_freq[token] += 1
-                self.vocabulary.add(token)
-
-        # Calculate average document length
-        self.avgdl = total_length / self.corpus_size if self.corpus_size > 0 else 0
-
-        # Calculate IDF scores
-        self.idf = {}
-        for term in self.vocabulary:
-            idf = math.log((self.corpus_size - term_doc_freq[term] + 0.5) / (term_doc_freq[term] + 0.5))
-            self.idf[term] = idf if idf > 0 else self.epsilon
+            tokens = self._tokenize(self._document_text(doc))
+            lengths.append(len(tokens))
+            doc_counts.append(Counter(tokens))
+
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.avgdl = float(self.doc_lengths.mean()) if self.corpus_size > 0 else 0.0
+        self._build_postings(doc_counts)
 
         logger.info(f"BM25 index built for {self.corpus_size} documents with {len(self.vocabulary)} unique terms")
 
+    def get_scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query (zeros where no query term occurs)."""
+        scores = np.zeros(self.corpus_size, dtype=np.float32)
+        if not self.corpus_size:
+            return scores
+
+        # Length normalisation per document: k1 * (1 - b + b * dl / avgdl)
+        avgdl = self.avgdl or 1.0
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / avgdl)
+        for token, query_tf in Counter(self._tokenize(query)).items():
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.postings[start:end]
+            tf = self.tfs[start:end]
+            scores[docs] += query_tf * self.idf[term_id] * tf * (self.k1 + 1) / (tf + norm[docs])
+        return scores
+
     def retrieve(self, query: str, top_k: int = 10, **kwargs) -> List[Dict[str, Any]]:
         """Retrieve documents using BM25 scoring."""
-        if not self.documents:
+        if not self.documents or top_k <= 0:
             return []
 
-        # Tokenize query
-        query_tokens = self._tokenize(query)
-
-        # Calculate BM25 scores for each document
-        scores = []
-        for doc_idx, doc_freqs in enumerate(self.doc_freqs):
-            score = 0
-            for token in query_tokens:
-                if token in doc_freqs and token in self.idf:
-                    # BM25 formula
-                    tf = doc_freqs[token]
-                    idf = self.idf[token]
-                    doc_len = self.doc_lengths[doc_idx]
+        scores = self.get_scores(query)
+        # Only documents with positive scores are candidates
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.size > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        # Highest score first; ties keep document order
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
 
-                    # Normalized term frequency
-                    normalized_tf = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl))
-
-                    score += idf * normalized_tf
-
-            scores.append((doc_idx, score))
-
-        # Sort by score (descending)
-        scores.sort(key=lambda x: x[1], reverse=True)
-
-        # Return top_k results
         results = []
-        for doc_idx, score in scores[:top_k]:
-            if score > 0:  # Only return documents with positive scores
-                doc = self.documents[doc_idx].copy()
-                doc["score"] = score
-                doc["retrieval_type"] = "bm25"
-                doc["id"] = doc.get("id", str(doc_idx))
-                results.append(doc)
+        for doc_idx in candidates.tolist():
+            doc = self.documents[doc_idx].copy()
+            doc["score"] = float(scores[doc_idx])
+            doc["retrieval_type"] = "bm25"
+            doc["id"] = doc.get("id", str(doc_idx))
+            results.append(doc)
 
         return results
 
@@ -133,27 +161,23 @@ class BM25Retriever(BaseRetriever):
         path = Path(path)
         path.mkdir(parents=True, exist_ok=True)
 
-        # Save index data
-        index_data = {
-            "k1": self.k1,
-            "b": self.b,
-            "epsilon": self.epsilon,
-            "doc_freqs": self.doc_freqs,
-            "idf": dict(self.idf),
-            "doc_lengths": self.doc_lengths,
-            "avgdl": self.avgdl,
-            "corpus_size": self.corpus_size,
-            "vocabulary": list(self.vocabulary)
-        }
-
-        index_path = path / "bm25_index.json"
-        with open(index_path, "w", encoding="utf-8") as f:
-            json.dump(index_data, f, indent=2)
+        # Terms are stored in id order so the vocabulary needs no separate mapping
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez(
+            path / INDEX_FILE,
+            params=np.asarray([self.k1, self.b, self.epsilon, self.avgdl], dtype=np.float64),
+            terms=np.asarray(terms, dtype=str),
+            indptr=self.indptr,
+            postings=self.postings,
+            tfs=self.tfs,
+            idf=self.idf,
+            doc_lengths=self.doc_lengths,
+        )
 
         # Save documents
         docs_path = path / "documents.json"
         with open(docs_path, "w", encoding="utf-8") as f:
-            json.dump(self.documents, f, ensure_ascii=False, indent=2)
+            json.dump(self.documents, f, ensure_ascii=False)
 
         logger.info(f"BM25 index saved to {path}")
 
@@ -161,27 +185,37 @@ class BM25Retriever(BaseRetriever):
         """Load BM25 index from disk."""
         path = Path(path)
 
-        # Load index data
-        index_path = path / "bm25_index.json"
+        # Load documents
+        docs_path = path / "documents.json"
+        if docs_path.exists():
+            with open(docs_path, "r", encoding="utf-8") as f:
+                self.documents = json.load(f)
+
+        index_path = path / INDEX_FILE
+        legacy_path = path / LEGACY_INDEX_FILE
         if index_path.exists():
-            with open(index_path, "r", encoding="utf-8") as f:
+            with np.load(index_path) as data:
+                self.k1, self.b, self.epsilon, self.avgdl = (float(v) for v in data["params"])
+                self.vocabulary = {term: idx for idx, term in enumerate(data["terms"].tolist())}
+                self.indptr = data["indptr"]
+                self.postings = data["postings"]
+                self.tfs = data["tfs"]
+                self.idf = data["idf"]
+                self.doc_lengths = data["doc_lengths"]
+            self.corpus_size = int(self.doc_lengths.shape[0])
+        elif legacy_path.exists():
+            # Indexes written by the previous JSON format are converted on load
+            with open(legacy_path, "r", encoding="utf-8") as f:
                 index_data = json.load(f)
 
             self.k1 = index_data.get("k1", 1.2)
             self.b = index_data.get("b", 0.75)
             self.epsilon = index_data.get("epsilon", 0.25)
-            self.doc_freqs = index_data.get("doc_freqs", [])
-            self.idf = index_data.get("idf", {})
-            self.doc_lengths = index_data.get("doc_lengths", [])
-            self.avgdl = index_data.get("avgdl", 0)
             self.corpus_size = index_data.get("corpus_size", 0)
-            self.vocabulary = set(index_data.get("vocabulary", []))
-
-        # Load documents
-        docs_path = path / "documents.json"
-        if docs_path.exists():
-            with open(docs_path, "r", encoding="utf-8") as f:
-                self.documents = json.load(f)
+            self.doc_lengths = np.asarray(index_data.get("doc_lengths", []), dtype=np.float32)
+            self.avgdl = index_data.get("avgdl", 0)
+            self.vocabulary = {}
+            self._build_postings(index_data.get("doc_freqs", []))
 
         logger.info(f"BM25 index loaded from {path}")
 
@@ -194,5 +228,6 @@ class BM25Retriever(BaseRetriever):
             "epsilon": self.epsilon,
             "num_documents": self.corpus_size,
             "vocabulary_size": len(self.vocabulary),
+            "num_postings": int(self.postings.shape[0]),
             "avg_doc_length": self.avgdl
-        }
\ No newline at end of file
+        }
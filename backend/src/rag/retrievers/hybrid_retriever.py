@@ -1,7 +1,9 @@
 """Hybrid retriever combining vector and keyword search."""
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import numpy as np
 from pathlib import Path
 
@@ -13,19 +15,59 @@ logger = logging.getLogger(__name__)
 
 
 class HybridRetriever(BaseRetriever):
-    """Hybrid retriever that combines vector and BM25 search."""
-
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    """Hybrid retriever that combines vector and BM25 search.
+
+    Both sub-retrievals run concurrently on a small thread pool and are fused
+    with one of three modes (``fusion`` in the config):
+
+    - ``weighted`` (default): weighted sum of the raw scores, as before the
+      other modes existed; also used when a saved config has no ``fusion``;
+    - ``rrf``: reciprocal rank fusion, ``sum(w / (rrf_k + rank))``, which
+      ignores the incomparable raw score scales;
+    - ``minmax``: each side's scores are min-max normalised to [0, 1] before the
+      weighted sum.
+
+    With ``early_stop_scores`` (e.g. ``{"vector": 0.85}``), a sub-retriever that
+    finishes first and fills top-k with every score at or above its threshold is
+    returned alone, without waiting for the other side.
+    Fused results carry ``retrieval_metadata`` with per-source ranks and
+    per-stage timings (also kept in ``last_metadata``).
+    """
+
+    FUSION_MODES = ("weighted", "rrf", "minmax")
+    DEFAULT_FUSION = "weighted"
+
+    def __init__(self,
+                 config: Optional[Dict[str, Any]] = None,
+                 vector_retriever: Optional[BaseRetriever] = None,
+                 bm25_retriever: Optional[BM25Retriever] = None):
         super().__init__(config)
+        config = config or {}
 
         # Initialize sub-retrievers
-        self.vector_retriever = VectorRetriever(config)
-        self.bm25_retriever = BM25Retriever(config)
+        self.vector_retriever = vector_retriever if vector_retriever is not None else VectorRetriever(config)
+        self.bm25_retriever = bm25_retriever if bm25_retriever is not None else BM25Retriever(config)
 
         # Hybrid search parameters
-        self.vector_weight = config.get("vector_weight", 0.5) if config else 0.5
-        self.bm25_weight = config.get("bm25_weight", 0.5) if config else 0.5
-        self.rerank = config.get("rerank", True) if config else True
+        self.vector_weight = config.get("vector_weight", 0.5)
+        self.bm25_weight = config.get("bm25_weight", 0.5)
+        self.rerank = config.get("rerank", True)
+        self.fusion = self._resolve_fusion(config.get("fusion"))
+        self.rrf_k = config.get("rrf_k", 60)
+        self.candidate_multiplier = max(1, int(config.get("candidate_multiplier", 2)))
+        self.early_stop_scores = dict(config.get("early_stop_scores") or {})
+        self.timeout = config.get("timeout")
+        self.last_metadata: Dict[str, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def _resolve_fusion(cls, fusion: Any) -> str:
+        return fusion if fusion in cls.FUSION_MODES else cls.DEFAULT_FUSION
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-retriever")
+        return self._executor
 
     def build_index(self, documents: List[Dict[str, Any]], **kwargs) -> None:
         """Build both vector and BM25 indexes."""
@@ -42,20 +84,92 @@ class HybridRetriever(BaseRetriever):
 
         logger.info(f"Hybrid index built for {len(documents)} documents")
 
+    @staticmethod
+    def _as_dict(result: Any) -> Dict[str, Any]:
+        """Normalise a sub-retriever result (dict or RetrievalResult) to a dict."""
+        if isinstance(result, dict):
+            return result
+        item = dict(getattr(result, "metadata", None) or {})
+        item["text"] = getattr(result, "text", "")
+        item["score"] = getattr(result, "score", 0.0)
+        item["id"] = item.get("id", getattr(result, "doc_id", None))
+        return item
+
+    def _timed_retrieve(self, retriever: BaseRetriever, query: str, top_k: int, **kwargs) -> Tuple[List[Dict[str, Any]], float]:
+        start = time.perf_counter()
+        results = [self._as_dict(r) for r in retriever.retrieve(query, top_k, **kwargs)]
+        return results, time.perf_counter() - start
+
+    def _confident(self, source: str, results: List[Dict[str, Any]], top_k: int) -> bool:
+        """Whether one side alone already fills top_k above its early-stop threshold."""
+        threshold = self.early_stop_scores.get(source)
+        if threshold is None or len(results) < top_k:
+            return False
+        return all(r.get("score", 0.0) >= threshold for r in results[:top_k])
+
     def retrieve(self, query: str, top_k: int = 10, **kwargs) -> List[Dict[str, Any]]:
         """Retrieve documents using hybrid search."""
         if not self.documents:
             return []
 
-        # Get more results from each retriever for better fusion
-        vector_results = self.vector_retriever.retrieve(query, top_k * 2, **kwargs)
-        bm25_results = self.bm25_retriever.retrieve(query, top_k * 2, **kwargs)
+        started = time.perf_counter()
+        candidates = top_k * self.candidate_multiplier
+        executor = self._get_executor()
+        futures = {
+            executor.submit(self._timed_retrieve, self.vector_retriever, query, candidates, **kwargs): "vector",
+            executor.submit(self._timed_retrieve, self.bm25_retriever, query, candidates, **kwargs): "bm25",
+        }
 
-        # Score fusion
-        fused_results = self._fuse_results(vector_results, bm25_results, query)
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        timings: Dict[str, float] = {}
+        early_stop = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=self.timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.warning(f"Hybrid sub-retrieval timed out: {[futures[f] for f in pending]}")
+                break
+            for future in done:
+                source = futures[future]
+                try:
+                    results[source], timings[source] = future.result()
+                except Exception as e:
+                    logger.warning(f"{source} retrieval failed: {e}")
+                    results[source], timings[source] = [], 0.0
+            confident = [source for source in results if self._confident(source, results[source], top_k)]
+            if pending and confident:
+                early_stop = confident[0]
+                break
+
+        # Score fusion (an early-stopped side is fused alone)
+        fuse_start = time.perf_counter()
+        vector_results = results.get("vector", []) if early_stop in (None, "vector") else []
+        bm25_results = results.get("bm25", []) if early_stop in (None, "bm25") else []
+        fused_results = self._fuse_results(vector_results, bm25_results, query)[:top_k]
+        timings["fusion"] = time.perf_counter() - fuse_start
+        timings["total"] = time.perf_counter() - started
+
+        self.last_metadata = {
+            "fusion": self.fusion,
+            "early_stop": early_stop,
+            "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+            "candidates": {source: len(items) for source, items in results.items()},
+        }
+        for result in fused_results:
+            result["retrieval_metadata"] = {**result["retrieval_metadata"], **self.last_metadata}
 
         # Return top_k results
-        return fused_results[:top_k]
+        return fused_results
+
+    @staticmethod
+    def _minmax(results: List[Dict[str, Any]]) -> List[float]:
+        scores = np.asarray([r.get("score", 0.0) for r in results], dtype=np.float64)
+        if scores.size == 0:
+            return []
+        low, high = scores.min(), scores.max()
+        if high - low <= 1e-12:
+            return [1.0] * len(results)
+        return ((scores - low) / (high - low)).tolist()
 
     def _fuse_results(self,
                      vector_results: List[Dict[str, Any]],
@@ -63,25 +177,29 @@ class HybridRetriever(BaseRetriever):
                      query: str) -> List[Dict[str, Any]]:
         """Fuse results from vector and BM25 retrievers."""
         # Create document score maps
-        doc_scores = {}
-        doc_results = {}
-
-        # Process vector results
-        for result in vector_results:
-            doc_id = result.get("id", "")
-            score = result.get("score", 0.0)
-            doc_scores[doc_id] = doc_scores.get(doc_id, 0) + self.vector_weight * score
-            doc_results[doc_id] = result
-
-        # Process BM25 results
-        for result in bm25_results:
-            doc_id = result.get("id", "")
-            score = result.get("score", 0.0)
-            doc_scores[doc_id] = doc_scores.get(doc_id, 0) + self.bm25_weight * score
-            if doc_id not in doc_results:
-                doc_results[doc_id] = result
-
-        # Sort by combined score
+        doc_scores: Dict[Any, float] = {}
+        doc_results: Dict[Any, Dict[str, Any]] = {}
+        doc_ranks: Dict[Any, Dict[str, int]] = {}
+
+        for source, source_results, weight in (
+            ("vector", vector_results, self.vector_weight),
+            ("bm25", bm25_results, self.bm25_weight),
+        ):
+            normalised = self._minmax(source_results) if self.fusion == "minmax" else None
+            for rank, result in enumerate(source_results, start=1):
+                doc_id = result.get("id", "")
+                if self.fusion == "rrf":
+                    contribution = weight / (self.rrf_k + rank)
+                elif self.fusion == "minmax":
+                    contribution = weight * normalised[rank - 1]
+                else:
+                    contribution = weight * result.get("score", 0.0)
+                doc_scores[doc_id] = doc_scores.get(doc_id, 0.0) + contribution
+                doc_ranks.setdefault(doc_id, {})[f"{source}_rank"] = rank
+                if doc_id not in doc_results:
+                    doc_results[doc_id] = result
+
+        # Sort by combined score (stable: vector order first on ties)
         sorted_docs = sorted(doc_scores.items(), key=lambda x: x[1], reverse=True)
 
         # Build final results
@@ -90,6 +208,7 @@ class HybridRetriever(BaseRetriever):
             result = doc_results[doc_id].copy()
             result["score"] = score
             result["retrieval_type"] = "hybrid"
+            result["retrieval_metadata"] = doc_ranks[doc_id]
             fused_results.append(result)
 
         return fused_results
@@ -113,7 +232,9 @@ class HybridRetriever(BaseRetriever):
         config = {
             "vector_weight": self.vector_weight,
             "bm25_weight": self.bm25_weight,
-            "rerank": self.rerank
+            "rerank": self.rerank,
+            "fusion": self.fusion,
+            "rrf_k": self.rrf_k
         }
         with open(config_path, "w") as f:
             json.dump(config, f, indent=2)
@@ -143,6 +264,9 @@ class HybridRetriever(BaseRetriever):
             self.vector_weight = config.get("vector_weight", 0.5)
             self.bm25_weight = config.get("bm25_weight", 0.5)
             self.rerank = config.get("rerank", True)
+            # Indexes saved before fusion modes existed keep the weighted sum
+            self.fusion = self._resolve_fusion(config.get("fusion"))
+            self.rrf_k = config.get("rrf_k", self.rrf_k)
 
         logger.info(f"Hybrid index loaded from {path}")
 
@@ -162,6 +286,7 @@ class HybridRetriever(BaseRetriever):
             "vector_weight": self.vector_weight,
             "bm25_weight": self.bm25_weight,
             "rerank": self.rerank,
+            "fusion": self.fusion,
             "num_documents": len(self.documents) if self.documents else 0
         }
 
@@ -15,6 +15,7 @@ from server_support.topic_context import TopicContext, resolve_context
 from src.fetch.data_fetch import get_topic_available_date_range
 from src.project import get_project_manager
 
+from . import event_stream
 from .deep_report import AI_FULL_REPORT_CACHE_FILENAME, REPORT_CACHE_FILENAME, generate_full_report_payload, generate_report_payload
 from .deep_report.deterministic import ensure_cache_dir_v2
 from .runtime_infra import resolve_runtime_profile
@@ -31,6 +32,7 @@ from .task_queue import (
     resolve_approval,
     resume_before_failure_task,
     retry_task,
+    subscribe_events,
 )
 
 PROJECT_MANAGER = get_project_manager()
@@ -759,48 +761,60 @@ def stream_report_task(task_id: str):
         heartbeat_at = time.time()
         last_worker_check_at = time.time()
         yield "retry: 2500\n\n"
-        while True:
-            try:
-                events = load_events_since(task_id, last_id)
-                current_task = get_task(task_id)
-            except LookupError:
-                break
-            for item in events:
-                event_id = int(item.get("event_id") or 0)
-                if event_id > last_id:
+        # Subscribe before reading the backlog; events landing in between show up twice and are deduped by id
+        with subscribe_events(task_id) as subscription:
+            feed = subscription.source
+            pending: List[Any] = load_events_since(task_id, last_id)
+            while True:
+                for item in pending:
+                    if item is event_stream.RESET:
+                        last_id = 0
+                        continue
+                    event_id = int(item.get("event_id") or 0)
+                    if event_id <= last_id:
+                        continue
                     last_id = event_id
-                yield _format_event(str(item.get("type") or "message"), item, event_id=event_id)
-            if time.time() - heartbeat_at >= 12:
-                heartbeat_at = time.time()
-                yield _format_event(
-                    "heartbeat",
-                    {
-                        "task_id": task_id,
-                        "ts": _utc_now_text(),
-                        "phase": current_task.get("phase"),
-                        "status": current_task.get("status"),
-                        "message": current_task.get("message"),
-                        "event_id": last_id,
-                    },
-                    event_id=None,
-                )
-            if str(current_task.get("status") or "") in {"completed", "failed", "cancelled"} and not events:
-                yield _format_event(
-                    "done",
-                    {
-                        "task_id": task_id,
-                        "status": current_task.get("status"),
-                        "event_id": last_id,
-                    },
-                )
-                break
-            if str(current_task.get("status") or "") == "queued" and time.time() - last_worker_check_at >= 10:
-                last_worker_check_at = time.time()
-                try:
-                    ensure_worker_running()
-                except Exception:
-                    pass
-            time.sleep(1.0)
+                    yield _format_event(str(item.get("type") or "message"), item, event_id=event_id)
+                if feed.missing:
+                    break
+                snapshot = feed.snapshot
+                status = str(snapshot.get("status") or "")
+                now = time.time()
+                if now - heartbeat_at >= 12:
+                    heartbeat_at = now
+                    yield _format_event(
+                        "heartbeat",
+                        {
+                            "task_id": task_id,
+                            "ts": _utc_now_text(),
+                            "phase": snapshot.get("phase"),
+                            "status": snapshot.get("status"),
+                            "message": snapshot.get("message"),
+                            "event_id": last_id,
+                        },
+                        event_id=None,
+                    )
+                if status in event_stream.TERMINAL_STATUSES and last_id >= feed.last_id:
+                    yield _format_event(
+                        "done",
+                        {
+                            "task_id": task_id,
+                            "status": status,
+                            "event_id": last_id,
+                        },
+                    )
+                    break
+                wake_at = heartbeat_at + 12
+                if status == "queued":
+                    if now - last_worker_check_at >= 10:
+                        last_worker_check_at = now
+                        try:
+                            ensure_worker_running()
+                        except Exception:
+                            pass
+                    # The worker check only matters while the task waits for a worker
+                    wake_at = min(wake_at, last_worker_check_at + 10)
+                pending = subscription.get(timeout=max(0.0, wake_at - time.time()))
 
     response = Response(stream_with_context(_stream()), mimetype="text/event-stream")
     response.headers["Cache-Control"] = "no-cache"
@@ -16,7 +16,7 @@ from ..utils.logging.logging import (
     log_save_success,
 )
 from ..utils.setting.env_loader import get_api_key
-from ..utils.ai import call_langchain_chat
+from ..utils.ai import call_langchain_chat, closing_sessions, pooled_session
 
 
 def _get_date_folder(start_date: str, end_date: Optional[str]) -> str:
@@ -270,8 +270,8 @@ async def _llm_call_report_direct(messages: Dict, logger, model: Optional[str] =
             # 针对长文本逐次放宽超时：60s → 96s → 154s（默认），上限为 3x
             eff_timeout = min(timeout * (1.6 ** (attempt - 1)), timeout * 3)
             client_timeout = aiohttp.ClientTimeout(total=eff_timeout, connect=30, sock_connect=30, sock_read=eff_timeout)
-            async with aiohttp.ClientSession(timeout=client_timeout) as sess:
-                async with sess.post(url, headers=hdrs, json=payload) as resp:
+            async with pooled_session() as sess:
+                async with sess.post(url, headers=hdrs, json=payload, timeout=client_timeout) as resp:
                     text = await resp.text()
                     if resp.status != 200:
                         log_error(logger, f"大模型HTTP错误 {resp.status}: {text}", "Report")
@@ -637,7 +637,9 @@ def run_report(topic: str, start_date: str, end_date: Optional[str] = None) -> b
 
             # 4) 调用大模型
             full_text = asyncio.run(
-                _llm_call_report(messages, logger, model=model_name, timeout=timeout_s, max_retries=max_retries)
+                closing_sessions(
+                    _llm_call_report(messages, logger, model=model_name, timeout=timeout_s, max_retries=max_retries)
+                )
             )
 
             # 5) 若 LLM 失败，回退为拼接文本直接输出
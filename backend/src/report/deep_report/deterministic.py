@@ -17,6 +17,7 @@ from ..capability_adapters import (
     collect_bertopic_snapshot,
     ensure_bertopic_results,
 )
+from ...utils.io.layers import find_layer_file, iter_layer_records
 from ...utils.setting.paths import bucket, ensure_bucket, get_data_root
 from ..knowledge_loader import load_report_knowledge
 from ..runtime_bootstrap import ANALYZE_FILE_MAP, collect_explain_outputs, ensure_analyze_results, ensure_explain_results
@@ -223,7 +224,8 @@ def _collect_top_labels(payload: Any, *, max_items: int = 8) -> List[Dict[str, A
 
 def _iter_source_rows(topic_identifier: str, start: str, end: str) -> Iterable[Dict[str, Any]]:
     folder = compose_folder_name(start, end)
-    overall = bucket("fetch", topic_identifier, folder) / "总体.jsonl"
+    fetch_dir = bucket("fetch", topic_identifier, folder)
+    overall = find_layer_file(fetch_dir, "总体") or fetch_dir / "总体.jsonl"
     candidates: List[Path] = [overall]
     uploads_dir = get_data_root() / "projects" / topic_identifier / "uploads" / "jsonl"
     if uploads_dir.exists():
@@ -232,17 +234,7 @@ def _iter_source_rows(topic_identifier: str, start: str, end: str) -> Iterable[D
         if not file_path.exists():
             continue
         try:
-            with file_path.open("r", encoding="utf-8") as handle:
-                for line in handle:
-                    raw = line.strip()
-                    if not raw:
-                        continue
-                    try:
-                        payload = json.loads(raw)
-                    except Exception:
-                        continue
-                    if isinstance(payload, dict):
-                        yield payload
+            yield from iter_layer_records(file_path)
         except Exception:
             continue
 
@@ -0,0 +1,253 @@
+"""Append-only event log for report tasks.
+
+Each task keeps its events in ``<task>.events.jsonl``. Next to it,
+``<task>.events.jsonl.idx`` is a sidecar index: fixed-width
+``(event_id, byte offset)`` records, one per line of the log. This means:
+
+- appending costs one line write plus one 16-byte index write;
+- ``read_since`` binary-searches the index and seeks to the first newer event
+  instead of parsing the whole log;
+- ``tail`` keeps a bounded in-memory ring per log. It only reads the bytes
+  appended since the last call, which may have been written by another
+  process (the worker appends, the API reads).
+
+Logs written before the index existed get their index rebuilt on first
+access. Lines appended without an index record, for example after a crash
+between the two writes, are still returned because reads continue to EOF.
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+INDEX_SUFFIX = ".idx"
+TAIL_CAPACITY = 200
+MAX_CACHED_TAILS = 256
+
+_RECORD = struct.Struct("<QQ")
+
+
+class _Tail:
+    __slots__ = ("events", "size", "anchor")
+
+    def __init__(self) -> None:
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=TAIL_CAPACITY)
+        # Bytes of the log already consumed; -1 until the first load
+        self.size = -1
+        # Last consumed line, re-checked on sync to detect logs reset by another process
+        self.anchor = b""
+
+    def consume(self, data: bytes, end: int) -> None:
+        self.events.extend(_parse_lines(data))
+        self.size = end
+        if data:
+            self.anchor = data[data.rstrip(b"\n").rfind(b"\n") + 1:]
+
+
+_TAILS: "OrderedDict[str, _Tail]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _event_id(event: Dict[str, Any]) -> int:
+    try:
+        return int(event.get("event_id") or 0)
+    except Exception:
+        return 0
+
+
+def _parse_lines(data: bytes) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    for raw in data.split(b"\n"):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            payload = json.loads(raw.decode("utf-8"))
+        except Exception:
+            continue
+        if isinstance(payload, dict):
+            events.append(payload)
+    return events
+
+
+def _read_complete(path: Path, start: int) -> Tuple[bytes, int]:
+    """Read from ``start`` up to the last complete line; returns (data, end offset)."""
+    with path.open("rb") as stream:
+        stream.seek(start)
+        data = stream.read()
+    cut = data.rfind(b"\n") + 1
+    return data[:cut], start + cut
+
+
+def _rebuild_index(path: Path) -> None:
+    records = bytearray()
+    offset = 0
+    if path.exists():
+        with path.open("rb") as stream:
+            for line in stream:
+                if not line.endswith(b"\n"):
+                    break
+                for event in _parse_lines(line):
+                    records += _RECORD.pack(_event_id(event), offset)
+                offset += len(line)
+    tmp = index_path(path).with_suffix(f"{INDEX_SUFFIX}.tmp")
+    tmp.write_bytes(bytes(records))
+    os.replace(str(tmp), str(index_path(path)))
+
+
+def _record_count(idx: Path) -> int:
+    try:
+        return idx.stat().st_size // _RECORD.size
+    except FileNotFoundError:
+        return 0
+
+
+def _read_record(stream, position: int) -> Tuple[int, int]:
+    stream.seek(position * _RECORD.size)
+    return _RECORD.unpack(stream.read(_RECORD.size))
+
+
+def _ensure_index(path: Path) -> int:
+    """Make sure the index covers the log; returns the number of index records."""
+    idx = index_path(path)
+    size = path.stat().st_size if path.exists() else 0
+    count = _record_count(idx)
+    stale = size > 0 and count == 0
+    if count:
+        with idx.open("rb") as stream:
+            _, last_offset = _read_record(stream, count - 1)
+        stale = last_offset >= size
+    if stale or (count and not path.exists()):
+        _rebuild_index(path)
+        count = _record_count(idx)
+    return count
+
+
+def append(path: Path, event: Dict[str, Any]) -> None:
+    """Append one event (callers serialise appends with the task lock)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+    idx = index_path(path)
+    if not idx.exists() and path.exists() and path.stat().st_size > 0:
+        _rebuild_index(path)
+    with path.open("ab") as stream:
+        stream.seek(0, os.SEEK_END)
+        offset = stream.tell()
+        stream.write(line)
+    with idx.open("ab") as stream:
+        stream.write(_RECORD.pack(_event_id(event), offset))
+
+    with _LOCK:
+        tail = _TAILS.get(str(path))
+        # Only extend the ring when it is in sync; otherwise the next tail() catches up
+        if tail is not None and tail.size == offset:
+            tail.events.append(dict(event))
+            tail.size = offset + len(line)
+            tail.anchor = line
+
+
+def reset(path: Path) -> None:
+    """Truncate the log and its index (used when a task restarts its event history)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    index_path(path).write_bytes(b"")
+    with _LOCK:
+        _TAILS.pop(str(path), None)
+
+
+def _offset_after(path: Path, since_id: int, count: int) -> int:
+    """Byte offset of the first indexed event with id > since_id (binary search)."""
+    if not count:
+        return 0
+    with index_path(path).open("rb") as stream:
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            if _read_record(stream, mid)[0] <= since_id:
+                low = mid + 1
+            else:
+                high = mid
+        if low < count:
+            return _read_record(stream, low)[1]
+        # Everything indexed is older; unindexed lines may follow the last record
+        return _read_record(stream, count - 1)[1]
+
+
+def _offset_of_last(path: Path, limit: int, count: int) -> int:
+    if not count or limit >= count:
+        return 0
+    with index_path(path).open("rb") as stream:
+        return _read_record(stream, count - limit)[1]
+
+
+def read_since(path: Path, since_id: int) -> List[Dict[str, Any]]:
+    """Events with event_id > since_id, in log order."""
+    if not path.exists():
+        return []
+    try:
+        count = _ensure_index(path)
+        data, _ = _read_complete(path, _offset_after(path, since_id, count))
+    except Exception:
+        return []
+    return [event for event in _parse_lines(data) if _event_id(event) > since_id]
+
+
+def tail(path: Path, limit: int = 60) -> List[Dict[str, Any]]:
+    """The last ``limit`` events, served from the in-memory ring when possible."""
+    limit = max(int(limit or 1), 1)
+    if not path.exists():
+        return []
+    try:
+        size = path.stat().st_size
+        if limit > TAIL_CAPACITY:
+            count = _ensure_index(path)
+            data, _ = _read_complete(path, _offset_of_last(path, limit, count))
+            return _parse_lines(data)[-limit:]
+
+        key = str(path)
+        with _LOCK:
+            entry = _TAILS.get(key)
+            if entry is None:
+                entry = _Tail()
+                _TAILS[key] = entry
+            _TAILS.move_to_end(key)
+            while len(_TAILS) > MAX_CACHED_TAILS:
+                _TAILS.popitem(last=False)
+
+            if entry.size >= 0 and size >= entry.size:
+                # Re-read the anchor line with the new bytes; if it changed the log was rewritten
+                data, end = _read_complete(path, entry.size - len(entry.anchor))
+                if data.startswith(entry.anchor):
+                    entry.consume(data[len(entry.anchor):], end)
+                else:
+                    entry.size = -1
+            if entry.size < 0 or size < entry.size:
+                # First access or the log was truncated: reload the last TAIL_CAPACITY events
+                count = _ensure_index(path)
+                data, end = _read_complete(path, _offset_of_last(path, TAIL_CAPACITY, count))
+                entry.events.clear()
+                entry.anchor = b""
+                entry.consume(data, end)
+            return list(entry.events)[-limit:]
+    except Exception:
+        return []
+
+
+def clear_tail_cache(path: Optional[Path] = None) -> None:
+    with _LOCK:
+        if path is None:
+            _TAILS.clear()
+        else:
+            _TAILS.pop(str(path), None)
+
+
+__all__ = ["append", "clear_tail_cache", "index_path", "read_since", "reset", "tail"]
@@ -0,0 +1,129 @@
+"""Push-based fan-out of report task events to SSE subscribers.
+
+Every task that has at least one open stream gets one shared ``TaskFeed``:
+
+- events written in this process (``task_queue`` mutations) are pushed to all
+  subscribers as soon as they are appended, without touching disk again;
+- events appended by the worker process are picked up by one watcher thread
+  per task that only ``stat``s the log every ``WATCH_INTERVAL`` seconds and
+  reads the new lines (plus the task state, once) when the log has grown;
+- heartbeats and terminal checks use the feed's cached task snapshot, so N
+  streams watching one task cost one reader, and idle streams read nothing.
+
+Subscribers receive event dicts in log order, or ``RESET`` when the task's
+event history was restarted and ids begin again at 1.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import event_log
+from ..utils.broadcast import Broadcaster, Subscription
+
+WATCH_INTERVAL = 0.1
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+RESET = object()
+
+_HUB = Broadcaster(poll_interval=WATCH_INTERVAL, name="report-events")
+
+
+def _signature(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return (-1, 0)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _event_id(event: Dict[str, Any]) -> int:
+    try:
+        return int(event.get("event_id") or 0)
+    except Exception:
+        return 0
+
+
+class TaskFeed:
+    """Shared per-task source: remembers the last published event and a task snapshot."""
+
+    def __init__(self, task_id: str, events_path: Path, load_task: Callable[[], Optional[Dict[str, Any]]]):
+        self.task_id = task_id
+        self.events_path = events_path
+        self._load_task = load_task
+        self._lock = threading.Lock()
+        self.snapshot: Dict[str, Any] = {}
+        self.missing = False
+        with self._lock:
+            self.signature = _signature(events_path)
+            latest = event_log.tail(events_path, limit=1)
+            self.last_id = _event_id(latest[-1]) if latest else 0
+            self._refresh(load_task())
+
+    def _refresh(self, task: Optional[Dict[str, Any]]) -> None:
+        self.missing = not task
+        if task:
+            self.snapshot = {key: task.get(key) for key in ("status", "phase", "message")}
+
+    def poll(self) -> List[Any]:
+        signature = _signature(self.events_path)
+        if signature == self.signature:
+            return []
+        with self._lock:
+            if signature[0] < self.signature[0]:
+                # The log shrank: another process restarted the event history
+                self.last_id = 0
+                _HUB.publish(self.task_id, RESET)
+            self.signature = signature
+            events = event_log.read_since(self.events_path, self.last_id)
+            if events:
+                self.last_id = max(_event_id(event) for event in events)
+            self._refresh(self._load_task())
+            # Published under the lock so pushes from this process cannot overtake them
+            _HUB.publish(self.task_id, *events)
+        return []
+
+    def push(self, event: Dict[str, Any], task: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            event_id = _event_id(event)
+            if event_id <= self.last_id:
+                return
+            events = [event]
+            if event_id > self.last_id + 1:
+                # Another process appended events the watcher has not polled yet: deliver them in order
+                events = event_log.read_since(self.events_path, self.last_id) or events
+            self.last_id = max(_event_id(item) for item in events)
+            self.signature = _signature(self.events_path)
+            self._refresh(task)
+            _HUB.publish(self.task_id, *events)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.last_id = 0
+            self.signature = _signature(self.events_path)
+            _HUB.publish(self.task_id, RESET)
+
+
+def subscribe(task_id: str, events_path: Path, load_task: Callable[[], Optional[Dict[str, Any]]]) -> Subscription:
+    """Open a subscription; ``subscription.source`` is the task's shared ``TaskFeed``."""
+    return _HUB.subscribe(task_id, lambda: TaskFeed(task_id, events_path, load_task))
+
+
+def publish(task_id: str, event: Dict[str, Any], task: Optional[Dict[str, Any]] = None) -> None:
+    """Push an event appended in this process; a no-op when nobody is watching the task."""
+    feed = _HUB.source(task_id)
+    if feed is not None:
+        feed.push(event, task)
+
+
+def reset(task_id: str) -> None:
+    feed = _HUB.source(task_id)
+    if feed is not None:
+        feed.reset()
+
+
+def subscriber_count(task_id: str) -> int:
+    return _HUB.subscriber_count(task_id)
+
+
+__all__ = ["RESET", "TERMINAL_STATUSES", "TaskFeed", "publish", "reset", "subscribe", "subscriber_count"]
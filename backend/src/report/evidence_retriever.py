@@ -13,6 +13,9 @@ from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+from ..utils.io.layers import find_layer_file, iter_layer_records
+from ..utils.rag.embedding_cache import get_embedding_cache
+from ..utils.segmentation import segment_texts
 from ..utils.setting.paths import bucket, get_data_root
 
 
@@ -21,11 +24,13 @@ _NEGATION_HINTS = ("辟谣", "不实", "并非", "未发布", "网传", "谣言"
 _POLICY_HINTS = ("控烟", "禁烟", "无烟", "二手烟", "吸烟", "戒烟", "烟草", "公共场所", "卫健委", "条例", "执法")
 _POLICY_CONTEXT_HINTS = ("政策", "通知", "条例", "卫健委", "公共场所", "控烟", "禁烟", "执法", "宣传", "健康", "二手烟")
 _KITCHEN_NOISE_HINTS = ("厨房", "油烟", "油烟机", "抽油烟", "灶台", "做饭", "烟灶", "神器")
-_RETRIEVAL_CACHE_VERSION = 1
+_RETRIEVAL_CACHE_VERSION = 2
 _CORPUS_CACHE_FILENAME = "retrieval_corpus.pkl"
 _EMBEDDING_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 _CORPUS_CACHE_LOCK = RLock()
 _CORPUS_CACHE_MEMO: Dict[str, Dict[str, Any]] = {}
+_TOKEN_HITS_LIMIT = 512
+_DIVERSITY_WINDOW = 120
 _EMBEDDING_MODEL: Any = None
 
 
@@ -51,11 +56,16 @@ def _tokenize(text: Any, *, max_items: int = 18) -> List[str]:
     raw = str(text or "").strip()
     if not raw:
         return []
+    try:
+        # 与关键词分析等模块共用 jieba 分词与缓存；不可用时退回按字符类切分
+        words = segment_texts([raw])[0]
+    except Exception:
+        words = _TOKEN_RE.findall(raw)
     tokens: List[str] = []
     seen = set()
-    for token in _TOKEN_RE.findall(raw):
+    for token in words:
         cleaned = str(token or "").strip()
-        if len(cleaned) < 2:
+        if len(cleaned) < 2 or not _TOKEN_RE.fullmatch(cleaned):
             continue
         key = cleaned.lower()
         if key in seen:
@@ -161,8 +171,8 @@ def _resolve_source_bundle(topic_identifier: str, start: str, end: str) -> Dict[
     request_start_text = _extract_date_text(start)
     request_end_text = _extract_date_text(end or start)
     folder = f"{start}_{end}" if end and end != start else start
-    exact = bucket("fetch", topic_identifier, folder) / "总体.jsonl"
-    if exact.exists():
+    exact = find_layer_file(bucket("fetch", topic_identifier, folder), "总体")
+    if exact is not None:
         return {
             "files": [exact],
             "source_resolution": "exact_fetch_range",
@@ -182,8 +192,8 @@ def _resolve_source_bundle(topic_identifier: str, start: str, end: str) -> Dict[
             range_start, range_end = _parse_fetch_range(item.name)
             start_dt = _extract_date_obj(range_start)
             end_dt = _extract_date_obj(range_end)
-            overall = item / "总体.jsonl"
-            if not overall.exists() or start_dt is None or end_dt is None:
+            overall = find_layer_file(item, "总体")
+            if overall is None or start_dt is None or end_dt is None:
                 continue
             if start_dt <= request_start and end_dt >= request_end:
                 covering.append((max(0, (end_dt - start_dt).days), range_start, range_end, overall))
@@ -278,28 +288,9 @@ def _retrieval_cache_root(topic_identifier: str, start: str, end: str) -> Path:
     return cache_root
 
 
-def _corpus_cache_key(
-    *,
-    topic_identifier: str,
-    start: str,
-    end: str,
-    platforms: Sequence[str],
-    time_start: str,
-    time_end: str,
-    source_files: Sequence[Path],
-    source_resolution: str,
-) -> str:
-    payload = {
-        "version": _RETRIEVAL_CACHE_VERSION,
-        "topic_identifier": str(topic_identifier or "").strip(),
-        "start": str(start or "").strip(),
-        "end": str(end or "").strip(),
-        "platforms": sorted(str(item or "").strip() for item in platforms if str(item or "").strip()),
-        "time_start": str(time_start or "").strip(),
-        "time_end": str(time_end or "").strip(),
-        "source_fingerprint": _build_source_fingerprint(source_files, source_resolution),
-    }
-    return hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+def _corpus_cache_key(*, source_files: Sequence[Path], source_resolution: str) -> str:
+    # 语料只取决于源文件；平台、时间等筛选在查询时以掩码方式应用，不同筛选组合共用同一份索引
+    return _build_source_fingerprint(source_files, source_resolution)
 
 
 def _corpus_cache_path(topic_identifier: str, start: str, end: str, cache_key: str) -> Path:
@@ -314,15 +305,14 @@ def _build_tfidf_index(docs: Sequence[str]) -> Tuple[Optional[TfidfVectorizer],
     return vectorizer, matrix
 
 
-def _score_tfidf_query(vectorizer: Optional[TfidfVectorizer], matrix: Any, query_text: str, docs_count: int) -> List[float]:
+def _score_tfidf_query(vectorizer: Optional[TfidfVectorizer], matrix: Any, query_text: str, docs_count: int) -> np.ndarray:
     if vectorizer is None or matrix is None or not str(query_text or "").strip():
-        return [0.0 for _ in range(docs_count)]
+        return np.zeros(docs_count, dtype=np.float64)
     try:
         query_vec = vectorizer.transform([str(query_text or "").strip()])
-        scores = (matrix @ query_vec.T).toarray().reshape(-1)
-        return [float(value) for value in scores.tolist()]
+        return np.asarray((matrix @ query_vec.T).toarray(), dtype=np.float64).reshape(-1)
     except Exception:
-        return [0.0 for _ in range(docs_count)]
+        return np.zeros(docs_count, dtype=np.float64)
 
 
 def _get_embedding_model() -> Any:
@@ -341,59 +331,107 @@ def _build_embedding_doc_vectors(docs: Sequence[str], mode: str) -> Optional[np.
         return None
     try:
         model = _get_embedding_model()
-        vectors = model.encode(list(docs), normalize_embeddings=True)
-        return np.asarray(vectors, dtype=np.float32)
+
+        def _encode(texts: List[str]) -> np.ndarray:
+            return np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+        # 相同证据文本跨任务复用已归一化的向量，只编码未命中的部分
+        cache = get_embedding_cache(
+            _EMBEDDING_MODEL_NAME, int(model.get_sentence_embedding_dimension() or 0)
+        )
+        if cache is None:
+            return _encode(list(docs))
+        return cache.encode(list(docs), _encode)
     except Exception:
         return None
 
 
-def _score_embedding_query(doc_vectors: Optional[np.ndarray], query_text: str, mode: str) -> List[float]:
+def _score_embedding_query(doc_vectors: Optional[np.ndarray], query_text: str, mode: str) -> np.ndarray:
     docs_count = int(doc_vectors.shape[0]) if isinstance(doc_vectors, np.ndarray) and doc_vectors.ndim >= 1 else 0
     safe_mode = str(mode or "fast").strip().lower()
     if safe_mode != "research" or docs_count <= 0 or not str(query_text or "").strip():
-        return [0.0 for _ in range(docs_count)]
+        return np.zeros(docs_count, dtype=np.float64)
     try:
         model = _get_embedding_model()
         query_vec = np.asarray(model.encode([str(query_text or "").strip()], normalize_embeddings=True)[0], dtype=np.float32)
-        scores = np.matmul(doc_vectors, query_vec)
-        return [float(value) for value in scores.tolist()]
+        return np.matmul(doc_vectors, query_vec).astype(np.float64)
     except Exception:
-        return [0.0 for _ in range(docs_count)]
+        return np.zeros(docs_count, dtype=np.float64)
 
 
-def _build_corpus_entries(
-    *,
-    topic_identifier: str,
-    start: str,
-    end: str,
-    platforms: Optional[List[str]] = None,
-    time_start: str = "",
-    time_end: str = "",
-) -> Dict[str, Any]:
-    rows = list(
-        _iter_filtered_entries(
-            topic_identifier=topic_identifier,
-            start=start,
-            end=end,
-            platforms=platforms,
-            time_start=time_start,
-            time_end=time_end,
-        )
-    )
+def _row_date_text(row: Dict[str, Any]) -> str:
+    return _extract_date_text(row.get("published_at") or row.get("publish_time") or row.get("date"))
+
+
+def _row_dedupe_key(row: Dict[str, Any], source_file: str, row_index: int) -> str:
+    url = str(row.get("url") or "").strip()
+    key = url.lower() if url else _normalise_title(str(row.get("title") or "").strip())
+    return key or f"{source_file}:{row_index}"
+
+
+def _join_search_texts(texts: Sequence[str]) -> Tuple[str, np.ndarray]:
+    """把逐行小写文本拼成一个 ``\\x00`` 分隔的大字符串，并返回每行起始偏移，供子串命中检索。"""
+    starts = np.zeros(len(texts), dtype=np.int64)
+    offset = 0
+    for index, text in enumerate(texts):
+        starts[index] = offset
+        offset += len(text) + 1
+    return "\x00".join(texts), starts
+
+
+def _rows_containing(blob: str, starts: np.ndarray, needle: str) -> np.ndarray:
+    """返回包含 ``needle`` 的行掩码；在拼接文本上用 ``str.find`` 跳行查找，每个命中行只处理一次。"""
+    hits = np.zeros(len(starts), dtype=bool)
+    if not needle:
+        hits[:] = True
+        return hits
+    position = blob.find(needle)
+    while position >= 0:
+        row = int(np.searchsorted(starts, position, side="right")) - 1
+        hits[row] = True
+        if row + 1 >= len(starts):
+            break
+        position = blob.find(needle, int(starts[row + 1]))
+    return hits
+
+
+def _build_corpus_entries(*, topic_identifier: str, start: str, end: str) -> Dict[str, Any]:
+    """
+    读取窗口源文件的全部记录，构建与筛选条件无关的检索语料。
+
+    除 TF-IDF 索引外，还预先计算平台/日期/去重键列以及与查询无关的来源质量、政策语境分，
+    查询时筛选条件以布尔掩码方式作用在这些列上。
+    """
     entries: List[Dict[str, Any]] = []
     docs: List[str] = []
-    for row, source_file, row_index in rows:
+    platforms: List[str] = []
+    dates: List[str] = []
+    dedupe_keys: List[str] = []
+    source_quality: List[float] = []
+    policy_context: List[float] = []
+    titles: List[str] = []
+    texts: List[str] = []
+    for row, source_file, row_index in _iter_source_entries(topic_identifier, start, end):
+        title = str(row.get("title") or "").strip()
+        text = _record_text(row)
         doc = "\n".join(
             [
-                str(row.get("title") or "").strip(),
-                str(row.get("title") or "").strip(),
-                _record_text(row),
+                title,
+                title,
+                text,
                 str(row.get("platform") or "").strip(),
                 str(row.get("author") or "").strip(),
             ]
         )
         entries.append({"row": row, "source_file": source_file, "row_index": row_index, "doc": doc})
         docs.append(doc)
+        platforms.append(str(row.get("platform") or "").strip())
+        dates.append(_row_date_text(row))
+        dedupe_keys.append(_row_dedupe_key(row, source_file, row_index))
+        source_quality.append(_source_quality_bonus(row))
+        policy_context.append(_policy_context_score(text))
+        titles.append(title.lower())
+        texts.append(text.lower())
     vectorizer, matrix = _build_tfidf_index(docs)
     return {
         "entries": entries,
@@ -401,6 +439,13 @@ def _build_corpus_entries(
         "matrix": matrix,
         "embedding_doc_vectors": None,
         "doc_count": len(docs),
+        "platform": np.asarray(platforms, dtype=object),
+        "date_text": np.asarray(dates, dtype="U10"),
+        "dedupe_key": np.asarray(dedupe_keys, dtype=object),
+        "source_quality": np.asarray(source_quality, dtype=np.float64),
+        "policy_context": np.asarray(policy_context, dtype=np.float64),
+        "title_search": _join_search_texts(titles),
+        "text_search": _join_search_texts(texts),
     }
 
 
@@ -423,8 +468,9 @@ def _load_cached_corpus(path: Path) -> Optional[Dict[str, Any]]:
 def _store_cached_corpus(path: Path, corpus: Dict[str, Any]) -> None:
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
+        persisted = {key: value for key, value in corpus.items() if key != "token_hits"}
         with path.open("wb") as handle:
-            pickle.dump({"version": _RETRIEVAL_CACHE_VERSION, "corpus": corpus}, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump({"version": _RETRIEVAL_CACHE_VERSION, "corpus": persisted}, handle, protocol=pickle.HIGHEST_PROTOCOL)
     except Exception:
         return
 
@@ -434,59 +480,84 @@ def _get_retrieval_corpus(
     topic_identifier: str,
     start: str,
     end: str,
-    platforms: Optional[List[str]] = None,
-    time_start: str = "",
-    time_end: str = "",
     mode: str = "fast",
 ) -> Dict[str, Any]:
-    normalized_platforms = _normalise_platforms(platforms)
-    lower_bound = str(time_start or "").strip() or str(start or "").strip()
-    upper_bound = str(time_end or "").strip() or str(end or "").strip()
     source_files, source_resolution = _resolve_source_files(topic_identifier, start, end)
-    cache_key = _corpus_cache_key(
-        topic_identifier=topic_identifier,
-        start=start,
-        end=end,
-        platforms=normalized_platforms,
-        time_start=lower_bound,
-        time_end=upper_bound,
-        source_files=source_files,
-        source_resolution=source_resolution,
-    )
+    cache_key = _corpus_cache_key(source_files=source_files, source_resolution=source_resolution)
     cache_path = _corpus_cache_path(topic_identifier, start, end, cache_key)
     with _CORPUS_CACHE_LOCK:
         corpus = _CORPUS_CACHE_MEMO.get(cache_key)
         if corpus is None:
             corpus = _load_cached_corpus(cache_path)
         if corpus is None:
-            corpus = _build_corpus_entries(
-                topic_identifier=topic_identifier,
-                start=start,
-                end=end,
-                platforms=normalized_platforms,
-                time_start=lower_bound,
-                time_end=upper_bound,
-            )
+            corpus = _build_corpus_entries(topic_identifier=topic_identifier, start=start, end=end)
             _store_cached_corpus(cache_path, corpus)
         if str(mode or "fast").strip().lower() == "research" and corpus.get("embedding_doc_vectors") is None:
             docs = [str(entry.get("doc") or "") for entry in corpus.get("entries") or [] if isinstance(entry, dict)]
             corpus["embedding_doc_vectors"] = _build_embedding_doc_vectors(docs[: max(12, len(docs))], mode)
             _store_cached_corpus(cache_path, corpus)
+        corpus.setdefault("token_hits", {})
         _CORPUS_CACHE_MEMO[cache_key] = corpus
     return {
+        **corpus,
         "cache_key": cache_key,
         "cache_path": cache_path,
         "source_files": source_files,
         "source_resolution": source_resolution,
-        "time_start": lower_bound,
-        "time_end": upper_bound,
-        "entries": list(corpus.get("entries") or []),
-        "vectorizer": corpus.get("vectorizer"),
-        "matrix": corpus.get("matrix"),
-        "embedding_doc_vectors": corpus.get("embedding_doc_vectors"),
     }
 
 
+def _corpus_filter_mask(
+    corpus: Dict[str, Any],
+    *,
+    platforms: Sequence[str],
+    lower_bound: str,
+    upper_bound: str,
+) -> np.ndarray:
+    """与 ``_iter_filtered_entries`` 相同的时间/平台筛选，作用在预计算列上。"""
+    dates = corpus["date_text"]
+    mask = np.ones(len(dates), dtype=bool)
+    has_date = dates != ""
+    if lower_bound:
+        mask &= ~has_date | (dates >= lower_bound)
+    if upper_bound:
+        mask &= ~has_date | (dates <= upper_bound)
+    if platforms:
+        platform_column = corpus["platform"]
+        mask &= (platform_column == "") | np.isin(platform_column, list(platforms))
+    return mask
+
+
+def _token_hits(corpus: Dict[str, Any], token: str) -> Tuple[np.ndarray, np.ndarray]:
+    """某个查询词的 (标题命中, 正文命中) 掩码；按语料缓存，重复的工具调用直接复用。"""
+    cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = corpus["token_hits"]
+    lowered = token.lower()
+    hits = cache.get(lowered)
+    if hits is None:
+        if len(cache) >= _TOKEN_HITS_LIMIT:
+            cache.clear()
+        hits = (
+            _rows_containing(*corpus["title_search"], lowered),
+            _rows_containing(*corpus["text_search"], lowered),
+        )
+        cache[lowered] = hits
+    return hits
+
+
+def _token_score_array(corpus: Dict[str, Any], tokens: Sequence[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """``_score_row`` 的向量化版本：返回每行的词命中得分，以及每个词的命中掩码。"""
+    count = int(corpus.get("doc_count") or 0)
+    title_score = np.zeros(count, dtype=np.float64)
+    body_score = np.zeros(count, dtype=np.float64)
+    matched: Dict[str, np.ndarray] = {}
+    for token in tokens:
+        title_hit, text_hit = _token_hits(corpus, token)
+        title_score += np.where(title_hit, 2.2, 0.0)
+        body_score += np.where(text_hit & ~title_hit, 1.0, 0.0)
+        matched[token] = title_hit | text_hit
+    return title_score + body_score, matched
+
+
 def _record_text(row: Dict[str, Any]) -> str:
     parts = [
         str(row.get("title") or "").strip(),
@@ -508,17 +579,8 @@ def _iter_source_entries(topic_identifier: str, start: str, end: str) -> Iterabl
     source_files, _ = _resolve_source_files(topic_identifier, start, end)
     for file_path in source_files:
         try:
-            with file_path.open("r", encoding="utf-8") as handle:
-                for row_index, line in enumerate(handle, start=1):
-                    raw = line.strip()
-                    if not raw:
-                        continue
-                    try:
-                        payload = json.loads(raw)
-                    except Exception:
-                        continue
-                    if isinstance(payload, dict):
-                        yield payload, str(file_path), row_index
+            for row_index, payload in enumerate(iter_layer_records(file_path), start=1):
+                yield payload, str(file_path), row_index
         except Exception:
             continue
 
@@ -648,22 +710,25 @@ def _source_quality_bonus(row: Dict[str, Any]) -> float:
     return round(score, 4)
 
 
-def _policy_context_adjustment(row: Dict[str, Any], query_text: str, query_terms: Sequence[str]) -> float:
-    if not _query_has_policy_intent(query_text, query_terms):
-        return 0.0
-    text = _record_text(row)
+def _policy_context_score(text: str) -> float:
     score = sum(0.18 for hint in _POLICY_CONTEXT_HINTS if hint in text)
     if any(hint in text for hint in _KITCHEN_NOISE_HINTS):
         score -= 1.8
     return round(score, 4)
 
 
+def _policy_context_adjustment(row: Dict[str, Any], query_text: str, query_terms: Sequence[str]) -> float:
+    if not _query_has_policy_intent(query_text, query_terms):
+        return 0.0
+    return _policy_context_score(_record_text(row))
+
+
 def _compute_tfidf_scores(docs: Sequence[str], query_text: str) -> List[float]:
     if not docs or not str(query_text or "").strip():
         return [0.0 for _ in docs]
     try:
         vectorizer, matrix = _build_tfidf_index(docs)
-        return _score_tfidf_query(vectorizer, matrix, query_text, len(docs))
+        return _score_tfidf_query(vectorizer, matrix, query_text, len(docs)).tolist()
     except Exception:
         return [0.0 for _ in docs]
 
@@ -674,7 +739,7 @@ def _maybe_embedding_scores(docs: Sequence[str], query_text: str, mode: str) ->
         return [0.0 for _ in docs]
     try:
         doc_vecs = _build_embedding_doc_vectors(docs[: max(12, len(docs))], mode)
-        return _score_embedding_query(doc_vecs, query_text, mode)
+        return _score_embedding_query(doc_vecs, query_text, mode).tolist()
     except Exception:
         return [0.0 for _ in docs]
 
@@ -687,7 +752,7 @@ def _select_diverse_candidates(candidates: List[Dict[str, Any]], *, top_k: int)
     while remaining and len(selected) < max(1, int(top_k or 1)):
         best_index = 0
         best_score = -10**9
-        for index, candidate in enumerate(remaining[:120]):
+        for index, candidate in enumerate(remaining[:_DIVERSITY_WINDOW]):
             adjusted = float(candidate["score"])
             adjusted -= 0.35 * platform_counts.get(candidate["platform"] or "未知", 0)
             adjusted -= 0.18 * date_counts.get(candidate["date_text"] or "未知", 0)
@@ -701,6 +766,67 @@ def _select_diverse_candidates(candidates: List[Dict[str, Any]], *, top_k: int)
     return selected
 
 
+def _build_candidate(
+    entry: Dict[str, Any],
+    *,
+    query_terms: List[str],
+    total_score: float,
+    lexical_score: float,
+    embedding_score: float,
+    source_bonus: float,
+    context_adjustment: float,
+    date_text: str,
+) -> Dict[str, Any]:
+    row = entry.get("row") if isinstance(entry.get("row"), dict) else {}
+    source_file = str(entry.get("source_file") or "").strip()
+    row_index = int(entry.get("row_index") or 0)
+    title = str(row.get("title") or "").strip()
+    contents = str(row.get("contents") or row.get("content") or "").strip()
+    text = _record_text(row)
+    _, matched_terms, token_breakdown = _score_row(text, title, query_terms)
+    # Extract engagement and sentiment data from raw row (for downstream evidence cards)
+    engagement_likes = row.get("点赞数") or row.get("like_count") or row.get("likes")
+    engagement_comments = row.get("评论数") or row.get("comment_count") or row.get("comments")
+    engagement_shares = row.get("转发数") or row.get("share_count") or row.get("shares") or row.get("转发")
+    engagement_views = row.get("播放量") or row.get("view_count") or row.get("views") or row.get("阅读量")
+    sentiment_raw = row.get("情感") or row.get("sentiment") or row.get("sentiment_label") or row.get("polarity")
+    hotness_raw = row.get("热度") or row.get("hotness_score") or row.get("hotness")
+    return {
+        "title": title,
+        "snippet": _make_snippet(text, matched_terms or _tokenize(title or text)),
+        "url": str(row.get("url") or "").strip(),
+        "published_at": str(row.get("published_at") or row.get("publish_time") or row.get("date") or "").strip(),
+        "platform": str(row.get("platform") or "").strip(),
+        "author": str(row.get("author") or "").strip(),
+        "contents": contents,
+        "polarity": str(row.get("polarity") or row.get("情感") or row.get("sentiment") or "").strip(),
+        "classification": str(row.get("classification") or "").strip(),
+        "region": str(row.get("region") or "").strip(),
+        "hit_words": str(row.get("hit_words") or "").strip(),
+        "matched_terms": matched_terms[:6],
+        "score": round(total_score, 4),
+        "source_file": source_file,
+        "source_row_index": row_index,
+        "content_quality_hint": _content_quality_hint(title, contents),
+        "score_breakdown": {
+            **token_breakdown,
+            "lexical": round(lexical_score * 6.0, 4),
+            "embedding": round(embedding_score * 2.5, 4),
+            "source_quality": source_bonus,
+            "policy_context": context_adjustment,
+        },
+        "date_text": date_text or "未知",
+        "row_text": text,
+        # Engagement data for evidence cards (NetInsight sources have these)
+        "engagement_likes": engagement_likes,
+        "engagement_comments": engagement_comments,
+        "engagement_shares": engagement_shares,
+        "engagement_views": engagement_views,
+        "sentiment_raw": sentiment_raw,
+        "hotness_raw": hotness_raw,
+    }
+
+
 def _retrieve_candidates(
     *,
     topic_identifier: str,
@@ -714,124 +840,93 @@ def _retrieve_candidates(
     top_k: int = 20,
     mode: str = "fast",
 ) -> Dict[str, Any]:
-    corpus = _get_retrieval_corpus(
-        topic_identifier=topic_identifier,
-        start=start,
-        end=end,
-        platforms=platforms,
-        time_start=time_start,
-        time_end=time_end,
-        mode=mode,
-    )
+    corpus = _get_retrieval_corpus(topic_identifier=topic_identifier, start=start, end=end, mode=mode)
+    lower_bound = str(time_start or "").strip() or str(start or "").strip()
+    upper_bound = str(time_end or "").strip() or str(end or "").strip()
     entries = [entry for entry in corpus.get("entries") or [] if isinstance(entry, dict)]
-    query_terms = _build_query_terms(query_text, entities)
-    lexical_scores = _score_tfidf_query(
-        corpus.get("vectorizer"),
-        corpus.get("matrix"),
-        query_text,
-        len(entries),
+    doc_count = len(entries)
+    in_scope = _corpus_filter_mask(
+        corpus,
+        platforms=_normalise_platforms(platforms),
+        lower_bound=lower_bound,
+        upper_bound=upper_bound,
     )
+    query_terms = _build_query_terms(query_text, entities)
+
+    # 整个语料一次性按数组打分，逐行的摘要/明细只对进入多样性筛选窗口的候选计算
+    token_scores, term_hits = _token_score_array(corpus, query_terms)
+    lexical_scores = _score_tfidf_query(corpus.get("vectorizer"), corpus.get("matrix"), query_text, doc_count)
     embedding_scores = _score_embedding_query(corpus.get("embedding_doc_vectors"), query_text, mode)
-    candidates: List[Dict[str, Any]] = []
-    for index, entry in enumerate(entries):
-        row = entry.get("row") if isinstance(entry.get("row"), dict) else {}
-        source_file = str(entry.get("source_file") or "").strip()
-        row_index = int(entry.get("row_index") or 0)
-        title = str(row.get("title") or "").strip()
-        contents = str(row.get("contents") or row.get("content") or "").strip()
-        text = _record_text(row)
-        token_score, matched_terms, token_breakdown = _score_row(text, title, query_terms)
-        lexical_score = lexical_scores[index] if index < len(lexical_scores) else 0.0
-        embedding_score = embedding_scores[index] if index < len(embedding_scores) else 0.0
-        if query_terms and token_score <= 0.0 and lexical_score <= 0.0 and embedding_score <= 0.0:
-            continue
-        source_bonus = _source_quality_bonus(row)
-        context_adjustment = _policy_context_adjustment(row, query_text, query_terms)
-        total_score = token_score + lexical_score * 6.0 + embedding_score * 2.5 + source_bonus + context_adjustment
-        if total_score <= 0.0:
-            continue
-        platform = str(row.get("platform") or "").strip()
-        date_text = _extract_date_text(row.get("published_at") or row.get("publish_time") or row.get("date")) or "未知"
-        url = str(row.get("url") or "").strip()
-        dedupe_key = url.lower() if url else _normalise_title(title)
-        # Extract engagement and sentiment data from raw row (for downstream evidence cards)
-        engagement_likes = row.get("点赞数") or row.get("like_count") or row.get("likes")
-        engagement_comments = row.get("评论数") or row.get("comment_count") or row.get("comments")
-        engagement_shares = row.get("转发数") or row.get("share_count") or row.get("shares") or row.get("转发")
-        engagement_views = row.get("播放量") or row.get("view_count") or row.get("views") or row.get("阅读量")
-        sentiment_raw = row.get("情感") or row.get("sentiment") or row.get("sentiment_label") or row.get("polarity")
-        hotness_raw = row.get("热度") or row.get("hotness_score") or row.get("hotness")
-
-        candidates.append(
-            {
-                "title": title,
-                "snippet": _make_snippet(text, matched_terms or _tokenize(title or text)),
-                "url": url,
-                "published_at": str(row.get("published_at") or row.get("publish_time") or row.get("date") or "").strip(),
-                "platform": platform,
-                "author": str(row.get("author") or "").strip(),
-                "contents": contents,
-                "polarity": str(row.get("polarity") or row.get("情感") or row.get("sentiment") or "").strip(),
-                "classification": str(row.get("classification") or "").strip(),
-                "region": str(row.get("region") or "").strip(),
-                "hit_words": str(row.get("hit_words") or "").strip(),
-                "matched_terms": matched_terms[:6],
-                "score": round(total_score, 4),
-                "source_file": source_file,
-                "source_row_index": row_index,
-                "content_quality_hint": _content_quality_hint(title, contents),
-                "score_breakdown": {
-                    **token_breakdown,
-                    "lexical": round(lexical_score * 6.0, 4),
-                    "embedding": round(embedding_score * 2.5, 4),
-                    "source_quality": source_bonus,
-                    "policy_context": context_adjustment,
-                },
-                "date_text": date_text,
-                "dedupe_key": dedupe_key or f"{source_file}:{row_index}",
-                "row_text": text,
-                # Engagement data for evidence cards (NetInsight sources have these)
-                "engagement_likes": engagement_likes,
-                "engagement_comments": engagement_comments,
-                "engagement_shares": engagement_shares,
-                "engagement_views": engagement_views,
-                "sentiment_raw": sentiment_raw,
-                "hotness_raw": hotness_raw,
-            }
+    if embedding_scores.shape[0] != doc_count:
+        embedding_scores = np.zeros(doc_count, dtype=np.float64)
+    if _query_has_policy_intent(query_text, query_terms):
+        context_scores = corpus["policy_context"]
+    else:
+        context_scores = np.zeros(doc_count, dtype=np.float64)
+    total_scores = (
+        token_scores + lexical_scores * 6.0 + embedding_scores * 2.5 + corpus["source_quality"] + context_scores
+    )
+    keep = in_scope & (total_scores > 0.0)
+    if query_terms:
+        keep &= (token_scores > 0.0) | (lexical_scores > 0.0) | (embedding_scores > 0.0)
+    candidate_indices = np.flatnonzero(keep)
+    ranked = candidate_indices[np.argsort(-np.round(total_scores[candidate_indices], 4), kind="stable")]
+    _, first_seen = np.unique(corpus["dedupe_key"][ranked], return_index=True)
+    deduped = ranked[np.sort(first_seen)]
+
+    selection_size = max(3, min(int(top_k or 20), 50))
+    date_column = corpus["date_text"]
+    shortlist = [
+        _build_candidate(
+            entries[index],
+            query_terms=query_terms,
+            total_score=float(total_scores[index]),
+            lexical_score=float(lexical_scores[index]),
+            embedding_score=float(embedding_scores[index]),
+            source_bonus=float(corpus["source_quality"][index]),
+            context_adjustment=float(context_scores[index]),
+            date_text=str(date_column[index]),
         )
-
-    by_key: Dict[str, Dict[str, Any]] = {}
-    for candidate in sorted(candidates, key=lambda item: float(item["score"]), reverse=True):
-        key = str(candidate["dedupe_key"] or "").strip()
-        if key not in by_key:
-            by_key[key] = candidate
-    deduped = list(by_key.values())
-    selected = _select_diverse_candidates(deduped, top_k=max(3, min(int(top_k or 20), 50)))
-    source_distribution: Dict[str, int] = {}
-    time_distribution: Dict[str, int] = {}
+        for index in deduped[: selection_size + _DIVERSITY_WINDOW].tolist()
+    ]
+    selected = _select_diverse_candidates(shortlist, top_k=selection_size)
+
+    platform_labels = corpus["platform"][deduped]
+    date_labels = date_column[deduped].astype(object)
+    source_distribution = dict(Counter(label or "未知" for label in platform_labels.tolist()))
+    time_distribution = Counter(label or "未知" for label in date_labels.tolist())
+    # 每行只统计按查询词顺序的前 6 个命中词，与候选的 matched_terms[:6] 一致
+    first_hits = []
+    row_matches = np.zeros(deduped.size, dtype=np.int64)
+    for position, term in enumerate(query_terms):
+        hits = term_hits[term][deduped]
+        counted = hits & (row_matches < 6)
+        row_matches += hits
+        if counted.any():
+            first_hits.append((int(np.argmax(counted)), position, term, int(counted.sum())))
     matched_terms_counter: Counter[str] = Counter()
-    for candidate in deduped:
-        source_distribution[candidate["platform"] or "未知"] = source_distribution.get(candidate["platform"] or "未知", 0) + 1
-        time_distribution[candidate["date_text"]] = time_distribution.get(candidate["date_text"], 0) + 1
-        matched_terms_counter.update(candidate["matched_terms"])
+    for _, _, term, count in sorted(first_hits):
+        matched_terms_counter[term] += count
+
     source_files = list(corpus.get("source_files") or [])
     source_resolution = str(corpus.get("source_resolution") or "").strip()
     retrieval_strategy = "tfidf_lexical"
     if str(mode or "fast").strip().lower() == "research":
-        retrieval_strategy = "tfidf_lexical+embedding" if any(score > 0 for score in embedding_scores) else "tfidf_lexical"
+        has_embedding = bool(np.any(embedding_scores[in_scope] > 0))
+        retrieval_strategy = "tfidf_lexical+embedding" if has_embedding else "tfidf_lexical"
     return {
         "query": str(query_text or "").strip(),
         "query_terms": query_terms[:10],
-        "time_start": str(corpus.get("time_start") or "").strip(),
-        "time_end": str(corpus.get("time_end") or "").strip(),
-        "items": [{key: value for key, value in item.items() if key not in {"dedupe_key", "date_text", "row_text"}} for item in selected],
+        "time_start": lower_bound,
+        "time_end": upper_bound,
+        "items": [{key: value for key, value in item.items() if key not in {"date_text", "row_text"}} for item in selected],
         "source_distribution": source_distribution,
         "time_distribution": dict(sorted(time_distribution.items(), key=lambda item: item[0])),
         "high_signal_terms": [term for term, _ in matched_terms_counter.most_common(8)],
-        "scanned_records": len(entries),
-        "matched_records": len(candidates),
-        "candidate_count": len(candidates),
-        "deduped_count": len(deduped),
+        "scanned_records": int(in_scope.sum()),
+        "matched_records": int(candidate_indices.size),
+        "candidate_count": int(candidate_indices.size),
+        "deduped_count": int(deduped.size),
         "source_files": [str(path) for path in source_files],
         "source_resolution": source_resolution,
         "retrieval_strategy": retrieval_strategy,
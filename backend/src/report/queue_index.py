@@ -0,0 +1,163 @@
+"""SQLite index of runnable report tasks.
+
+Task state stays in ``<task>.json``; this index only tracks tasks that are
+``queued`` or ``running`` so the worker can reserve the next one without
+listing and parsing every task file. One row per task:
+
+- ``reserved_by`` is 0 while the task waits and the supervisor pid once it
+  is reserved; the row is deleted when the task leaves queued/running
+  (finished, cancelled, waiting for approval);
+- ``reserve`` runs in a single ``BEGIN IMMEDIATE`` transaction, so concurrent
+  reservations never hand out the same task;
+- a topic with a reserved row is skipped, which keeps at most one running
+  task per topic;
+- candidates are ordered by ``priority + waited_seconds / aging_seconds``, so
+  higher priority goes first but old tasks are not starved.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+DEFAULT_AGING_SECONDS = 600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    task_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL DEFAULT '',
+    priority INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    reserved_by INTEGER NOT NULL DEFAULT 0,
+    reserved_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS queue_reserved ON queue (reserved_by, topic);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_READY: Set[str] = set()
+_READY_LOCK = threading.Lock()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def ensure(path: Path, load_runnable: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+    """Create the index on first use, seeding it with ``load_runnable()`` (tasks queued before it existed)."""
+    key = str(path)
+    if key in _READY:
+        return
+    with _READY_LOCK:
+        if key in _READY:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(_connect(path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+            seeded = conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone()
+            if not seeded:
+                for task in load_runnable():
+                    conn.execute(
+                        "INSERT OR IGNORE INTO queue (task_id, topic, priority, enqueued_at) VALUES (?, ?, ?, ?)",
+                        (str(task.get("id") or ""), _topic(task), _priority(task), time.time()),
+                    )
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', '1')")
+            conn.execute("COMMIT")
+        _READY.add(key)
+
+
+def _topic(task: Dict[str, Any]) -> str:
+    return str(task.get("topic_identifier") or task.get("topic") or "").strip()
+
+
+def _priority(task: Dict[str, Any]) -> int:
+    try:
+        return int(task.get("priority") or 0)
+    except Exception:
+        return 0
+
+
+def enqueue(path: Path, task: Dict[str, Any]) -> None:
+    """Add a queued task (no-op if it is already indexed)."""
+    with closing(_connect(path)) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO queue (task_id, topic, priority, enqueued_at) VALUES (?, ?, ?, ?)",
+            (str(task.get("id") or ""), _topic(task), _priority(task), time.time()),
+        )
+
+
+def remove(path: Path, task_id: str) -> None:
+    with closing(_connect(path)) as conn:
+        conn.execute("DELETE FROM queue WHERE task_id = ?", (task_id,))
+
+
+def reserve(path: Path, *, worker: int, aging_seconds: float = DEFAULT_AGING_SECONDS) -> Optional[str]:
+    """Atomically reserve the best waiting task whose topic is not already running."""
+    now = time.time()
+    with closing(_connect(path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT task_id FROM queue
+                WHERE reserved_by = 0
+                  AND topic NOT IN (SELECT topic FROM queue WHERE reserved_by != 0)
+                ORDER BY priority + (? - enqueued_at) / ? DESC, enqueued_at ASC
+                LIMIT 1
+                """,
+                (now, max(float(aging_seconds), 1.0)),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE queue SET reserved_by = ?, reserved_at = ? WHERE task_id = ?",
+                    (int(worker), now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return row[0] if row is not None else None
+
+
+def release_stale(path: Path, is_alive: Callable[[int], bool]) -> int:
+    """Return reservations held by dead workers to the queue; returns how many were released."""
+    with closing(_connect(path)) as conn:
+        holders = [row[0] for row in conn.execute("SELECT DISTINCT reserved_by FROM queue WHERE reserved_by != 0")]
+        dead = [pid for pid in holders if not is_alive(int(pid))]
+        released = 0
+        for pid in dead:
+            released += conn.execute(
+                "UPDATE queue SET reserved_by = 0, reserved_at = 0 WHERE reserved_by = ?", (pid,)
+            ).rowcount
+    return released
+
+
+def snapshot(path: Path) -> List[Dict[str, Any]]:
+    """All indexed tasks (waiting and reserved), for diagnostics and tests."""
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT task_id, topic, priority, enqueued_at, reserved_by FROM queue ORDER BY enqueued_at"
+        ).fetchall()
+    return [
+        {"task_id": row[0], "topic": row[1], "priority": row[2], "enqueued_at": row[3], "reserved_by": row[4]}
+        for row in rows
+    ]
+
+
+def forget(path: Optional[Path] = None) -> None:
+    """Drop the "schema ready" memo (tests that swap the state directory)."""
+    with _READY_LOCK:
+        if path is None:
+            _READY.clear()
+        else:
+            _READY.discard(str(path))
+
+
+__all__ = ["DEFAULT_AGING_SECONDS", "enqueue", "ensure", "forget", "release_stale", "remove", "reserve", "snapshot"]
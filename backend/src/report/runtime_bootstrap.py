@@ -11,7 +11,7 @@ from typing import Any, Dict, List, Optional
 from server_support.archive_locator import ArchiveLocator, compose_folder_name
 from server_support.topic_context import TopicContext
 from src.analyze import run_Analyze
-from src.utils.ai import call_langchain_chat
+from src.utils.ai import call_langchain_chat, closing_sessions
 from src.utils.setting.paths import bucket
 
 LOGGER = logging.getLogger(__name__)
@@ -147,11 +147,13 @@ def ensure_explain_results(
 
         runner_ok = bool(
             safe_async_call(
-                run_Explain(
-                    topic_identifier,
-                    start,
-                    end_date=end,
-                    only_overall=True,
+                closing_sessions(
+                    run_Explain(
+                        topic_identifier,
+                        start,
+                        end_date=end,
+                        only_overall=True,
+                    )
                 )
             )
         )
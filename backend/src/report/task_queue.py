@@ -16,10 +16,13 @@ from filelock import FileLock
 
 from server_support.archive_locator import compose_folder_name
 
+from . import event_log, event_stream, queue_index
 from .deep_report import REPORT_CACHE_FILENAME
 from .deep_report.runtime_contract import RUNTIME_CONTRACT_VERSION
 from ..project import get_project_manager
 from ..utils.setting.paths import get_data_root
+from ..utils.broadcast import Subscription
+from ..utils.task_store import TaskFamily, task_family
 from ..utils.setting.paths import bucket
 
 LOGGER = logging.getLogger(__name__)
@@ -27,6 +30,7 @@ LOGGER = logging.getLogger(__name__)
 STATE_ROOT = get_data_root() / "_report"
 TASK_STATE_DIR = STATE_ROOT / "tasks"
 WORKER_STATUS_PATH = STATE_ROOT / "worker.json"
+QUEUE_INDEX_FILENAME = "queue.sqlite3"
 TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
 RESUME_BEFORE_FAILURE_PHASES = {"compile", "review", "persist"}
 AGENT_LABELS = {
@@ -101,6 +105,7 @@ def create_task(payload: Dict[str, Any]) -> Dict[str, Any]:
     resume_source_phase = str(payload.get("resume_source_phase") or resume_context.get("source_failed_phase") or "").strip()
     resume_source_actor = str(payload.get("resume_source_actor") or resume_context.get("source_failed_actor") or "").strip()
     skip_validation = bool(payload.get("skip_validation"))
+    priority = _safe_int(payload.get("priority"), 0)
     if mode not in {"fast", "research"}:
         raise ValueError("mode 仅支持 fast 或 research")
     if not topic_identifier or not topic or not start:
@@ -116,6 +121,7 @@ def create_task(payload: Dict[str, Any]) -> Dict[str, Any]:
         "start": start,
         "end": end,
         "mode": mode,
+        "priority": priority,
         "status": "queued",
         "phase": "prepare",
         "percentage": 0,
@@ -141,6 +147,7 @@ def create_task(payload: Dict[str, Any]) -> Dict[str, Any]:
             ],
             "resume_context": dict(resume_context or {}),
             "skip_validation": skip_validation,
+            "priority": priority,
         },
         "parent_task_id": parent_task_id,
         "resume_kind": resume_kind,
@@ -200,24 +207,15 @@ def create_task(payload: Dict[str, Any]) -> Dict[str, Any]:
         title="任务已创建",
         message="报告任务已入队，等待 worker 执行。",
     )
+    _sync_queue_index(task)
     return get_task(task["id"])
 
 
 def list_tasks(*, topic: str = "", status: str = "", limit: int = 50) -> Dict[str, Any]:
     worker = load_worker_status()
     _reconcile_orphaned_running_tasks(worker)
-    tasks = _load_all_tasks()
-    if topic:
-        tasks = [
-            item
-            for item in tasks
-            if str(item.get("topic_identifier") or "") == topic
-            or str(item.get("topic") or "") == topic
-        ]
-    if status:
-        tasks = [item for item in tasks if str(item.get("status") or "") == status]
-    tasks.sort(key=lambda item: item.get("created_at") or "", reverse=True)
-    sliced = [attach_recent_events(item, limit=20) for item in tasks[: max(limit, 1)]]
+    tasks = _task_family().list(topic=topic, statuses=[status] if status else None, limit=max(limit, 1))
+    sliced = [attach_recent_events(item, limit=20) for item in tasks]
     return {"tasks": sliced, "summary": _summarise_tasks(sliced), "worker": worker}
 
 
@@ -411,8 +409,8 @@ def resume_before_failure_task(task_id: str) -> Dict[str, Any]:
                 "updated_at": now,
             }
         )
-        event_path.parent.mkdir(parents=True, exist_ok=True)
-        event_path.write_text("", encoding="utf-8")
+        event_log.reset(event_path)
+        event_stream.reset(task_id)
         event = {
             "event_id": 1,
             "task_id": task_id,
@@ -434,7 +432,10 @@ def resume_before_failure_task(task_id: str) -> Dict[str, Any]:
         current["event_seq"] = 1
         current["event_count"] = 1
         _atomic_write_json(state_path, current)
-        _append_jsonl_line(event_path, event)
+        _task_family().index(current)
+        event_log.append(event_path, event)
+        event_stream.publish(task_id, event, current)
+        _sync_queue_index(current)
         return attach_recent_events(current, limit=80)
 
 
@@ -465,7 +466,7 @@ def find_latest_task(
 ) -> Optional[Dict[str, Any]]:
     desired_statuses = set(statuses or [])
     matches = []
-    for task in _load_all_tasks():
+    for task in _task_family().list(topic=topic_identifier, statuses=desired_statuses):
         if str(task.get("topic_identifier") or "") != topic_identifier:
             continue
         if str(task.get("start") or "") != start:
@@ -493,31 +494,16 @@ def attach_recent_events(task: Dict[str, Any], *, limit: int = 60) -> Dict[str,
 
 
 def tail_events(task_id: str, *, limit: int = 60) -> List[Dict[str, Any]]:
-    events = load_events_since(task_id, 0)
-    return events[-max(limit, 1):]
+    return event_log.tail(task_events_path(task_id), limit=max(limit, 1))
 
 
 def load_events_since(task_id: str, since_id: int) -> List[Dict[str, Any]]:
-    path = task_events_path(task_id)
-    if not path.exists():
-        return []
-    results: List[Dict[str, Any]] = []
-    try:
-        with path.open("r", encoding="utf-8") as stream:
-            for line in stream:
-                raw = line.strip()
-                if not raw:
-                    continue
-                try:
-                    payload = json.loads(raw)
-                except Exception:
-                    continue
-                event_id = _safe_int((payload or {}).get("event_id"), 0)
-                if isinstance(payload, dict) and event_id > since_id:
-                    results.append(payload)
-    except Exception:
-        return []
-    return results
+    return event_log.read_since(task_events_path(task_id), since_id)
+
+
+def subscribe_events(task_id: str) -> Subscription:
+    """订阅任务事件推送；同一任务的所有订阅共享一个事件源（见 event_stream）。"""
+    return event_stream.subscribe(task_id, task_events_path(task_id), lambda: _load_task(task_id))
 
 
 def cancel_task(task_id: str) -> Dict[str, Any]:
@@ -543,6 +529,7 @@ def cancel_task(task_id: str) -> Dict[str, Any]:
             phase="cancelled",
             title="任务已取消",
             message=cancel_message,
+            recent_events=80,
         )
     if status != "running":
         raise ValueError("当前任务状态不支持取消")
@@ -558,6 +545,7 @@ def cancel_task(task_id: str) -> Dict[str, Any]:
         phase=str(task.get("phase") or "prepare"),
         title="收到取消请求",
         message="已请求取消，等待 worker 安全停止。",
+        recent_events=80,
     )
 
 
@@ -601,6 +589,7 @@ def requeue_task(task_id: str) -> Dict[str, Any]:
         phase="prepare",
         title="任务重新入队",
         message="任务已重置为 queued，将基于原 thread_id 从 checkpoint 继续。",
+        recent_events=80,
     )
     return task
 
@@ -610,25 +599,38 @@ def should_cancel(task_id: str) -> bool:
     return bool(task and task.get("cancel_requested"))
 
 
-def reserve_next_task() -> Optional[Dict[str, Any]]:
-    queued = sorted(
-        (item for item in _load_all_tasks() if str(item.get("status") or "") == "queued"),
-        key=lambda item: item.get("created_at") or "",
-    )
-    if not queued:
-        return None
-    task_id = str(queued[0].get("id") or "")
-    if not task_id:
-        return None
-    try:
-        return mark_task_started(
-            task_id,
-            phase="prepare",
-            percentage=1,
-            message="worker 已接单，准备检查基础数据。",
-        )
-    except ValueError:
-        return None
+def reserve_next_task(*, worker_pid: int = 0, aging_seconds: float = queue_index.DEFAULT_AGING_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    原子地领取下一个可执行任务并标记为 running。
+
+    通过 SQLite 队列索引按 优先级+等待时长 选取，跳过已有运行中任务的专题；
+    不再遍历解析全部任务文件。没有可领取的任务时返回 None。
+    """
+    index_path = _queue_index_path()
+    worker = _safe_int(worker_pid, 0) or os.getpid()
+    while True:
+        task_id = queue_index.reserve(index_path, worker=worker, aging_seconds=aging_seconds)
+        if not task_id:
+            return None
+        task = _load_task(task_id)
+        if not task or str(task.get("status") or "") != "queued":
+            # 索引残留（任务已被删除或状态已变更），丢弃后继续领取
+            queue_index.remove(index_path, task_id)
+            continue
+        try:
+            return mark_task_started(
+                task_id,
+                phase="prepare",
+                percentage=1,
+                message="worker 已接单，准备检查基础数据。",
+            )
+        except (LookupError, ValueError):
+            queue_index.remove(index_path, task_id)
+
+
+def release_stale_reservations() -> int:
+    """把已退出的 worker 持有、但任务仍在排队的预留归还队列（worker 启动时调用）。"""
+    return queue_index.release_stale(_queue_index_path(), _is_process_alive)
 
 
 def ensure_worker_running() -> Dict[str, Any]:
@@ -748,6 +750,10 @@ def set_child_pid(task_id: str, child_pid: int) -> Dict[str, Any]:
     return _update_task(task_id, lambda task: task.update({"child_pid": _safe_int(child_pid, 0)}))
 
 
+def touch_task_heartbeat(task_id: str) -> Dict[str, Any]:
+    return _update_task(task_id, lambda task: task.update({"worker_heartbeat": _utc_now()}))
+
+
 def mark_agent_started(
     task_id: str,
     *,
@@ -1103,6 +1109,7 @@ def resolve_approval(
             "decision": decision_text,
             "review_payload": normalized_review_payload if normalized_review_payload and decision_text in {"approve", "rewrite"} else {},
         },
+        recent_events=80,
     )
 
 
@@ -1120,16 +1127,28 @@ def _ensure_state_dirs() -> None:
     TASK_STATE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def _load_all_tasks() -> List[Dict[str, Any]]:
-    _ensure_state_dirs()
-    items: List[Dict[str, Any]] = []
-    for path in TASK_STATE_DIR.glob("*.json"):
-        if path.name.endswith(".events.json"):
-            continue
-        payload = _load_json(path, {})
-        if isinstance(payload, dict) and payload.get("id"):
-            items.append(payload)
-    return items
+def _task_family() -> TaskFamily:
+    return task_family("report", STATE_ROOT, task_dir=TASK_STATE_DIR)
+
+
+def _queue_index_path() -> Path:
+    path = STATE_ROOT / QUEUE_INDEX_FILENAME
+    queue_index.ensure(
+        path,
+        lambda: _task_family().list(statuses=["queued"], newest_first=False),
+    )
+    return path
+
+
+def _sync_queue_index(task: Dict[str, Any]) -> None:
+    """queued 任务写入队列索引；离开 queued/running 的任务从索引移除（释放专题占用）。"""
+    status = str(task.get("status") or "")
+    if status == "running":
+        return
+    if status == "queued":
+        queue_index.enqueue(_queue_index_path(), task)
+    else:
+        queue_index.remove(_queue_index_path(), str(task.get("id") or ""))
 
 
 def _load_task(task_id: str) -> Optional[Dict[str, Any]]:
@@ -1143,6 +1162,7 @@ def _save_task(task: Dict[str, Any]) -> None:
     with lock:
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
 
 
 def _update_task(task_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
@@ -1155,6 +1175,7 @@ def _update_task(task_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict
         mutate(task)
         task["updated_at"] = _utc_now()
         _atomic_write_json(path, task)
+        _task_family().index(task)
         return task
 
 
@@ -1169,7 +1190,14 @@ def _mutate_task_with_event(
     message: str = "",
     delta: str = "",
     payload: Optional[Dict[str, Any]] = None,
+    recent_events: int = 0,
 ) -> Dict[str, Any]:
+    """
+    更新任务状态并追加一条事件。
+
+    返回更新后的任务；只有 recent_events > 0 时才附带最近事件（面向接口响应），
+    worker 侧的高频调用不再为每次写入回读事件日志。
+    """
     state_path = task_state_path(task_id)
     event_path = task_events_path(task_id)
     lock = FileLock(str(state_path) + ".lock")
@@ -1183,8 +1211,9 @@ def _mutate_task_with_event(
             seen_keys = task.get("runtime_event_keys") if isinstance(task.get("runtime_event_keys"), list) else []
             normalized_seen = [str(item).strip() for item in seen_keys if str(item or "").strip()]
             if dedupe_key in normalized_seen:
-                return attach_recent_events(task, limit=80)
+                return attach_recent_events(task, limit=recent_events) if recent_events > 0 else task
             task["runtime_event_keys"] = [*normalized_seen[-63:], dedupe_key]
+        previous_status = str(task.get("status") or "")
         mutate(task)
         now = _utc_now()
         _apply_runtime_observability(
@@ -1214,8 +1243,12 @@ def _mutate_task_with_event(
             "payload": runtime_payload,
         }
         _atomic_write_json(state_path, task)
-        _append_jsonl_line(event_path, event)
-        return attach_recent_events(task, limit=80)
+        _task_family().index(task)
+        event_log.append(event_path, event)
+        event_stream.publish(task_id, event, task)
+        if str(task.get("status") or "") != previous_status:
+            _sync_queue_index(task)
+        return attach_recent_events(task, limit=recent_events) if recent_events > 0 else task
 
 
 def _apply_runtime_observability(
@@ -1504,9 +1537,7 @@ def _summarise_tasks(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
 def _reconcile_orphaned_running_tasks(worker_status: Dict[str, Any]) -> None:
     if worker_status.get("running"):
         return
-    for task in _load_all_tasks():
-        if str(task.get("status") or "") != "running":
-            continue
+    for task in _task_family().list(statuses=["running"]):
         task_id = str(task.get("id") or "")
         if not task_id:
             continue
@@ -1575,13 +1606,6 @@ def _atomic_write_json(path: Path, payload: Any) -> None:
         raise last_error
 
 
-def _append_jsonl_line(path: Path, payload: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as stream:
-        stream.write(json.dumps(payload, ensure_ascii=False))
-        stream.write("\n")
-
-
 def _new_task_id() -> str:
     return f"rp-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}"
 
@@ -1642,6 +1666,7 @@ __all__ = [
     "mark_task_started",
     "record_tool_call",
     "record_tool_result",
+    "release_stale_reservations",
     "reserve_next_task",
     "resolve_approval",
     "resume_before_failure_task",
@@ -1650,9 +1675,11 @@ __all__ = [
     "set_structured_result_digest",
     "set_worker_pid",
     "should_cancel",
+    "subscribe_events",
     "tail_events",
     "task_events_path",
     "task_state_path",
+    "touch_task_heartbeat",
     "update_task_trust",
     "update_todos",
     "write_worker_status",
@@ -3,11 +3,12 @@ from __future__ import annotations
 
 import logging
 import os
+import subprocess
 import sys
 import threading
 import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 BACKEND_DIR = Path(__file__).resolve().parents[2]
 SRC_DIR = BACKEND_DIR / "src"
@@ -40,15 +41,18 @@ from src.report.task_queue import (  # type: ignore
     mark_task_failed,
     mark_task_progress,
     set_structured_result_digest,
+    release_stale_reservations,
     reserve_next_task,
     set_worker_pid,
     should_cancel,
+    touch_task_heartbeat,
     update_task_trust,
     update_todos,
     write_worker_status,
 )
 from src.utils.setting.paths import get_data_root  # type: ignore
 from src.utils.setting.paths import bucket  # type: ignore
+from src.utils.setting.settings import settings  # type: ignore
 
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(
@@ -69,6 +73,13 @@ PHASE_PERCENTAGE = {
     "persist": 98,
 }
 
+DEFAULT_POOL_SLOTS = 2
+DEFAULT_IDLE_SECONDS = 90.0
+DEFAULT_AGING_MINUTES = 10.0
+HEARTBEAT_SECONDS = 12.0
+SUPERVISOR_POLL_SECONDS = 1.0
+IDLE_POLL_SECONDS = 2.0
+
 PROJECT_MANAGER = get_project_manager()
 
 
@@ -76,83 +87,167 @@ class TaskCancelled(RuntimeError):
     """Raised when the queue item was cancelled by the user."""
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) >= 2 and args[0] == "--task":
+        _run_slot(args[1])
+        return
+    _supervise()
+
+
+def _resolve_pool_settings() -> Dict[str, Any]:
+    """读取 worker 池配置：llm.langchain.report.worker（环境变量优先）。"""
+    try:
+        settings.reload()
+    except Exception:
+        pass
+    config = settings.get("llm.langchain.report.worker", {}) or {}
+    if not isinstance(config, dict):
+        config = {}
+
+    def _number(key: str, env_name: str, default: float) -> float:
+        raw = str(os.getenv(env_name) or "").strip() or config.get(key, default)
+        try:
+            return float(raw)
+        except (TypeError, ValueError):
+            return default
+
+    return {
+        "slots": max(1, int(_number("slots", "OPINION_REPORT_WORKER_SLOTS", DEFAULT_POOL_SLOTS))),
+        "idle_seconds": max(0.0, _number("idle_seconds", "OPINION_REPORT_WORKER_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)),
+        "aging_seconds": max(1.0, _number("aging_minutes", "OPINION_REPORT_WORKER_AGING_MINUTES", DEFAULT_AGING_MINUTES) * 60),
+    }
+
+
+def _spawn_slot(task_id: str) -> subprocess.Popen:
+    creation_flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    return subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "--task", task_id],
+        cwd=str(BACKEND_DIR),
+        creationflags=creation_flags,
+    )
+
+
+def _finalise_slot(task_id: str, returncode: Optional[int]) -> None:
+    """子进程退出后任务仍处于 running，说明进程异常退出，按取消请求或失败收尾。"""
+    try:
+        task = get_task(task_id)
+    except LookupError:
+        return
+    if str(task.get("status") or "") != "running":
+        return
+    if bool(task.get("cancel_requested")):
+        mark_task_cancelled(task_id, "报告子进程已退出，取消请求已生效。")
+    else:
+        mark_task_failed(task_id, f"报告子进程异常退出（exit code {returncode}）。")
+
+
+def _supervise() -> None:
+    """
+    worker 主进程：最多同时运行 slots 个报告任务，每个任务在独立子进程中执行。
+
+    任务领取走 SQLite 队列索引（同专题互斥、按优先级与等待时长排序），
+    空闲超过 idle_seconds 且没有运行中的子进程时退出，由 ensure_worker_running 按需重新拉起。
+    """
+    pool = _resolve_pool_settings()
     started_at = _utc_now()
-    idle_seconds = 90
     last_active_at = time.monotonic()
-    write_worker_status(
-        {
+    last_status: Dict[str, Any] = {}
+    last_status_at = 0.0
+    children: Dict[str, subprocess.Popen] = {}
+
+    def _write_status(status: str, *, running: bool = True) -> None:
+        nonlocal last_status, last_status_at
+        active = sorted(children)
+        payload = {
             "pid": os.getpid(),
-            "status": "idle",
-            "running": True,
-            "current_task_id": "",
-            "last_heartbeat": _utc_now(),
+            "status": status,
+            "running": running,
+            "current_task_id": active[0] if active else "",
+            "active_task_ids": active,
+            "slots": pool["slots"],
             "started_at": started_at,
         }
-    )
+        # 状态不变时按心跳间隔写入，避免每轮循环都重写 worker.json
+        if payload == last_status and time.monotonic() - last_status_at < HEARTBEAT_SECONDS:
+            return
+        last_status = dict(payload)
+        last_status_at = time.monotonic()
+        write_worker_status({**payload, "last_heartbeat": _utc_now()})
+
+    released = release_stale_reservations()
+    if released:
+        LOGGER.warning("report worker | released %s stale reservation(s)", released)
+    _write_status("idle")
     try:
         while True:
-            task = reserve_next_task()
-            if not task:
-                write_worker_status(
-                    {
-                        "pid": os.getpid(),
-                        "status": "idle",
-                        "running": True,
-                        "current_task_id": "",
-                        "last_heartbeat": _utc_now(),
-                        "started_at": started_at,
-                    }
+            for task_id, process in list(children.items()):
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+                children.pop(task_id, None)
+                last_active_at = time.monotonic()
+                _finalise_slot(task_id, returncode)
+
+            while len(children) < pool["slots"]:
+                task = reserve_next_task(worker_pid=os.getpid(), aging_seconds=pool["aging_seconds"])
+                if not task:
+                    break
+                task_id = str(task.get("id") or "")
+                try:
+                    children[task_id] = _spawn_slot(task_id)
+                except Exception as exc:
+                    LOGGER.exception("Report worker failed to start slot | task=%s", task_id)
+                    mark_task_failed(task_id, f"无法启动报告子进程：{exc}")
+                    continue
+                last_active_at = time.monotonic()
+                LOGGER.warning(
+                    "report worker | slot started | task=%s active=%s/%s", task_id, len(children), pool["slots"]
                 )
-                if time.monotonic() - last_active_at >= idle_seconds:
-                    write_worker_status(
-                        {
-                            "pid": os.getpid(),
-                            "status": "stopped",
-                            "running": False,
-                            "current_task_id": "",
-                            "last_heartbeat": _utc_now(),
-                            "started_at": started_at,
-                        }
-                    )
-                    return
-                time.sleep(2.0)
-                continue
 
-            last_active_at = time.monotonic()
-            task_id = str(task.get("id") or "")
-            set_worker_pid(task_id, os.getpid())
-            write_worker_status(
-                {
-                    "pid": os.getpid(),
-                    "status": "running",
-                    "running": True,
-                    "current_task_id": task_id,
-                    "last_heartbeat": _utc_now(),
-                    "started_at": started_at,
-                }
-            )
-            try:
-                _run_task(task_id)
-            except TaskCancelled as exc:
-                mark_task_cancelled(task_id, str(exc))
-            except Exception as exc:
-                LOGGER.exception("Report worker failed | task=%s", task_id)
-                diagnostic = _build_failure_diagnostic(task_id, exc)
-                mark_task_failed(task_id, _failure_message(exc, diagnostic), payload=diagnostic)
+            if children:
+                _write_status("running")
+                time.sleep(SUPERVISOR_POLL_SECONDS)
+                continue
+            _write_status("idle")
+            if time.monotonic() - last_active_at >= pool["idle_seconds"]:
+                return
+            time.sleep(IDLE_POLL_SECONDS)
     finally:
+        # 主进程意外退出时结束子进程，运行中的任务由 _reconcile_orphaned_running_tasks 收尾
+        for process in children.values():
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        children.clear()
         write_worker_status(
             {
                 "pid": os.getpid(),
                 "status": "stopped",
                 "running": False,
                 "current_task_id": "",
+                "active_task_ids": [],
+                "slots": pool["slots"],
                 "last_heartbeat": _utc_now(),
                 "started_at": started_at,
             }
         )
 
 
+def _run_slot(task_id: str) -> None:
+    """子进程入口：执行单个已领取的任务。"""
+    set_worker_pid(task_id, os.getpid())
+    try:
+        _run_task(task_id)
+    except TaskCancelled as exc:
+        mark_task_cancelled(task_id, str(exc))
+    except Exception as exc:
+        LOGGER.exception("Report worker failed | task=%s", task_id)
+        diagnostic = _build_failure_diagnostic(task_id, exc)
+        mark_task_failed(task_id, _failure_message(exc, diagnostic), payload=diagnostic)
+
+
 def _run_task(task_id: str) -> None:
     task = get_task(task_id)
     request = dict(task.get("request") or {})
@@ -194,7 +289,7 @@ def _run_task(task_id: str) -> None:
     stop_event = threading.Event()
     heartbeat = threading.Thread(
         target=_heartbeat_loop,
-        args=(task_id, stop_event, task.get("started_at") or _utc_now()),
+        args=(task_id, stop_event),
         daemon=True,
     )
     heartbeat.start()
@@ -501,20 +596,11 @@ def _run_task(task_id: str) -> None:
         heartbeat.join(timeout=1.0)
 
 
-def _heartbeat_loop(task_id: str, stop_event: threading.Event, started_at: str) -> None:
-    while not stop_event.wait(12.0):
+def _heartbeat_loop(task_id: str, stop_event: threading.Event) -> None:
+    # worker.json 由主进程维护，子进程只刷新自身任务的心跳
+    while not stop_event.wait(HEARTBEAT_SECONDS):
         try:
-            task = get_task(task_id)
-            write_worker_status(
-                {
-                    "pid": os.getpid(),
-                    "status": "running",
-                    "running": True,
-                    "current_task_id": task_id,
-                    "last_heartbeat": _utc_now(),
-                    "started_at": started_at,
-                }
-            )
+            touch_task_heartbeat(task_id)
         except Exception:
             continue
 
@@ -17,6 +17,7 @@ from src.topic.config import (
 )
 
 PROJECT_MANAGER = get_project_manager()
+from src.utils.io.layers import layer_exists
 from src.utils.setting.paths import bucket, get_data_root
 from pathlib import Path
 import logging
@@ -521,8 +522,8 @@ def check_topic_availability():
                     else:
                         start, end = dir_name, dir_name
 
-                    # 检查是否有总体.jsonl文件
-                    has_data = (cache_dir / "总体.jsonl").exists()
+                    # 检查是否有总体层文件（JSONL/Parquet）
+                    has_data = layer_exists(cache_dir, "总体")
 
                     fetch_caches.append({
                         "folder": dir_name,
@@ -41,6 +41,9 @@ from ..utils.logging.logging import (
 from ..utils.setting.env_loader import get_api_key, load_env_file
 from ..utils.setting.paths import get_project_root, bucket
 from ..utils.io.excel import read_csv
+from ..utils.io.layers import find_layer_file, list_layer_files, read_layer
+from ..utils.rag.embedding_cache import get_embedding_cache
+from ..utils.segmentation import segment_texts, token_cache_path
 
 
 # 配置常量
@@ -87,12 +90,12 @@ def _deduplicate_by_contents(df: pd.DataFrame, logger, source: str) -> pd.DataFr
 
 def _read_json_records(file_path: Path, logger) -> pd.DataFrame:
     """
-    读取 JSON / JSONL 文件为 DataFrame，尽最大可能兼容常见结构。
+    读取 JSON / JSONL / Parquet 文件为 DataFrame，尽最大可能兼容常见结构。
     """
     try:
         suffix = file_path.suffix.lower()
-        if suffix == ".jsonl":
-            df = pd.read_json(file_path, lines=True)
+        if suffix in {".jsonl", ".parquet"}:
+            df = read_layer(file_path)
         else:
             raw = file_path.read_text(encoding="utf-8").strip()
             if not raw:
@@ -123,15 +126,17 @@ def _normalise_json_payload(payload: Any) -> Iterable[Dict]:
 
 
 def _load_json_sources(fetch_dir: Path, logger) -> pd.DataFrame:
-    priority_files = ["总体.jsonl", "总体.json"]
-    for filename in priority_files:
-        file_path = fetch_dir / filename
-        if file_path.exists():
+    # 总体层（Parquet 优先，其次 JSONL），再退回旧版 总体.json
+    priority_files = [find_layer_file(fetch_dir, "总体"), fetch_dir / "总体.json"]
+    for file_path in priority_files:
+        if file_path is not None and file_path.exists():
             df = _read_json_records(file_path, logger)
             if not df.empty:
                 return _deduplicate_by_contents(df, logger, "JSON")
 
-    json_files = sorted([f for f in fetch_dir.glob("*.json*") if f.name not in priority_files])
+    json_files = list_layer_files(fetch_dir, exclude=("总体",)) + sorted(
+        f for f in fetch_dir.glob("*.json") if f.name != "总体.json"
+    )
     if not json_files:
         return pd.DataFrame()
 
@@ -247,13 +252,24 @@ def _load_stopwords(path: Path) -> List[str]:
     return []
 
 
-def _segment(texts: List[str], stopwords: List[str], userdict: Optional[Path]) -> List[str]:
-    if userdict and userdict.exists():
-        jieba.load_userdict(str(userdict))
+def _load_user_words(path: Optional[Path]) -> List[str]:
+    """读取用户词典（jieba userdict 格式，每行首列为词）"""
+    if not path or not path.exists():
+        return []
+    words: List[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        parts = line.strip().split()
+        if parts and not parts[0].startswith("#"):
+            words.append(parts[0])
+    return words
+
+
+def _segment(texts: List[str], stopwords: List[str], userdict: Optional[Path],
+             cache_path: Optional[Path] = None) -> List[str]:
     stopset = set(stopwords)
     result: List[str] = []
-    for t in texts:
-        words = [w for w in jieba.cut(t) if len(w) >= 2 and not w.isdigit() and w not in stopset]
+    for tokens in segment_texts(texts, user_words=_load_user_words(userdict), cache_path=cache_path):
+        words = [w for w in tokens if len(w) >= 2 and not w.isdigit() and w not in stopset]
         result.append(" ".join(words))
     return result
 
@@ -288,13 +304,29 @@ def _embed(batch_texts: List[str], api_key: str, logger=None, base_url: str = "h
     if not processed_texts:
         return np.array([])
     
-    # 生成向量
+    # 生成向量（命中共享向量缓存的文本不再请求接口）
     client = OpenAI(api_key=api_key, base_url=base_url)
-    all_vecs: List[List[float]] = []
-    for i in range(0, len(processed_texts), batch_size):
-        sub = processed_texts[i:i + batch_size]
-        resp = client.embeddings.create(model=model, input=sub, dimensions=dimensions, encoding_format="float")
-        all_vecs.extend([item.embedding for item in resp.data])
+
+    def _request(texts: List[str]) -> List[List[float]]:
+        vecs: List[List[float]] = []
+        for i in range(0, len(texts), batch_size):
+            sub = texts[i:i + batch_size]
+            resp = client.embeddings.create(model=model, input=sub, dimensions=dimensions, encoding_format="float")
+            vecs.extend([item.embedding for item in sorted(resp.data, key=lambda item: item.index)])
+        return vecs
+
+    cache = get_embedding_cache(f"qwen/{model}", dimensions)
+    if cache is None:
+        all_vecs = np.array(_request(processed_texts), dtype=np.float32)
+    else:
+        hits_before, misses_before = cache.hits, cache.misses
+        all_vecs = cache.encode(processed_texts, _request)
+        if logger:
+            log_success(
+                logger,
+                f"向量缓存命中{cache.hits - hits_before}条 | 未命中{cache.misses - misses_before}条",
+                "TopicBertopic",
+            )
     
     # 如果有空文本，填充零向量
     if len(valid_indices) < len(batch_texts):
@@ -667,7 +699,7 @@ def run_topic_bertopic(topic: str, start_date: str, end_date: str = None,
 
         # 分词
         sw = _load_stopwords(stopwords_path)
-        seg = _segment(cleaned, sw, userdict_path)
+        seg = _segment(cleaned, sw, userdict_path, cache_path=token_cache_path(fetch_path))
 
         # 向量化
         _emit_progress("embed", 45, "正在生成文本向量。")
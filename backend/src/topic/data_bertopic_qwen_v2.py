@@ -43,7 +43,9 @@ from ..utils.logging.logging import (
 from ..utils.setting.env_loader import load_env_file
 from ..utils.setting.paths import get_project_root, bucket
 from ..utils.io.excel import read_jsonl, write_jsonl
+from ..utils.io.layers import find_layer_file, layer_exists, list_layer_files, read_layer
 from ..utils.setting.settings import settings
+from ..utils.segmentation import segment_texts, token_cache_path
 from ..utils.ai import call_langchain_chat
 from ..project.manager import get_project_manager
 from ..fetch.data_fetch import get_topic_available_date_range
@@ -735,7 +737,7 @@ def _ensure_fetch_data(topic: str, start_date: str, end_date: str, logger, bucke
     paths = _default_paths(storage_topic, start_date, end_date, bucket_topic=storage_topic)
     fetch_dir = paths["fetch_dir"]
 
-    if fetch_dir.exists() and (fetch_dir / "总体.jsonl").exists():
+    if fetch_dir.exists() and layer_exists(fetch_dir, "总体"):
         log_success(logger, f"使用缓存数据: {fetch_dir}", "TopicBertopic")
         return True
 
@@ -783,10 +785,10 @@ def _load_and_merge_data(fetch_dir: Path, logger) -> List[Tuple[str, str]]:
         return []
 
     # 优先读取总体数据
-    overall_file = fetch_dir / "总体.jsonl"
-    if overall_file.exists():
+    overall_file = find_layer_file(fetch_dir, "总体")
+    if overall_file is not None:
         try:
-            df = read_jsonl(
+            df = read_layer(
                 overall_file,
                 dtype={
                     "id": str,
@@ -827,12 +829,12 @@ def _load_and_merge_data(fetch_dir: Path, logger) -> List[Tuple[str, str]]:
             log_error(logger, f"读取总体数据失败: {e}", "TopicBertopic")
 
     # 如果没有总体数据，则合并各渠道数据
-    jsonl_files = list(fetch_dir.glob("*.jsonl"))
-    if not jsonl_files:
-        log_error(logger, f"未找到任何JSONL文件", "TopicBertopic")
+    layer_files = list_layer_files(fetch_dir)
+    if not layer_files:
+        log_error(logger, f"未找到任何渠道数据文件", "TopicBertopic")
         return []
 
-    log_success(logger, f"找到{len(jsonl_files)}个渠道文件，开始合并", "TopicBertopic")
+    log_success(logger, f"找到{len(layer_files)}个渠道文件，开始合并", "TopicBertopic")
 
     merged_records: List[Tuple[str, str]] = []
     record_index: Dict[str, int] = {}
@@ -853,9 +855,9 @@ def _load_and_merge_data(fetch_dir: Path, logger) -> List[Tuple[str, str]]:
             appended += 1
         return appended
 
-    for file_path in jsonl_files:
+    for file_path in layer_files:
         try:
-            df = read_jsonl(
+            df = read_layer(
                 file_path,
                 dtype={
                     "id": str,
@@ -915,22 +917,30 @@ def _load_dict_file(file_path: Path, logger) -> set:
         return set()
 
 
-def _preprocess_text(texts: List[str], user_words: set, stop_words: set, logger) -> Tuple[List[str], List[int]]:
-    """文本预处理和分词，返回 (处理后的文本列表, 对应的原始索引列表)"""
-    # 添加用户词典
-    for word in user_words:
-        jieba.add_word(word)
+def _preprocess_text(
+    texts: List[str],
+    user_words: set,
+    stop_words: set,
+    logger,
+    cache_path: Optional[Path] = None,
+) -> Tuple[List[str], List[int]]:
+    """文本预处理和分词，返回 (处理后的文本列表, 对应的原始索引列表)
+
+    分词走共享分词服务：结果按文本与用户词典缓存（cache_path 通常为 fetch 目录下的分词缓存），
+    文本较多时自动多进程并行。
+    """
+    indices = [i for i, text in enumerate(texts) if not pd.isna(text) and str(text).strip()]
+    total_count = len(indices)
+    segmented = segment_texts(
+        [str(texts[i]) for i in indices],
+        user_words=user_words,
+        cache_path=cache_path,
+    )
+    log_success(logger, f"分词完成: {total_count} 条文本", "TopicBertopic")
 
     processed_texts = []
     valid_indices = []
-    
-    for i, text in enumerate(texts):
-        if pd.isna(text) or not str(text).strip():
-            continue
-
-        # 分词
-        words = jieba.lcut(text)
-
+    for i, words in zip(indices, segmented):
         # 过滤停用词和短词
         words = [
             w for w in words
@@ -943,13 +953,6 @@ def _preprocess_text(texts: List[str], user_words: set, stop_words: set, logger)
             processed_texts.append(' '.join(words))
             valid_indices.append(i)
 
-        # 进度提示
-        if (i + 1) % 1000 == 0:
-            if total_count:
-                log_success(logger, f"已处理 {i + 1}/{total_count} 条文本", "TopicBertopic")
-            else:
-                log_success(logger, f"已处理 {i + 1} 条文本", "TopicBertopic")
-
     log_success(logger, f"文本预处理完成，有效文本: {len(processed_texts)}", "TopicBertopic")
     return processed_texts, valid_indices
 
@@ -2032,7 +2035,9 @@ def run_topic_bertopic(
             return False
 
         # 文本预处理
-        processed_texts, valid_indices = _preprocess_text(texts, user_words, stop_words, logger)
+        processed_texts, valid_indices = _preprocess_text(
+            texts, user_words, stop_words, logger, cache_path=token_cache_path(paths["fetch_dir"])
+        )
         
         if not processed_texts:
             log_error(logger, "文本预处理后没有有效内容", "TopicBertopic")
@@ -10,7 +10,8 @@ from typing import Any, Dict, List, Optional
 
 from ..utils.setting.paths import bucket, ensure_bucket
 from ..utils.logging.logging import setup_logger, log_module_start, log_success, log_error, log_skip
-from ..utils.io.excel import read_jsonl, write_jsonl, sanitize_dataframe, get_standard_table_schema
+from ..utils.io.excel import sanitize_dataframe, get_standard_table_schema
+from ..utils.io.layers import list_layer_files, read_layer, resolve_layer_format, write_layer
 from ..utils.io.db import db_manager
 from sqlalchemy import DateTime, MetaData, String, Table, Text, Column, inspect, inspect, text
 from sqlalchemy.exc import IntegrityError as SAIntegrityError
@@ -49,9 +50,9 @@ def _date_variants(date: str) -> List[str]:
     return variants
 
 
-def _resolve_layer_jsonl_files(layer: str, topic: str, date: str) -> tuple[str, Any, List[Any]]:
+def _resolve_layer_files(layer: str, topic: str, date: str) -> tuple[str, Any, List[Any]]:
     """
-    在同义日期目录里查找首个可用 JSONL 文件集合。
+    在同义日期目录里查找首个可用层文件（JSONL/Parquet）集合。
     """
     first_existing_date = ""
     first_existing_dir = None
@@ -60,7 +61,7 @@ def _resolve_layer_jsonl_files(layer: str, topic: str, date: str) -> tuple[str,
         if layer_dir.exists() and first_existing_dir is None:
             first_existing_dir = layer_dir
             first_existing_date = candidate_date
-        files = sorted(layer_dir.glob("*.jsonl"))
+        files = list_layer_files(layer_dir)
         if files:
             return candidate_date, layer_dir, files
 
@@ -156,9 +157,9 @@ def _write_direct_ingest_summary(
 
 def _prepare_intermediate_from_clean(topic: str, date: str, logger=None) -> Dict[str, Any]:
     """
-    当 filter 层不存在产物时，从 clean 层生成可入库的中间 JSONL。
+    当 filter 层不存在产物时，从 clean 层生成可入库的中间层文件。
     """
-    resolved_clean_date, clean_dir, clean_files = _resolve_layer_jsonl_files("clean", topic, date)
+    resolved_clean_date, clean_dir, clean_files = _resolve_layer_files("clean", topic, date)
     filter_dir = ensure_bucket("filter", topic, date)
     result: Dict[str, Any] = {
         "status": "error",
@@ -180,11 +181,12 @@ def _prepare_intermediate_from_clean(topic: str, date: str, logger=None) -> Dict
         )
         return result
 
+    layer_format = resolve_layer_format(topic)
     total_rows = 0
     for file_path in clean_files:
         channel = file_path.stem
         try:
-            source_df = read_jsonl(file_path)
+            source_df = read_layer(file_path)
             if source_df is None or len(source_df) == 0:
                 result["skipped"].append(
                     {"channel": channel, "file": file_path.name, "reason": "清洗文件无数据"}
@@ -203,8 +205,7 @@ def _prepare_intermediate_from_clean(topic: str, date: str, logger=None) -> Dict
                 log_skip(logger, f"{file_path.name} 缺少有效ID，跳过中间数据生成", "Upload")
                 continue
 
-            output_file = filter_dir / file_path.name
-            write_jsonl(prepared_df, output_file)
+            output_file = write_layer(prepared_df, filter_dir, channel, fmt=layer_format)
             total_rows += len(prepared_df)
             result["generated"].append(
                 {"channel": channel, "file": output_file.name, "rows": len(prepared_df)}
@@ -291,16 +292,15 @@ def _rebuild_from_fetch(
         log_error(logger, result["message"], "Rebuild")
         return result
 
-    jsonl_files = sorted(fetch_dir.glob("*.jsonl"))
     # 跳过合并文件（如 总体.jsonl），避免重复导入
     MERGED_FILE_NAMES = {"总体", "all", "merged", "combined"}
-    jsonl_files = [f for f in jsonl_files if f.stem not in MERGED_FILE_NAMES]
-    if not jsonl_files:
-        result["message"] = f"未在 fetch 层找到有效的渠道 JSONL 文件: {fetch_dir}"
+    layer_files = list_layer_files(fetch_dir, exclude=MERGED_FILE_NAMES)
+    if not layer_files:
+        result["message"] = f"未在 fetch 层找到有效的渠道数据文件: {fetch_dir}"
         log_error(logger, result["message"], "Rebuild")
         return result
 
-    log_success(logger, f"从 fetch 层({fetch_date})找到 {len(jsonl_files)} 个数据文件", "Rebuild")
+    log_success(logger, f"从 fetch 层({fetch_date})找到 {len(layer_files)} 个数据文件", "Rebuild")
 
     # 确保数据库存在
     if not db_manager.ensure_database(target_database):
@@ -322,7 +322,7 @@ def _rebuild_from_fetch(
     try:
         with engine.begin() as conn:
             # 创建表（如果不存在），已存在则 TRUNCATE 清空（重建 = 全量覆盖）
-            for file_path in jsonl_files:
+            for file_path in layer_files:
                 table_name = file_path.stem
                 if not table_exists(conn, table_name, target_database):
                     if not create_table_with_standard_schema(conn, table_name, topic, logger):
@@ -339,10 +339,10 @@ def _rebuild_from_fetch(
 
             # 上传数据
             total_rows = 0
-            for file_path in jsonl_files:
+            for file_path in layer_files:
                 table_name = file_path.stem
                 try:
-                    df = read_jsonl(file_path)
+                    df = read_layer(file_path)
                     if df is None or len(df) == 0:
                         log_skip(logger, f"{file_path.name} 无数据，跳过", "Rebuild")
                         result["skipped"].append({"channel": table_name, "reason": "文件无数据"})
@@ -611,7 +611,7 @@ def upload_filtered_excels(
     """
 
     # 1. 定位文件
-    resolved_filter_date, filter_dir, jsonl_files = _resolve_layer_jsonl_files("filter", topic, date)
+    resolved_filter_date, filter_dir, layer_files = _resolve_layer_files("filter", topic, date)
 
     target_database = (dataset_name or topic).strip()
     if not target_database:
@@ -671,7 +671,7 @@ def upload_filtered_excels(
                     candidate = filter_dir / file_name.strip()
                     if candidate.exists():
                         resolved_files.append(candidate)
-            jsonl_files = sorted(resolved_files)
+            layer_files = sorted(resolved_files)
             response["source_layer"] = "clean->filter"
         else:
             message = str(intermediate.get("message") or "生成中间数据失败")
@@ -682,7 +682,7 @@ def upload_filtered_excels(
                 "message": message,
             }
 
-    if not jsonl_files:
+    if not layer_files:
         if prepare_intermediate_from_clean:
             message = "中间数据已生成流程未产出可入库文件，请检查 clean 层数据。"
         else:
@@ -721,7 +721,7 @@ def upload_filtered_excels(
     try:
         with engine.begin() as conn:
             # 4. 创建表（如果不存在）
-            for file_path in jsonl_files:
+            for file_path in layer_files:
                 table_name = file_path.stem
 
                 if not table_exists(conn, table_name, target_database):
@@ -732,12 +732,12 @@ def upload_filtered_excels(
                         continue
 
             # 5. 上传数据
-            for file_path in jsonl_files:
+            for file_path in layer_files:
                 table_name = file_path.stem
 
                 try:
                     # 读取JSONL文件
-                    df = read_jsonl(file_path)
+                    df = read_layer(file_path)
                     if df is None or len(df) == 0:
                         log_skip(logger, f"{file_path.name} 无数据，跳过", "Upload")
                         response["skipped"].append(
@@ -6,6 +6,8 @@ import uuid
 from .qwen import QwenClient, get_qwen_client
 from .openai_client import OpenAIClient, get_openai_client
 from .langchain_client import build_langchain_chat_model, call_langchain_chat, call_langchain_with_tools
+from .http_pool import close_sessions, closing_sessions, get_pool_stats, get_session, pooled_session
+from .rate_limit import RateLimitError, RateLimiter
 
 
 def ensure_langchain_uuid_compat() -> None:
@@ -27,5 +29,12 @@ __all__ = [
     'build_langchain_chat_model',
     'call_langchain_chat',
     'call_langchain_with_tools',
+    'close_sessions',
+    'closing_sessions',
+    'get_pool_stats',
+    'get_session',
+    'pooled_session',
+    'RateLimitError',
+    'RateLimiter',
     'ensure_langchain_uuid_compat',
 ]
@@ -0,0 +1,257 @@
+"""
+大模型 HTTP 调用共享连接池
+
+每个事件循环持有一个 aiohttp.ClientSession（以及 OpenAI 兼容客户端使用的 httpx.AsyncClient），
+同一循环内的所有调用复用 keep-alive 连接，避免每个请求重复建立 TCP/TLS。
+
+- 连接数、keep-alive 与超时读取 configs/llm.yaml 的 ``http_pool``；
+- 通过 aiohttp TraceConfig 统计请求耗时与连接新建/复用次数（``get_pool_stats``）；
+- 入口函数用 ``asyncio.run(closing_sessions(coro))`` 运行协程，循环结束前关闭本循环的连接；
+  已关闭循环上遗留的会话引用会在下次取会话及进程退出时丢弃。
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Deque, Dict, TypeVar
+
+import aiohttp
+
+from ..setting.settings import settings
+
+T = TypeVar("T")
+
+DEFAULT_POOL_CONFIG: Dict[str, Any] = {
+    "limit": 100,
+    "limit_per_host": 32,
+    "keepalive_timeout": 60,
+    "total_timeout": 180,
+    "connect_timeout": 10,
+    "sock_read_timeout": 120,
+}
+
+_LATENCY_WINDOW = 2048
+
+
+class PoolStats:
+    """连接池运行指标（线程安全，跨事件循环累计）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.failures = 0
+            self.connections_created = 0
+            self.connections_reused = 0
+            self.total_latency = 0.0
+            self.latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def record_request(self, latency: float, ok: bool = True) -> None:
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.failures += 1
+            self.total_latency += latency
+            self.latencies.append(latency)
+
+    def record_connection(self, reused: bool) -> None:
+        with self._lock:
+            if reused:
+                self.connections_reused += 1
+            else:
+                self.connections_created += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self.latencies)
+            connections = self.connections_created + self.connections_reused
+
+            def _percentile(ratio: float) -> float:
+                if not recent:
+                    return 0.0
+                return round(recent[min(len(recent) - 1, int(len(recent) * ratio))] * 1000, 1)
+
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "connections_created": self.connections_created,
+                "connections_reused": self.connections_reused,
+                "reuse_rate": round(self.connections_reused / connections, 4) if connections else 0.0,
+                "avg_latency_ms": round(self.total_latency / self.requests * 1000, 1) if self.requests else 0.0,
+                "p50_latency_ms": _percentile(0.5),
+                "p95_latency_ms": _percentile(0.95),
+            }
+
+
+_STATS = PoolStats()
+_SESSIONS: Dict[int, "tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]"] = {}
+_HTTPX_CLIENTS: Dict[int, "tuple[asyncio.AbstractEventLoop, Any]"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def pool_config() -> Dict[str, Any]:
+    """合并 llm.http_pool 配置与默认值。"""
+    configured = settings.get("llm.http_pool") or {}
+    merged = dict(DEFAULT_POOL_CONFIG)
+    if isinstance(configured, dict):
+        merged.update({key: value for key, value in configured.items() if value is not None})
+    return merged
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+
+    async def _on_request_start(session, context, params) -> None:
+        context.started_at = time.perf_counter()
+
+    async def _on_request_end(session, context, params) -> None:
+        _STATS.record_request(time.perf_counter() - context.started_at, ok=params.response.status < 400)
+
+    async def _on_request_exception(session, context, params) -> None:
+        _STATS.record_request(time.perf_counter() - getattr(context, "started_at", time.perf_counter()), ok=False)
+
+    async def _on_connection_create_end(session, context, params) -> None:
+        _STATS.record_connection(reused=False)
+
+    async def _on_connection_reuseconn(session, context, params) -> None:
+        _STATS.record_connection(reused=True)
+
+    trace.on_request_start.append(_on_request_start)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_request_exception.append(_on_request_exception)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    trace.on_connection_reuseconn.append(_on_connection_reuseconn)
+    return trace
+
+
+def _discard_closed_loops() -> None:
+    """丢弃已关闭事件循环上遗留的会话引用（循环已关闭，无法再 await 关闭，由垃圾回收释放）。"""
+    with _REGISTRY_LOCK:
+        for registry in (_SESSIONS, _HTTPX_CLIENTS):
+            for key, (loop, _client) in list(registry.items()):
+                if loop.is_closed():
+                    registry.pop(key, None)
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    返回当前事件循环共享的 aiohttp 会话，不存在或已关闭时创建
+
+    Returns:
+        aiohttp.ClientSession: 复用 keep-alive 连接的会话；调用方不应自行关闭
+    """
+    loop = asyncio.get_running_loop()
+    entry = _SESSIONS.get(id(loop))
+    if entry is not None and entry[0] is loop and not entry[1].closed:
+        return entry[1]
+
+    _discard_closed_loops()
+    cfg = pool_config()
+    connector = aiohttp.TCPConnector(
+        limit=int(cfg["limit"]),
+        limit_per_host=int(cfg["limit_per_host"]),
+        keepalive_timeout=float(cfg["keepalive_timeout"]),
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=float(cfg["total_timeout"]),
+        connect=float(cfg["connect_timeout"]),
+        sock_read=float(cfg["sock_read_timeout"]),
+    )
+    session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[_trace_config()])
+    with _REGISTRY_LOCK:
+        _SESSIONS[id(loop)] = (loop, session)
+    return session
+
+
+@asynccontextmanager
+async def pooled_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """以上下文形式取得共享会话，退出时不关闭，可直接替换 ``async with aiohttp.ClientSession()``。"""
+    yield await get_session()
+
+
+def get_httpx_client() -> Any:
+    """
+    返回当前事件循环共享的 httpx.AsyncClient（供 OpenAI 兼容客户端使用），连接上限与 aiohttp 会话一致
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    entry = _HTTPX_CLIENTS.get(id(loop))
+    if entry is not None and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+
+    _discard_closed_loops()
+    cfg = pool_config()
+    client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=int(cfg["limit"]),
+            max_keepalive_connections=int(cfg["limit_per_host"]),
+            keepalive_expiry=float(cfg["keepalive_timeout"]),
+        ),
+        timeout=httpx.Timeout(float(cfg["total_timeout"]), connect=float(cfg["connect_timeout"])),
+    )
+    with _REGISTRY_LOCK:
+        _HTTPX_CLIENTS[id(loop)] = (loop, client)
+    return client
+
+
+async def close_sessions() -> None:
+    """关闭当前事件循环上的共享会话，应在循环结束前调用。"""
+    loop = asyncio.get_running_loop()
+    with _REGISTRY_LOCK:
+        session_entry = _SESSIONS.pop(id(loop), None)
+        httpx_entry = _HTTPX_CLIENTS.pop(id(loop), None)
+    if session_entry is not None and session_entry[0] is loop and not session_entry[1].closed:
+        await session_entry[1].close()
+    if httpx_entry is not None and httpx_entry[0] is loop and not httpx_entry[1].is_closed:
+        await httpx_entry[1].aclose()
+
+
+async def closing_sessions(awaitable: Awaitable[T]) -> T:
+    """
+    运行协程并在结束后关闭本循环的共享会话，用于 ``asyncio.run`` 等同步入口
+
+    Example:
+        asyncio.run(closing_sessions(run_filter_async(topic, date)))
+    """
+    try:
+        return await awaitable
+    finally:
+        await close_sessions()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """返回请求耗时与连接复用指标，以及当前活跃的会话数。"""
+    payload = _STATS.snapshot()
+    payload["active_sessions"] = sum(1 for _, session in _SESSIONS.values() if not session.closed)
+    return payload
+
+
+def record_request(latency: float, ok: bool = True) -> None:
+    """记录不经 aiohttp 会话的请求耗时（如 OpenAI SDK 调用）。"""
+    _STATS.record_request(latency, ok)
+
+
+def reset_pool_stats() -> None:
+    _STATS.reset()
+
+
+@atexit.register
+def _close_at_exit() -> None:
+    _discard_closed_loops()
+    for loop, session in list(_SESSIONS.values()):
+        if session.closed or loop.is_running():
+            continue
+        try:
+            loop.run_until_complete(session.close())
+        except Exception:
+            pass
+
@@ -3,19 +3,25 @@ OpenAI (以及兼容 API) 客户端封装
 """
 from __future__ import annotations
 
+import asyncio
+import time
 from typing import Any, Dict, Optional
 
 try:
     from openai import AsyncOpenAI
     from openai import OpenAIError  # type: ignore
+    from openai import RateLimitError as OpenAIRateLimitError  # type: ignore
 except ImportError as exc:  # pragma: no cover - 依赖缺失时提供清晰错误
     AsyncOpenAI = None  # type: ignore
     OpenAIError = Exception  # type: ignore
+    OpenAIRateLimitError = None  # type: ignore
     _IMPORT_ERROR = exc
 else:
     _IMPORT_ERROR = None
 
 from ..setting.env_loader import get_openai_api_key, get_openai_base_url
+from .http_pool import get_httpx_client, record_request
+from .rate_limit import RateLimitError, parse_retry_after
 
 
 class OpenAIClient:
@@ -44,7 +50,23 @@ class OpenAIClient:
 
         self.base_url = base_url or get_openai_base_url()
         self.default_temperature = default_temperature
-        self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        # 按事件循环创建 SDK 客户端，底层 httpx 连接池由 http_pool 统一管理
+        self._clients: Dict[int, Any] = {}
+
+    def _sdk_client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        http_client = get_httpx_client()
+        entry = self._clients.get(id(loop))
+        if entry is None or entry[0] is not http_client:
+            self._clients = {
+                key: value for key, value in self._clients.items() if not value[0].is_closed
+            }
+            entry = (
+                http_client,
+                AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=http_client),
+            )
+            self._clients[id(loop)] = entry
+        return entry[1]
 
     async def call(
         self,
@@ -52,6 +74,7 @@ class OpenAIClient:
         model: str = "gpt-3.5-turbo",
         max_tokens: int = 1024,
         temperature: Optional[float] = None,
+        raise_on_rate_limit: bool = False,
     ) -> Optional[Dict[str, Any]]:
         """
         调用 Chat Completions 接口。
@@ -61,12 +84,14 @@ class OpenAIClient:
             model: 模型名称。
             max_tokens: 最多生成 token 数。
             temperature: 采样温度，默认为初始化时设定。
+            raise_on_rate_limit: 为 True 时限流（429）抛出 RateLimitError，便于调用方退避。
 
         Returns:
             包含 'text' 与 'usage' 字段的响应字典，失败时返回 None。
         """
+        started = time.perf_counter()
         try:
-            response = await self._client.chat.completions.create(
+            response = await self._sdk_client().chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens,
@@ -93,10 +118,16 @@ class OpenAIClient:
                         if not key.startswith("_") and not callable(getattr(usage_payload, key))
                     }
 
+            record_request(time.perf_counter() - started)
             return {"text": text, "usage": usage}
-        except OpenAIError:
+        except OpenAIError as exc:
+            record_request(time.perf_counter() - started, ok=False)
+            if raise_on_rate_limit and OpenAIRateLimitError is not None and isinstance(exc, OpenAIRateLimitError):
+                headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+                raise RateLimitError(str(exc), parse_retry_after(headers.get("retry-after"))) from exc
             return None
         except Exception:
+            record_request(time.perf_counter() - started, ok=False)
             return None
 
 
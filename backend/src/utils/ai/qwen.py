@@ -5,6 +5,8 @@ import asyncio
 import aiohttp
 from typing import Optional, Dict, Any
 from ..setting.env_loader import get_api_key
+from .http_pool import get_session
+from .rate_limit import RateLimitError, parse_retry_after
 
 # API配置
 API_URL = "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
@@ -24,7 +26,13 @@ class QwenClient:
         if not self.api_key:
             raise ValueError("千问API密钥未配置，请在配置文件 credentials.qwen_api_key 中设置")
 
-    async def call(self, prompt: str, model: str = "qwen-plus", max_tokens: int = 10000) -> Optional[Dict[str, Any]]:
+    async def call(
+        self,
+        prompt: str,
+        model: str = "qwen-plus",
+        max_tokens: int = 10000,
+        raise_on_rate_limit: bool = False,
+    ) -> Optional[Dict[str, Any]]:
         """
         调用千问API
 
@@ -32,6 +40,7 @@ class QwenClient:
             prompt (str): 提示词
             model (str): 模型名称
             max_tokens (int): 最大token数
+            raise_on_rate_limit (bool): 为 True 时限流（429）抛出 RateLimitError，便于调用方退避
 
         Returns:
             Optional[Dict[str, Any]]: API响应数据，包含text和usage信息，失败时返回None
@@ -54,24 +63,29 @@ class QwenClient:
         }
 
         try:
-            # 增加超时时间和连接池配置
+            # 复用当前事件循环的共享连接池（keep-alive），单次请求沿用原有超时
             timeout = aiohttp.ClientTimeout(total=60, connect=10, sock_read=30)
-            connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.post(API_URL, json=data, headers=headers) as resp:
-                    if resp.status == 200:
-                        response_data = await resp.json()
-                        return {
-                            'text': response_data.get('output', {}).get('text', ''),
-                            'usage': response_data.get('usage', {})
-                        }
-                    elif resp.status == 429:  # 限流错误
-                        return None
-                    elif resp.status >= 500:  # 服务器错误
-                        return None
-                    else:
-                        return None
+            session = await get_session()
+            async with session.post(API_URL, json=data, headers=headers, timeout=timeout) as resp:
+                if resp.status == 200:
+                    response_data = await resp.json()
+                    return {
+                        'text': response_data.get('output', {}).get('text', ''),
+                        'usage': response_data.get('usage', {})
+                    }
+                elif resp.status == 429:  # 限流错误
+                    if raise_on_rate_limit:
+                        raise RateLimitError(
+                            "千问API限流",
+                            parse_retry_after(resp.headers.get("Retry-After")),
+                        )
+                    return None
+                elif resp.status >= 500:  # 服务器错误
+                    return None
+                else:
+                    return None
+        except RateLimitError:
+            raise
         except asyncio.TimeoutError:
             return None
         except aiohttp.ClientError:
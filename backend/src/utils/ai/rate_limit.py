@@ -0,0 +1,149 @@
+"""
+模型调用限流：令牌桶（请求数/秒 + Token 数/分钟）与 429 自适应退避
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimitError(RuntimeError):
+    """
+    上游返回限流（HTTP 429）时抛出，仅在调用方显式要求时使用
+
+    Args:
+        retry_after: 服务端建议的等待秒数（Retry-After），未提供时为 None
+    """
+
+    def __init__(self, message: str = "rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数），无法解析时返回 None。"""
+    try:
+        seconds = float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds >= 0 else None
+
+
+class TokenBucket:
+    """
+    令牌桶：以 rate × rate_factor 每秒补充，最多积累 capacity 个令牌
+
+    允许余额为负（实际消耗超过预估时记账），之后的请求需等待补足。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self.rate_factor = 1.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self._updated, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate * self.rate_factor)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """返回取得 amount 个令牌还需等待的秒数（0 表示可立即取得）。"""
+        self._refill(time.monotonic())
+        amount = min(float(amount), self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / (self.rate * self.rate_factor)
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(float(amount), self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens = min(self.capacity, self.tokens - float(delta))
+
+
+class RateLimiter:
+    """
+    异步限流器
+
+    - 请求桶：每秒 requests_per_second 个请求，突发上限为一秒的量；
+    - Token 桶（tokens_per_minute > 0 时启用）：按预估 Token 预扣，响应后按实际用量记账；
+    - 收到 429 时速率减半（不低于 min_rate_ratio）并按 Retry-After 暂停，
+      之后每次成功调用逐步恢复到配置速率。
+
+    Args:
+        requests_per_second: 每秒请求数上限
+        tokens_per_minute: 每分钟 Token 上限，<=0 表示不限制
+        min_rate_ratio: 自适应降速的下限比例
+        recovery_step: 每次成功调用恢复的速率比例
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        tokens_per_minute: float = 0,
+        min_rate_ratio: float = 0.1,
+        recovery_step: float = 0.02,
+    ):
+        rps = max(float(requests_per_second), 0.01)
+        self.requests = TokenBucket(rps, max(rps, 1.0))
+        self.tokens: Optional[TokenBucket] = None
+        if tokens_per_minute and float(tokens_per_minute) > 0:
+            self.tokens = TokenBucket(float(tokens_per_minute) / 60.0, float(tokens_per_minute))
+        self.min_rate_ratio = float(min_rate_ratio)
+        self.recovery_step = float(recovery_step)
+        self.rate_factor = 1.0
+        self.rate_limited = 0
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 0) -> None:
+        """等待直到请求与 Token 额度均可用，并预扣额度；并发调用按到达顺序排队。"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                wait = self.requests.wait_time(1)
+                if self.tokens is not None and tokens:
+                    wait = max(wait, self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    self.requests.consume(1)
+                    if self.tokens is not None and tokens:
+                        self.tokens.consume(tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def settle(self, estimated: float, actual: float) -> None:
+        """按实际 Token 用量修正预扣额度（请求未被受理时 actual 传 0 以退还）。"""
+        if self.tokens is not None:
+            self.tokens.adjust(float(actual) - float(estimated))
+
+    def _set_rate_factor(self, factor: float) -> None:
+        self.rate_factor = factor
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket._refill(time.monotonic())
+                bucket.rate_factor = factor
+
+    def on_success(self) -> None:
+        if self.rate_factor < 1.0:
+            self._set_rate_factor(min(1.0, self.rate_factor + self.recovery_step))
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        记录一次限流：降速并暂停发送
+
+        Returns:
+            float: 本次暂停的秒数
+        """
+        self.rate_limited += 1
+        self._set_rate_factor(max(self.min_rate_ratio, self.rate_factor / 2))
+        pause = retry_after if retry_after is not None else 1.0 / (self.requests.rate * self.rate_factor)
+        pause = max(pause, 0.5)
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        return pause
@@ -0,0 +1,179 @@
+"""
+进程内事件广播（SSE 进度流共用）
+
+- 按 key（如任务 ID、专题+日期）维护订阅者队列，写入方 publish 后所有订阅者立即收到，
+  同一个 key 的多个连接（多个浏览器标签页）共享同一份数据，不再各自轮询磁盘；
+- 每个 key 可以挂一个数据源（source），由一个共享的后台线程定期调用 source.poll()，
+  用于发现其他进程写入的变化（如报告 worker 进程追加的事件）；poll 应只做廉价的
+  stat 检查，确实有变化时才读取文件；
+- 最后一个订阅者退出后后台线程随之结束，数据源被释放。
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+class Subscription:
+    """单个订阅者：持有自己的队列，使用完毕后需要 close()（支持 with 语句）"""
+
+    def __init__(self, broadcaster: "Broadcaster", key: str, source: Any = None):
+        self.broadcaster = broadcaster
+        self.key = key
+        self.source = source
+        self.closed = False
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+
+    def put(self, item: Any) -> None:
+        self._queue.put(item)
+
+    def get(self, timeout: Optional[float] = None) -> List[Any]:
+        """
+        等待并取出所有已到达的消息
+
+        Args:
+            timeout: 最长等待秒数，超时返回空列表
+
+        Returns:
+            List[Any]: 按发布顺序排列的消息
+        """
+        try:
+            items = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.broadcaster._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _Channel:
+    __slots__ = ("subscribers", "source", "wake", "thread")
+
+    def __init__(self, source: Any = None):
+        self.subscribers: List[Subscription] = []
+        self.source = source
+        self.wake = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+
+class Broadcaster:
+    """
+    按 key 分发消息的广播器（线程安全）
+
+    Args:
+        poll_interval: 数据源轮询间隔（秒）
+        name: 后台线程名前缀
+    """
+
+    def __init__(self, *, poll_interval: float = DEFAULT_POLL_INTERVAL, name: str = "broadcast"):
+        self.poll_interval = max(float(poll_interval), 0.01)
+        self.name = name
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, key: str, source_factory: Optional[Callable[[], Any]] = None) -> Subscription:
+        """
+        订阅某个 key
+
+        Args:
+            key: 订阅键
+            source_factory: 该 key 尚无数据源时用于创建数据源（需提供 poll() -> List），
+                同一个 key 的所有订阅者共享一个数据源与一个轮询线程
+
+        Returns:
+            Subscription: 订阅对象，subscription.source 为共享的数据源
+        """
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = _Channel()
+                self._channels[key] = channel
+            if channel.source is None and source_factory is not None:
+                channel.source = source_factory()
+            subscription = Subscription(self, key, channel.source)
+            channel.subscribers.append(subscription)
+            if channel.source is not None and channel.thread is None:
+                channel.thread = threading.Thread(
+                    target=self._watch, args=(key, channel), name=f"{self.name}:{key}", daemon=True
+                )
+                channel.thread.start()
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            channel = self._channels.get(subscription.key)
+            if channel is None:
+                return
+            if subscription in channel.subscribers:
+                channel.subscribers.remove(subscription)
+            if not channel.subscribers:
+                self._channels.pop(subscription.key, None)
+                channel.wake.set()
+
+    def source(self, key: str) -> Any:
+        """返回 key 当前共享的数据源；没有订阅者时返回 None"""
+        with self._lock:
+            channel = self._channels.get(key)
+            return channel.source if channel is not None else None
+
+    def subscriber_count(self, key: str) -> int:
+        with self._lock:
+            channel = self._channels.get(key)
+            return len(channel.subscribers) if channel is not None else 0
+
+    def publish(self, key: str, *items: Any) -> int:
+        """
+        向 key 的所有订阅者发布消息
+
+        Returns:
+            int: 收到消息的订阅者数量
+        """
+        if not items:
+            return 0
+        with self._lock:
+            channel = self._channels.get(key)
+            subscribers = list(channel.subscribers) if channel is not None else []
+        for subscription in subscribers:
+            for item in items:
+                subscription.put(item)
+        return len(subscribers)
+
+    def nudge(self, key: str) -> None:
+        """让 key 的数据源立即轮询一次（写入方无法直接构造消息时使用）"""
+        with self._lock:
+            channel = self._channels.get(key)
+        if channel is not None:
+            channel.wake.set()
+
+    def _watch(self, key: str, channel: _Channel) -> None:
+        while True:
+            with self._lock:
+                if self._channels.get(key) is not channel:
+                    return
+            try:
+                items = channel.source.poll() or []
+            except Exception:
+                items = []
+            if items:
+                self.publish(key, *items)
+            channel.wake.wait(self.poll_interval)
+            channel.wake.clear()
+
+
+__all__ = ["Broadcaster", "DEFAULT_POLL_INTERVAL", "Subscription"]
@@ -6,9 +6,17 @@ from .excel import (
     read_jsonl, write_jsonl, generate_id, get_standard_table_schema, sanitize_dataframe
 )
 from .db import DatabaseManager, db_manager
+from .layers import (
+    resolve_layer_format, find_layer_file, layer_exists, list_layer_files,
+    is_layer_file, read_layer, iter_layer_chunks, iter_layer_records, count_layer_rows,
+    write_layer, append_layer, remove_layer
+)
 
 __all__ = [
     'read_excel', 'write_excel', 'read_csv', 'write_csv', 'read_parquet', 'write_parquet',
     'read_jsonl', 'write_jsonl', 'generate_id', 'get_standard_table_schema', 'sanitize_dataframe',
-    'DatabaseManager', 'db_manager'
+    'DatabaseManager', 'db_manager',
+    'resolve_layer_format', 'find_layer_file', 'layer_exists', 'list_layer_files',
+    'is_layer_file', 'read_layer', 'iter_layer_chunks', 'iter_layer_records', 'count_layer_rows',
+    'write_layer', 'append_layer', 'remove_layer'
 ]
@@ -2,6 +2,7 @@
 数据库连接和查询模块
 """
 import os
+import threading
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
@@ -14,6 +15,10 @@ from ..logging.logging import setup_logger, log_success, log_error, log_module_s
 class DatabaseManager:
     """数据库管理类"""
 
+    # 进程级共享引擎缓存：完整连接 URL（含库名） -> Engine
+    _shared_engines: Dict[str, Engine] = {}
+    _shared_engines_lock = threading.Lock()
+
     @staticmethod
     def _normalise_postgres_driver_url(url: Optional[str]) -> Optional[str]:
         if not isinstance(url, str):
@@ -137,6 +142,45 @@ class DatabaseManager:
         db_url = base_url.set(database=database_name)
         return self._create_engine(db_url)
 
+    def get_shared_engine_for_database(self, database_name: str, pool_size: Optional[int] = None) -> Engine:
+        """
+        返回进程内共享的连接池引擎，按连接 URL 与数据库名缓存。
+
+        与 get_engine_for_database 不同，返回的引擎在多次调用、多个线程间复用，
+        调用方不应 dispose；需要释放时使用 dispose_shared_engines。
+
+        Args:
+            database_name (str): 数据库名称
+            pool_size (Optional[int]): 首次创建时的连接池大小（仅 MySQL/PostgreSQL 生效）
+
+        Returns:
+            Engine: 共享引擎
+        """
+        db_url = make_url(self.db_url).set(database=database_name)
+        cache_key = db_url.render_as_string(hide_password=False)
+        with self._shared_engines_lock:
+            engine = self._shared_engines.get(cache_key)
+            if engine is None:
+                overrides: Dict[str, Any] = {}
+                if pool_size and db_url.get_backend_name() in {"mysql", "postgresql"}:
+                    overrides["pool_size"] = max(5, int(pool_size))
+                    overrides["max_overflow"] = 10
+                engine = self._create_engine(db_url, **overrides)
+                self._shared_engines[cache_key] = engine
+            return engine
+
+    @classmethod
+    def dispose_shared_engines(cls) -> None:
+        """释放所有共享引擎（例如切换数据库连接配置后）。"""
+        with cls._shared_engines_lock:
+            engines = list(cls._shared_engines.values())
+            cls._shared_engines.clear()
+        for engine in engines:
+            try:
+                engine.dispose()
+            except Exception:
+                pass
+
     def ensure_database(self, database_name: str) -> bool:
         """
         确保数据库存在，不存在则创建
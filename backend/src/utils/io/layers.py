@@ -0,0 +1,421 @@
+"""
+中间层（fetch/merge/clean/filter）数据文件的统一读写接口
+
+同一份渠道数据以 ``<目录>/<名称>.<后缀>`` 存放，后缀由存储格式决定：
+- ``jsonl``：历史格式，逐行 JSON；
+- ``parquet``：列式格式（默认 zstd 压缩），支持列裁剪，加载更快且保留类型。
+
+写入格式按「项目元数据 layer_format > configs/storage.yaml > jsonl」确定；
+读取时按文件实际后缀解析，同名文件同时存在两种格式时优先 Parquet，
+因此旧项目的 JSONL 数据无需迁移即可继续读取。
+
+Parquet 文件无法原地追加，``append_layer`` 把新增行写成同目录隐藏的
+``.<名称>.parts/part-<序号>.parquet`` 分片；本模块的读取/计数接口会把分片
+接在主文件之后一起返回，整层重写（``write_layer``/``remove_layer``）时分片一并清除。
+"""
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from ..setting.settings import settings
+from .excel import read_jsonl, write_jsonl
+
+LAYER_FORMATS = ("parquet", "jsonl")
+DEFAULT_LAYER_FORMAT = "jsonl"
+LAYER_SUFFIXES: Dict[str, str] = {"parquet": ".parquet", "jsonl": ".jsonl"}
+_SUFFIX_PRIORITY = {".parquet": 0, ".jsonl": 1}
+MAX_LAYER_PARTS = 32
+
+PathLike = Union[str, Path]
+
+
+def normalise_layer_format(value: Optional[str]) -> Optional[str]:
+    """将配置值规范为受支持的格式名，无法识别时返回 None。"""
+    text = str(value or "").strip().lower()
+    return text if text in LAYER_FORMATS else None
+
+
+def resolve_layer_format(topic: Optional[str] = None) -> str:
+    """
+    解析写入中间层时使用的存储格式
+
+    Args:
+        topic (Optional[str]): 项目标识，传入时优先读取项目元数据中的 layer_format
+
+    Returns:
+        str: ``parquet`` 或 ``jsonl``
+    """
+    if topic:
+        try:
+            from ...project.manager import get_project_manager
+
+            record = get_project_manager().get_project_record(str(topic))
+            metadata = record.metadata if record else {}
+            project_format = normalise_layer_format((metadata or {}).get("layer_format"))
+            if project_format:
+                return project_format
+        except Exception:
+            pass
+    return normalise_layer_format(settings.get("storage.layer_format")) or DEFAULT_LAYER_FORMAT
+
+
+def _parquet_compression() -> str:
+    return str(settings.get("storage.parquet_compression") or "zstd")
+
+
+def layer_path(directory: PathLike, name: str, fmt: str) -> Path:
+    """返回指定格式下的层文件路径（不检查是否存在）。"""
+    return Path(directory) / f"{name}{LAYER_SUFFIXES[fmt]}"
+
+
+def layer_parts_dir(file_path: PathLike) -> Path:
+    """Parquet 层文件对应的追加分片目录。"""
+    path = Path(file_path)
+    return path.parent / f".{path.stem}.parts"
+
+
+def layer_part_files(file_path: PathLike) -> List[Path]:
+    """
+    返回 Parquet 层的全部数据文件：主文件在前，追加分片按序号在后；JSONL 层只返回自身。
+    """
+    path = Path(file_path)
+    if path.suffix.lower() != ".parquet":
+        return [path]
+    parts_dir = layer_parts_dir(path)
+    parts = sorted(parts_dir.glob("part-*.parquet")) if parts_dir.is_dir() else []
+    return [path, *parts]
+
+
+def find_layer_file(directory: PathLike, name: str) -> Optional[Path]:
+    """查找已存在的层文件，Parquet 优先，均不存在时返回 None。"""
+    for fmt in LAYER_FORMATS:
+        path = layer_path(directory, name, fmt)
+        if path.exists():
+            return path
+    return None
+
+
+def layer_exists(directory: PathLike, name: str) -> bool:
+    return find_layer_file(directory, name) is not None
+
+
+def is_layer_file(path: PathLike) -> bool:
+    path = Path(path)
+    return path.suffix.lower() in _SUFFIX_PRIORITY and not path.name.startswith(".")
+
+
+def list_layer_files(directory: PathLike, exclude: Iterable[str] = ()) -> List[Path]:
+    """
+    列出目录下的层文件，每个名称只返回一个文件（Parquet 优先），按名称排序
+
+    Args:
+        directory: 层目录
+        exclude: 需要排除的名称（不含后缀），例如 ``("总体",)``
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    excluded = set(exclude or ())
+    chosen: Dict[str, Path] = {}
+    for path in directory.iterdir():
+        if not path.is_file() or not is_layer_file(path) or path.stem in excluded:
+            continue
+        current = chosen.get(path.stem)
+        if current is None or _SUFFIX_PRIORITY[path.suffix.lower()] < _SUFFIX_PRIORITY[current.suffix.lower()]:
+            chosen[path.stem] = path
+    return [chosen[name] for name in sorted(chosen)]
+
+
+def _project_columns(df: pd.DataFrame, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    if columns is None:
+        return df
+    return df[[column for column in columns if column in df.columns]]
+
+
+def _apply_dtypes(df: pd.DataFrame, dtype: Any) -> pd.DataFrame:
+    """按 pd.read_json 的 dtype 参数转换 Parquet 读出的列，空值保持为空。"""
+    if dtype is None or isinstance(dtype, bool):
+        return df
+    targets = dtype if isinstance(dtype, dict) else {column: dtype for column in df.columns}
+    for column, target in targets.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if target is str or target == "str":
+            df[column] = series.map(lambda value: value if pd.isna(value) else str(value)).astype(object)
+        else:
+            df[column] = series.astype(target)
+    return df
+
+
+def read_layer(file_path: PathLike, columns: Optional[Sequence[str]] = None, **kwargs) -> pd.DataFrame:
+    """
+    读取层文件，按后缀选择解析方式
+
+    Args:
+        file_path: 层文件路径
+        columns: 只读取的列；不存在的列会被忽略。Parquet 下只解码这些列
+        **kwargs: JSONL 时额外传递给 pd.read_json 的参数；Parquet 只支持其中的 dtype
+            （读取后转换列类型），其余参数会抛出 TypeError
+
+    Returns:
+        pd.DataFrame: 读取的数据
+    """
+    path = Path(file_path)
+    if path.suffix.lower() == ".parquet":
+        dtype = kwargs.pop("dtype", None)
+        if kwargs:
+            raise TypeError(f"Parquet 层不支持参数: {', '.join(sorted(kwargs))}")
+        if columns is not None:
+            import pyarrow.parquet as pq
+
+            available = set(pq.read_schema(path).names)
+            columns = [column for column in columns if column in available]
+        selected = list(columns) if columns is not None else None
+        files = layer_part_files(path)
+        if len(files) == 1:
+            df = pd.read_parquet(path, columns=selected)
+        else:
+            df = pd.concat([pd.read_parquet(item, columns=selected) for item in files], ignore_index=True)
+        return _apply_dtypes(df, dtype)
+    return _project_columns(read_jsonl(path, **kwargs), columns)
+
+
+def iter_layer_chunks(
+    file_path: PathLike,
+    chunk_size: int,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """按块读取层文件，内存占用与 chunk_size 相关。"""
+    path = Path(file_path)
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for part_path in layer_part_files(path):
+            parquet_file = pq.ParquetFile(part_path)
+            selected = None
+            if columns is not None:
+                available = set(parquet_file.schema_arrow.names)
+                selected = [column for column in columns if column in available]
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=selected):
+                yield batch.to_pandas()
+        return
+    with pd.read_json(path, lines=True, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield _project_columns(chunk, columns)
+
+
+def iter_layer_records(file_path: PathLike, chunk_size: int = 5000) -> Iterator[Dict[str, Any]]:
+    """
+    逐条读取层文件记录（字典）
+
+    JSONL 逐行解析并跳过无法解析的行；Parquet 按块解码后以与 write_jsonl 相同的
+    JSON 规则序列化，保证两种格式下得到的字段值一致（日期为 ISO 字符串等）。
+    """
+    path = Path(file_path)
+    if path.suffix.lower() == ".parquet":
+        for chunk in iter_layer_chunks(path, chunk_size):
+            if chunk.empty:
+                continue
+            payload = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+            for line in payload.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            raw = line.strip()
+            if not raw:
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def count_layer_rows(file_path: PathLike) -> int:
+    """统计层文件行数；Parquet 直接读取元数据。"""
+    path = Path(file_path)
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        return sum(int(pq.ParquetFile(item).metadata.num_rows) for item in layer_part_files(path))
+    count = 0
+    with path.open("rb") as handle:
+        for line in handle:
+            if line.strip():
+                count += 1
+    return count
+
+
+def _coerce_for_parquet(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将无法直接转换为 Arrow 的混合类型对象列转为字符串，其余列保持原类型。
+    """
+    import pyarrow as pa
+
+    coerced = df
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            if coerced is df:
+                coerced = df.copy()
+            coerced[column] = df[column].map(lambda value: value if value is None else str(value))
+    return coerced
+
+
+def write_layer(
+    df: pd.DataFrame,
+    directory: PathLike,
+    name: str,
+    fmt: Optional[str] = None,
+    topic: Optional[str] = None,
+) -> Path:
+    """
+    写入层文件，并删除同名的另一种格式文件，避免读取到过期数据
+
+    Args:
+        df: 要保存的数据框
+        directory: 层目录
+        name: 文件名（不含后缀），通常为渠道名或 ``总体``
+        fmt: 指定格式；不传时按 topic 解析
+        topic: 项目标识，用于解析项目级格式
+
+    Returns:
+        Path: 实际写入的文件路径
+    """
+    fmt = normalise_layer_format(fmt) or resolve_layer_format(topic)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = layer_path(directory, name, fmt)
+    if fmt == "parquet":
+        tmp_path = target.with_name(target.name + ".tmp")
+        _coerce_for_parquet(df).to_parquet(tmp_path, index=False, compression=_parquet_compression())
+        tmp_path.replace(target)
+        _remove_parts(target)
+    else:
+        write_jsonl(df, target)
+    remove_layer(directory, name, keep=fmt)
+    return target
+
+
+def conform_arrow_table(table, schema):
+    """将 Arrow 表对齐到目标列结构：缺失列补空值，多余列丢弃，类型按目标转换。"""
+    import pyarrow as pa
+
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            column = table.column(field.name)
+            if column.type != field.type:
+                column = column.cast(field.type, safe=False)
+        else:
+            column = pa.nulls(table.num_rows, type=field.type)
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def append_layer(df: pd.DataFrame, directory: PathLike, name: str, fmt: Optional[str] = None) -> Path:
+    """
+    向已有层追加行，开销只与新增行数相关
+
+    - 层不存在：按 fmt 新建（同 ``write_layer``）；
+    - JSONL：直接在文件末尾追加；
+    - Parquet：按主文件的列结构写出一个新分片，分片数超过 ``MAX_LAYER_PARTS`` 时
+      合并为单个文件（按批次流式重写）；新增行带有主文件没有的列时，先按扩展后的
+      列结构重写整个层（旧行的新列为空），不丢弃新列。
+
+    两种格式同时存在（流式提取的 JSONL 副本）时两者都追加。
+
+    Returns:
+        Path: 层文件路径（Parquet 优先）
+    """
+    directory = Path(directory)
+    jsonl_path = layer_path(directory, name, "jsonl")
+    parquet_path = layer_path(directory, name, "parquet")
+    if not jsonl_path.exists() and not parquet_path.exists():
+        return write_layer(df, directory, name, fmt=fmt)
+    if jsonl_path.exists():
+        write_jsonl(df, jsonl_path, mode="a")
+    if not parquet_path.exists():
+        return jsonl_path
+    if df.empty:
+        return parquet_path
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(_coerce_for_parquet(df), preserve_index=False)
+    schema = pq.read_schema(parquet_path)
+    added = [field for field in table.schema if field.name not in schema.names]
+    if added:
+        schema = pa.schema(list(schema) + added)
+        compact_layer(parquet_path, schema=schema)
+    table = conform_arrow_table(table, schema)
+    parts_dir = layer_parts_dir(parquet_path)
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    existing = layer_part_files(parquet_path)[1:]
+    sequence = int(existing[-1].stem.split("-")[-1]) + 1 if existing else 1
+    part_path = parts_dir / f"part-{sequence:06d}.parquet"
+    tmp_path = part_path.with_name(part_path.name + ".tmp")
+    pq.write_table(table, tmp_path, compression=_parquet_compression())
+    tmp_path.replace(part_path)
+    if len(existing) + 1 > MAX_LAYER_PARTS:
+        compact_layer(parquet_path)
+    return parquet_path
+
+
+def compact_layer(file_path: PathLike, batch_size: int = 50000, schema=None) -> int:
+    """
+    把 Parquet 层的主文件与追加分片合并为单个文件，返回总行数
+
+    schema 指定时按该列结构重写（即使没有分片），用于追加新列时扩展层的列结构。
+    """
+    path = Path(file_path)
+    files = layer_part_files(path)
+    if len(files) <= 1 and schema is None:
+        return count_layer_rows(path)
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if schema is None:
+        schema = pq.read_schema(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema, compression=_parquet_compression()) as writer:
+        for part_path in files:
+            for batch in pq.ParquetFile(part_path).iter_batches(batch_size=batch_size):
+                writer.write_table(conform_arrow_table(pa.Table.from_batches([batch]), schema))
+                rows += batch.num_rows
+    tmp_path.replace(path)
+    _remove_parts(path)
+    return rows
+
+
+def _remove_parts(parquet_path: Path) -> None:
+    parts_dir = layer_parts_dir(parquet_path)
+    if parts_dir.is_dir():
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def remove_layer(directory: PathLike, name: str, keep: Optional[str] = None) -> None:
+    """删除名称对应的层文件（含 Parquet 追加分片）；keep 指定时保留该格式。"""
+    for fmt in LAYER_FORMATS:
+        if fmt == keep:
+            continue
+        path = layer_path(directory, name, fmt)
+        if path.exists():
+            path.unlink()
+        if fmt == "parquet":
+            _remove_parts(path)
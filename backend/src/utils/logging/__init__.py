@@ -3,10 +3,12 @@
 """
 from .logging import (
     setup_logger, log_success, log_error, log_module_start, 
-    log_save_success, log_skip, get_logs_directory, ColoredFormatter
+    log_save_success, log_skip, get_logs_directory, ColoredFormatter,
+    buffered_logger, replay_records
 )
 
 __all__ = [
     'setup_logger', 'log_success', 'log_error', 'log_module_start',
-    'log_save_success', 'log_skip', 'get_logs_directory', 'ColoredFormatter'
+    'log_save_success', 'log_skip', 'get_logs_directory', 'ColoredFormatter',
+    'buffered_logger', 'replay_records'
 ]
@@ -4,7 +4,7 @@
 import logging
 import warnings
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 from ..setting.paths import get_logs_root
 
 # 抑制 openpyxl 的默认样式警告
@@ -157,6 +157,48 @@ def log_skip(logger: logging.Logger, reason: str, module: str):
     (logger or logging.getLogger("opinion-system")).info(f"[{module}] 跳过: {reason}")
 
 
+class _RecordBuffer(logging.Handler):
+    """把日志记录缓存到列表中的处理器"""
+
+    def __init__(self, records: List[logging.LogRecord]):
+        super().__init__(logging.DEBUG)
+        self.records = records
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def buffered_logger(name: str = "opinion-system.worker") -> Tuple[logging.Logger, List[logging.LogRecord]]:
+    """
+    创建只缓存记录的日志记录器（子进程内使用，避免多个进程同时写同一日志文件）
+    
+    记录器不注册到 logging 全局表，缓存的记录可随任务结果回传主进程，再用 replay_records 写出。
+    
+    Args:
+        name (str): 记录器名称
+    
+    Returns:
+        Tuple[logging.Logger, List[logging.LogRecord]]: 记录器与其缓存的记录列表
+    """
+    records: List[logging.LogRecord] = []
+    logger = logging.Logger(name, logging.DEBUG)
+    logger.addHandler(_RecordBuffer(records))
+    return logger, records
+
+
+def replay_records(logger: logging.Logger, records: List[logging.LogRecord]):
+    """
+    将缓存的日志记录交给目标记录器处理
+    
+    Args:
+        logger (logging.Logger): 目标日志记录器
+        records (List[logging.LogRecord]): buffered_logger 缓存的记录
+    """
+    logger = logger or logging.getLogger("opinion-system")
+    for record in records:
+        logger.handle(record)
+
+
 def get_logs_directory() -> Path:
     """
     获取日志目录
@@ -0,0 +1,148 @@
+"""
+按渠道多进程并行执行的通用工具（merge/clean 共用）
+
+各渠道相互独立，CPU 密集的解析与清洗放到进程池中执行：
+- 结果按任务提交顺序返回，输出与串行执行一致；
+- 单个任务抛出的异常作为该任务的结果返回，不影响其他渠道；
+- 传入 logger 时，子进程内的日志先缓存为记录并随结果回传，由主进程统一写出，
+  避免多个进程同时写同一日志文件；
+- 传入 on_result 时，每个任务完成即在主进程回调，调用方据此上报渠道级进度；
+- 进程数为 1、只有一个任务或当前环境无法创建进程池时，在当前进程串行执行。
+"""
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .logging.logging import buffered_logger, replay_records
+
+
+def resolve_process_workers(configured: Any, job_count: int) -> int:
+    """
+    解析进程数：0/未配置表示按 CPU 核数自动设置，结果不超过任务数
+
+    Args:
+        configured: 配置值（channels.yaml 的 processing.workers 或调用方传入）
+        job_count: 任务数量
+
+    Returns:
+        int: 实际使用的进程数（至少为 1）
+    """
+    try:
+        workers = int(configured)
+    except (TypeError, ValueError):
+        workers = 0
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, job_count))
+
+
+def progress_event(
+    phase: str,
+    channel: str,
+    completed: int,
+    total: int,
+    outcome: Any,
+    rows: int = 0,
+    message: str = "",
+) -> Dict[str, Any]:
+    """
+    构造渠道级进度字典（phase/channel/completed/total/percentage/status/rows/message）
+
+    outcome 为异常时状态为 error，为 None 时为 skipped，其余为 ok。
+    """
+    failed = isinstance(outcome, Exception)
+    if failed:
+        status = "error"
+    elif outcome is None:
+        status = "skipped"
+    else:
+        status = "ok"
+    return {
+        "phase": phase,
+        "channel": channel,
+        "completed": completed,
+        "total": total,
+        "percentage": int(completed * 100 / total) if total else 100,
+        "status": status,
+        "rows": 0 if failed else int(rows or 0),
+        "message": message or (str(outcome) if failed else ""),
+    }
+
+
+def _call_with_buffered_logs(worker: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, List[logging.LogRecord]]:
+    """在子进程中执行 worker(*args, logger=缓存记录器)，返回 (结果或异常, 日志记录)。"""
+    logger, records = buffered_logger()
+    try:
+        outcome = worker(*args, logger=logger)
+    except Exception as exc:
+        outcome = exc
+    return outcome, records
+
+
+def run_process_jobs(
+    worker: Callable[..., Any],
+    jobs: Sequence[Tuple[Any, ...]],
+    workers: int,
+    logger: Optional[logging.Logger] = None,
+    on_result: Optional[Callable[[int, Any], None]] = None,
+) -> List[Any]:
+    """
+    在进程池中执行 worker(*job)，按 jobs 顺序返回结果
+
+    Args:
+        worker: 模块级函数（需可被子进程导入）
+        jobs: 每个任务的位置参数
+        workers: 进程数
+        logger: 传入时以 logger 关键字参数交给 worker；串行时直接使用，
+            并行时子进程的日志记录在对应任务完成后由主进程写入该记录器
+        on_result: 每个任务完成时在主进程回调 (任务下标, 结果或异常)，在该任务日志写出之后调用
+
+    Returns:
+        List[Any]: 与 jobs 一一对应的结果；任务失败时为对应的异常对象
+    """
+    results: List[Any] = [None] * len(jobs)
+    extra = {"logger": logger} if logger is not None else {}
+
+    def _record(index: int, outcome: Any) -> None:
+        results[index] = outcome
+        if on_result is not None:
+            on_result(index, outcome)
+
+    executor = None
+    if workers > 1 and len(jobs) > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError):
+            executor = None
+
+    if executor is None:
+        for index, args in enumerate(jobs):
+            try:
+                outcome = worker(*args, **extra)
+            except Exception as exc:
+                outcome = exc
+            _record(index, outcome)
+        return results
+
+    with executor:
+        if logger is None:
+            futures = {executor.submit(worker, *args): index for index, args in enumerate(jobs)}
+        else:
+            futures = {
+                executor.submit(_call_with_buffered_logs, worker, tuple(args)): index
+                for index, args in enumerate(jobs)
+            }
+        for future in as_completed(futures):
+            try:
+                outcome = future.result()
+            except Exception as exc:
+                outcome = exc
+            else:
+                if logger is not None:
+                    outcome, records = outcome
+                    replay_records(logger, records)
+            _record(futures[future], outcome)
+    return results
@@ -10,6 +10,9 @@ from ..setting.settings import settings
 from ..setting.env_loader import get_api_key, get_openai_api_key, get_openai_base_url
 from ..logging.logging import log_error, log_success
 
+# Max texts per embeddings request accepted by each provider
+DEFAULT_BATCH_SIZES = {"qwen": 10, "openai": 256}
+
 def get_embedding_config() -> dict:
     """
     Get the current embedding configuration from global settings.
@@ -44,6 +47,16 @@ def get_embedding_client_settings() -> Tuple[str, str, str, str, int]:
             
     return api_key, base_url, model, provider, dimension
 
+def get_embedding_batch_size() -> int:
+    """
+    Number of texts packed into one embeddings request
+    (embedding_llm.batch_size, defaulting to the provider limit).
+    """
+    config = get_embedding_config()
+    provider = config.get('provider', 'qwen')
+    size = config.get('batch_size') or DEFAULT_BATCH_SIZES.get(provider, 10)
+    return max(1, int(size))
+
 def get_sync_client() -> Tuple[OpenAI, str, int]:
     """
     Get a synchronous OpenAI client configured for embeddings.
@@ -99,3 +112,12 @@ async def generate_embedding_async(client: AsyncOpenAI, text: str, model: str) -
     except Exception as e:
         print(f"Embedding generation failed: {e}")
         raise e
+
+async def generate_embeddings_async(client: AsyncOpenAI, texts: List[str], model: str) -> List[List[float]]:
+    """
+    Generate embeddings for several texts in a single request, preserving input order.
+    """
+    inputs = [text.replace("\n", " ") for text in texts]
+    response = await client.embeddings.create(input=inputs, model=model)
+    data = sorted(response.data, key=lambda item: item.index)
+    return [item.embedding for item in data]
@@ -0,0 +1,371 @@
+"""
+文本向量持久化缓存
+
+以 (文本内容哈希, 模型, 维度) 为键保存向量，跨专题与多次向量化运行共享：
+同一段文本（句子、实体名、标签、主题建模语料、报告证据等）再次出现时直接复用，不再请求向量接口或重新编码。
+缓存分两层：
+- 磁盘层：单个 SQLite 文件（WAL 模式），按块批量读写，向量以 float32 或 float16 原始字节存储；
+  记录最近使用时间，compact() 按条目上限/有效期淘汰并回收文件空间。
+- 内存层：按字节计量的 LRU，超出 memory_bytes 时淘汰最久未使用的向量。
+进程内通过 get_embedding_cache() 按 (路径, 模型, 维度) 共享同一实例，RAG 向量化、BERTopic 与报告证据检索共用。
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / "cache" / "embeddings.sqlite3"
+DEFAULT_MEMORY_MB = 64
+DEFAULT_MAX_ENTRIES = 0
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16}
+
+# SQLite 默认参数上限为 999，按块查询
+_CHUNK = 500
+
+_SHARED: Dict[Tuple[str, str, int], "EmbeddingCache"] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def prepare_text(text: str) -> str:
+    """与向量接口一致的输入预处理（换行替换为空格）。"""
+    return str(text or "").replace("\n", " ")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(prepare_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    向量缓存
+
+    Args:
+        path: SQLite 文件路径
+        model: 向量模型标识（建议带 provider 前缀）
+        dimension: 向量维度（参与缓存键，维度变化时不会误用旧向量）
+        dtype: 磁盘存储精度，float32 或 float16（float16 体积减半，读出时还原为 float32）
+        memory_bytes: 内存 LRU 层的字节上限，<=0 表示不启用内存层
+        max_entries: compact() 保留的最大条目数，<=0 表示不限制
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        model: str,
+        dimension: int = 0,
+        dtype: str = "float32",
+        memory_bytes: int = DEFAULT_MEMORY_MB * 1024 * 1024,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.model = str(model or "")
+        self.dimension = int(dimension or 0)
+        self.dtype = dtype if dtype in STORAGE_DTYPES else "float32"
+        self.memory_bytes = max(0, int(memory_bytes or 0))
+        self.max_entries = int(max_entries or 0)
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (text_hash, model, dimension)
+            )
+            """
+        )
+        # 旧版缓存文件缺少存储精度与最近使用时间列
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "dtype" not in columns:
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+        if "last_used_at" not in columns:
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN last_used_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE embeddings SET last_used_at = created_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used_at)")
+        self._conn.commit()
+
+    # ---------------- 内存层 ----------------
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if not self.memory_bytes or vector.nbytes > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_used -= previous.nbytes
+        self._memory[key] = vector
+        self._memory_used += vector.nbytes
+        while self._memory_used > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= evicted.nbytes
+
+    def _recall(self, key: str) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    # ---------------- 读写 ----------------
+
+    def get_arrays(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        批量查询缓存向量（先查内存层，再按块查磁盘），并累计命中/未命中计数
+
+        Returns:
+            Dict[str, np.ndarray]: 命中的 {内容哈希: float32 向量}
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            pending = []
+            for key in unique_keys:
+                vector = self._recall(key)
+                if vector is None:
+                    pending.append(key)
+                else:
+                    found[key] = vector
+            self.memory_hits += len(found)
+
+            loaded = []
+            for start in range(0, len(pending), _CHUNK):
+                chunk = pending[start : start + _CHUNK]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"""
+                    SELECT text_hash, vector, dtype FROM embeddings
+                    WHERE model = ? AND dimension = ? AND text_hash IN ({placeholders})
+                    """,
+                    (self.model, self.dimension, *chunk),
+                ).fetchall()
+                for key, blob, dtype in rows:
+                    vector = np.frombuffer(blob, dtype=STORAGE_DTYPES.get(dtype, np.float32)).astype(np.float32)
+                    found[key] = vector
+                    loaded.append(key)
+                    self._remember(key, vector)
+            if loaded:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used_at = ? WHERE text_hash = ? AND model = ? AND dimension = ?",
+                    [(now, key, self.model, self.dimension) for key in loaded],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        return found
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        批量查询缓存向量，并累计命中/未命中计数
+
+        Returns:
+            Dict[str, List[float]]: 命中的 {内容哈希: 向量}
+        """
+        return {key: vector.tolist() for key, vector in self.get_arrays(keys).items()}
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """写入 (内容哈希, 向量)，空向量跳过，已存在时覆盖；同时放入内存层。"""
+        now = time.time()
+        storage = STORAGE_DTYPES[self.dtype]
+        rows = []
+        with self._lock:
+            for key, vector in items:
+                if vector is None or len(vector) == 0:
+                    continue
+                array = np.asarray(vector, dtype=np.float32).reshape(-1)
+                stored = array.astype(storage)
+                rows.append((key, self.model, self.dimension, stored.tobytes(), now, self.dtype, now))
+                self._remember(key, stored.astype(np.float32))
+            if not rows:
+                return
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO embeddings
+                    (text_hash, model, dimension, vector, created_at, dtype, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def encode(self, texts: Sequence[str], embed_fn: Callable[[List[str]], Any]) -> np.ndarray:
+        """
+        带缓存的批量编码：相同文本只编码一次，命中缓存的直接复用，其余一次性交给 embed_fn
+
+        Args:
+            texts: 待编码文本
+            embed_fn: 接收未命中文本列表、返回等长向量序列（list 或 ndarray）的函数
+
+        Returns:
+            np.ndarray: (len(texts), dimension) 的 float32 矩阵，顺序与 texts 一致
+        """
+        keys = [content_hash(text) for text in texts]
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+        resolved = self.get_arrays(unique.keys())
+        pending = [key for key in unique if key not in resolved]
+        if pending:
+            vectors = embed_fn([unique[key] for key in pending])
+            generated = list(zip(pending, vectors))
+            self.put_many(generated)
+            resolved.update(
+                {key: np.asarray(vector, dtype=np.float32).reshape(-1) for key, vector in generated if vector is not None}
+            )
+        dimension = self.dimension or next((len(v) for v in resolved.values()), 0)
+        matrix = np.zeros((len(texts), dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            vector = resolved.get(key)
+            if vector is not None and len(vector) == dimension:
+                matrix[row] = vector
+        return matrix
+
+    # ---------------- 维护 ----------------
+
+    def compact(self, max_entries: Optional[int] = None, max_age_days: float = 0) -> int:
+        """
+        淘汰超出条目上限（按最近使用时间）与超过有效期的记录，并回收文件空间，返回删除条数
+
+        Args:
+            max_entries: 保留的最大条目数（全部模型合计），默认使用构造参数，<=0 表示不限制
+            max_age_days: 超过该天数未使用的记录被删除，<=0 表示不按时间淘汰
+        """
+        limit = self.max_entries if max_entries is None else int(max_entries or 0)
+        removed = 0
+        with self._lock:
+            if max_age_days and float(max_age_days) > 0:
+                cutoff = time.time() - float(max_age_days) * 86400
+                cursor = self._conn.execute(
+                    "DELETE FROM embeddings WHERE last_used_at < ?", (cutoff,)
+                )
+                removed += max(cursor.rowcount, 0)
+            if limit > 0:
+                total = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                overflow = int(total) - limit
+                if overflow > 0:
+                    cursor = self._conn.execute(
+                        """
+                        DELETE FROM embeddings WHERE rowid IN (
+                            SELECT rowid FROM embeddings ORDER BY last_used_at ASC LIMIT ?
+                        )
+                        """,
+                        (overflow,),
+                    )
+                    removed += max(cursor.rowcount, 0)
+            self._conn.commit()
+            if removed:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._conn.execute("VACUUM")
+        return removed
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+
+    def clear(self) -> None:
+        """清空当前模型与维度的全部缓存（内存层与磁盘层）。"""
+        with self._lock:
+            self.clear_memory()
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE model = ? AND dimension = ?", (self.model, self.dimension)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+        }
+
+    def disk_stats(self) -> Dict[str, Any]:
+        """磁盘层条目数与文件大小（只查元数据，不遍历向量）。"""
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ? AND dimension = ?",
+                (self.model, self.dimension),
+            ).fetchone()[0]
+        size = sum(
+            candidate.stat().st_size
+            for candidate in (self.path, Path(f"{self.path}-wal"))
+            if candidate.exists()
+        )
+        return {"entries": int(entries), "file_bytes": size, "path": str(self.path)}
+
+    def close(self) -> None:
+        with _SHARED_LOCK:
+            for shared_key, cache in list(_SHARED.items()):
+                if cache is self:
+                    del _SHARED[shared_key]
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+
+def _cache_config() -> Dict[str, Any]:
+    try:
+        from .embedding import get_embedding_config
+
+        cache_cfg = get_embedding_config().get("cache")
+    except Exception:
+        cache_cfg = None
+    return cache_cfg if isinstance(cache_cfg, dict) else {}
+
+
+def get_embedding_cache(model: str, dimension: int = 0, path: Optional[Path] = None) -> Optional[EmbeddingCache]:
+    """
+    获取进程内共享的向量缓存实例（配置见 llm.yaml 的 embedding_llm.cache）
+
+    Args:
+        model: 向量模型标识（建议带 provider 前缀，如 qwen/text-embedding-v4、sentence-transformers/xxx）
+        dimension: 向量维度
+        path: 缓存文件路径，默认使用配置的 path 或 DEFAULT_CACHE_PATH
+
+    Returns:
+        Optional[EmbeddingCache]: 缓存未启用或无法打开时返回 None
+    """
+    cache_cfg = _cache_config()
+    if not cache_cfg.get("enabled", True):
+        return None
+    cache_path = Path(path or cache_cfg.get("path") or DEFAULT_CACHE_PATH)
+    shared_key = (str(cache_path.resolve()), str(model or ""), int(dimension or 0))
+    with _SHARED_LOCK:
+        cache = _SHARED.get(shared_key)
+        if cache is None:
+            try:
+                cache = EmbeddingCache(
+                    cache_path,
+                    model,
+                    dimension,
+                    dtype=str(cache_cfg.get("dtype") or "float32"),
+                    memory_bytes=int(float(cache_cfg.get("memory_mb", DEFAULT_MEMORY_MB)) * 1024 * 1024),
+                    max_entries=int(cache_cfg.get("max_entries") or DEFAULT_MAX_ENTRIES),
+                )
+                # 首次打开时按条目上限/有效期整理一次
+                if cache.max_entries > 0 or float(cache_cfg.get("ttl_days") or 0) > 0:
+                    cache.compact(max_age_days=float(cache_cfg.get("ttl_days") or 0))
+            except Exception:
+                return None
+            _SHARED[shared_key] = cache
+    return cache
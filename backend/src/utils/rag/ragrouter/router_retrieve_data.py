@@ -7,7 +7,7 @@ import json
 import lancedb
 import yaml
 import re
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
@@ -16,6 +16,8 @@ from ...setting.env_loader import get_api_key
 from ...setting.settings import settings
 from ...logging.logging import setup_logger, log_success, log_error, log_module_start
 from ...ai.qwen import QwenClient
+from ...ai.http_pool import closing_sessions, pooled_session
+from .time_index import DocTimeIndex, doc_filter, doc_time_index_path, in_filter, parse_query_time
 
 
 def get_available_router_topics():
@@ -46,6 +48,8 @@ class TimeRange:
     has_time: bool
     time_text: str
     matched_docs: List[str]
+    start: Optional[date] = None
+    end: Optional[date] = None
 
 
 @dataclass
@@ -137,11 +141,12 @@ class LLMHelper:
                 # 使用更长的超时时间
                 timeout = aiohttp.ClientTimeout(total=180, connect=10, sock_read=120)
                 
-                async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with pooled_session() as session:
                     async with session.post(
                         "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation",
                         json=data,
-                        headers=headers
+                        headers=headers,
+                        timeout=timeout,
                     ) as resp:
                         if resp.status == 200:
                             response_data = await resp.json()
@@ -310,29 +315,6 @@ class LLMHelper:
         except:
             return {"has_time": False, "time_text": ""}
     
-    async def match_time_with_docs(self, query_time: str, doc_times: Dict[str, str]) -> List[str]:
-        """匹配查询时间与文档时间范围"""
-        doc_time_list = "\n".join([f"- ID={doc_id}: {time}" for doc_id, time in doc_times.items()])
-        
-        # 从配置文件加载提示词
-        prompt_template = self.prompts.get('time_matching', {}).get('prompt', '')
-        if not prompt_template:
-            log_error(self.logger, "未找到time_matching提示词配置", "llm")
-            return []
-        
-        prompt = prompt_template.format(query_time=query_time, doc_time_list=doc_time_list)
-        response = await self.call_api(prompt)
-        try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group(0))
-                matched = result.get("matched_doc_ids", [])
-                matched = [str(doc_id).strip() for doc_id in matched]
-                return matched
-            return []
-        except:
-            return []
-    
     async def expand_query(self, original_query: str) -> str:
         """查询扩展/重写：将用户查询扩展为更完整、更适合检索的查询
         
@@ -446,8 +428,8 @@ class AdvancedRAGSearcher:
         self.tables = {}
         self._load_tables()
         
-        # 加载文档时间映射
-        self.doc_times = self._load_doc_times()
+        # 加载文档时间索引
+        self.time_index = self._load_time_index()
     
     def _load_tables(self) -> None:
         """加载所有表"""
@@ -460,51 +442,95 @@ class AdvancedRAGSearcher:
             except Exception as e:
                 log_error(self.logger, f"无法加载表 {name}: {str(e)}", "searcher")
     
-    def _load_doc_times(self) -> Dict[str, str]:
-        """加载文档时间映射"""
-        doc_times = {}
+    def _load_time_index(self) -> DocTimeIndex:
+        """加载文档时间索引；没有索引文件的旧数据库只读取文本表的 doc_id/time 两列构建"""
+        index = DocTimeIndex.load(doc_time_index_path(self.db_path.parent))
+        if len(index):
+            return index
         try:
             texts_table = self.tables.get("graphrag_texts")
             if texts_table:
-                df = texts_table.to_pandas()
-                for _, row in df.iterrows():
-                    doc_id = row['doc_id']
-                    time = row['time']
-                    if doc_id not in doc_times:
-                        doc_times[doc_id] = time
-                
+                index = DocTimeIndex.from_table(texts_table)
         except Exception as e:
             log_error(self.logger, f"无法加载文档时间: {str(e)}", "searcher")
-        
-        return doc_times
+        return index
     
     async def _process_time_filter(self, query: str) -> TimeRange:
-        """处理时间过滤"""
+        """处理时间过滤：规则解析查询时间，仅在时间说法无法确定时调用大模型，再在文档时间索引中查出命中文档"""
         
-        # 1. 提取查询中的时间
-        time_info = await self.llm_helper.extract_time_from_query(query)
-        has_time = time_info.get("has_time", False)
-        time_text = time_info.get("time_text", "")
-        
-        if not has_time:
+        # 1. 规则解析查询中的时间
+        query_time = parse_query_time(query)
+        if query_time.status == "none":
             return TimeRange(has_time=False, time_text="", matched_docs=[])
         
-        log_success(self.logger, f"查询包含时间范围: {time_text}", "RouterRetrieve")
+        if query_time.status == "ambiguous":
+            time_info = await self.llm_helper.extract_time_from_query(query)
+            if not time_info.get("has_time", False):
+                return TimeRange(has_time=False, time_text="", matched_docs=[])
+            time_text = time_info.get("time_text", "")
+            query_time = parse_query_time(time_text)
+            if query_time.status != "parsed":
+                log_error(self.logger, f"无法解析时间范围: {time_text}，将进行全库检索", "time")
+                return TimeRange(has_time=False, time_text=time_text, matched_docs=[])
+            query_time.text = time_text
+        
+        time_text = query_time.text
+        log_success(
+            self.logger,
+            f"查询包含时间范围: {time_text} ({query_time.start or '不限'} ~ {query_time.end or '不限'})",
+            "RouterRetrieve"
+        )
         
-        # 2. 与文档时间进行匹配
-        if not self.doc_times:
+        # 2. 在文档时间索引中匹配
+        if not len(self.time_index):
             log_error(self.logger, "无文档时间信息，将进行全库检索", "time")
             return TimeRange(has_time=False, time_text=time_text, matched_docs=[])
         
-        matched_doc_ids = await self.llm_helper.match_time_with_docs(time_text, self.doc_times)
+        matched_doc_ids = self.time_index.match(query_time.start, query_time.end)
         
         if not matched_doc_ids:
             return TimeRange(has_time=False, time_text=time_text, matched_docs=[])
         
         log_success(self.logger, f"文档匹配完成: {', '.join(matched_doc_ids)}", "RouterRetrieve")
         
-        return TimeRange(has_time=True, time_text=time_text, matched_docs=matched_doc_ids)
+        return TimeRange(
+            has_time=True,
+            time_text=time_text,
+            matched_docs=matched_doc_ids,
+            start=query_time.start,
+            end=query_time.end
+        )
     
+    @staticmethod
+    def _time_where(table, time_range: TimeRange) -> Optional[str]:
+        """时间过滤对应的 where 预过滤谓词（按命中文档），无时间过滤时返回 None"""
+        if time_range.has_time and time_range.matched_docs:
+            return doc_filter(table, time_range.matched_docs)
+        return None
+
+    @staticmethod
+    def _vector_search(table, query_vec: List[float], column: str, limit: int,
+                       where: Optional[str] = None) -> List[Dict[str, Any]]:
+        """向量检索；有 where 时在 LanceDB 内预过滤，只在命中的行上计算距离"""
+        query = table.search(query_vec, vector_column_name=column)
+        if where:
+            query = query.where(where, prefilter=True)
+        return query.limit(limit).to_list()
+
+    @staticmethod
+    def _fetch_rows(table, where: str) -> List[Dict[str, Any]]:
+        """按标量条件读取行（不含向量列）"""
+        columns = [name for name in table.schema.names if not name.endswith("_vec")]
+        return table.search().where(where).select(columns).limit(None).to_list()
+
+    def _fetch_entities(self, entity_table, entity_ids, cache: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """按ID读取实体并写入缓存，已缓存的不再查询"""
+        missing = [eid for eid in dict.fromkeys(entity_ids) if eid not in cache]
+        if missing:
+            for row in self._fetch_rows(entity_table, in_filter("entity_id", missing)):
+                cache.setdefault(row['entity_id'], row)
+        return cache
+
     async def _graphrag_search(self, query_vec: List[float], time_range: TimeRange, topk: int) -> GraphRAGResult:
         """
         GraphRAG检索：联合实体向量+描述向量，扩展核心实体的所有关系
@@ -518,108 +544,46 @@ class AdvancedRAGSearcher:
             log_error(self.logger, "表不存在", "graphrag")
             return GraphRAGResult(entities=[], relationships=[], multi_hop_paths=[])
         
-        # 加载完整的实体和关系数据
-        entities_df = entity_table.to_pandas()
-        relations_df = rel_table.to_pandas()
+        # 按需读取的实体行（entity_id -> 行），不再整表载入
+        entity_rows: Dict[str, Dict[str, Any]] = {}
         
-        # 1. 联合检索：实体名称向量 + 实体描述向量（支持时间过滤）
+        # 1. 联合检索：实体名称向量 + 实体描述向量（时间过滤以 where 预过滤下推到 LanceDB）
         try:
-            # 如果有时间过滤，先筛选全库样本
-            if time_range.has_time and time_range.matched_docs:
-                # 1. 从全库中筛选符合时间范围的实体
-                time_filtered_entity_ids = []
-                for _, entity_row in entities_df.iterrows():
-                    doc_ids = json.loads(entity_row.get('doc_ids', '[]'))
-                    if any(doc_id in time_range.matched_docs for doc_id in doc_ids):
-                        time_filtered_entity_ids.append(entity_row['entity_id'])
-                
-                total_entities = len(entities_df)
-                filtered_count = len(time_filtered_entity_ids)
-                
-                
-                # 如果没有符合时间的实体，返回空结果
-                if not time_filtered_entity_ids:
-                    log_error(self.logger, "  未找到符合时间范围的实体", "graphrag")
-                    core_entity_ids = []
+            entity_where = self._time_where(entity_table, time_range)
+            name_results = self._vector_search(entity_table, query_vec, "entity_name_vec", topk * 2, entity_where)
+            desc_results = self._vector_search(entity_table, query_vec, "description_vec", topk * 2, entity_where)
+            
+            if entity_where and not name_results and not desc_results:
+                log_error(self.logger, "  未找到符合时间范围的实体", "graphrag")
+            
+            # 合并结果并综合排序（保存详细的距离信息）
+            entity_scores = {}  # entity_id -> {total_score, name_dist, desc_dist}
+            for e in name_results:
+                eid = e['entity_id']
+                if eid not in entity_scores:
+                    entity_scores[eid] = {'name_dist': None, 'desc_dist': None}
+                entity_scores[eid]['name_dist'] = e.get('_distance', 1.0)
+            
+            for e in desc_results:
+                eid = e['entity_id']
+                if eid not in entity_scores:
+                    entity_scores[eid] = {'name_dist': None, 'desc_dist': None}
+                entity_scores[eid]['desc_dist'] = e.get('_distance', 1.0)
+            
+            # 计算综合分数（取两者平均，如果只有一个就用一个）
+            for eid in entity_scores:
+                name_d = entity_scores[eid]['name_dist']
+                desc_d = entity_scores[eid]['desc_dist']
+                if name_d is not None and desc_d is not None:
+                    entity_scores[eid]['total'] = (name_d + desc_d) / 2
+                elif name_d is not None:
+                    entity_scores[eid]['total'] = name_d
                 else:
-                    # 2. 在筛选后的样本上进行向量检索
-                    # 获取全库检索结果
-                    name_results = entity_table.search(query_vec, vector_column_name="entity_name_vec").limit(total_entities).to_list()
-                    desc_results = entity_table.search(query_vec, vector_column_name="description_vec").limit(total_entities).to_list()
-                    
-                    # 只保留符合时间范围的结果
-                    name_results = [e for e in name_results if e['entity_id'] in time_filtered_entity_ids]
-                    desc_results = [e for e in desc_results if e['entity_id'] in time_filtered_entity_ids]
-                                        
-                    # 合并结果并综合排序（保存详细的距离信息）
-                    entity_scores = {}  # entity_id -> {total_score, name_dist, desc_dist}
-                    for e in name_results:
-                        eid = e['entity_id']
-                        if eid not in entity_scores:
-                            entity_scores[eid] = {'name_dist': None, 'desc_dist': None}
-                        entity_scores[eid]['name_dist'] = e.get('_distance', 1.0)
-                    
-                    for e in desc_results:
-                        eid = e['entity_id']
-                        if eid not in entity_scores:
-                            entity_scores[eid] = {'name_dist': None, 'desc_dist': None}
-                        entity_scores[eid]['desc_dist'] = e.get('_distance', 1.0)
-                    
-                    # 计算综合分数（取两者平均，如果只有一个就用一个）
-                    for eid in entity_scores:
-                        name_d = entity_scores[eid]['name_dist']
-                        desc_d = entity_scores[eid]['desc_dist']
-                        if name_d is not None and desc_d is not None:
-                            entity_scores[eid]['total'] = (name_d + desc_d) / 2
-                        elif name_d is not None:
-                            entity_scores[eid]['total'] = name_d
-                        else:
-                            entity_scores[eid]['total'] = desc_d
-                    
-                    # 按综合分数排序（距离越小越相似）
-                    sorted_items = sorted(entity_scores.items(), key=lambda x: x[1]['total'])
-                    core_entity_ids = [item[0] for item in sorted_items[:topk]]
-                    
-                    # 输出详细日志
-                    for i, (eid, scores) in enumerate(sorted_items[:topk], 1):
-                        entity_name = entities_df[entities_df['entity_id'] == eid].iloc[0]['entity_name']
-            else:
-                # 无时间过滤，正常检索
-                name_results = entity_table.search(query_vec, vector_column_name="entity_name_vec").limit(topk * 2).to_list()
-                desc_results = entity_table.search(query_vec, vector_column_name="description_vec").limit(topk * 2).to_list()
-                
-                # 合并结果并综合排序（保存详细的距离信息）
-                entity_scores = {}  # entity_id -> {total_score, name_dist, desc_dist}
-                for e in name_results:
-                    eid = e['entity_id']
-                    if eid not in entity_scores:
-                        entity_scores[eid] = {'name_dist': None, 'desc_dist': None}
-                    entity_scores[eid]['name_dist'] = e.get('_distance', 1.0)
-                
-                for e in desc_results:
-                    eid = e['entity_id']
-                    if eid not in entity_scores:
-                        entity_scores[eid] = {'name_dist': None, 'desc_dist': None}
-                    entity_scores[eid]['desc_dist'] = e.get('_distance', 1.0)
-                
-                # 计算综合分数（取两者平均，如果只有一个就用一个）
-                for eid in entity_scores:
-                    name_d = entity_scores[eid]['name_dist']
-                    desc_d = entity_scores[eid]['desc_dist']
-                    if name_d is not None and desc_d is not None:
-                        entity_scores[eid]['total'] = (name_d + desc_d) / 2
-                    elif name_d is not None:
-                        entity_scores[eid]['total'] = name_d
-                    else:
-                        entity_scores[eid]['total'] = desc_d
-                
-                # 按综合分数排序（距离越小越相似）
-                sorted_items = sorted(entity_scores.items(), key=lambda x: x[1]['total'])
-                core_entity_ids = [item[0] for item in sorted_items[:topk]]
-                
-                # 输出详细日志
-                for i, (eid, scores) in enumerate(sorted_items[:topk], 1):
-                    entity_name = entities_df[entities_df['entity_id'] == eid].iloc[0]['entity_name']
+                    entity_scores[eid]['total'] = desc_d
+            
+            # 按综合分数排序（距离越小越相似）
+            sorted_items = sorted(entity_scores.items(), key=lambda x: x[1]['total'])
+            core_entity_ids = [item[0] for item in sorted_items[:topk]]
             
         except Exception as e:
             log_error(self.logger, f"[entity_search] 失败: {str(e)}", "graphrag")
@@ -630,18 +594,25 @@ class AdvancedRAGSearcher:
         expanded_relationships = []  # list of relationship_info
         
         try:
+            if core_entity_ids:
+                # 一次读取核心实体的全部关系及其两端实体
+                core_rels = self._fetch_rows(
+                    rel_table,
+                    f"{in_filter('source', core_entity_ids)} OR {in_filter('target', core_entity_ids)}"
+                )
+                linked_ids = [rel[key] for rel in core_rels for key in ('source', 'target')]
+                self._fetch_entities(entity_table, core_entity_ids + linked_ids, entity_rows)
+            else:
+                core_rels = []
+            
             for core_id in core_entity_ids:
                 # 添加核心实体
-                core_entity = entities_df[entities_df['entity_id'] == core_id].iloc[0]
-                expanded_entities[core_id] = core_entity
+                expanded_entities[core_id] = entity_rows[core_id]
                 
                 # 查找所有相关关系
-                related_rels = relations_df[
-                    (relations_df['source'] == core_id) | 
-                    (relations_df['target'] == core_id)
-                ]
+                related_rels = [rel for rel in core_rels if rel['source'] == core_id or rel['target'] == core_id]
                 
-                for _, rel in related_rels.iterrows():
+                for rel in related_rels:
                     src_id = rel['source']
                     tgt_id = rel['target']
                     
@@ -649,15 +620,11 @@ class AdvancedRAGSearcher:
                     expanded_relationships.append(rel)
                     
                     # 添加相关实体
-                    if src_id not in expanded_entities:
-                        src_entity = entities_df[entities_df['entity_id'] == src_id]
-                        if not src_entity.empty:
-                            expanded_entities[src_id] = src_entity.iloc[0]
+                    if src_id not in expanded_entities and src_id in entity_rows:
+                        expanded_entities[src_id] = entity_rows[src_id]
                     
-                    if tgt_id not in expanded_entities:
-                        tgt_entity = entities_df[entities_df['entity_id'] == tgt_id]
-                        if not tgt_entity.empty:
-                            expanded_entities[tgt_id] = tgt_entity.iloc[0]
+                    if tgt_id not in expanded_entities and tgt_id in entity_rows:
+                        expanded_entities[tgt_id] = entity_rows[tgt_id]
             
         except Exception as e:
             log_error(self.logger, f"[entity_expand] 失败: {str(e)}", "graphrag")
@@ -665,58 +632,29 @@ class AdvancedRAGSearcher:
         # 3. 检索关系Top3，并获取对应的两个实体
         top_relations = []
         try:
-            # 如果有时间过滤，先筛选全库样本
-            if time_range.has_time and time_range.matched_docs:
-                # 1. 从全库中筛选符合时间范围的关系
-                time_filtered_rel_ids = []
-                for _, rel_row in relations_df.iterrows():
-                    try:
-                        doc_ids = json.loads(rel_row.get('doc_ids', '[]'))
-                        if any(doc_id in time_range.matched_docs for doc_id in doc_ids):
-                            time_filtered_rel_ids.append(rel_row['relationship_id'])
-                    except:
-                        continue
-                
-                total_relations = len(relations_df)
-                filtered_count = len(time_filtered_rel_ids)
-                
-                
-                if filtered_count == 0:
-                    log_error(self.logger, "  未找到符合时间范围的关系", "graphrag")
-                    rel_results = []
-                else:
-                    # 2. 在筛选后的样本上进行向量检索
-                    # 获取全库检索结果
-                    all_rel_results = rel_table.search(query_vec, vector_column_name="description_vec").limit(total_relations).to_list()
-                    
-                    # 只保留符合时间范围的结果
-                    rel_results = [r for r in all_rel_results if r['relationship_id'] in time_filtered_rel_ids]
-                    
-            else:
-                # 无时间过滤，正常检索
-                rel_results = rel_table.search(query_vec, vector_column_name="description_vec").limit(10).to_list()
+            rel_where = self._time_where(rel_table, time_range)
+            rel_results = self._vector_search(rel_table, query_vec, "description_vec", 10, rel_where)
+            if rel_where and not rel_results:
+                log_error(self.logger, "  未找到符合时间范围的关系", "graphrag")
             
             # 按距离重新排序（确保距离小的在前面）
             rel_results = sorted(rel_results, key=lambda x: x.get('_distance', 1.0))
             
             # 获取前3个关系及对应的两个实体
+            self._fetch_entities(
+                entity_table,
+                [r[key] for r in rel_results[:3] for key in ('source', 'target')],
+                entity_rows
+            )
             for i, r in enumerate(rel_results[:3], 1):
-                src_id = r['source']
-                tgt_id = r['target']
-                
-                # 获取源实体和目标实体
-                src_entity = entities_df[entities_df['entity_id'] == src_id]
-                tgt_entity = entities_df[entities_df['entity_id'] == tgt_id]
+                src_entity = entity_rows.get(r['source'])
+                tgt_entity = entity_rows.get(r['target'])
                 
-                if not src_entity.empty and not tgt_entity.empty:
-                    src_name = src_entity.iloc[0]['entity_name']
-                    tgt_name = tgt_entity.iloc[0]['entity_name']
-                    distance = r.get('_distance', 1.0)
-                    
+                if src_entity is not None and tgt_entity is not None:
                     top_relations.append({
                         'relation': r,
-                        'source_entity': src_entity.iloc[0],
-                        'target_entity': tgt_entity.iloc[0]
+                        'source_entity': src_entity,
+                        'target_entity': tgt_entity
                     })
 
         except Exception as e:
@@ -846,34 +784,13 @@ class AdvancedRAGSearcher:
             return NormalRAGResult(sentences=[])
         
         try:
-            # 如果有时间过滤，先筛选全库样本
-            if time_range.has_time and time_range.matched_docs:
-                # 1. 从全库中筛选符合时间范围的句子
-                sentences_df = sentence_table.to_pandas()
-                time_filtered_sentences = sentences_df[
-                    sentences_df['doc_id'].isin(time_range.matched_docs)
-                ]
-                total_sentences = len(sentences_df)
-                filtered_count = len(time_filtered_sentences)
-                                
-                if filtered_count == 0:
-                    log_error(self.logger, "  未找到符合时间范围的句子", "normalrag")
-                    return NormalRAGResult(sentences=[])
-                
-                # 2. 在筛选后的样本上进行向量检索
-                # 由于LanceDB不支持预过滤，需要获取所有结果然后手动筛选
-                all_results = sentence_table.search(query_vec, vector_column_name="sentence_vec").limit(total_sentences).to_list()
-                
-                # 只保留符合时间范围的
-                results = [s for s in all_results if s.get('doc_id', '') in time_range.matched_docs]
-                
-                # 按距离排序
-                results = sorted(results, key=lambda x: x.get('_distance', 1.0))
-                
-            else:
-                # 无时间过滤，正常检索
-                results = sentence_table.search(query_vec, vector_column_name="sentence_vec").limit(topk * 2).to_list()
-                results = sorted(results, key=lambda x: x.get('_distance', 1.0))
+            # 时间过滤以 where 预过滤下推到 LanceDB，只在命中文档的句子上检索
+            where = self._time_where(sentence_table, time_range)
+            results = self._vector_search(sentence_table, query_vec, "sentence_vec", topk * 2, where)
+            if where and not results:
+                log_error(self.logger, "  未找到符合时间范围的句子", "normalrag")
+                return NormalRAGResult(sentences=[])
+            results = sorted(results, key=lambda x: x.get('_distance', 1.0))
             
             # 获取前topk条
             results = results[:topk]
@@ -908,34 +825,13 @@ class AdvancedRAGSearcher:
             return TagRAGResult(text_blocks=[])
         
         try:
-            # 如果有时间过滤，先筛选全库样本
-            if time_range.has_time and time_range.matched_docs:
-                # 1. 从全库中筛选符合时间范围的文本块
-                texts_df = texts_table.to_pandas()
-                time_filtered_texts = texts_df[
-                    texts_df['doc_id'].isin(time_range.matched_docs)
-                ]
-                total_texts = len(texts_df)
-                filtered_count = len(time_filtered_texts)
-                                
-                if filtered_count == 0:
-                    log_error(self.logger, "  未找到符合时间范围的文本块", "tagrag")
-                    return TagRAGResult(text_blocks=[])
-                
-                # 2. 在筛选后的样本上进行向量检索
-                # 由于LanceDB不支持预过滤，需要获取所有结果然后手动筛选
-                all_results = texts_table.search(query_vec, vector_column_name="text_tag_vec").limit(total_texts).to_list()
-                
-                # 只保留符合时间范围的
-                results = [t for t in all_results if t.get('doc_id', '') in time_range.matched_docs]
-                
-                # 按距离排序
-                results = sorted(results, key=lambda x: x.get('_distance', 1.0))
-                
-            else:
-                # 无时间过滤，正常检索
-                results = texts_table.search(query_vec, vector_column_name="text_tag_vec").limit(topk * 2).to_list()
-                results = sorted(results, key=lambda x: x.get('_distance', 1.0))
+            # 时间过滤以 where 预过滤下推到 LanceDB，只在命中文档的文本块上检索
+            where = self._time_where(texts_table, time_range)
+            results = self._vector_search(texts_table, query_vec, "text_tag_vec", topk * 2, where)
+            if where and not results:
+                log_error(self.logger, "  未找到符合时间范围的文本块", "tagrag")
+                return TagRAGResult(text_blocks=[])
+            results = sorted(results, key=lambda x: x.get('_distance', 1.0))
             
             # 获取前topk个
             results = results[:topk]
@@ -1158,7 +1054,7 @@ def router_retrieve(
         
         
         # 执行检索（需要使用asyncio运行）
-        results = asyncio.run(searcher.search(params))
+        results = asyncio.run(closing_sessions(searcher.search(params)))
         
         return results
         
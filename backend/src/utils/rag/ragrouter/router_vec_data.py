@@ -5,6 +5,7 @@
 """
 import asyncio
 import aiohttp
+import hashlib
 import json
 import re
 import yaml
@@ -20,6 +21,16 @@ from ...setting.paths import get_project_root, get_configs_root
 from ...setting.env_loader import get_api_key
 from ...setting.settings import settings
 from ...logging.logging import setup_logger, log_success, log_error, log_module_start
+from ...ai.http_pool import closing_sessions, pooled_session
+from .time_index import (
+    DOC_ID_LIST_FIELD,
+    TIME_FIELDS,
+    DocTimeIndex,
+    doc_filter,
+    doc_time_index_path,
+    ensure_scalar_indexes,
+    time_columns,
+)
 
 init(autoreset=True)
 
@@ -70,7 +81,8 @@ class TextProcessor:
         self.all_mapping = {}  # 统一的映射结构
         
         self.processed_docs = set()  # 已处理的文档ID集合
-        self.new_doc_ids = []  # 本次新增的文档ID
+        self.new_doc_ids = []  # 本次需要处理的文档ID（新增 + 内容变更）
+        self.stale_doc_ids = []  # 需要删除旧数据的文档ID（内容变更 + 源文件已移除）
         
         self.logger = logger
     
@@ -93,6 +105,26 @@ class TextProcessor:
         
         return filename, 1
     
+    @staticmethod
+    def fingerprint(text_files: List[Tuple[int, Path]]) -> str:
+        """文档指纹：按文本块顺序汇总各源文件名与内容哈希"""
+        digest = hashlib.sha1()
+        for text_num, text_file in sorted(text_files, key=lambda x: x[0]):
+            digest.update(text_file.name.encode("utf-8"))
+            digest.update(hashlib.sha1(text_file.read_bytes()).digest())
+        return digest.hexdigest()
+    
+    def _drop_docs(self, doc_ids: List[str], keep_mapping: bool = False) -> None:
+        """清除文档的文本映射与合并文件（keep_mapping=True 时保留文档条目以沿用原ID）"""
+        for doc_id in doc_ids:
+            for text_id in self.doc_mapping.get(doc_id, {}).get('text_ids', []):
+                self.text_mapping.pop(text_id, None)
+            for doc_file in self.doc_db.glob(f"doc{doc_id}_*.txt"):
+                doc_file.unlink()
+            if not keep_mapping:
+                self.doc_mapping.pop(doc_id, None)
+                self.processed_docs.discard(doc_id)
+    
     def _split_sentences(self) -> None:
         """切割句子并建立映射（增量：只切割新文档）"""
         # 读取已有句子，恢复sentence_id_counter
@@ -109,6 +141,11 @@ class TextProcessor:
             except Exception as e:
                 log_error(self.logger, f"读取句子文件失败: {e}", "RouterVectorize")
         
+        # 丢弃变更/已移除文档的旧句子
+        stale = set(self.stale_doc_ids)
+        if stale:
+            all_sentences = [s for s in all_sentences if s['doc_id'] not in stale]
+        
         # 只切割新文档
         new_sentences = []
         for doc_file in sorted(self.doc_db.glob("doc*.txt")):
@@ -170,15 +207,20 @@ class TextProcessor:
                 "processed_docs": []
             }
         
-        # 更新文档映射（追加新文档）
+        # 按当前映射重建文档与文本条目（已移除文档随之删除）
+        self.all_mapping["documents"] = {}
+        self.all_mapping["texts"] = {}
         for doc_id, doc_info in self.doc_mapping.items():
             self.all_mapping["documents"][doc_id] = {
                 "doc_name": doc_info['name'],
                 "text_ids": doc_info['text_ids'],
-                "text_count": len(doc_info['text_ids'])
+                "text_count": len(doc_info['text_ids']),
+                "fingerprint": doc_info.get('fingerprint')
             }
+        self.all_mapping["processed_docs"] = [
+            doc_id for doc_id in self.all_mapping.get("processed_docs", []) if doc_id in self.doc_mapping
+        ]
         
-        # 更新文本映射（追加新文本）
         for text_id, text_info in self.text_mapping.items():
             self.all_mapping["texts"][text_id] = {
                 "doc_id": text_info['doc_id'],
@@ -194,7 +236,7 @@ class TextProcessor:
             json.dump(self.all_mapping, f, ensure_ascii=False, indent=2)
 
     def process_all(self) -> None:
-        """执行完整的文本处理流程（增量模式：只处理新文档）"""
+        """执行完整的文本处理流程（增量模式：按指纹只处理新增与内容变更的文档，清理已移除的文档）"""
         
         # 读取已有映射，获取已处理的文档和计数器
         mapping_file = self.log_db / "data_mapping.json"
@@ -211,7 +253,8 @@ class TextProcessor:
                 
                 # 恢复映射
                 self.all_mapping = existing_mapping
-                self.doc_mapping = {k: {'name': v['doc_name'], 'texts_name': [], 'text_ids': v['text_ids'], 'sentence_ids': []} 
+                self.doc_mapping = {k: {'name': v['doc_name'], 'texts_name': [], 'text_ids': v['text_ids'], 'sentence_ids': [],
+                                        'fingerprint': v.get('fingerprint')}
                                    for k, v in existing_mapping.get('documents', {}).items()}
                 self.text_mapping = existing_mapping.get('texts', {})
                 
@@ -226,7 +269,7 @@ class TextProcessor:
                     log_error(self.logger, f"读取映射文件失败: {e}", "RouterVectorize")
         
         text_files = sorted(self.text_db.glob("*.txt"))
-        if not text_files:
+        if not text_files and not self.processed_docs:
             log_error(self.logger, "没有文本文件", "RouterVectorize")
             return
                 
@@ -236,36 +279,64 @@ class TextProcessor:
             doc_name, text_num = self.extract_doc_name_from_file(text_file.stem)
             doc_groups[doc_name].append((text_num, text_file))
         
-        # 过滤出新文档
+        # 按指纹区分新增、变更与未变化的文档
+        processed_by_name = {
+            self.doc_mapping.get(doc_id, {}).get('name', ''): doc_id for doc_id in self.processed_docs
+        }
         new_doc_groups = {}
-        for doc_name in doc_groups.keys():
-            # 检查该文档是否已处理（通过文档名匹配）
-            already_processed = False
-            for processed_id in self.processed_docs:
-                existing_doc_name = self.doc_mapping.get(processed_id, {}).get('name', '')
-                if existing_doc_name == doc_name:
-                    already_processed = True
-                    break
-            
-            if not already_processed:
-                new_doc_groups[doc_name] = doc_groups[doc_name]
+        changed_doc_ids = {}  # doc_name -> 沿用的doc_id
+        fingerprints = {}
+        for doc_name, files in doc_groups.items():
+            fingerprint = fingerprints[doc_name] = self.fingerprint(files)
+            doc_id = processed_by_name.get(doc_name)
+            if doc_id is None:
+                new_doc_groups[doc_name] = files
+                continue
+            stored = self.doc_mapping[doc_id].get('fingerprint')
+            if stored is None:
+                # 旧映射没有指纹：视为未变化，补记指纹
+                self.doc_mapping[doc_id]['fingerprint'] = fingerprint
+            elif stored != fingerprint:
+                new_doc_groups[doc_name] = files
+                changed_doc_ids[doc_name] = doc_id
+        
+        removed_doc_ids = sorted(
+            (doc_id for name, doc_id in processed_by_name.items() if name not in doc_groups),
+            key=int
+        )
+        
+        self.stale_doc_ids = sorted(changed_doc_ids.values(), key=int) + removed_doc_ids
+        self._drop_docs(list(changed_doc_ids.values()), keep_mapping=True)
+        self._drop_docs(removed_doc_ids)
+        
+        if removed_doc_ids:
+            log_success(self.logger, f"源文件已移除的文档:共 {len(removed_doc_ids)} 项，将删除其数据", "RouterVectorize")
         
         if not new_doc_groups:
-            log_success(self.logger, "暂无新文档需要处理", "RouterVectorize")
+            if removed_doc_ids:
+                self._split_sentences()
+            self._save_mappings()
+            log_success(self.logger, "暂无新增或变更的文档需要处理", "RouterVectorize")
             return
         
-        log_success(self.logger, f"新增待处理文档:共 {len(new_doc_groups)} 项", "RouterVectorize")
+        log_success(
+            self.logger,
+            f"待处理文档:共 {len(new_doc_groups)} 项（新增{len(new_doc_groups) - len(changed_doc_ids)} | 变更{len(changed_doc_ids)}）",
+            "RouterVectorize"
+        )
         
-        # 建立映射（只处理新文档）
+        # 建立映射（只处理新增与变更的文档，变更文档沿用原ID）
         for doc_name in sorted(new_doc_groups.keys()):
-            doc_id = str(doc_id_counter)
+            reused_id = changed_doc_ids.get(doc_name)
+            doc_id = reused_id or str(doc_id_counter)
             text_files_in_doc = sorted(new_doc_groups[doc_name], key=lambda x: x[0])
             
             self.doc_mapping[doc_id] = {
                 'name': doc_name,
                 'texts_name': [],
                 'text_ids': [],
-                'sentence_ids': []
+                'sentence_ids': [],
+                'fingerprint': fingerprints[doc_name]
             }
             
             doc_texts = []
@@ -297,10 +368,11 @@ class TextProcessor:
 
             log_success(self.logger, f"文档命名：doc{doc_id}-{doc_name[:30]} | 文本块:共{len(doc_texts)}份 | 长度:{len(merged_text)}字", "RouterVectorize")
             
-            # 记录新增的文档ID
+            # 记录待处理的文档ID
             self.new_doc_ids.append(doc_id)
             
-            doc_id_counter += 1
+            if reused_id is None:
+                doc_id_counter += 1
         
         # 切割句子
         self._split_sentences()
@@ -458,7 +530,7 @@ class EntityRelationExtractor:
         text_data = {}  # text_id -> (text_content, doc_id)
         text_entities = {}  # text_id -> entities
         
-        async with aiohttp.ClientSession() as session:
+        async with pooled_session() as session:
             
             total_tasks = len(text_files)
             completed = 0
@@ -608,21 +680,29 @@ class EntityRelationExtractor:
         return text_tags, entity_id_counter - 1, relation_id_counter - 1, current_batch_entities, current_batch_relations
 
 class EmbeddingGenerator:
-    """向量生成器 - 使用配置的模型（高并发）"""
+    """向量生成器 - 使用配置的模型（多条文本合并为一次请求，去重并复用持久化向量缓存）"""
     
     def __init__(self, api_key: str = None, max_concurrent: int = 100, model: str = None, logger=None):
-        from ..embedding import get_async_client
+        from ..embedding import get_async_client, get_embedding_batch_size, get_embedding_config
         self.logger = logger
         self.max_concurrent = max_concurrent
         self.token_counter = TokenCounter(logger)
+        self.batch_size = get_embedding_batch_size()
+        self.requests = 0
         
         try:
             # api_key arg is ignored, we use config
             self.client, self.model_name, self.dimension = get_async_client()
-            log_success(self.logger, f"Embedding模型: {self.model_name}", "RouterVectorize")
+            log_success(self.logger, f"Embedding模型: {self.model_name} | 每次请求{self.batch_size}条", "RouterVectorize")
         except Exception as e:
             log_error(self.logger, f"EmbeddingClient初始化失败: {e}", "RouterVectorize")
             self.client = None
+        
+        self.cache = None
+        if self.client:
+            from ..embedding_cache import get_embedding_cache
+            provider = get_embedding_config().get('provider', 'qwen')
+            self.cache = get_embedding_cache(f"{provider}/{self.model_name}", self.dimension)
     
     async def generate_embedding(self, text: str, task_name: str = "", max_retries: int = 5) -> Optional[List[float]]:
         """生成单个向量（带重试）"""
@@ -636,6 +716,7 @@ class EmbeddingGenerator:
                 # generate_embedding_async handles the call
                 embedding = await generate_embedding_async(self.client, text, self.model_name)
                 # self.token_counter.add_tokens(...) # Token counting not supported in shared util yet
+                self.requests += 1
                 return embedding
             except Exception as e:
                 if attempt < max_retries - 1:
@@ -645,19 +726,68 @@ class EmbeddingGenerator:
                 return None
         return None
     
+    async def _embed_chunk(self, texts: List[str], task_name: str, max_retries: int = 5) -> List[Optional[List[float]]]:
+        """一次请求生成多条向量；整批失败时逐条重试，避免单条异常文本拖垮整批"""
+        from ..embedding import generate_embeddings_async
+        
+        for attempt in range(max_retries):
+            try:
+                vecs = await generate_embeddings_async(self.client, texts, self.model_name)
+                self.requests += 1
+                if len(vecs) == len(texts):
+                    return vecs
+                break
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(1)
+                    continue
+                log_error(self.logger, f"批量向量生成失败 {task_name}: {e}，改为逐条生成", "RouterVectorize")
+        return [await self.generate_embedding(text, task_name, max_retries=2) for text in texts]
+    
     async def generate_batch(self, texts: List[str], desc: str = "向量") -> List[Optional[List[float]]]:
-        """批量生成向量（高并发）"""        
+        """批量生成向量：相同文本只生成一次，命中缓存的不再请求，其余按 batch_size 合并请求并发发送"""
+        if not texts:
+            return []
+        if not self.client:
+            return [None] * len(texts)
+        
+        from ..embedding_cache import content_hash
+        
+        # 1. 去重（空文本不请求）
+        keys = [content_hash(t) if t and str(t).strip() else None for t in texts]
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key is not None and key not in unique:
+                unique[key] = text
+        
+        # 2. 查询持久化缓存
+        resolved: Dict[str, List[float]] = self.cache.get_many(unique.keys()) if self.cache else {}
+        pending = [key for key in unique if key not in resolved]
+        requests_before = self.requests
+        
+        # 3. 未命中的文本分块合并请求
         semaphore = asyncio.Semaphore(self.max_concurrent)
+        chunks = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
         
-        async def gen_one(text: str, idx: int):
+        async def gen_chunk(chunk_keys: List[str], idx: int):
             async with semaphore:
-                vec = await self.generate_embedding(text, f"{desc}{idx}")
-                return vec
+                vecs = await self._embed_chunk([unique[k] for k in chunk_keys], f"{desc}{idx}")
+                return list(zip(chunk_keys, vecs))
+        
+        generated = [pair for result in await asyncio.gather(*[gen_chunk(c, i) for i, c in enumerate(chunks)]) for pair in result]
+        resolved.update({key: vec for key, vec in generated if vec})
+        if self.cache:
+            self.cache.put_many(generated)
         
-        vecs = await asyncio.gather(*[gen_one(t, i) for i, t in enumerate(texts)])
+        vecs = [resolved.get(key) if key is not None else None for key in keys]
         
         success = sum(1 for v in vecs if v is not None)
-        # success_rate = (success*100//len(texts)) if len(texts) > 0 else 0
+        log_success(
+            self.logger,
+            f"{desc}: 共{len(texts)}条 | 去重后{len(unique)}条 | 缓存命中{len(unique) - len(pending)}条 | "
+            f"请求{self.requests - requests_before}次 | 成功{success}条",
+            "RouterVectorize"
+        )
         
         return vecs
 
@@ -683,12 +813,56 @@ class LanceDBManager:
             
             if mode == "append":
                 table = self.db.open_table(table_name)
+                # 旧表缺少新增的类型化列时只写入已有字段
+                existing = set(table.schema.names)
+                if not set(schema.names) <= existing:
+                    data = [{k: v for k, v in row.items() if k in existing} for row in data]
                 table.add(data)
                 total = table.count_rows()
             else:
-                self.db.create_table(table_name, data=data, schema=schema, mode="overwrite")
+                table = self.db.create_table(table_name, data=data, schema=schema, mode="overwrite")
+            ensure_scalar_indexes(table, table_name, self.logger)
         except Exception as e:
             log_error(self.logger, f"{table_name} 保存失败: {str(e)}", "RouterVectorize")
+    
+    def upsert_table(self, table_name: str, data: List[Dict], schema: pa.Schema, key: str) -> None:
+        """按主键增量写入（merge_insert：已存在则更新，否则插入），表不存在时创建"""
+        if not data:
+            return
+        
+        try:
+            if table_name not in self.db.table_names():
+                table = self.db.create_table(table_name, data=data, schema=schema)
+            else:
+                table = self.db.open_table(table_name)
+                # 旧表缺少新增的类型化列时只写入已有字段
+                existing = set(table.schema.names)
+                if not set(schema.names) <= existing:
+                    data = [{k: v for k, v in row.items() if k in existing} for row in data]
+                table.merge_insert(key).when_matched_update_all().when_not_matched_insert_all().execute(
+                    pa.Table.from_pylist(data, schema=table.schema)
+                )
+                try:
+                    # 合并小文件并把新增行纳入已有索引
+                    table.optimize()
+                except Exception:
+                    pass
+            ensure_scalar_indexes(table, table_name, self.logger)
+        except Exception as e:
+            log_error(self.logger, f"{table_name} 写入失败: {str(e)}", "RouterVectorize")
+    
+    def delete_docs(self, doc_ids: List[str]) -> None:
+        """删除指定文档在各表中的全部行"""
+        if not doc_ids:
+            return
+        for table_name in ("normalrag", "graphrag_texts", "graphrag_entities", "graphrag_relationships"):
+            if table_name not in self.db.table_names():
+                continue
+            try:
+                table = self.db.open_table(table_name)
+                table.delete(doc_filter(table, doc_ids))
+            except Exception as e:
+                log_error(self.logger, f"{table_name} 删除旧文档数据失败: {str(e)}", "RouterVectorize")
 
 class VectorizationPipeline:
     """向量化处理流水线 - 完整流程管理"""
@@ -741,35 +915,55 @@ class VectorizationPipeline:
         )
         self.lancedb_manager = LanceDBManager(str(base_path / "vector_db"), logger)
         
+        # 文档时间索引（持久化，检索端按区间匹配文档）；旧数据库首次运行时从文本表补建
+        self.time_index = DocTimeIndex.load(doc_time_index_path(base_path))
+        if not len(self.time_index) and "graphrag_texts" in self.lancedb_manager.db.table_names():
+            try:
+                self.time_index = DocTimeIndex.from_table(
+                    self.lancedb_manager.db.open_table("graphrag_texts"), doc_time_index_path(base_path)
+                )
+            except Exception as e:
+                log_error(self.logger, f"从文本表重建文档时间索引失败: {e}", "RouterVectorize")
+        
         # 运行时数据（非持久化）
-        self.doc_time_mapping = {}  # 文档时间映射
+        self.doc_time_mapping = self.time_index.doc_times()  # 文档时间映射（含已处理文档）
         self.text_tags = {}  # 文本标签映射
         self.current_batch_entities = []  # 当前批次实体
         self.current_batch_relations = []  # 当前批次关系
     
     async def run(self, skip_check: bool = False) -> None:
-        """运行完整流水线"""
+        """运行完整流水线（增量：只处理新增与内容变更的文档，删除变更与已移除文档的旧数据）"""
         
         try:
-            # 步骤1: 文本处理与映射
+            # 步骤1: 文本处理与映射（按文档指纹判断新增/变更/移除）
             self.text_processor.process_all()
             
-            # 步骤2: 提取时间（使用LLM，只提取新文档）
-            if not self.text_processor.new_doc_ids:
+            new_doc_ids = set(self.text_processor.new_doc_ids)
+            stale_doc_ids = list(self.text_processor.stale_doc_ids)
+            if not new_doc_ids and not stale_doc_ids:
+                log_success(self.logger, "文档均未变化，无需更新向量库", "RouterVectorize")
+                return
+            
+            # 步骤2: 提取时间（使用LLM，只提取待处理文档）；已移除文档从时间索引中删除
+            for doc_id in stale_doc_ids:
+                if doc_id not in new_doc_ids:
+                    self.time_index.remove(doc_id)
+                    self.doc_time_mapping.pop(doc_id, None)
+            if not new_doc_ids:
                 log_success(self.logger, "暂无新文档需要提取时间", "RouterVectorize")
             else:
-                async with aiohttp.ClientSession() as session:
+                async with pooled_session() as session:
                     tasks = []
-                    # 只提取新文档的时间
                     for doc_id in self.text_processor.new_doc_ids:
                         doc_info = self.text_processor.doc_mapping.get(doc_id)
                         if doc_info:
                             tasks.append(self._extract_time_for_doc(doc_id, doc_info['name'], session))
                     
                     await asyncio.gather(*tasks)
+            self.time_index.save()
                             
             # 步骤3: 实体关系提取（两阶段处理）
-            # 读取现有的last_id，用于增量更新
+            # 读取现有的last_id，新实体/关系在其后分配ID（已有ID保持不变）
             start_entity_id = 1
             start_relation_id = 1
             mapping_file = self.text_processor.log_db / "data_mapping.json"
@@ -783,22 +977,13 @@ class VectorizationPipeline:
                 except:
                     pass
             
-            last_entity_id = 0
-            last_relation_id = 0
-            
-            # 只处理新文档的文本文件
+            # 只处理待处理文档的文本文件
+            file_to_text_id = {info['original_file']: tid for tid, info in self.text_processor.text_mapping.items()}
             new_text_files = []
-            all_text_files = sorted(self.text_processor.text_db.glob("*.txt"))
-            
-            for text_file in all_text_files:
-                # 从文件名提取text_id，判断是否属于新文档
-                file_to_text_id = {info['original_file']: tid for tid, info in self.text_processor.text_mapping.items()}
+            for text_file in sorted(self.text_processor.text_db.glob("*.txt")):
                 text_id = file_to_text_id.get(text_file.name)
-                
-                if text_id:
-                    doc_id = self.text_processor.text_mapping[text_id]['doc_id']
-                    if doc_id in self.text_processor.new_doc_ids:
-                        new_text_files.append(text_file)
+                if text_id and self.text_processor.text_mapping[text_id]['doc_id'] in new_doc_ids:
+                    new_text_files.append(text_file)
             
             current_batch_entities = []
             current_batch_relations = []
@@ -806,7 +991,7 @@ class VectorizationPipeline:
             if not new_text_files:
                 log_success(self.logger, "暂无新文档需要提取实体关系", "RouterVectorize")
             else:
-                self.text_tags, last_entity_id, last_relation_id, current_batch_entities, current_batch_relations = await self.entity_extractor.process_batch_high_qps(
+                self.text_tags, _, _, current_batch_entities, current_batch_relations = await self.entity_extractor.process_batch_high_qps(
                     new_text_files,
                     self.text_processor.entities_db,
                     self.text_processor.relationships_db,
@@ -819,11 +1004,10 @@ class VectorizationPipeline:
             self.current_batch_entities = current_batch_entities
             self.current_batch_relations = current_batch_relations
             
-            # 步骤4: 生成向量并存LanceDB
-            # 调用向量化，返回去重后的最大ID
+            # 步骤4: 删除旧数据、生成向量并增量写入LanceDB
             final_entity_last_id, final_relation_last_id = await self._generate_and_save()
             
-            # 更新映射文件（last_id = count = 去重后的最大ID）
+            # 更新映射文件（last_id 为已分配的最大ID）
             entity_count = 0
             relation_count = 0
             try:
@@ -834,8 +1018,12 @@ class VectorizationPipeline:
             except:
                 pass
             
-            # last_id和count都是去重后的最大ID
-            self._update_mapping(final_entity_last_id, final_relation_last_id, entity_count, relation_count)
+            self._update_mapping(
+                max(start_entity_id - 1, final_entity_last_id),
+                max(start_relation_id - 1, final_relation_last_id),
+                entity_count,
+                relation_count
+            )
             
         except Exception as e:
             log_error(self.logger, f"处理失败: {str(e)}", "RouterVectorize")
@@ -846,18 +1034,53 @@ class VectorizationPipeline:
         """为单个文档提取时间"""
         time_str = await self.entity_extractor.extract_time_from_doc(doc_name, session)
         self.doc_time_mapping[doc_id] = time_str
+        self.time_index.set(doc_id, time_str)
         log_success(self.logger, f"时间标签提取完成：{time_str}", "RouterVectorize")
     
+    @staticmethod
+    def _merge_records(path: Path, records: List[Dict], stale_doc_ids: set) -> None:
+        """更新 entities.json / relationships.json：去掉变更与已移除文档的旧记录，追加本批次记录"""
+        existing = []
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+            except Exception:
+                existing = []
+        merged = [item for item in existing if item.get('doc_id', '') not in stale_doc_ids] + records
+        if merged or existing:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+    
+    def _attach_doc(self, item: Dict[str, Any]) -> Optional[str]:
+        """为实体/关系补充所属文档、文档名与时间，返回doc_id（文本不在映射中时返回None）"""
+        info = self.text_processor.text_mapping.get(item.get('text_id', ''))
+        if not info:
+            return None
+        doc_id = info['doc_id']
+        item['doc_id'] = doc_id
+        item['doc_name'] = info.get('doc_name', item.get('doc_name', ''))
+        item['time'] = self.doc_time_mapping.get(doc_id, '未知')
+        return doc_id
+    
     async def _generate_and_save(self) -> Tuple[int, int]:
-        """生成向量并存LanceDB，返回去重后的最大ID"""
+        """删除变更/已移除文档的旧行，为本批次生成向量并按主键增量写入LanceDB，返回本批次写入的最大实体/关系ID"""
+        
+        new_doc_ids = set(self.text_processor.new_doc_ids)
+        stale_doc_ids = set(self.text_processor.stale_doc_ids)
         
-        # 1. 句子向量（增量：只处理新文档的句子）
+        # 0. 删除变更与已移除文档的旧数据（未变化文档的行与ID保持不变）
+        if stale_doc_ids:
+            self.lancedb_manager.delete_docs(sorted(stale_doc_ids, key=int))
+            log_success(self.logger, f"已删除{len(stale_doc_ids)}个变更/移除文档的旧数据", "RouterVectorize")
+        
+        # 1. 句子向量（只处理待处理文档的句子）
         sentence_file = self.text_processor.sentence_db / "sentences.json"
-        with open(sentence_file, 'r', encoding='utf-8') as f:
-            all_sentences = json.load(f)
+        all_sentences = []
+        if sentence_file.exists():
+            with open(sentence_file, 'r', encoding='utf-8') as f:
+                all_sentences = json.load(f)
         
-        # 只处理新文档的句子
-        new_doc_ids = set(self.text_processor.new_doc_ids)
         new_sentences = [s for s in all_sentences if s['doc_id'] in new_doc_ids]
         
         if not new_sentences:
@@ -877,7 +1100,8 @@ class VectorizationPipeline:
                         "sentence_vec": v,
                         "doc_id": s["doc_id"],
                         "doc_name": s["doc_name"],
-                        "time": self.doc_time_mapping.get(s["doc_id"], "未知")
+                        "time": self.doc_time_mapping.get(s["doc_id"], "未知"),
+                        **time_columns(self.doc_time_mapping.get(s["doc_id"]))
                     })
             
             if normalrag_data:
@@ -888,152 +1112,73 @@ class VectorizationPipeline:
                     pa.field("sentence_vec", pa.list_(pa.float32(), vec_dim)),
                     pa.field("doc_id", pa.string()),
                     pa.field("doc_name", pa.string()),
-                    pa.field("time", pa.string())
+                    pa.field("time", pa.string()),
+                    *TIME_FIELDS
                 ])
-                self.lancedb_manager.save_table("normalrag", normalrag_data, schema, mode="auto")
-        
-        # 2. 读取实体、合并新旧、按文档去重、增量向量化
-        # 读取已有的去重后实体（从entities.json）
-        existing_entities = []
-        merged_entities_file = self.text_processor.entities_db / "entities.json"
-        if merged_entities_file.exists():
-            try:
-                with open(merged_entities_file, 'r', encoding='utf-8') as f:
-                    existing_entities = json.load(f)
-            except Exception as e:
-                log_error(self.logger, f"读取已有实体失败: {e}", "RouterVectorize")
-        
-        # 合并当前批次的新实体
-        all_entities_raw = existing_entities + self.current_batch_entities
+                self.lancedb_manager.upsert_table("normalrag", normalrag_data, schema, key="sentence_id")
         
-        # 按文档分组
+        # 2. 实体：只处理本批次，按文档去重（entity_name + type），重复实体指向保留的实体ID
         doc_entities = defaultdict(list)
-        for e in all_entities_raw:
-            text_id = e.get('text_id', '')
-            if text_id in self.text_processor.text_mapping:
-                doc_id = self.text_processor.text_mapping[text_id]['doc_id']
-                doc_name = self.text_processor.text_mapping[text_id].get('doc_name', e.get('doc_name', ''))
-                e['doc_id'] = doc_id
-                e['doc_name'] = doc_name
-                e['time'] = self.doc_time_mapping.get(doc_id, '未知')
+        for e in self.current_batch_entities:
+            doc_id = self._attach_doc(e)
+            if doc_id is not None:
                 doc_entities[doc_id].append(e)
         
-        # 按文档去重（每个文档内按entity_name + type去重）
         unique_entities = []
-        total_duplicates = 0
-        old_to_new_id = {}
-        
-        for doc_id in sorted(doc_entities.keys()):
-            seen = set()
+        entity_alias = {}  # 重复实体ID -> 保留的实体ID
+        for doc_id in sorted(doc_entities.keys(), key=int):
+            kept = {}
             for e in doc_entities[doc_id]:
                 key = (e['entity_name'], e.get('type', ''))
-                if key not in seen:
-                    seen.add(key)
-                    unique_entities.append(e)
+                if key in kept:
+                    entity_alias[e['entity_id']] = kept[key]['entity_id']
                 else:
-                    total_duplicates += 1
-                
-        # 从LanceDB读取已有实体的向量（通过doc_name+entity_name+type匹配，同文档去重）
-        existing_entity_vectors = {}  # key=(doc_name, entity_name, type) -> (name_vec, desc_vec)
-        
-        try:
-            if "graphrag_entities" in self.lancedb_manager.db.table_names():
-                table = self.lancedb_manager.db.open_table("graphrag_entities")
-                df = table.to_pandas()
-                for _, row in df.iterrows():
-                    key = (row['doc_name'], row['entity_name'], row['type'])
-                    existing_entity_vectors[key] = (
-                        row['entity_name_vec'].tolist() if hasattr(row['entity_name_vec'], 'tolist') else list(row['entity_name_vec']),
-                        row['description_vec'].tolist() if hasattr(row['description_vec'], 'tolist') else list(row['description_vec'])
-                    )
-        except:
-            pass
-        
-        # 判断哪些实体需要向量化
-        entities_need_vec = []
-        entities_has_vec = []
-        
-        for e in unique_entities:
-            key = (e.get('doc_name', ''), e.get('entity_name', ''), e.get('type', ''))
-            if key in existing_entity_vectors:
-                # 已有向量，直接使用
-                e['entity_name_vec'] = existing_entity_vectors[key][0]
-                e['description_vec'] = existing_entity_vectors[key][1]
-                entities_has_vec.append(e)
-            else:
-                # 需要向量化
-                entities_need_vec.append(e)
+                    kept[key] = e
+                    unique_entities.append(e)
         
-        if len(entities_need_vec) > 0:
-            log_success(self.logger, f"entity向量化：新增{len(entities_need_vec)}条 | 复用{len(entities_has_vec)}条", "RouterVectorize")
+        if unique_entities:
+            log_success(self.logger, f"entity向量化：新增{len(unique_entities)}条 | 文档内去重{len(entity_alias)}条", "RouterVectorize")
+            name_vecs = await self.embedding_generator.generate_batch([e['entity_name'] for e in unique_entities], "实体名称向量")
+            desc_vecs = await self.embedding_generator.generate_batch([e.get('description', '') for e in unique_entities], "实体描述向量")
         else:
-            log_success(self.logger, f"entity向量化：实体向量全部复用共{len(entities_has_vec)}条", "RouterVectorize")
+            name_vecs, desc_vecs = [], []
         
-        # 只对需要的实体生成向量
-        if entities_need_vec:
-            entity_names = [e['entity_name'] for e in entities_need_vec]
-            entity_descs = [e.get('description', '') for e in entities_need_vec]
-            
-            name_vecs = await self.embedding_generator.generate_batch(entity_names, "实体名称向量")
-            desc_vecs = await self.embedding_generator.generate_batch(entity_descs, "实体描述向量")
-            
-            # 添加向量到新实体
-            for e, name_vec, desc_vec in zip(entities_need_vec, name_vecs, desc_vecs):
-                if name_vec and desc_vec:
-                    e['entity_name_vec'] = name_vec
-                    e['description_vec'] = desc_vec
-        
-        # 合并所有实体（已有向量+新向量化）
-        all_unique_entities = entities_has_vec + entities_need_vec
-        
-        # 重新分配全局连续ID
         entities_data = []
         entities_for_save = []  # 保存到entities.json的数据
-        new_entity_id = 1
-        
-        for e in all_unique_entities:
-            if 'entity_name_vec' in e and 'description_vec' in e:
-                # 重新分配连续ID
-                old_to_new_id[e.get('entity_id', '')] = str(new_entity_id)
-                
-                # 准备LanceDB数据
-                entities_data.append({
-                    "entity_id": str(new_entity_id),
-                    "entity_name": e['entity_name'],
-                    "entity_name_vec": e['entity_name_vec'],
-                    "type": e.get('type', ''),
-                    "description": e.get('description', ''),
-                    "description_vec": e['description_vec'],
-                    "time": e.get('time', '未知'),
-                    "doc_name": e.get('doc_name', ''),
-                    "text_ids": json.dumps([e.get('text_id', '')], ensure_ascii=False),
-                    "doc_ids": json.dumps([e.get('doc_id', '')], ensure_ascii=False)
-                })
-                
-                # 准备保存到entities.json的数据（不含向量，节省空间）
-                entities_for_save.append({
-                    "entity_id": str(new_entity_id),
-                    "entity_name": e['entity_name'],
-                    "type": e.get('type', ''),
-                    "description": e.get('description', ''),
-                    "time": e.get('time', '未知'),
-                    "doc_name": e.get('doc_name', ''),
-                    "texts_name": e.get('texts_name', []),
-                    "text_id": e.get('text_id', ''),
-                    "doc_id": e.get('doc_id', '')
-                })
-                
-                new_entity_id += 1
-        
-        final_entity_last_id = new_entity_id - 1
-        
-        # 保存去重后的实体到entities.json（不含向量）
-        if entities_for_save:
-            entities_file = self.text_processor.entities_db / "entities.json"
-            with open(entities_file, 'w', encoding='utf-8') as f:
-                json.dump(entities_for_save, f, ensure_ascii=False, indent=2)
+        for e, name_vec, desc_vec in zip(unique_entities, name_vecs, desc_vecs):
+            if not (name_vec and desc_vec):
+                continue
+            entities_data.append({
+                "entity_id": e['entity_id'],
+                "entity_name": e['entity_name'],
+                "entity_name_vec": name_vec,
+                "type": e.get('type', ''),
+                "description": e.get('description', ''),
+                "description_vec": desc_vec,
+                "time": e.get('time', '未知'),
+                "doc_name": e.get('doc_name', ''),
+                "text_ids": json.dumps([e.get('text_id', '')], ensure_ascii=False),
+                "doc_ids": json.dumps([e.get('doc_id', '')], ensure_ascii=False),
+                "doc_id_list": [e.get('doc_id', '')],
+                **time_columns(e.get('time'))
+            })
+            
+            # 不含向量，节省空间
+            entities_for_save.append({
+                "entity_id": e['entity_id'],
+                "entity_name": e['entity_name'],
+                "type": e.get('type', ''),
+                "description": e.get('description', ''),
+                "time": e.get('time', '未知'),
+                "doc_name": e.get('doc_name', ''),
+                "texts_name": e.get('texts_name', []),
+                "text_id": e.get('text_id', ''),
+                "doc_id": e.get('doc_id', '')
+            })
+        
+        saved_entity_ids = {e['entity_id'] for e in entities_data}
+        self._merge_records(self.text_processor.entities_db / "entities.json", entities_for_save, stale_doc_ids)
         
-        # 保存到LanceDB
         if entities_data:
             vec_dim = len(entities_data[0]["description_vec"])
             schema = pa.schema([
@@ -1046,156 +1191,78 @@ class VectorizationPipeline:
                 pa.field("time", pa.string()),
                 pa.field("doc_name", pa.string()),
                 pa.field("text_ids", pa.string()),
-                pa.field("doc_ids", pa.string())
+                pa.field("doc_ids", pa.string()),
+                DOC_ID_LIST_FIELD,
+                *TIME_FIELDS
             ])
-            self.lancedb_manager.save_table("graphrag_entities", entities_data, schema, mode="overwrite")
-        
-        # 3. 读取关系、合并新旧、按文档去重、增量向量化
-        
-        # 读取已有的去重后关系（从relationships.json）
-        existing_relations = []
-        merged_relations_file = self.text_processor.relationships_db / "relationships.json"
-        if merged_relations_file.exists():
-            try:
-                with open(merged_relations_file, 'r', encoding='utf-8') as f:
-                    existing_relations = json.load(f)
-            except Exception as e:
-                log_error(self.logger, f"读取已有关系失败: {e}", "RouterVectorize")
+            self.lancedb_manager.upsert_table("graphrag_entities", entities_data, schema, key="entity_id")
         
-        # 合并当前批次的新关系
-        all_relations_raw = existing_relations + self.current_batch_relations
-        
-        # 按文档分组并更新实体ID映射
+        # 3. 关系：只处理本批次，端点映射到保留的实体ID，按文档去重（source + target）
         doc_relations = defaultdict(list)
         filtered_no_entities = 0
+        for r in self.current_batch_relations:
+            doc_id = self._attach_doc(r)
+            if doc_id is None:
+                continue
+            r['source'] = entity_alias.get(r.get('source', ''), r.get('source', ''))
+            r['target'] = entity_alias.get(r.get('target', ''), r.get('target', ''))
+            # 只保留实体都存在的关系
+            if r['source'] in saved_entity_ids and r['target'] in saved_entity_ids:
+                doc_relations[doc_id].append(r)
+            else:
+                filtered_no_entities += 1
         
-        for r in all_relations_raw:
-            text_id = r.get('text_id', '')
-            if text_id in self.text_processor.text_mapping:
-                doc_id = self.text_processor.text_mapping[text_id]['doc_id']
-                doc_name = self.text_processor.text_mapping[text_id].get('doc_name', r.get('doc_name', ''))
-                r['doc_id'] = doc_id
-                r['doc_name'] = doc_name
-                r['time'] = self.doc_time_mapping.get(doc_id, '未知')
-                
-                # 实体ID映射（去重后ID会变）
-                old_src = r.get('source', '')
-                old_tgt = r.get('target', '')
-                new_src = old_to_new_id.get(old_src, old_src)
-                new_tgt = old_to_new_id.get(old_tgt, old_tgt)
-                r['source'] = new_src
-                r['target'] = new_tgt
-                
-                # 只保留实体都存在的关系
-                if new_src in old_to_new_id.values() and new_tgt in old_to_new_id.values():
-                    doc_relations[doc_id].append(r)
-                else:
-                    filtered_no_entities += 1
-        
-        # 按文档去重（每个文档内按source + target去重）
         unique_relations = []
-        total_duplicates = 0
-        
-        for doc_id in sorted(doc_relations.keys()):
+        for doc_id in sorted(doc_relations.keys(), key=int):
             seen = set()
             for r in doc_relations[doc_id]:
-                key = (r.get('source', ''), r.get('target', ''))
+                key = (r['source'], r['target'])
                 if key not in seen:
                     seen.add(key)
                     unique_relations.append(r)
-                else:
-                    total_duplicates += 1
         
-        
-        # 从LanceDB读取已有关系的向量（通过doc_name+source+target匹配，同文档去重）
-        existing_relation_vectors = {}  # key=(doc_name, source, target) -> description_vec
-        
-        try:
-            if "graphrag_relationships" in self.lancedb_manager.db.table_names():
-                table = self.lancedb_manager.db.open_table("graphrag_relationships")
-                df = table.to_pandas()
-                for _, row in df.iterrows():
-                    key = (row['doc_name'], row['source'], row['target'])
-                    existing_relation_vectors[key] = row['description_vec'].tolist() if hasattr(row['description_vec'], 'tolist') else list(row['description_vec'])
-        except:
-            pass
-        
-        # 判断哪些关系需要向量化
-        relations_need_vec = []
-        relations_has_vec = []
-        
-        for r in unique_relations:
-            key = (r.get('doc_name', ''), r.get('source', ''), r.get('target', ''))
-            if key in existing_relation_vectors:
-                # 已有向量，直接使用
-                r['description_vec'] = existing_relation_vectors[key]
-                relations_has_vec.append(r)
-            else:
-                # 需要向量化
-                relations_need_vec.append(r)
-        
-        if len(relations_need_vec) > 0:
-            log_success(self.logger, f"relationships向量化：新增{len(relations_need_vec)}条 | 复用{len(relations_has_vec)}条", "RouterVectorize")
+        if unique_relations:
+            log_success(self.logger, f"relationships向量化：新增{len(unique_relations)}条", "RouterVectorize")
+            rel_vecs = await self.embedding_generator.generate_batch(
+                [r.get('description', '') for r in unique_relations], "关系向量"
+            )
         else:
-            log_success(self.logger, f"relationships向量化：关系向量全部复用共{len(relations_has_vec)}个", "RouterVectorize")
-        
-        # 只对需要的关系生成向量
-        if relations_need_vec:
-            rel_descs = [r.get('description', '') for r in relations_need_vec]
-            rel_vecs = await self.embedding_generator.generate_batch(rel_descs, "关系向量")
-            
-            # 添加向量到新关系
-            for r, vec in zip(relations_need_vec, rel_vecs):
-                if vec:
-                    r['description_vec'] = vec
-        
-        # 合并所有关系（已有向量+新向量化）
-        all_unique_relations = relations_has_vec + relations_need_vec
+            rel_vecs = []
         
-        # 重新分配全局连续ID
         relations_data = []
         relations_for_save = []
-        new_relation_id = 1
-        
-        for r in all_unique_relations:
-            if 'description_vec' in r:
-                # 准备LanceDB数据
-                relations_data.append({
-                    "relationship_id": str(new_relation_id),
-                    "source": r.get('source', ''),
-                    "target": r.get('target', ''),
-                    "description": r.get('description', ''),
-                    "description_vec": r['description_vec'],
-                    "time": r.get('time', '未知'),
-                    "doc_name": r.get('doc_name', ''),
-                    "text_ids": json.dumps([r.get('text_id', '')], ensure_ascii=False),
-                    "doc_ids": json.dumps([r.get('doc_id', '')], ensure_ascii=False)
-                })
-                
-                # 准备保存到relationships.json的数据（不含向量，节省空间）
-                relations_for_save.append({
-                    "relationship_id": str(new_relation_id),
-                    "source": r.get('source', ''),
-                    "target": r.get('target', ''),
-                    "description": r.get('description', ''),
-                    "time": r.get('time', '未知'),
-                    "doc_name": r.get('doc_name', ''),
-                    "texts_name": r.get('texts_name', []),
-                    "text_id": r.get('text_id', ''),
-                    "doc_id": r.get('doc_id', '')
-                })
-                
-                new_relation_id += 1
-        
-        final_relation_last_id = new_relation_id - 1
-        
-        # 保存去重后的关系到relationships.json（不含向量）
-        if relations_for_save:
-            relations_file = self.text_processor.relationships_db / "relationships.json"
-            with open(relations_file, 'w', encoding='utf-8') as f:
-                json.dump(relations_for_save, f, ensure_ascii=False, indent=2)
+        for r, vec in zip(unique_relations, rel_vecs):
+            if not vec:
+                continue
+            relations_data.append({
+                "relationship_id": r['relationship_id'],
+                "source": r['source'],
+                "target": r['target'],
+                "description": r.get('description', ''),
+                "description_vec": vec,
+                "time": r.get('time', '未知'),
+                "doc_name": r.get('doc_name', ''),
+                "text_ids": json.dumps([r.get('text_id', '')], ensure_ascii=False),
+                "doc_ids": json.dumps([r.get('doc_id', '')], ensure_ascii=False),
+                "doc_id_list": [r.get('doc_id', '')],
+                **time_columns(r.get('time'))
+            })
+            
+            # 不含向量，节省空间
+            relations_for_save.append({
+                "relationship_id": r['relationship_id'],
+                "source": r['source'],
+                "target": r['target'],
+                "description": r.get('description', ''),
+                "time": r.get('time', '未知'),
+                "doc_name": r.get('doc_name', ''),
+                "texts_name": r.get('texts_name', []),
+                "text_id": r.get('text_id', ''),
+                "doc_id": r.get('doc_id', '')
+            })
+        
+        self._merge_records(self.text_processor.relationships_db / "relationships.json", relations_for_save, stale_doc_ids)
         
-        # 保存到LanceDB
         if relations_data:
             vec_dim = len(relations_data[0]["description_vec"])
             schema = pa.schema([
@@ -1207,64 +1274,52 @@ class VectorizationPipeline:
                 pa.field("time", pa.string()),
                 pa.field("doc_name", pa.string()),
                 pa.field("text_ids", pa.string()),
-                pa.field("doc_ids", pa.string())
+                pa.field("doc_ids", pa.string()),
+                DOC_ID_LIST_FIELD,
+                *TIME_FIELDS
             ])
-            self.lancedb_manager.save_table("graphrag_relationships", relations_data, schema, mode="overwrite")
+            self.lancedb_manager.upsert_table("graphrag_relationships", relations_data, schema, key="relationship_id")
         
-        # 4. 文本表（新增text、text_tag、text_tag_vec字段）
-        # 收集每个文本的实体ID（使用新ID）
+        # 4. 文本表（text、text_tag、text_tag_vec字段）
         text_entities = defaultdict(set)
         for e in entities_data:
-            text_ids_str = e.get('text_ids', '[]')
-            text_ids = json.loads(text_ids_str)
-            for tid in text_ids:
+            for tid in json.loads(e.get('text_ids', '[]')):
                 text_entities[tid].add(e['entity_id'])
         
-        # 收集每个文本的关系ID（使用新ID）
         text_relations = defaultdict(set)
         for r in relations_data:
-            text_ids_str = r.get('text_ids', '[]')
-            text_ids = json.loads(text_ids_str)
-            for tid in text_ids:
+            for tid in json.loads(r.get('text_ids', '[]')):
                 text_relations[tid].add(r['relationship_id'])
         
-        # 只对新批次的文本生成标签向量
-        new_doc_ids = set(self.text_processor.new_doc_ids)
         tag_texts = []
         tag_text_ids = []
-        
         for text_id, info in self.text_processor.text_mapping.items():
-            # 只处理新批次文档的文本
             if info['doc_id'] in new_doc_ids:
-                tag = self.text_tags.get(text_id, "未标注")
-                tag_texts.append(tag)
+                tag_texts.append(self.text_tags.get(text_id, "未标注"))
                 tag_text_ids.append(text_id)
         
         if not tag_texts:
             log_success(self.logger, "暂无新文本需要处理", "RouterVectorize")
         else:
-            
             tag_vecs = await self.embedding_generator.generate_batch(tag_texts, "文本标签向量")
-            
             tag_vec_map = {tid: vec for tid, vec in zip(tag_text_ids, tag_vecs) if vec}
             
             texts_data = []
             for text_id in tag_text_ids:
                 info = self.text_processor.text_mapping[text_id]
-                tag = self.text_tags.get(text_id, "未标注")
-                tag_vec = tag_vec_map.get(text_id, None)
-                
+                tag_vec = tag_vec_map.get(text_id)
                 if tag_vec:  # 只保存有向量的
                     texts_data.append({
                         "text_id": text_id,
                         "text": info.get('text_content', ''),
-                        "text_tag": tag,
+                        "text_tag": self.text_tags.get(text_id, "未标注"),
                         "text_tag_vec": tag_vec,
                         "doc_id": info['doc_id'],
                         "doc_name": info['doc_name'],
                         "time": self.doc_time_mapping.get(info['doc_id'], '未知'),
-                        "entity_ids": json.dumps(sorted(list(text_entities.get(text_id, set()))), ensure_ascii=False),
-                        "relationship_ids": json.dumps(sorted(list(text_relations.get(text_id, set()))), ensure_ascii=False)
+                        **time_columns(self.doc_time_mapping.get(info['doc_id'])),
+                        "entity_ids": json.dumps(sorted(text_entities.get(text_id, set())), ensure_ascii=False),
+                        "relationship_ids": json.dumps(sorted(text_relations.get(text_id, set())), ensure_ascii=False)
                     })
         
             log_success(self.logger, f"text向量化: 新增{len(texts_data)}条", "RouterVectorize")
@@ -1280,36 +1335,39 @@ class VectorizationPipeline:
                     pa.field("doc_name", pa.string()),
                     pa.field("time", pa.string()),
                     pa.field("entity_ids", pa.string()),
-                    pa.field("relationship_ids", pa.string())
+                    pa.field("relationship_ids", pa.string()),
+                    *TIME_FIELDS
                 ])
-                self.lancedb_manager.save_table("graphrag_texts", texts_data, schema, mode="auto")
+                self.lancedb_manager.upsert_table("graphrag_texts", texts_data, schema, key="text_id")
         
-        # 返回去重后的最大ID
-        return final_entity_last_id, final_relation_last_id
+        # 返回本批次写入的最大ID
+        return (
+            max((int(e['entity_id']) for e in entities_data), default=0),
+            max((int(r['relationship_id']) for r in relations_data), default=0)
+        )
     
     def _update_mapping(self, last_entity_id: int, last_relation_id: int, 
                        entity_count: int, relation_count: int) -> None:
-        """更新映射文件（last_id = count = 去重后的最大ID）"""
+        """更新映射文件（last_id 为已分配的最大ID，count 为表中现有行数）"""
         mapping_file = self.text_processor.log_db / "data_mapping.json"
         
         # 读取现有映射
         with open(mapping_file, 'r', encoding='utf-8') as f:
             all_mapping = json.load(f)
         
-        # last_id 和 count 都是去重后的最大ID（保持一致）
+        # 增量构建不重新编号，last_id 只增不减；count 为删除旧数据后的实际行数
         all_mapping['entities']['last_id'] = last_entity_id
         all_mapping['entities']['count'] = entity_count
         all_mapping['relationships']['last_id'] = last_relation_id
         all_mapping['relationships']['count'] = relation_count
         
         # 更新已处理的文档列表
-        if 'processed_docs' not in all_mapping:
-            all_mapping['processed_docs'] = []
-        
         current_doc_ids = list(self.text_processor.doc_mapping.keys())
+        processed_docs = [d for d in all_mapping.get('processed_docs', []) if d in self.text_processor.doc_mapping]
         for doc_id in current_doc_ids:
-            if doc_id not in all_mapping['processed_docs']:
-                all_mapping['processed_docs'].append(doc_id)
+            if doc_id not in processed_docs:
+                processed_docs.append(doc_id)
+        all_mapping['processed_docs'] = processed_docs
         
         # 保存更新后的映射
         with open(mapping_file, 'w', encoding='utf-8') as f:
@@ -1342,7 +1400,7 @@ def run_ragrouter(topic_name: str = "默认", base_path: Optional[Path] = None)
         pipeline = VectorizationPipeline(topic_name=topic_name, logger=logger, base_path=base_path)
         
         # 运行完整流程
-        asyncio.run(pipeline.run(skip_check=False))
+        asyncio.run(closing_sessions(pipeline.run(skip_check=False)))
         
         return True
         
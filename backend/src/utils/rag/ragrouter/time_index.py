@@ -0,0 +1,423 @@
+"""
+RouterRAG 文档时间与检索预过滤工具
+
+- parse_time_text：把文档时间标签（如“2023年5月”“2024-03-15”）解析为闭区间日期范围；
+- DocTimeIndex：向量化时持久化的文档时间索引（normal_db/log_db/doc_time_index.json），检索时按区间直接查出命中文档；
+- parse_query_time：规则解析查询中的时间表达（绝对日期、今年/去年、近N个月、上半年/季度、以来/之前等），
+  只有出现无法确定的时间说法时才交给大模型；
+- 向量表写入 time_start/time_end（date32）与 doc_id_list（list<string>）类型列，并为过滤列建立标量索引；
+- 检索时用 where 预过滤把文档/时间条件下推到 LanceDB，只扫描命中的行，不再整表读入后在 Python 中筛选。
+"""
+import calendar
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+
+from ...logging.logging import log_error
+
+# 类型化时间列（无法解析的时间为 null）
+TIME_FIELDS = [
+    pa.field("time_start", pa.date32()),
+    pa.field("time_end", pa.date32()),
+]
+DOC_ID_LIST_FIELD = pa.field("doc_id_list", pa.list_(pa.string()))
+
+# 各表需要的标量索引：(列名, 索引类型)
+SCALAR_INDEXES: Dict[str, List[Tuple[str, str]]] = {
+    "normalrag": [("doc_id", "BTREE"), ("time_start", "BTREE"), ("time_end", "BTREE")],
+    "graphrag_texts": [("doc_id", "BTREE"), ("time_start", "BTREE"), ("time_end", "BTREE")],
+    "graphrag_entities": [
+        ("entity_id", "BTREE"),
+        ("doc_id_list", "LABEL_LIST"),
+        ("time_start", "BTREE"),
+        ("time_end", "BTREE"),
+    ],
+    "graphrag_relationships": [
+        ("relationship_id", "BTREE"),
+        ("source", "BTREE"),
+        ("target", "BTREE"),
+        ("doc_id_list", "LABEL_LIST"),
+        ("time_start", "BTREE"),
+        ("time_end", "BTREE"),
+    ],
+}
+
+_DATE_PATTERN = re.compile(
+    r"(?P<year>(?:19|20)\d{2})\s*(?:年|[-/.])\s*"
+    r"(?:(?P<month>1[0-2]|0?[1-9])(?!\d)\s*(?:月|[-/.])?\s*"
+    r"(?:(?P<day>3[01]|[12]\d|0?[1-9])(?!\d)\s*[日号]?)?)?"
+)
+_YEAR_PATTERN = re.compile(r"(?<!\d)(?P<year>(?:19|20)\d{2})(?!\d)")
+
+
+def _match_range(year: int, month: Optional[int], day: Optional[int]) -> Optional[Tuple[date, date]]:
+    """单个年/月/日片段对应的闭区间，非法日期返回 None。"""
+    try:
+        if month is None:
+            return date(year, 1, 1), date(year, 12, 31)
+        if day is None:
+            return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+        moment = date(year, month, day)
+        return moment, moment
+    except ValueError:
+        return None
+
+
+def parse_time_text(text: Any) -> Tuple[Optional[date], Optional[date]]:
+    """
+    把时间标签解析为闭区间 [start, end]。
+
+    文本中出现多个日期时取最早起点与最晚终点（如“2023年5月至6月”按出现的完整日期计算），
+    只写到年或月时覆盖整年/整月；无法解析（如“未知”）返回 (None, None)。
+    """
+    if not isinstance(text, str) or not text.strip():
+        return None, None
+
+    ranges = []
+    for match in _DATE_PATTERN.finditer(text):
+        month = match.group("month")
+        day = match.group("day")
+        span = _match_range(
+            int(match.group("year")),
+            int(month) if month else None,
+            int(day) if day and month else None,
+        )
+        if span:
+            ranges.append(span)
+    if not ranges:
+        ranges = [_match_range(int(m.group("year")), None, None) for m in _YEAR_PATTERN.finditer(text)]
+        ranges = [span for span in ranges if span]
+    if not ranges:
+        return None, None
+    return min(start for start, _ in ranges), max(end for _, end in ranges)
+
+
+def _sort_doc_ids(doc_ids: Iterable[str]) -> List[str]:
+    return sorted(doc_ids, key=lambda doc_id: (0, int(doc_id), "") if doc_id.isdigit() else (1, 0, doc_id))
+
+
+DOC_TIME_INDEX_FILE = "doc_time_index.json"
+
+
+def doc_time_index_path(base_path: Path) -> Path:
+    """专题数据库目录下的文档时间索引路径。"""
+    return Path(base_path) / "normal_db" / "log_db" / DOC_TIME_INDEX_FILE
+
+
+class DocTimeIndex:
+    """
+    文档时间索引：doc_id -> 时间标签及解析后的日期区间。
+
+    向量化流水线在提取文档时间后写入，检索端加载一次后按区间匹配文档，
+    无需再把全部文档时间交给大模型比对。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path: Path) -> "DocTimeIndex":
+        """读取索引文件，不存在或损坏时返回空索引。"""
+        index = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return index
+        for doc_id, entry in (payload.get("documents") or {}).items():
+            index.set(doc_id, entry.get("time", ""))
+        return index
+
+    @classmethod
+    def from_table(cls, table, path: Optional[Path] = None) -> "DocTimeIndex":
+        """从带 doc_id/time 列的向量表重建索引（兼容没有索引文件的旧数据库，只读取这两列）。"""
+        index = cls(path)
+        rows = table.search().select(["doc_id", "time"]).limit(None).to_arrow()
+        for doc_id, time_text in zip(rows.column("doc_id").to_pylist(), rows.column("time").to_pylist()):
+            if doc_id is not None and str(doc_id) not in index.entries:
+                index.set(doc_id, time_text)
+        return index
+
+    def remove(self, doc_id: Any) -> None:
+        self.entries.pop(str(doc_id), None)
+
+    def set(self, doc_id: Any, time_text: Any) -> None:
+        start, end = parse_time_text(time_text)
+        self.entries[str(doc_id)] = {
+            "time": time_text if isinstance(time_text, str) else "",
+            "start": start,
+            "end": end,
+        }
+
+    def get(self, doc_id: Any) -> Optional[str]:
+        entry = self.entries.get(str(doc_id))
+        return entry["time"] if entry else None
+
+    def doc_times(self) -> Dict[str, str]:
+        """doc_id -> 原始时间标签。"""
+        return {doc_id: entry["time"] for doc_id, entry in self.entries.items()}
+
+    def match(self, start: Optional[date], end: Optional[date]) -> List[str]:
+        """返回时间区间与 [start, end] 有交集的文档（无法解析时间的文档不参与匹配）。"""
+        matched = []
+        for doc_id, entry in self.entries.items():
+            doc_start, doc_end = entry["start"], entry["end"]
+            if doc_start is None or doc_end is None:
+                continue
+            if (start is None or doc_end >= start) and (end is None or doc_start <= end):
+                matched.append(doc_id)
+        return _sort_doc_ids(matched)
+
+    def save(self) -> None:
+        """原子写入索引文件。"""
+        if self.path is None:
+            return
+        payload = {
+            "version": 1,
+            "documents": {
+                doc_id: {
+                    "time": entry["time"],
+                    "start": entry["start"].isoformat() if entry["start"] else None,
+                    "end": entry["end"].isoformat() if entry["end"] else None,
+                }
+                for doc_id, entry in ((doc_id, self.entries[doc_id]) for doc_id in _sort_doc_ids(self.entries))
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class QueryTime:
+    """查询时间解析结果：status 为 none（无时间表达）/ parsed（已解析）/ ambiguous（需大模型判断）"""
+    status: str
+    text: str = ""
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+
+_CN_DIGITS = {"零": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_NUMBER = r"(\d{1,3}|[一二两三四五六七八九十]{1,3})"
+_RELATIVE_YEARS = {"今年": 0, "本年": 0, "去年": -1, "上一年": -1, "前年": -2}
+_HALVES = {"上半年": (1, 6), "下半年": (7, 12)}
+_QUARTERS = {"一": 1, "二": 2, "三": 3, "四": 4, "1": 1, "2": 2, "3": 3, "4": 4}
+
+_YEAR_PART_PATTERN = re.compile(
+    r"(?:(?P<year>(?:19|20)\d{2})\s*年?|(?P<rel>今年|本年|去年|上一年|前年))\s*"
+    r"(?:(?P<half>上半年|下半年)|第?(?P<quarter>[一二三四1-4])\s*季度|[Qq](?P<q>[1-4]))"
+)
+_RELATIVE_YEAR_PATTERN = re.compile(r"今年|本年|去年|上一年|前年")
+_RELATIVE_MONTH_PATTERN = re.compile(r"本月|这个月|上个月|上月")
+_RELATIVE_DAY_PATTERN = re.compile(r"今天|今日|昨天|昨日|本周|这周|上周")
+_RECENT_PATTERN = re.compile(r"(?:近|最近|过去|前)\s*" + _NUMBER + r"\s*(?P<unit>天|日|周|个月|月|年)")
+_BARE_YEAR_PATTERN = re.compile(r"(?<![\d.])(?P<year>(?:19|20)\d{2})(?![\d万亿元人个条名家起次件%％多余])")
+_MONTH_ONLY_PATTERN = re.compile(r"(?<![\d年])(?P<month>1[0-2]|0?[1-9])\s*月(?:份)?")
+_SINCE_SUFFIX = re.compile(r"\s*(?:以来|至今|到现在)")
+_AFTER_SUFFIX = re.compile(r"\s*(?:之后|以后)")
+_BEFORE_SUFFIX = re.compile(r"\s*(?:之前|以前)")
+_AMBIGUOUS_MARKERS = (
+    "期间", "时期", "以来", "之前", "之后", "以前", "以后", "前后", "近期", "近来", "最近", "近年",
+    "当时", "那时", "早期", "初期", "后期", "年初", "年底", "年末", "月初", "月底", "年代", "春节", "国庆", "两会",
+)
+
+
+def _cn_number(token: str) -> Optional[int]:
+    if token.isdigit():
+        return int(token)
+    if token == "十":
+        return 10
+    if "十" in token:
+        tens, _, ones = token.partition("十")
+        return (_CN_DIGITS.get(tens, 1) if tens else 1) * 10 + (_CN_DIGITS.get(ones, 0) if ones else 0)
+    return _CN_DIGITS.get(token) if len(token) == 1 else None
+
+
+def _shift_months(moment: date, months: int) -> date:
+    index = moment.year * 12 + moment.month - 1 + months
+    year, month = divmod(index, 12)
+    return date(year, month + 1, min(moment.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def _month_span(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _apply_suffix(text: str, end_pos: int, span: Tuple[date, date], today: date) -> Tuple[Optional[date], Optional[date]]:
+    """处理紧跟在时间后的“以来/之后/之前”等开区间说法。"""
+    rest = text[end_pos:]
+    if _SINCE_SUFFIX.match(rest):
+        return span[0], today
+    if _AFTER_SUFFIX.match(rest):
+        return span[0], None
+    if _BEFORE_SUFFIX.match(rest):
+        return None, span[0] - timedelta(days=1)
+    return span
+
+
+def parse_query_time(query: str, today: Optional[date] = None) -> QueryTime:
+    """
+    规则解析查询中的时间范围。
+
+    Args:
+        query: 用户查询
+        today: 相对时间的基准日期，默认当天
+
+    Returns:
+        QueryTime: 多个时间表达取并集范围；出现“期间/近期/当时”等无法确定的说法时 status 为 ambiguous
+    """
+    today = today or date.today()
+    text = query or ""
+    spans: List[Tuple[Optional[date], Optional[date]]] = []
+    pieces: List[str] = []
+    consumed: List[Tuple[int, int]] = []
+
+    def _add(match, span: Tuple[date, date]) -> None:
+        consumed.append(match.span())
+        pieces.append(match.group(0))
+        spans.append(_apply_suffix(text, match.end(), span, today))
+
+    def _free(match) -> bool:
+        return all(match.end() <= a or match.start() >= b for a, b in consumed)
+
+    for match in _YEAR_PART_PATTERN.finditer(text):
+        year = int(match.group("year")) if match.group("year") else today.year + _RELATIVE_YEARS[match.group("rel")]
+        if match.group("half"):
+            first, last = _HALVES[match.group("half")]
+        else:
+            quarter = _QUARTERS[match.group("quarter") or match.group("q")]
+            first, last = quarter * 3 - 2, quarter * 3
+        _add(match, (_month_span(year, first)[0], _month_span(year, last)[1]))
+
+    for match in _DATE_PATTERN.finditer(text):
+        if not _free(match):
+            continue
+        month, day = match.group("month"), match.group("day")
+        span = _match_range(int(match.group("year")), int(month) if month else None, int(day) if day and month else None)
+        if span:
+            _add(match, span)
+
+    for match in _RELATIVE_YEAR_PATTERN.finditer(text):
+        if _free(match):
+            year = today.year + _RELATIVE_YEARS[match.group(0)]
+            _add(match, (date(year, 1, 1), date(year, 12, 31)))
+
+    for match in _RELATIVE_MONTH_PATTERN.finditer(text):
+        if _free(match):
+            anchor = today if match.group(0) in ("本月", "这个月") else _shift_months(today.replace(day=1), -1)
+            _add(match, _month_span(anchor.year, anchor.month))
+
+    for match in _RELATIVE_DAY_PATTERN.finditer(text):
+        if not _free(match):
+            continue
+        word = match.group(0)
+        if word in ("今天", "今日"):
+            span = (today, today)
+        elif word in ("昨天", "昨日"):
+            span = (today - timedelta(days=1),) * 2
+        else:
+            monday = today - timedelta(days=today.weekday())
+            span = (monday, today) if word in ("本周", "这周") else (monday - timedelta(days=7), monday - timedelta(days=1))
+        _add(match, span)
+
+    for match in _RECENT_PATTERN.finditer(text):
+        amount = _cn_number(match.group(1))
+        if not amount or not _free(match):
+            continue
+        unit = match.group("unit")
+        if unit in ("天", "日"):
+            start = today - timedelta(days=amount)
+        elif unit == "周":
+            start = today - timedelta(weeks=amount)
+        elif unit in ("个月", "月"):
+            start = _shift_months(today, -amount)
+        else:
+            start = _shift_months(today, -12 * amount)
+        consumed.append(match.span())
+        pieces.append(match.group(0))
+        spans.append((start, today))
+
+    for match in _BARE_YEAR_PATTERN.finditer(text):
+        if _free(match):
+            year = int(match.group("year"))
+            _add(match, (date(year, 1, 1), date(year, 12, 31)))
+
+    for match in _MONTH_ONLY_PATTERN.finditer(text):
+        if _free(match):
+            _add(match, _month_span(today.year, int(match.group("month"))))
+
+    if spans:
+        starts = [start for start, _ in spans]
+        ends = [end for _, end in spans]
+        return QueryTime(
+            status="parsed",
+            text="、".join(pieces),
+            start=None if any(s is None for s in starts) else min(starts),
+            end=None if any(e is None for e in ends) else max(ends),
+        )
+    if any(marker in text for marker in _AMBIGUOUS_MARKERS):
+        return QueryTime(status="ambiguous", text=text)
+    return QueryTime(status="none")
+
+
+def time_columns(text: Any) -> Dict[str, Optional[date]]:
+    """返回写入向量表的 time_start/time_end 字段。"""
+    start, end = parse_time_text(text)
+    return {"time_start": start, "time_end": end}
+
+
+def ensure_scalar_indexes(table, table_name: str, logger=None) -> None:
+    """为表中存在的过滤列补建缺失的标量索引，供 where 预过滤命中索引（已有索引由 optimize 增量更新）。"""
+    columns = set(table.schema.names)
+    try:
+        indexed = {column for index in table.list_indices() for column in index.columns}
+    except Exception:
+        indexed = set()
+    for column, index_type in SCALAR_INDEXES.get(table_name, []):
+        if column not in columns or column in indexed:
+            continue
+        try:
+            table.create_scalar_index(column, index_type=index_type, replace=True)
+        except Exception as e:
+            log_error(logger, f"{table_name}.{column} 标量索引创建失败: {e}", "RouterVectorize")
+
+
+def sql_literal(value: Any) -> str:
+    """SQL 字符串字面量（单引号转义）。"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def in_filter(column: str, values: Iterable[Any]) -> str:
+    """``column IN (...)`` 谓词；值为空时返回恒假条件。"""
+    literals = ", ".join(sql_literal(v) for v in dict.fromkeys(values))
+    return f"{column} IN ({literals})" if literals else "false"
+
+
+def doc_filter(table, doc_ids: Iterable[Any]) -> str:
+    """
+    按文档 ID 过滤的 where 谓词，依表结构选择可走索引的列：
+    doc_id（句子/文本表）→ doc_id_list（实体/关系表）→ 旧表的 JSON 字符串 doc_ids。
+    """
+    doc_ids = [str(doc_id) for doc_id in dict.fromkeys(doc_ids)]
+    if not doc_ids:
+        return "false"
+    columns = set(table.schema.names)
+    if "doc_id" in columns:
+        return in_filter("doc_id", doc_ids)
+    if "doc_id_list" in columns:
+        return "array_has_any(doc_id_list, [" + ", ".join(sql_literal(d) for d in doc_ids) + "])"
+    patterns = [sql_literal(f'%"{doc_id}"%') for doc_id in doc_ids]
+    return "(" + " OR ".join(f"doc_ids LIKE {pattern}" for pattern in patterns) + ")"
+
@@ -3,10 +3,12 @@
 """
 import os
 import json
+import threading
+from collections import OrderedDict
 import numpy as np
 import lancedb
 from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import pickle
 from pathlib import Path
 from pypinyin import lazy_pinyin, Style
@@ -49,8 +51,68 @@ def to_pinyin(text: str) -> str:
     pinyin_list = lazy_pinyin(text, style=Style.NORMAL)
     return ''.join(pinyin_list).lower()
 
+QUERY_CACHE_SIZE = 1024
+VECTOR_COLUMNS = ("tag_vec", "text_vec")
+
+# 进程内常驻的检索器（按数据库路径 + 表名），表版本或向量模型变化时重建
+_RETRIEVERS: Dict[Tuple[str, str], "Retriever"] = {}
+_RETRIEVERS_LOCK = threading.Lock()
+
+# 查询向量 LRU：(模型指纹, 查询语句) -> 归一化后的 float32 向量
+_QUERY_CACHE: "OrderedDict[Tuple[Tuple[str, str], str], np.ndarray]" = OrderedDict()
+_QUERY_CACHE_LOCK = threading.Lock()
+
+
+def _default_db_path() -> str:
+    return str(get_project_root() / "src" / "utils" / "rag" / "tagrag" / "vector_db")
+
+
+def _embedding_fingerprint() -> Tuple[str, str]:
+    """当前向量模型配置的指纹（base_url, model），用于判断常驻检索器与查询缓存是否仍然有效。"""
+    from ..embedding import get_embedding_client_settings
+
+    _, base_url, model, _, _ = get_embedding_client_settings()
+    return str(base_url or ""), str(model or "")
+
+
+def _table_version(db_path: str, table_name: str) -> Optional[int]:
+    """返回表的当前版本号，表不存在时返回 None。"""
+    db = lancedb.connect(db_path)
+    if table_name not in db.table_names():
+        return None
+    return int(db.open_table(table_name).version)
+
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    """按行 L2 归一化；零向量保持为零（相似度为 0，与逐行余弦计算一致）。"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _column_matrix(column) -> np.ndarray:
+    """将 Arrow 向量列转换为连续的 float32 矩阵。"""
+    import pyarrow as pa
+
+    column = column.combine_chunks() if hasattr(column, "combine_chunks") else column
+    if len(column) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    if pa.types.is_fixed_size_list(column.type) and column.null_count == 0:
+        width = column.type.list_size
+        return np.asarray(column.flatten(), dtype=np.float32).reshape(len(column), width)
+    return np.asarray([np.asarray(value, dtype=np.float32) for value in column.to_pylist()], dtype=np.float32)
+
+
+def clear_retriever_cache() -> None:
+    """清空常驻检索器与查询向量缓存（测试或重建向量库后使用）。"""
+    with _RETRIEVERS_LOCK:
+        _RETRIEVERS.clear()
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE.clear()
+
+
 class Retriever:
-    """向量检索器类。"""
+    """向量检索器类。向量以行归一化的 float32 矩阵常驻内存，检索为一次矩阵乘法 + argpartition。"""
     
     def __init__(self, topic_name: str = "控烟", db_path: str = None, logger=None):
         """
@@ -65,21 +127,20 @@ class Retriever:
         self.topic_name = topic_name
         # 将主题名称转换为拼音作为表名（lance不支持中文表名）
         self.table_name = to_pinyin(topic_name)
-        self.data = []
-        
-        # 设置数据库路径
-        if db_path is None:
-            project_root = get_project_root()
-            self.db_path = str(project_root / "src" / "utils" / "rag" / "tagrag" / "vector_db")
-        else:
-            self.db_path = db_path
-        
-        if self.logger:
-            pass  # 日志初始化完成
+        self.db_path = db_path if db_path is not None else _default_db_path()
+        self.table_version: Optional[int] = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.texts: List[str] = []
+        self.vectors: Dict[str, np.ndarray] = {}
         
         # 初始化OpenAI客户端
         self._init_client()
+        self.fingerprint = _embedding_fingerprint()
         self._load_database()
+
+    @property
+    def size(self) -> int:
+        return len(self.texts)
     
     def _init_client(self):
         """初始化OpenAI客户端。"""
@@ -95,31 +156,30 @@ class Retriever:
             raise
     
     def _load_database(self) -> None:
-        """加载向量数据库。"""
+        """加载向量数据库：只读取 id/text 与向量列，并转换为归一化矩阵。"""
         try:
             db = lancedb.connect(self.db_path)
             if self.table_name in db.table_names():
                 table = db.open_table(self.table_name)
-                # 将LanceDB表转换为列表格式
-                self.data = []
-                # 使用to_pandas()方法获取所有数据
-                df = table.to_pandas()
-                for _, row in df.iterrows():
-                    self.data.append({
-                        'id': int(row['id']),
-                        'text': str(row['text']),
-                        'tag_vec': row['tag_vec'].tolist() if hasattr(row['tag_vec'], 'tolist') else list(row['tag_vec'])
-                    })
-                if self.logger:
-                    pass  # 向量记录加载成功
+                self.table_version = int(table.version)
+                arrow_table = table.to_arrow()
+                names = set(arrow_table.column_names)
+                self.ids = np.asarray(arrow_table.column("id").to_numpy(zero_copy_only=False), dtype=np.int64)
+                self.texts = [str(value) for value in arrow_table.column("text").to_pylist()]
+                self.vectors = {
+                    column: _normalise_rows(_column_matrix(arrow_table.column(column)))
+                    for column in VECTOR_COLUMNS
+                    if column in names
+                }
             else:
                 if self.logger:
                     log_error(self.logger, f"表 {self.table_name} 不存在", "Retriever")
-                self.data = []
         except Exception as e:
             if self.logger:
                 log_error(self.logger, f"加载数据库失败: {e}", "Retriever")
-            self.data = []
+            self.ids = np.zeros(0, dtype=np.int64)
+            self.texts = []
+            self.vectors = {}
     
     def _get_query_embedding(self, query: str) -> List[float]:
         """
@@ -138,6 +198,25 @@ class Retriever:
             if self.logger:
                 log_error(self.logger, f"查询向量化失败: {e}", "Retriever")
             return [0.0] * getattr(self, "dimension", 1024)  # 返回零向量
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        """返回归一化的查询向量，命中 LRU 时不再调用向量接口；向量化失败的结果不缓存。"""
+        key = (self.fingerprint, query)
+        with _QUERY_CACHE_LOCK:
+            cached = _QUERY_CACHE.get(key)
+            if cached is not None:
+                _QUERY_CACHE.move_to_end(key)
+                return cached
+        vector = np.asarray(self._get_query_embedding(query), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return vector
+        vector = vector / norm
+        with _QUERY_CACHE_LOCK:
+            _QUERY_CACHE[key] = vector
+            while len(_QUERY_CACHE) > QUERY_CACHE_SIZE:
+                _QUERY_CACHE.popitem(last=False)
+        return vector
     
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
@@ -161,6 +240,14 @@ class Retriever:
             return 0.0
         
         return dot_product / (norm1 * norm2)
+
+    def _row(self, index: int, search_column: str) -> Dict[str, Any]:
+        """按行号还原结果数据（id/text 与检索列向量）。"""
+        item: Dict[str, Any] = {'id': int(self.ids[index]), 'text': self.texts[index]}
+        matrix = self.vectors.get(search_column)
+        if matrix is not None:
+            item[search_column] = matrix[index].tolist()
+        return item
     
     def retrieve(self, 
                  query: str, 
@@ -181,36 +268,38 @@ class Retriever:
         Returns:
             检索结果列表，按相似度降序排列
         """
-        if not self.data:
+        if not self.size:
             if self.logger:
                 log_error(self.logger, "数据库为空，无法进行检索", "Retriever")
             return []
         
-        if search_column not in ["text_vec", "tag_vec"]:
+        if search_column not in VECTOR_COLUMNS:
             if self.logger:
                 log_error(self.logger, f"不支持的搜索列: {search_column}", "Retriever")
             return []
+
+        matrix = self.vectors.get(search_column)
+        if matrix is None or top_k <= 0:
+            return []
         
-        # 获取查询向量
-        query_vector = self._get_query_embedding(query)
-        
-        # 计算相似度
-        similarities = []
-        for i, item in enumerate(self.data):
-            if search_column in item:
-                similarity = self._cosine_similarity(query_vector, item[search_column])
-                if similarity >= min_similarity:  # 过滤低相似度结果
-                    similarities.append({
-                        'index': i,
-                        'similarity': similarity,
-                        'data': item
-                    })
-        
-        # 按相似度排序
-        similarities.sort(key=lambda x: x['similarity'], reverse=True)
-        
-        # 返回前k个结果
-        results = similarities[:top_k]
+        # 获取查询向量并一次性计算全部相似度
+        query_vector = self._query_vector(query)
+        if query_vector.shape[0] != matrix.shape[1] or not np.any(query_vector):
+            scores = np.zeros(matrix.shape[0], dtype=np.float32)
+        else:
+            scores = matrix @ query_vector
+
+        # 过滤低相似度结果后取前k个（argpartition + 稳定排序，同分按原始顺序）
+        candidates = np.flatnonzero(scores >= min_similarity)
+        if candidates.size > top_k:
+            keep = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = np.sort(candidates[keep])
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = [
+            {'index': int(i), 'similarity': float(scores[i]), 'data': self._row(int(i), search_column)}
+            for i in order
+        ]
         
         # 如果指定了返回列，则过滤结果
         if return_columns:
@@ -281,6 +370,44 @@ class Retriever:
         else:
             return results
 
+def get_retriever(topic_name: str, db_path: Optional[str] = None, logger=None) -> Retriever:
+    """
+    获取常驻检索器：同一专题只加载一次向量表，表版本或向量模型配置变化时重新加载。
+
+    Args:
+        topic_name: RAG主题名称
+        db_path: 向量数据库路径，None 时使用默认路径
+        logger: 日志记录器（更新到复用的检索器上）
+
+    Returns:
+        Retriever: 可直接检索的检索器
+    """
+    path = db_path if db_path is not None else _default_db_path()
+    key = (path, to_pinyin(topic_name))
+    version = _table_version(path, key[1])
+    fingerprint = _embedding_fingerprint()
+    with _RETRIEVERS_LOCK:
+        retriever = _RETRIEVERS.get(key)
+    if (
+        retriever is not None
+        and version is not None
+        and retriever.table_version == version
+        and retriever.fingerprint == fingerprint
+    ):
+        retriever.logger = logger
+        return retriever
+
+    retriever = Retriever(topic_name=topic_name, db_path=path, logger=logger)
+    with _RETRIEVERS_LOCK:
+        if retriever.table_version is not None:
+            _RETRIEVERS[key] = retriever
+        else:
+            _RETRIEVERS.pop(key, None)
+    if logger:
+        log_success(logger, f"加载 TagRAG 向量表 {key[1]} (版本 {retriever.table_version}, {retriever.size} 条)", "Retriever")
+    return retriever
+
+
 def tag_retrieve(query: str,
                  topic_name: str = "控烟",
                  search_column: str = "tag_vec", 
@@ -293,8 +420,8 @@ def tag_retrieve(query: str,
     logger = setup_logger(f"TagRetrieve_{topic_name}", "default")
     
     try:
-        # 初始化检索器
-        retriever = Retriever(topic_name=topic_name, logger=logger)
+        # 获取常驻检索器
+        retriever = get_retriever(topic_name, logger=logger)
         
         # 执行检索
         results = retriever.search(
@@ -338,7 +465,7 @@ def retrieve_documents(
     logger = setup_logger(f"TagRAG_{topic}", "default")
 
     try:
-        retriever = Retriever(topic_name=topic, db_path=db_path, logger=logger)
+        retriever = get_retriever(topic, db_path=db_path, logger=logger)
         raw_results = retriever.retrieve(
             query=query,
             top_k=top_k,
@@ -0,0 +1,293 @@
+"""
+共享 jieba 分词服务（关键词分析、BERTopic、排除词建议与报告证据检索共用）
+
+- 分词结果按 (文本内容哈希, 分词方式, 用户词典指纹) 缓存：进程内 LRU + 可选的磁盘缓存
+  （SQLite，默认放在 fetch 数据桶的 .cache 目录下），同一批数据的多次分析与不同模块之间直接复用；
+- 未命中的文本较多时分块交给进程池并行分词（不依赖 jieba.enable_parallel，Windows 同样可用），
+  否则在当前进程串行执行；
+- 带用户词的分词使用按词表独立创建的 jieba.Tokenizer，不修改进程内的全局词典，
+  因此不带用户词的调用始终按默认词典切分；
+- 只缓存 jieba 的原始切分结果，停用词、词性与长度过滤由调用方按各自规则完成。
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .parallel import resolve_process_workers, run_process_jobs
+
+try:
+    import jieba
+    import jieba.posseg as pseg
+
+    JIEBA_AVAILABLE = True
+    jieba.setLogLevel(60)
+except ImportError:  # pragma: no cover - jieba 为后端依赖
+    jieba = None
+    pseg = None
+    JIEBA_AVAILABLE = False
+
+DEFAULT_MIN_PARALLEL_TEXTS = 2000
+DEFAULT_CHUNK_SIZE = 1000
+MEMORY_CACHE_SIZE = 20000
+TOKEN_CACHE_DIRNAME = ".cache"
+TOKEN_CACHE_FILENAME = "tokens.sqlite3"
+
+# 词与词之间、词与词性之间的分隔符（不会出现在正常文本中）
+_TOKEN_SEP = "\x1f"
+_FLAG_SEP = "\x1e"
+# SQLite 默认参数上限为 999，按块查询
+_CHUNK = 500
+
+Token = Union[str, Tuple[str, str]]
+
+# 每个用户词表对应的独立分词器（加载词典较慢，按进程缓存少量词表）
+_TOKENIZER_CACHE_SIZE = 4
+
+_MEMORY: "OrderedDict[Tuple[str, str], List[Token]]" = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+_TOKENIZERS: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+_TOKENIZER_LOCK = threading.Lock()
+
+
+def token_cache_path(data_dir: Union[str, Path]) -> Path:
+    """数据桶目录（如 fetch/<日期>）下的分词缓存文件路径。"""
+    return Path(data_dir) / TOKEN_CACHE_DIRNAME / TOKEN_CACHE_FILENAME
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(str(text or "").encode("utf-8")).hexdigest()
+
+
+def _variant(pos: bool, user_words: Sequence[str]) -> str:
+    """分词方式 + 用户词典指纹（用户词典不同，切分结果可能不同）。"""
+    words = sorted({str(word).strip() for word in user_words or () if str(word).strip()})
+    digest = hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()[:16] if words else "-"
+    return f"{'pos' if pos else 'cut'}:{digest}"
+
+
+def _encode(tokens: List[Token], pos: bool) -> str:
+    if pos:
+        return _TOKEN_SEP.join(f"{word}{_FLAG_SEP}{flag}" for word, flag in tokens)
+    return _TOKEN_SEP.join(tokens)
+
+
+def _decode(payload: str, pos: bool) -> List[Token]:
+    if not payload:
+        return []
+    items = payload.split(_TOKEN_SEP)
+    if pos:
+        return [tuple(item.split(_FLAG_SEP, 1)) for item in items]
+    return items
+
+
+def _tokenizer(user_words: Tuple[str, ...], pos: bool) -> Any:
+    """返回用户词表对应的独立分词器；pos 时为共用同一词典的 POSTokenizer。"""
+    with _TOKENIZER_LOCK:
+        entry = _TOKENIZERS.get(user_words)
+        if entry is None:
+            tokenizer = jieba.Tokenizer()
+            for word in user_words:
+                tokenizer.add_word(word)
+            entry = {"cut": tokenizer, "pos": None}
+            _TOKENIZERS[user_words] = entry
+            while len(_TOKENIZERS) > _TOKENIZER_CACHE_SIZE:
+                _TOKENIZERS.popitem(last=False)
+        _TOKENIZERS.move_to_end(user_words)
+        if not pos:
+            return entry["cut"]
+        if entry["pos"] is None:
+            entry["pos"] = pseg.POSTokenizer(entry["cut"])
+        return entry["pos"]
+
+
+def _segment_chunk(texts: List[str], pos: bool, user_words: Tuple[str, ...]) -> List[List[Token]]:
+    """对一批文本分词（模块级函数，供子进程调用）。"""
+    if not JIEBA_AVAILABLE:
+        raise RuntimeError("jieba 未安装")
+    if pos:
+        tokenizer = _tokenizer(user_words, True) if user_words else pseg
+        return [[(word, flag) for word, flag in tokenizer.cut(text)] for text in texts]
+    tokenizer = _tokenizer(user_words, False) if user_words else jieba
+    return [tokenizer.lcut(text) for text in texts]
+
+
+class TokenCache:
+    """
+    分词结果磁盘缓存
+
+    Args:
+        path: SQLite 文件路径
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tokens (
+                text_hash TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (text_hash, variant)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str], variant: str) -> Dict[str, str]:
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, str] = {}
+        for start in range(0, len(unique_keys), _CHUNK):
+            chunk = unique_keys[start : start + _CHUNK]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = self._conn.execute(
+                f"SELECT text_hash, payload FROM tokens WHERE variant = ? AND text_hash IN ({placeholders})",
+                (variant, *chunk),
+            ).fetchall()
+            found.update({row[0]: row[1] for row in rows})
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str]], variant: str) -> None:
+        now = time.time()
+        rows = [(key, variant, payload, now) for key, payload in items]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO tokens (text_hash, variant, payload, created_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+
+def _tokenize_config() -> Dict[str, Any]:
+    try:
+        from .setting.settings import settings
+
+        config = settings.get_analysis_config().get("tokenize")
+    except Exception:
+        config = None
+    return config if isinstance(config, dict) else {}
+
+
+def segment_texts(
+    texts: Sequence[Any],
+    *,
+    pos: bool = False,
+    user_words: Iterable[str] = (),
+    cache_path: Optional[Union[str, Path]] = None,
+    workers: Optional[int] = None,
+    min_parallel_texts: Optional[int] = None,
+) -> List[List[Token]]:
+    """
+    批量分词（带缓存与多进程并行）
+
+    Args:
+        texts: 待分词文本，None/空文本返回空列表
+        pos: True 时返回 (词, 词性) 列表（jieba.posseg），否则返回词列表（jieba.lcut）
+        user_words: 额外加入 jieba 词典的用户词（参与缓存键）
+        cache_path: 磁盘缓存文件路径（通常为 token_cache_path(fetch 目录)），为空时只使用进程内缓存
+        workers: 进程数，默认读取 analysis.yaml 的 tokenize.workers（0 为按 CPU 核数）
+        min_parallel_texts: 未命中文本数达到该值才启用进程池，默认读取 tokenize.min_parallel_texts
+
+    Returns:
+        List[List[Token]]: 与 texts 一一对应的分词结果
+    """
+    if not JIEBA_AVAILABLE:
+        raise RuntimeError("jieba 未安装，无法分词")
+
+    user_words = tuple(sorted({str(word).strip() for word in user_words or () if str(word).strip()}))
+    variant = _variant(pos, user_words)
+    sources = [str(text) if text is not None else "" for text in texts]
+    keys = [_text_hash(text) if text.strip() else None for text in sources]
+
+    resolved: Dict[str, List[Token]] = {}
+    with _MEMORY_LOCK:
+        for key in keys:
+            if key is None or key in resolved:
+                continue
+            cached = _MEMORY.get((variant, key))
+            if cached is not None:
+                _MEMORY.move_to_end((variant, key))
+                resolved[key] = cached
+
+    pending: Dict[str, str] = {}
+    for key, text in zip(keys, sources):
+        if key is not None and key not in resolved:
+            pending.setdefault(key, text)
+
+    disk = None
+    if cache_path and pending:
+        try:
+            disk = TokenCache(cache_path)
+            for key, payload in disk.get_many(pending.keys(), variant).items():
+                resolved[key] = _decode(payload, pos)
+                pending.pop(key, None)
+        except Exception:
+            disk = None
+
+    if pending:
+        pending_keys = list(pending)
+        pending_texts = [pending[key] for key in pending_keys]
+        config = _tokenize_config()
+        threshold = int(
+            min_parallel_texts if min_parallel_texts is not None
+            else config.get("min_parallel_texts", DEFAULT_MIN_PARALLEL_TEXTS)
+        )
+        chunk_size = max(1, int(config.get("chunk_size", DEFAULT_CHUNK_SIZE)))
+        chunks = [pending_texts[i : i + chunk_size] for i in range(0, len(pending_texts), chunk_size)]
+        process_count = 1
+        if len(pending_texts) >= threshold and len(chunks) > 1:
+            process_count = resolve_process_workers(
+                workers if workers is not None else config.get("workers", 0), len(chunks)
+            )
+
+        if process_count > 1:
+            outcomes = run_process_jobs(
+                _segment_chunk, [(chunk, pos, user_words) for chunk in chunks], process_count
+            )
+        else:
+            outcomes = [_segment_chunk(chunk, pos, user_words) for chunk in chunks]
+
+        segmented: List[List[Token]] = []
+        for chunk, outcome in zip(chunks, outcomes):
+            # 子进程失败的分块回退到当前进程
+            segmented.extend(_segment_chunk(chunk, pos, user_words) if isinstance(outcome, Exception) else outcome)
+        resolved.update(zip(pending_keys, segmented))
+
+        if disk is not None:
+            try:
+                disk.put_many(((key, _encode(resolved[key], pos)) for key in pending_keys), variant)
+            except Exception:
+                pass
+
+    if disk is not None:
+        disk.close()
+
+    with _MEMORY_LOCK:
+        for key, tokens in resolved.items():
+            _MEMORY[(variant, key)] = tokens
+            _MEMORY.move_to_end((variant, key))
+        while len(_MEMORY) > MEMORY_CACHE_SIZE:
+            _MEMORY.popitem(last=False)
+
+    return [list(resolved[key]) if key is not None else [] for key in keys]
+
+
+def clear_memory_cache() -> None:
+    with _MEMORY_LOCK:
+        _MEMORY.clear()
@@ -0,0 +1,353 @@
+"""
+统一的后台任务存储（SQLite WAL）
+
+报告、NetInsight、排除词建议、异常发布者识别、媒体识别、基础/流体/BERTopic 分析等任务族
+各自把任务保存为 ``<STATE_ROOT>/tasks/<task_id>.json``。本模块在数据根目录下维护一份
+共享的 SQLite 库（``_tasks/tasks.sqlite3``），按 (任务族, 状态/专题/创建时间) 建索引：
+
+- 兼容层：各任务族照常写 JSON 文件（单个任务的读取、FileLock 互斥都不变），
+  写入/删除后同步一行到统一存储；
+- 列表、领取下一个排队任务、按状态/专题筛选、后台任务看板都走索引查询，
+  不再遍历并解析整个任务目录；
+- 任务族首次访问统一存储时从已有 JSON 文件导入一次，历史任务无需迁移。
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+TASK_STORE_DIRNAME = "_tasks"
+TASK_STORE_FILENAME = "tasks.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    family TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT '',
+    topic TEXT NOT NULL DEFAULT '',
+    label TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    PRIMARY KEY (family, task_id)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (family, status, created_at);
+CREATE INDEX IF NOT EXISTS tasks_topic ON tasks (family, topic, created_at);
+CREATE INDEX IF NOT EXISTS tasks_created ON tasks (family, created_at);
+CREATE INDEX IF NOT EXISTS tasks_updated ON tasks (family, updated_at);
+CREATE TABLE IF NOT EXISTS task_families (family TEXT PRIMARY KEY, seeded_at TEXT NOT NULL);
+"""
+
+_ORDER_COLUMNS = {"created_at", "updated_at"}
+
+
+class TaskStore:
+    """
+    一个 SQLite 任务库（线程内复用连接，跨进程依赖 WAL 与 busy_timeout）
+
+    Args:
+        path: 数据库文件路径
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialised = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialised:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._initialised = True
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, family: str, task: Dict[str, Any], *, topic_fields: Sequence[str] = ("topic_identifier",)) -> None:
+        """写入（或覆盖）一个任务"""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO tasks (family, task_id, status, topic, label, created_at, updated_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            _row(family, task, topic_fields),
+        )
+
+    def insert_missing(
+        self,
+        family: str,
+        tasks: Iterable[Dict[str, Any]],
+        *,
+        topic_fields: Sequence[str] = ("topic_identifier",),
+    ) -> int:
+        """批量导入（已存在的任务保持不变，避免用旧的文件快照覆盖并发写入的新状态）"""
+        rows = [_row(family, task, topic_fields) for task in tasks if task.get("id")]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (family, task_id, status, topic, label, created_at, updated_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def delete(self, family: str, task_id: str) -> None:
+        self._conn().execute("DELETE FROM tasks WHERE family = ? AND task_id = ?", (family, task_id))
+
+    def query(
+        self,
+        family: str,
+        *,
+        statuses: Optional[Iterable[str]] = None,
+        topic: str = "",
+        order_by: str = "created_at",
+        newest_first: bool = True,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        按任务族查询任务
+
+        Args:
+            family: 任务族
+            statuses: 只返回这些状态的任务
+            topic: 专题标识或专题名称（匹配 topic 或 label 列）
+            order_by: 排序列（created_at / updated_at）
+            newest_first: 是否倒序
+            limit: 最多返回条数
+
+        Returns:
+            List[Dict[str, Any]]: 任务内容（与 JSON 文件一致）
+        """
+        clauses = ["family = ?"]
+        params: List[Any] = [family]
+        status_list = [str(item) for item in (statuses or [])]
+        if status_list:
+            clauses.append(f"status IN ({', '.join('?' for _ in status_list)})")
+            params.extend(status_list)
+        if topic:
+            clauses.append("(topic = ? OR label = ?)")
+            params.extend([topic, topic])
+        column = order_by if order_by in _ORDER_COLUMNS else "created_at"
+        sql = f"SELECT payload FROM tasks WHERE {' AND '.join(clauses)} ORDER BY {column} {'DESC' if newest_first else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(max(int(limit), 0))
+        tasks: List[Dict[str, Any]] = []
+        for (payload,) in self._conn().execute(sql, params):
+            try:
+                task = json.loads(payload)
+            except Exception:
+                continue
+            if isinstance(task, dict):
+                tasks.append(task)
+        return tasks
+
+    def count_by_status(self, family: str) -> Dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) FROM tasks WHERE family = ? GROUP BY status", (family,)
+        ).fetchall()
+        return {str(status): int(count) for status, count in rows}
+
+    def is_seeded(self, family: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM task_families WHERE family = ?", (family,)).fetchone()
+        return row is not None
+
+    def mark_seeded(self, family: str, seeded_at: str) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO task_families (family, seeded_at) VALUES (?, ?)", (family, seeded_at)
+        )
+
+    def clear(self, family: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM tasks WHERE family = ?", (family,))
+        conn.execute("DELETE FROM task_families WHERE family = ?", (family,))
+
+
+def _row(family: str, task: Dict[str, Any], topic_fields: Sequence[str]) -> tuple:
+    topic = ""
+    for field in topic_fields:
+        topic = str(task.get(field) or "").strip()
+        if topic:
+            break
+    return (
+        family,
+        str(task.get("id") or ""),
+        str(task.get("status") or ""),
+        topic,
+        str(task.get("topic") or "").strip(),
+        str(task.get("created_at") or ""),
+        str(task.get("updated_at") or ""),
+        json.dumps(task, ensure_ascii=False),
+    )
+
+
+_STORES: Dict[str, TaskStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_task_store(path: Path) -> TaskStore:
+    """按文件路径复用 TaskStore 实例"""
+    key = str(Path(path))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = TaskStore(Path(path))
+            _STORES[key] = store
+        return store
+
+
+def _utc_now() -> str:
+    from datetime import datetime, timezone
+
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _load_task_files(task_dir: Path) -> List[Dict[str, Any]]:
+    tasks: List[Dict[str, Any]] = []
+    if not task_dir.exists():
+        return tasks
+    for path in task_dir.glob("*.json"):
+        if path.name.endswith(".events.json"):
+            continue
+        try:
+            with path.open("r", encoding="utf-8") as stream:
+                payload = json.load(stream)
+        except Exception:
+            continue
+        if isinstance(payload, dict) and payload.get("id"):
+            tasks.append(payload)
+    return tasks
+
+
+class TaskFamily:
+    """
+    某个任务族在统一存储中的视图（各任务族模块的兼容层）
+
+    Args:
+        name: 任务族名称（如 report、media-tagging）
+        state_root: 任务族状态目录（如 data/_media_tagging），统一存储位于其上级目录的 _tasks 下
+        task_dir: 任务 JSON 目录，默认 state_root/tasks
+        topic_fields: 作为专题索引的字段，按顺序取第一个非空值
+    """
+
+    def __init__(
+        self,
+        name: str,
+        state_root: Path,
+        *,
+        task_dir: Optional[Path] = None,
+        topic_fields: Sequence[str] = ("topic_identifier",),
+    ):
+        self.name = name
+        self.state_root = Path(state_root)
+        self.task_dir = Path(task_dir) if task_dir is not None else self.state_root / "tasks"
+        self.topic_fields = tuple(topic_fields)
+        self.store = get_task_store(self.state_root.parent / TASK_STORE_DIRNAME / TASK_STORE_FILENAME)
+        self._seeded = False
+        self._seed_lock = threading.Lock()
+
+    def _ensure_seeded(self) -> None:
+        if self._seeded:
+            return
+        with self._seed_lock:
+            if self._seeded:
+                return
+            if not self.store.is_seeded(self.name):
+                self.store.insert_missing(self.name, _load_task_files(self.task_dir), topic_fields=self.topic_fields)
+                self.store.mark_seeded(self.name, _utc_now())
+            self._seeded = True
+
+    def index(self, task: Dict[str, Any]) -> None:
+        """任务 JSON 写入后调用，同步到统一存储"""
+        if not task.get("id"):
+            return
+        self._ensure_seeded()
+        self.store.upsert(self.name, task, topic_fields=self.topic_fields)
+
+    def drop(self, task_id: str) -> None:
+        """任务 JSON 删除后调用"""
+        self._ensure_seeded()
+        self.store.delete(self.name, task_id)
+
+    def list(
+        self,
+        *,
+        statuses: Optional[Iterable[str]] = None,
+        topic: str = "",
+        order_by: str = "created_at",
+        newest_first: bool = True,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        self._ensure_seeded()
+        return self.store.query(
+            self.name,
+            statuses=statuses,
+            topic=topic,
+            order_by=order_by,
+            newest_first=newest_first,
+            limit=limit,
+        )
+
+    def next_queued(self) -> Optional[Dict[str, Any]]:
+        """最早创建的排队任务"""
+        tasks = self.list(statuses=["queued"], newest_first=False, limit=1)
+        return tasks[0] if tasks else None
+
+    def counts(self) -> Dict[str, int]:
+        self._ensure_seeded()
+        return self.store.count_by_status(self.name)
+
+    def rebuild(self) -> int:
+        """丢弃该任务族的索引并从 JSON 文件重新导入（手工改动任务目录后使用）"""
+        with self._seed_lock:
+            self.store.clear(self.name)
+            count = self.store.insert_missing(self.name, _load_task_files(self.task_dir), topic_fields=self.topic_fields)
+            self.store.mark_seeded(self.name, _utc_now())
+            self._seeded = True
+        return count
+
+
+_FAMILIES: Dict[tuple, TaskFamily] = {}
+_FAMILIES_LOCK = threading.Lock()
+
+
+def task_family(
+    name: str,
+    state_root: Path,
+    *,
+    task_dir: Optional[Path] = None,
+    topic_fields: Sequence[str] = ("topic_identifier",),
+) -> TaskFamily:
+    """
+    获取任务族视图（按 名称+状态目录 缓存，测试中替换 STATE_ROOT 时会得到新的视图）
+    """
+    key = (name, str(state_root), str(task_dir or Path(state_root) / "tasks"))
+    with _FAMILIES_LOCK:
+        family = _FAMILIES.get(key)
+        if family is None:
+            family = TaskFamily(name, state_root, task_dir=task_dir, topic_fields=topic_fields)
+            _FAMILIES[key] = family
+        return family
+
+
+__all__ = [
+    "TASK_STORE_DIRNAME",
+    "TASK_STORE_FILENAME",
+    "TaskFamily",
+    "TaskStore",
+    "get_task_store",
+    "task_family",
+]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.analyze import engine  # noqa: E402
+from src.analyze.functions.classification import analyze_classification_overall  # noqa: E402
+from src.analyze.functions.geography import analyze_geography_overall  # noqa: E402
+from src.analyze.functions.keywords import analyze_keywords_overall  # noqa: E402
+from src.analyze.functions.publishers import analyze_publishers_overall  # noqa: E402
+from src.analyze.functions.trends import analyze_trends_overall  # noqa: E402
+from src.utils.io.layers import write_layer  # noqa: E402
+
+_CHANNELS = {
+    "微博": pd.DataFrame({
+        "title": ["控烟条例", "电子烟监管", "禁烟宣传"],
+        "contents": ["控烟条例正式实施，公共场所全面禁烟", "电子烟监管新规出台", "学校开展禁烟宣传活动"],
+        "published_at": ["2025-01-01 08:00:00", "2025-01-02 09:00:00", "2025-01-02 10:00:00"],
+        "author": ["健康中国", "人民日报", "健康中国"],
+        "region": ["北京", "上海", "北京"],
+        "classification": ["政策", "监管", "政策"],
+        "polarity": ["正面", "中性", "正面"],
+        "unused": ["x", "y", "z"],
+    }),
+    "新闻": pd.DataFrame({
+        "title": ["控烟进展"],
+        "contents": ["各地控烟工作持续推进，公共场所禁烟效果明显"],
+        "published_at": ["2025-01-01 12:00:00"],
+        "author": ["人民日报"],
+        "region": ["广东"],
+        "classification": ["政策"],
+        "polarity": ["负面"],
+        "unused": ["w"],
+    }),
+}
+
+_FUNCTIONS = [
+    {"name": name, "target": target}
+    for name in ("volume", "attitude", "trends", "keywords", "geography", "publishers", "classification")
+    for target in ("总体", "渠道")
+]
+
+
+class AnalysisEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.fetch_dir = Path(self._tmp.name)
+        for name, df in _CHANNELS.items():
+            write_layer(df, self.fetch_dir, name, fmt="jsonl")
+        self.overall = pd.concat(list(_CHANNELS.values()), ignore_index=True)
+        write_layer(self.overall, self.fetch_dir, "总体", fmt="jsonl")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _run(self, functions=_FUNCTIONS, **kwargs):
+        results = {}
+        reads = Counter()
+        real_read = engine.read_layer
+
+        def _counting_read(path, *args, **kw):
+            reads[Path(path).stem] += 1
+            return real_read(path, *args, **kw)
+
+        def _on_result(name, target, result):
+            results[(name, target)] = result
+
+        with mock.patch.object(engine, "read_layer", side_effect=_counting_read):
+            status = engine.run_analysis_engine(
+                self.fetch_dir, functions, max_workers=4, on_result=_on_result, **kwargs
+            )
+        return status, results, reads
+
+    def test_channels_are_read_once_and_overall_is_combined(self) -> None:
+        status, results, reads = self._run()
+        self.assertEqual(reads, Counter({"微博": 1, "新闻": 1}))
+        self.assertTrue(all(status[(f["name"], f["target"])] for f in _FUNCTIONS))
+
+        self.assertEqual(results[("volume", "总体")], {"data": [{"name": "微博", "value": 3}, {"name": "新闻", "value": 1}]})
+        self.assertEqual(results[("volume", "微博")], {"data": [{"name": "微博", "value": 3}]})
+        self.assertEqual(results[("trends", "总体")], analyze_trends_overall(self.overall))
+        self.assertEqual(results[("publishers", "总体")], analyze_publishers_overall(self.overall))
+        self.assertEqual(results[("geography", "总体")], analyze_geography_overall(self.overall))
+        self.assertEqual(results[("classification", "总体")], analyze_classification_overall(self.overall, None))
+        self.assertEqual(
+            sorted(map(str, results[("keywords", "总体")]["data"])),
+            sorted(map(str, analyze_keywords_overall(self.overall, "t")["data"])),
+        )
+        attitude = {row["name"]: row["value"] for row in results[("attitude", "总体")]["data"]}
+        self.assertEqual(attitude, {"positive": 2, "neutral": 1, "negative": 1})
+
+    def test_failed_channel_falls_back_to_overall(self) -> None:
+        real_count = engine.count_trends
+
+        def _flaky(df):
+            if len(df) == 1:
+                raise RuntimeError("boom")
+            return real_count(df)
+
+        functions = [{"name": "trends", "target": "总体"}]
+        with mock.patch.object(engine, "count_trends", side_effect=_flaky):
+            status, results, reads = self._run(functions)
+        self.assertTrue(status[("trends", "总体")])
+        self.assertEqual(reads["总体"], 1)
+        self.assertEqual(results[("trends", "总体")], analyze_trends_overall(self.overall))
+
+    def test_volume_only_reads_no_data(self) -> None:
+        progress = []
+        status, results, reads = self._run(
+            [{"name": "volume", "target": "总体"}], on_progress=lambda *args: progress.append(args)
+        )
+        self.assertEqual(sum(reads.values()), 0)
+        self.assertEqual(len(progress), 2)
+        self.assertEqual(set(results), {("volume", "总体")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import math
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.rag.retrievers.bm25_retriever import INDEX_FILE, BM25Retriever  # noqa: E402
+
+_DOCS = [
+    {"id": "a", "text": "控烟条例正式实施，公共场所全面禁烟"},
+    {"id": "b", "text": "电子烟监管新规出台，控烟工作持续推进"},
+    {"id": "c", "text": "Tobacco control law takes effect in public places"},
+    {"id": "d", "text": "控烟 控烟 宣传进校园"},
+    {"id": "e", "text": "天气晴朗，适合出行"},
+]
+
+
+def _naive_scores(retriever: BM25Retriever, query: str) -> list:
+    docs = [Counter(retriever._tokenize(doc["text"])) for doc in _DOCS]
+    lengths = [sum(counts.values()) for counts in docs]
+    avgdl = sum(lengths) / len(lengths)
+    scores = []
+    for counts, length in zip(docs, lengths):
+        score = 0.0
+        for token in retriever._tokenize(query):
+            df = sum(1 for other in docs if token in other)
+            if token not in counts:
+                continue
+            idf = math.log((len(docs) - df + 0.5) / (df + 0.5))
+            idf = idf if idf > 0 else retriever.epsilon
+            tf = counts[token]
+            score += idf * tf * (retriever.k1 + 1) / (
+                tf + retriever.k1 * (1 - retriever.b + retriever.b * length / avgdl)
+            )
+        scores.append(score)
+    return scores
+
+
+class BM25RetrieverTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.retriever = BM25Retriever()
+        self.retriever.build_index(_DOCS)
+
+    def test_scores_match_reference_bm25(self) -> None:
+        query = "控烟 公共场所 public"
+        expected = _naive_scores(self.retriever, query)
+        for got, want in zip(self.retriever.get_scores(query).tolist(), expected):
+            self.assertAlmostEqual(got, want, places=4)
+        results = self.retriever.retrieve(query, top_k=3)
+        ranked = sorted(range(len(expected)), key=lambda i: (-expected[i], i))[:3]
+        self.assertEqual([r["id"] for r in results], [_DOCS[i]["id"] for i in ranked])
+        self.assertTrue(all(r["retrieval_type"] == "bm25" for r in results))
+        self.assertEqual(self.retriever.retrieve("完全无关", top_k=3), [])
+
+    def test_binary_index_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            self.retriever.save_index(tmp)
+            self.assertTrue((Path(tmp) / INDEX_FILE).exists())
+            loaded = BM25Retriever()
+            loaded.load_index(tmp)
+        query = "控烟 tobacco"
+        self.assertEqual(loaded.retrieve(query, top_k=5), self.retriever.retrieve(query, top_k=5))
+        self.assertEqual(loaded.get_stats(), self.retriever.get_stats())
+
+    def test_legacy_json_index_is_converted(self) -> None:
+        docs = [Counter(self.retriever._tokenize(doc["text"])) for doc in _DOCS]
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy = {
+                "k1": 1.2, "b": 0.75, "epsilon": 0.25, "doc_freqs": docs,
+                "doc_lengths": [sum(c.values()) for c in docs],
+                "avgdl": sum(sum(c.values()) for c in docs) / len(docs),
+                "corpus_size": len(docs),
+            }
+            (Path(tmp) / "bm25_index.json").write_text(json.dumps(legacy), encoding="utf-8")
+            (Path(tmp) / "documents.json").write_text(json.dumps(_DOCS), encoding="utf-8")
+            loaded = BM25Retriever()
+            loaded.load_index(tmp)
+        query = "控烟 宣传"
+        self.assertEqual(
+            [r["id"] for r in loaded.retrieve(query)], [r["id"] for r in self.retriever.retrieve(query)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
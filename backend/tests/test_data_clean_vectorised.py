@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.clean.data_clean import (  # noqa: E402
+    CONTENT_FIELDS,
+    MYSQL_TIME_FORMAT,
+    TIME_FORMATS,
+    _clean_whitespace_series,
+    _format_published_at,
+    _merge_contents,
+    _normalize_region_series,
+    _sequential_ids,
+    clean_text_whitespace,
+    normalize_region,
+    parse_datetime,
+)
+
+
+def _rowwise_contents(df: pd.DataFrame) -> pd.Series:
+    def _merge_with_labels(row):
+        parts = []
+        for col in CONTENT_FIELDS:
+            if col in row and str(row[col]).strip() != "未知":
+                parts.append(f"{col}: {clean_text_whitespace(row[col])}")
+        return " ".join(parts).strip() if parts else "未知"
+
+    return df.apply(_merge_with_labels, axis=1).apply(clean_text_whitespace)
+
+
+def _rowwise_published_at(series: pd.Series) -> pd.Series:
+    parsed = series.apply(lambda x: parse_datetime(x, TIME_FORMATS))
+    return parsed.apply(lambda x: x.strftime(MYSQL_TIME_FORMAT) if pd.notna(x) and x is not None else None)
+
+
+def _as_json(series: pd.Series) -> str:
+    return series.reset_index(drop=True).to_json(orient="values", force_ascii=False)
+
+
+class VectorisedCleanTests(unittest.TestCase):
+    def test_contents_match_rowwise_merge(self) -> None:
+        df = pd.DataFrame(
+            {
+                "title": ["  标题\t一 ", " 未知 ", None, "", "x"],
+                "summary": ["未知", "摘　要", "未知", None, "\xa0"],
+                "content": ["正文\n\n二", "未知", None, "  ", "y  z"],
+            },
+            index=[3, 1, 7, 0, 9],
+        )
+        for col in ("title", "summary", "content"):
+            df[col] = df[col].fillna("未知").astype(str)
+        self.assertEqual(
+            _as_json(_rowwise_contents(df)),
+            _as_json(_clean_whitespace_series(_merge_contents(df))),
+        )
+
+    def test_region_lookup_matches_rowwise(self) -> None:
+        for values in (
+            ["广东深圳", " 北京 ", "", None, "海外", "   ", "内蒙古", "广东深圳"],
+            [None, None],
+            ["北京", 3, None],
+        ):
+            series = pd.Series(values, dtype=object)
+            expected = series.apply(lambda x: normalize_region(x, "未知"))
+            self.assertEqual(_as_json(expected), _as_json(_normalize_region_series(series, "未知")))
+
+    def test_published_at_matches_rowwise(self) -> None:
+        series = pd.Series(
+            [
+                "2025-01-02 03:04:05",
+                "2025/01/02 03:04",
+                "2025-01-02",
+                "2025-02-30 10:00:00",
+                "1500-01-01 00:00:00",
+                "２０２５-01-02 03:04:05",
+                "2025-1-2 3:4:5",
+                "2025-01-02T03:04:05+08:00",
+                "Jan 3 2025 10:00",
+                " 2025-01-02",
+                "not a date",
+                "",
+                None,
+                float("nan"),
+                pd.Timestamp("2025-01-05 06:07:08"),
+            ],
+            dtype=object,
+        )
+        self.assertEqual(_as_json(_rowwise_published_at(series)), _as_json(_format_published_at(series)))
+
+    def test_sequential_ids_match_string_concatenation(self) -> None:
+        for date_digits, count in (("20250101", 1), ("20250101", 12345), ("20250101_20250131", 11)):
+            expected = [int(f"{date_digits}{i + 1}") for i in range(count)]
+            self.assertEqual(expected, [int(value) for value in _sequential_ids(date_digits, count)])
+
+
+if __name__ == "__main__":
+    unittest.main()
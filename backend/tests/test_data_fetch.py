@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.fetch import data_fetch  # noqa: E402
+from src.utils.io import layers  # noqa: E402
+from src.utils.io.layers import find_layer_file, read_layer  # noqa: E402
+
+CHANNELS = ["新闻", "微博", "抖音"]
+MERGE_CONFIG = {"社媒": ["微博", "抖音"]}
+
+
+def _row(row_id: int, channel: str, published_at: str) -> dict:
+    return {"id": row_id, "title": f"{channel}-{row_id}", "platform": channel, "published_at": published_at}
+
+
+class _FetchTestCase(unittest.TestCase):
+    """Runs fetch_range against a SQLite database with one table per channel."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.fetch_dir = root / "fetch"
+        self.fetch_dir.mkdir()
+        self.engine = create_engine(f"sqlite:///{root / 'topic.db'}")
+        for channel in CHANNELS:
+            with self.engine.begin() as conn:
+                conn.execute(text(f'CREATE TABLE "{channel}" (id INTEGER, title TEXT, platform TEXT, published_at TEXT)'))
+        self.fetch_options = {"workers": 1}
+        settings = MagicMock()
+        settings.get_channel_config.side_effect = lambda: {
+            "keep": CHANNELS,
+            "merge_for_analysis": MERGE_CONFIG,
+            "fetch": dict(self.fetch_options),
+        }
+        self._stack = ExitStack()
+        self._stack.enter_context(patch.object(data_fetch, "settings", settings))
+        self._stack.enter_context(patch.object(data_fetch, "ensure_bucket", return_value=self.fetch_dir))
+        self._stack.enter_context(patch.object(data_fetch, "_create_topic_engine", return_value=self.engine))
+        self._stack.enter_context(
+            patch.object(data_fetch, "table_exists", side_effect=lambda conn, table, topic: inspect(conn).has_table(table))
+        )
+
+    def tearDown(self) -> None:
+        self._stack.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def _insert(self, *rows: dict) -> None:
+        with self.engine.begin() as conn:
+            for row in rows:
+                conn.execute(
+                    text(f'INSERT INTO "{row["platform"]}" VALUES (:id, :title, :platform, :published_at)'), row
+                )
+
+    def _fetch(self, layer_format: str, **kwargs):
+        with patch.object(data_fetch, "resolve_layer_format", return_value=layer_format):
+            return data_fetch.fetch_range("demo", "2025-01-01", "2025-01-31", "2025-01-31", **kwargs)
+
+    def _layer_ids(self, name: str) -> list:
+        return sorted(read_layer(find_layer_file(self.fetch_dir, name))["id"].tolist())
+
+
+class IncrementalFetchTests(_FetchTestCase):
+    def _seed(self) -> None:
+        self._insert(
+            _row(1, "新闻", "2025-01-02 08:00:00"),
+            _row(2, "新闻", "2025-01-03 09:00:00"),
+            _row(3, "微博", "2025-01-03 10:00:00"),
+        )
+
+    def test_incremental_appends_rows_after_the_watermark_as_parts(self) -> None:
+        self._seed()
+        self.assertEqual(self._fetch("parquet", incremental=True), 3)
+        marks = json.loads((self.fetch_dir / data_fetch.WATERMARK_FILENAME).read_text(encoding="utf-8"))
+        self.assertEqual(marks["channels"]["新闻"], {"published_at": "2025-01-03 09:00:00", "ids": ["2"]})
+
+        self._insert(
+            _row(4, "新闻", "2025-01-03 09:00:00"),  # same instant as the watermark, new id
+            _row(5, "新闻", "2025-01-01 07:00:00"),  # back-filled before the watermark: not picked up
+            _row(6, "抖音", "2025-01-04 12:00:00"),
+        )
+        base = self.fetch_dir / "总体.parquet"
+        base_bytes = base.read_bytes()
+        self.assertEqual(self._fetch("parquet", incremental=True), 5)
+
+        # The base file is untouched; new rows live in part files that readers pick up
+        self.assertEqual(base.read_bytes(), base_bytes)
+        self.assertEqual(len(layers.layer_part_files(base)), 2)
+        self.assertEqual(self._layer_ids("总体"), [1, 2, 3, 4, 6])
+        self.assertEqual(layers.count_layer_rows(base), 5)
+        self.assertEqual(self._layer_ids("新闻"), [1, 2, 4])
+        self.assertEqual(self._layer_ids("社媒"), [3, 6])
+        marks = json.loads((self.fetch_dir / data_fetch.WATERMARK_FILENAME).read_text(encoding="utf-8"))
+        self.assertEqual(marks["total_rows"], 5)
+        self.assertEqual(marks["channels"]["新闻"], {"published_at": "2025-01-03 09:00:00", "ids": ["2", "4"]})
+        self.assertEqual(marks["channels"]["抖音"]["published_at"], "2025-01-04 12:00:00")
+
+        # Nothing new: the layers and the total stay as they are
+        self.assertEqual(self._fetch("parquet", incremental=True), 5)
+        self.assertEqual(len(layers.layer_part_files(base)), 2)
+
+    def test_incremental_appends_to_jsonl_layers(self) -> None:
+        self._seed()
+        self._fetch("jsonl", incremental=True)
+        self._insert(_row(7, "微博", "2025-01-05 10:00:00"))
+        self.assertEqual(self._fetch("jsonl", incremental=True), 4)
+        self.assertEqual(find_layer_file(self.fetch_dir, "总体").suffix, ".jsonl")
+        self.assertEqual(self._layer_ids("总体"), [1, 2, 3, 7])
+        self.assertEqual(self._layer_ids("社媒"), [3, 7])
+
+    def test_without_a_watermark_falls_back_to_a_full_fetch(self) -> None:
+        self._seed()
+        self.assertEqual(self._fetch("parquet", incremental=False), 3)
+        (self.fetch_dir / data_fetch.WATERMARK_FILENAME).unlink()
+        self._insert(_row(8, "新闻", "2025-01-06 10:00:00"))
+        self.assertEqual(self._fetch("parquet", incremental=True), 4)
+        self.assertEqual(layers.layer_part_files(self.fetch_dir / "总体.parquet"), [self.fetch_dir / "总体.parquet"])
+
+    def test_since_predicate_is_only_added_in_incremental_mode(self) -> None:
+        self._seed()
+        with self.engine.connect() as conn:
+            self.assertNotIn(":since", str(data_fetch._build_fetch_query(conn, "新闻")))
+            query = data_fetch._build_fetch_query(conn, "新闻", incremental=True)
+            self.assertIn("published_at >= :since", str(query))
+            params = {"start_date": "2025-01-01", "end_date": "2025-01-31", "since": "2025-01-03 00:00:00"}
+            self.assertEqual([row.id for row in conn.execute(query, params)], [2])
+
+    def test_watermark_keeps_ids_at_the_latest_instant(self) -> None:
+        first = pd.DataFrame([_row(1, "新闻", "2025-01-02 08:00:00"), _row(2, "新闻", "2025-01-02 08:00:00")])
+        mark = data_fetch._advance_watermark(None, first)
+        self.assertEqual(mark, {"published_at": "2025-01-02 08:00:00", "ids": ["1", "2"]})
+        same = data_fetch._advance_watermark(mark, pd.DataFrame([_row(3, "新闻", "2025-01-02 08:00:00")]))
+        self.assertEqual(same["ids"], ["1", "2", "3"])
+        older = data_fetch._advance_watermark(mark, pd.DataFrame([_row(4, "新闻", "2025-01-01 08:00:00")]))
+        self.assertEqual(older, mark)
+        newer = data_fetch._advance_watermark(mark, pd.DataFrame([_row(5, "新闻", "2025-01-05 08:00:00")]))
+        self.assertEqual(newer, {"published_at": "2025-01-05 08:00:00", "ids": ["5"]})
+
+
+class StreamingFetchTests(_FetchTestCase):
+    def _seed(self) -> None:
+        rows = [_row(index, "新闻", f"2025-01-{index:02d} 08:00:00") for index in range(1, 6)]
+        rows += [_row(index, "微博", f"2025-01-{index - 4:02d} 09:00:00") for index in range(10, 13)]
+        rows += [_row(20, "抖音", "2025-01-08 10:00:00")]
+        self._insert(*rows)
+
+    def _snapshot(self, layer_format: str) -> dict:
+        return {
+            name: read_layer(self.fetch_dir / f"{name}.{layer_format}").reset_index(drop=True)
+            for name in ("新闻", "社媒", "总体")
+        }
+
+    def test_streamed_layers_match_the_in_memory_fetch(self) -> None:
+        self._seed()
+        for layer_format in ("parquet", "jsonl"):
+            with self.subTest(layer_format=layer_format):
+                self.fetch_options = {"workers": 1}
+                self.assertEqual(self._fetch(layer_format), 9)
+                expected = self._snapshot(layer_format)
+
+                chunk_sizes = []
+                original_chunks = data_fetch._iter_channel_chunks
+
+                def _counting_chunks(*args, **kwargs):
+                    for chunk in original_chunks(*args, **kwargs):
+                        chunk_sizes.append(len(chunk))
+                        yield chunk
+
+                self.fetch_options = {"workers": 2, "streaming": True, "chunk_size": 2}
+                with patch.object(data_fetch, "_iter_channel_chunks", side_effect=_counting_chunks):
+                    self.assertEqual(self._fetch(layer_format), 9)
+                self.assertEqual(sorted(chunk_sizes), [1, 1, 1, 2, 2, 2])
+
+                streamed = self._snapshot(layer_format)
+                for name, frame in expected.items():
+                    pd.testing.assert_frame_equal(streamed[name], frame, check_dtype=False)
+                self.assertEqual(streamed["总体"]["id"].tolist(), [5, 4, 3, 2, 1, 12, 11, 10, 20])
+                # Merged source channels are removed; the JSONL copy follows the project layer format
+                self.assertIsNone(find_layer_file(self.fetch_dir, "微博"))
+                self.assertEqual((self.fetch_dir / "总体.jsonl").exists(), layer_format == "jsonl")
+                marks = json.loads((self.fetch_dir / data_fetch.WATERMARK_FILENAME).read_text(encoding="utf-8"))
+                self.assertEqual(marks["total_rows"], 9)
+                self.assertEqual(marks["channels"]["新闻"]["published_at"], "2025-01-05 08:00:00")
+
+    def test_concat_parquet_files_unions_columns(self) -> None:
+        first = self.fetch_dir / "a.parquet"
+        second = self.fetch_dir / "b.parquet"
+        pd.DataFrame({"id": [1, 2], "title": ["x", "y"]}).to_parquet(first, index=False)
+        pd.DataFrame({"id": [3], "extra": ["z"]}).to_parquet(second, index=False)
+        rows = data_fetch._concat_parquet_files([first, second], self.fetch_dir / "all", chunk_size=1)
+        self.assertEqual(rows, 3)
+        frame = read_layer(self.fetch_dir / "all.parquet")
+        self.assertEqual(list(frame.columns), ["id", "title", "extra"])
+        self.assertEqual(frame["extra"].fillna("").tolist(), ["", "", "z"])
+        self.assertEqual(len(read_layer(self.fetch_dir / "all.jsonl")), 3)
+        self.assertEqual(data_fetch._concat_parquet_files([], self.fetch_dir / "none", chunk_size=1), 0)
+
+    def test_concat_parquet_files_includes_appended_parts(self) -> None:
+        layers.write_layer(pd.DataFrame({"id": [1], "title": ["x"]}), self.fetch_dir, "微博", fmt="parquet")
+        layers.append_layer(pd.DataFrame({"id": [2], "title": ["y"]}), self.fetch_dir, "微博")
+        rows = data_fetch._concat_parquet_files(
+            [self.fetch_dir / "微博.parquet"], self.fetch_dir / "社媒", chunk_size=10, mirror_jsonl=False
+        )
+        self.assertEqual(rows, 2)
+        self.assertEqual(read_layer(self.fetch_dir / "社媒.parquet")["id"].tolist(), [1, 2])
+
+
+class RunChannelJobsTests(unittest.TestCase):
+    def test_results_keep_channel_order_and_capture_exceptions(self) -> None:
+        delays = {"新闻": 0.2, "微博": 0.1, "抖音": 0.0}
+        threads = {}
+
+        def _job(channel: str) -> str:
+            time.sleep(delays[channel])
+            threads[channel] = threading.get_ident()
+            if channel == "微博":
+                raise RuntimeError("lost connection")
+            return channel * 2
+
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                threads.clear()
+                results = data_fetch._run_channel_jobs(CHANNELS, _job, workers)
+                self.assertEqual(list(results), CHANNELS)
+                self.assertEqual((results["新闻"], results["抖音"]), ("新闻新闻", "抖音抖音"))
+                self.assertIsInstance(results["微博"], RuntimeError)
+                on_caller = {ident == threading.get_ident() for ident in threads.values()}
+                self.assertEqual(on_caller, {workers == 1})
+
+    def test_single_channel_runs_on_the_calling_thread(self) -> None:
+        results = data_fetch._run_channel_jobs(["新闻"], lambda channel: threading.get_ident(), workers=4)
+        self.assertEqual(results, {"新闻": threading.get_ident()})
+
+
+class AppendLayerTests(unittest.TestCase):
+    def test_parts_are_compacted_past_the_limit(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, patch.object(layers, "MAX_LAYER_PARTS", 2):
+            directory = Path(temp_dir)
+            layers.write_layer(pd.DataFrame({"id": [1], "title": ["a"]}), directory, "总体", fmt="parquet")
+            for row_id in (2, 3):
+                layers.append_layer(pd.DataFrame({"id": [row_id], "extra": ["x"]}), directory, "总体")
+            base = directory / "总体.parquet"
+            self.assertEqual(len(layers.layer_part_files(base)), 3)
+
+            layers.append_layer(pd.DataFrame({"id": [4], "title": ["d"]}), directory, "总体")
+            self.assertEqual(layers.layer_part_files(base), [base])
+            frame = layers.read_layer(base)
+            self.assertEqual(frame["id"].tolist(), [1, 2, 3, 4])
+            # Columns introduced by appended rows are kept, not cast away
+            self.assertEqual(list(frame.columns), ["id", "title", "extra"])
+            self.assertEqual(frame["extra"].tolist()[1:3], ["x", "x"])
+
+            layers.write_layer(pd.DataFrame({"id": [9]}), directory, "总体", fmt="parquet")
+            layers.append_layer(pd.DataFrame({"id": [10]}), directory, "总体")
+            layers.remove_layer(directory, "总体")
+            self.assertEqual(list(directory.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
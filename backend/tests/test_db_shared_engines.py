@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server_support import configuration  # noqa: E402
+from src.utils.io.db import DatabaseManager  # noqa: E402
+
+
+class SharedEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.manager = DatabaseManager(f"sqlite:///{Path(self._tmp.name) / 'base.db'}")
+        self.database = str(Path(self._tmp.name) / "a.db")
+        self.addCleanup(DatabaseManager.dispose_shared_engines)
+
+    def test_engines_are_shared_per_database_until_disposed(self) -> None:
+        first = self.manager.get_shared_engine_for_database(self.database)
+        self.assertIs(DatabaseManager(self.manager.db_url).get_shared_engine_for_database(self.database), first)
+        other = self.manager.get_shared_engine_for_database(str(Path(self._tmp.name) / "b.db"))
+        self.assertIsNot(other, first)
+        with first.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT 1")).scalar(), 1)
+
+        DatabaseManager.dispose_shared_engines()
+        self.assertEqual(DatabaseManager._shared_engines, {})
+        self.assertIsNot(self.manager.get_shared_engine_for_database(self.database), first)
+
+    def test_persisting_database_settings_disposes_shared_engines(self) -> None:
+        engine = self.manager.get_shared_engine_for_database(self.database)
+        config = {"active": "local", "connections": [{"id": "local", "url": "sqlite:///other.db"}]}
+        with patch.object(configuration, "save_settings_config") as save, patch.object(
+            configuration, "reload_settings"
+        ) as reload:
+            configuration.persist_databases_config(config)
+        save.assert_called_once()
+        reload.assert_called_once()
+        self.assertEqual(DatabaseManager._shared_engines, {})
+        self.assertIsNot(self.manager.get_shared_engine_for_database(self.database), engine)
+
+
+if __name__ == "__main__":
+    unittest.main()
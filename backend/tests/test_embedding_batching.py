@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.utils.rag.embedding as embedding_module  # noqa: E402
+from src.utils.rag.ragrouter.router_vec_data import EmbeddingGenerator  # noqa: E402
+
+
+class _FakeEmbeddings:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    async def create(self, input, model):  # noqa: A002 - mirrors the OpenAI SDK signature
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class EmbeddingBatchingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.fake = _FakeEmbeddings()
+        config = {
+            "provider": "qwen",
+            "batch_size": 3,
+            "cache": {"enabled": True, "path": str(Path(self._tmp.name) / "embeddings.sqlite3")},
+        }
+        client = SimpleNamespace(embeddings=self.fake)
+        patches = [
+            mock.patch.object(embedding_module, "get_embedding_config", return_value=config),
+            mock.patch.object(embedding_module, "get_async_client", return_value=(client, "stub-model", 2)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _generator(self) -> EmbeddingGenerator:
+        generator = EmbeddingGenerator(max_concurrent=4)
+        self.addCleanup(generator.cache.close)
+        return generator
+
+    def test_texts_are_deduplicated_and_packed(self) -> None:
+        texts = ["a", "bb", "a", "ccc", "", "dddd", "bb", "eeeee"]
+        vecs = asyncio.run(self._generator().generate_batch(texts, "测试"))
+        self.assertEqual([v[0] if v else None for v in vecs], [1.0, 2.0, 1.0, 3.0, None, 4.0, 2.0, 5.0])
+        self.assertEqual(sorted(len(call) for call in self.fake.calls), [2, 3])
+        self.assertEqual(sum(len(call) for call in self.fake.calls), 5)
+
+    def test_cache_is_reused_across_runs(self) -> None:
+        asyncio.run(self._generator().generate_batch(["a", "bb"], "测试"))
+        generator = self._generator()
+        vecs = asyncio.run(generator.generate_batch(["bb", "a", "ccc"], "测试"))
+        self.assertEqual([v[0] for v in vecs], [2.0, 1.0, 3.0])
+        self.assertEqual(self.fake.calls[-1], ["ccc"])
+        self.assertEqual(generator.cache.stats()["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
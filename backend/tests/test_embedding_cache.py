@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.rag.embedding_cache import EmbeddingCache, content_hash  # noqa: E402
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "embeddings.sqlite3"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _cache(self, **kwargs) -> EmbeddingCache:
+        cache = EmbeddingCache(self.path, "stub/model", 4, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_encode_only_embeds_misses_once(self) -> None:
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return [[float(len(text)), 0.0, 0.0, 1.0] for text in texts]
+
+        cache = self._cache()
+        first = cache.encode(["a", "bb", "a"], embed)
+        second = self._cache(memory_bytes=0).encode(["bb", "ccc"], embed)
+        self.assertEqual(calls, [["a", "bb"], ["ccc"]])
+        self.assertEqual(first[:, 0].tolist(), [1.0, 2.0, 1.0])
+        self.assertEqual(second[:, 0].tolist(), [2.0, 3.0])
+
+    def test_memory_tier_is_bounded_by_bytes(self) -> None:
+        cache = self._cache(memory_bytes=2 * 16)
+        cache.put_many((content_hash(str(i)), [float(i)] * 4) for i in range(5))
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+        self.assertLessEqual(cache.stats()["memory_bytes"], 32)
+        found = cache.get_arrays(content_hash(str(i)) for i in range(5))
+        self.assertEqual(len(found), 5)
+        self.assertEqual(cache.memory_hits, 2)
+
+    def test_float16_storage_and_compaction(self) -> None:
+        cache = self._cache(dtype="float16", memory_bytes=0)
+        cache.put_many((content_hash(str(i)), [0.5, 0.25, float(i), 1.0]) for i in range(10))
+        vector = cache.get_arrays([content_hash("3")])[content_hash("3")]
+        self.assertEqual(vector.dtype, np.float32)
+        self.assertEqual(vector.tolist(), [0.5, 0.25, 3.0, 1.0])
+        self.assertEqual(cache.compact(max_entries=4), 6)
+        self.assertEqual(cache.disk_stats()["entries"], 4)
+        self.assertIn(content_hash("3"), cache.get_arrays([content_hash("3")]))
+
+    def test_legacy_cache_file_is_migrated(self) -> None:
+        conn = sqlite3.connect(str(self.path))
+        conn.execute(
+            "CREATE TABLE embeddings (text_hash TEXT NOT NULL, model TEXT NOT NULL, dimension INTEGER NOT NULL,"
+            " vector BLOB NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (text_hash, model, dimension))"
+        )
+        conn.execute(
+            "INSERT INTO embeddings VALUES (?, ?, ?, ?, ?)",
+            ("k", "stub/model", 4, np.ones(4, dtype=np.float32).tobytes(), 1.0),
+        )
+        conn.commit()
+        conn.close()
+        self.assertEqual(self._cache().get_many(["k"]), {"k": [1.0, 1.0, 1.0, 1.0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.report import api as report_api  # noqa: E402
+from src.report import event_log, event_stream  # noqa: E402
+from src.report import task_queue as task_queue_module  # noqa: E402
+from src.utils.broadcast import Broadcaster  # noqa: E402
+
+
+class _CountingSource:
+    def __init__(self) -> None:
+        self.polls = 0
+        self.pending = []
+
+    def poll(self):
+        self.polls += 1
+        items, self.pending = self.pending, []
+        return items
+
+
+def _drain(subscription, count: int, timeout: float = 2.0) -> list:
+    items = []
+    deadline = time.time() + timeout
+    while len(items) < count and time.time() < deadline:
+        items.extend(subscription.get(timeout=0.05))
+    return items
+
+
+class BroadcasterTests(unittest.TestCase):
+    def test_subscribers_share_one_source_and_watcher(self) -> None:
+        hub = Broadcaster(poll_interval=0.01, name="test")
+        created = []
+
+        def _factory():
+            created.append(_CountingSource())
+            return created[-1]
+
+        first = hub.subscribe("task", _factory)
+        second = hub.subscribe("task", _factory)
+        self.assertEqual(len(created), 1)
+        self.assertIs(first.source, second.source)
+
+        created[0].pending = ["from-watcher"]
+        hub.publish("task", "pushed")
+        self.assertEqual(sorted(_drain(first, 2)), ["from-watcher", "pushed"])
+        self.assertEqual(sorted(_drain(second, 2)), ["from-watcher", "pushed"])
+
+        first.close()
+        second.close()
+        self.assertEqual(hub.subscriber_count("task"), 0)
+        self.assertIsNone(hub.source("task"))
+        time.sleep(0.05)
+        self.assertFalse(any(t.name == "test:task" for t in threading.enumerate()))
+        self.assertEqual(hub.publish("task", "nobody"), 0)
+
+
+class ReportEventStreamTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self._stack = ExitStack()
+        root = Path(self._tmp.name)
+        self._stack.enter_context(patch.object(task_queue_module, "STATE_ROOT", root / "_report"))
+        self._stack.enter_context(patch.object(task_queue_module, "TASK_STATE_DIR", root / "_report" / "tasks"))
+        self._stack.enter_context(patch.object(task_queue_module, "WORKER_STATUS_PATH", root / "_report" / "worker.json"))
+        self.task = task_queue_module.create_task(
+            {"topic": "示例专题", "topic_identifier": "demo-topic", "start": "2025-01-01", "end": "2025-01-31"}
+        )
+
+    def tearDown(self) -> None:
+        self._stack.close()
+        event_log.clear_tail_cache()
+        self._tmp.cleanup()
+
+    def test_in_process_events_are_pushed_to_every_subscriber(self) -> None:
+        task_id = self.task["id"]
+        with task_queue_module.subscribe_events(task_id) as first, task_queue_module.subscribe_events(task_id) as second:
+            self.assertEqual(event_stream.subscriber_count(task_id), 2)
+            self.assertEqual(first.source.snapshot["status"], "queued")
+            task_queue_module.append_event(task_id, event_type="tool.call", title="调用工具", message="检索")
+            for subscription in (first, second):
+                events = subscription.get(timeout=0)
+                self.assertEqual([e["event_id"] for e in events], [2])
+        self.assertEqual(event_stream.subscriber_count(task_id), 0)
+
+    def test_push_delivers_unpolled_appends_from_other_processes(self) -> None:
+        task_id = self.task["id"]
+        path = task_queue_module.task_events_path(task_id)
+        with task_queue_module.subscribe_events(task_id) as subscription:
+            feed = subscription.source
+            # The worker's append lands first; the API push may arrive before the watcher polls
+            event_log.append(path, {"event_id": 2, "type": "phase.progress", "message": "worker"})
+            pushed = {"event_id": 3, "type": "tool.call", "message": "api"}
+            event_log.append(path, pushed)
+            feed.push(pushed, None)
+            events = _drain(subscription, 2)
+            self.assertEqual([e["event_id"] for e in events], [2, 3])
+            self.assertEqual(feed.last_id, 3)
+            time.sleep(0.2)
+            self.assertEqual(subscription.get(timeout=0), [])
+
+    def test_watcher_picks_up_appends_from_other_processes(self) -> None:
+        task_id = self.task["id"]
+        path = task_queue_module.task_events_path(task_id)
+        with task_queue_module.subscribe_events(task_id) as subscription:
+            # Written straight to the log, as the worker process does
+            event_log.append(path, {"event_id": 2, "type": "phase.progress", "message": "worker"})
+            events = _drain(subscription, 1)
+            self.assertEqual([e["event_id"] for e in events], [2])
+            self.assertEqual(subscription.source.last_id, 2)
+
+            path.write_bytes(b"")
+            event_log.index_path(path).write_bytes(b"")
+            event_log.append(path, {"event_id": 1, "type": "phase.progress", "message": "restarted"})
+            items = _drain(subscription, 2)
+            self.assertIs(items[0], event_stream.RESET)
+            self.assertEqual(items[-1]["message"], "restarted")
+
+
+
+class _ScriptedSubscription:
+    """Reports the task as running for a few waits, then completes it."""
+
+    def __init__(self, clock: list, running_waits: int) -> None:
+        self.source = SimpleNamespace(missing=False, last_id=0, snapshot={"status": "running", "phase": "write"})
+        self.timeouts = []
+        self._clock = clock
+        self._running_waits = running_waits
+
+    def get(self, timeout=None):
+        self.timeouts.append(timeout)
+        # Waiting advances the clock, as a real blocking get would
+        self._clock[0] += timeout or 0
+        if len(self.timeouts) >= self._running_waits:
+            self.source.snapshot = {"status": "completed"}
+        return []
+
+
+class ReportStreamEndpointTests(unittest.TestCase):
+    def test_running_task_waits_for_the_heartbeat_instead_of_spinning(self) -> None:
+        clock = [1_000.0]
+        subscription = _ScriptedSubscription(clock, running_waits=4)
+
+        @contextmanager
+        def _subscribe(task_id):
+            yield subscription
+
+        app = Flask(__name__)
+        app.register_blueprint(report_api.report_bp, url_prefix="/api/report")
+        with ExitStack() as stack:
+            stack.enter_context(patch.object(report_api, "get_task", return_value={"id": "t1"}))
+            stack.enter_context(patch.object(report_api, "subscribe_events", _subscribe))
+            stack.enter_context(patch.object(report_api, "load_events_since", return_value=[]))
+            worker_check = stack.enter_context(patch.object(report_api, "ensure_worker_running"))
+            stack.enter_context(patch.object(report_api, "time", SimpleNamespace(time=lambda: clock[0])))
+            body = app.test_client().get("/api/report/tasks/t1/stream").get_data(as_text=True)
+
+        self.assertEqual(len(subscription.timeouts), 4)
+        self.assertTrue(all(timeout > 0 for timeout in subscription.timeouts), subscription.timeouts)
+        self.assertIn("event: heartbeat", body)
+        self.assertIn("event: done", body)
+        worker_check.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -178,6 +178,49 @@ class EvidenceRetrieverTests(unittest.TestCase):
         self.assertGreater(first["scanned_records"], 0)
         self.assertGreater(second["scanned_records"], 0)
 
+    def test_query_terms_come_from_the_shared_segmenter(self) -> None:
+        self.assertEqual(evidence_retriever._tokenize("市卫健委发布控烟通知，网传？"), ["市卫健委", "发布", "控烟", "通知", "网传"])
+        with patch.object(evidence_retriever, "segment_texts", side_effect=RuntimeError("jieba 未安装")):
+            self.assertEqual(evidence_retriever._tokenize("控烟 政策"), ["控烟", "政策"])
+
+    def test_high_signal_terms_count_six_matches_per_row(self) -> None:
+        terms = ["市卫健委", "发布", "公共场所", "控烟", "新规", "政策", "执法", "通知"]
+        with patch.object(evidence_retriever, "_build_query_terms", return_value=terms):
+            payload = search_raw_records(
+                topic_identifier=self.topic_identifier, start="2025-01-15", end="2025-12-31", query="控烟", top_k=10
+            )
+        policy = next(item for item in payload["items"] if item["title"] == "市卫健委发布公共场所控烟新规")
+        self.assertEqual(policy["matched_terms"], terms[:6])
+        # The policy row also contains 执法 and 通知, past its first six matches, so they only count once each
+        self.assertEqual(
+            payload["high_signal_terms"],
+            ["控烟", "市卫健委", "发布", "公共场所", "新规", "政策", "通知", "执法"],
+        )
+
+    def test_platform_and_time_filters_share_one_corpus(self) -> None:
+        original_build_index = evidence_retriever._build_tfidf_index
+        build_calls = {"count": 0}
+
+        def _counting_build_index(docs):
+            build_calls["count"] += 1
+            return original_build_index(docs)
+
+        window = {"topic_identifier": self.topic_identifier, "start": "2025-01-15", "end": "2025-12-31"}
+        with patch.object(evidence_retriever, "_build_tfidf_index", side_effect=_counting_build_index):
+            everything = search_raw_records(**window, query="控烟", top_k=10)
+            weibo = search_raw_records(**window, query="控烟", platforms=["微博"], top_k=10)
+            august = search_raw_records(
+                **window, query="控烟", time_start="2025-08-21", time_end="2025-08-31", top_k=10
+            )
+
+        self.assertEqual(build_calls["count"], 1)
+        self.assertEqual(everything["scanned_records"], 6)
+        self.assertEqual(weibo["scanned_records"], 1)
+        self.assertEqual({item["platform"] for item in weibo["items"]}, {"微博"})
+        self.assertEqual(august["scanned_records"], 3)
+        self.assertTrue(all("2025-08-21" <= item["published_at"][:10] <= "2025-08-31" for item in august["items"]))
+        self.assertEqual((august["time_start"], august["time_end"]), ("2025-08-21", "2025-08-31"))
+
 
 if __name__ == "__main__":
     unittest.main()
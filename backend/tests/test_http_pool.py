@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.utils.ai.qwen as qwen_module  # noqa: E402
+from src.utils.ai.http_pool import (  # noqa: E402
+    _SESSIONS,
+    closing_sessions,
+    get_pool_stats,
+    get_session,
+    reset_pool_stats,
+)
+from src.utils.ai.qwen import QwenClient  # noqa: E402
+
+
+async def _generation(request: web.Request) -> web.Response:
+    return web.json_response({"output": {"text": "ok"}, "usage": {"total_tokens": 3}})
+
+
+class HttpPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_pool_stats()
+        self._api_url = qwen_module.API_URL
+
+    def tearDown(self) -> None:
+        qwen_module.API_URL = self._api_url
+
+    def test_qwen_calls_reuse_pooled_connections(self) -> None:
+        async def _run() -> list:
+            app = web.Application()
+            app.router.add_post("/gen", _generation)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+            qwen_module.API_URL = f"http://127.0.0.1:{port}/gen"
+            try:
+                client = QwenClient(api_key="test-key")
+                results = []
+                for _ in range(5):
+                    results.append(await client.call("prompt"))
+                return results
+            finally:
+                await runner.cleanup()
+
+        results = asyncio.run(closing_sessions(_run()))
+        self.assertTrue(all(item and item["text"] == "ok" for item in results))
+        stats = get_pool_stats()
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["connections_created"], 1)
+        self.assertEqual(stats["connections_reused"], 4)
+        self.assertEqual(stats["active_sessions"], 0)
+
+    def test_session_is_shared_within_loop_and_closed_after(self) -> None:
+        async def _run():
+            first = await get_session()
+            second = await get_session()
+            return first, second
+
+        first, second = asyncio.run(closing_sessions(_run()))
+        self.assertIs(first, second)
+        self.assertTrue(first.closed)
+
+    def test_sessions_left_on_closed_loops_are_dropped(self) -> None:
+        leaked = asyncio.run(get_session())
+        self.assertFalse(leaked.closed)
+        fresh = asyncio.run(closing_sessions(get_session()))
+        # The leaked session's loop is gone, so its reference is dropped rather than awaited
+        self.assertIsNot(fresh, leaked)
+        self.assertTrue(fresh.closed)
+        self.assertFalse(any(session is leaked for _, session in _SESSIONS.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
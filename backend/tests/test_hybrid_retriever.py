@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.rag.retrievers.base import BaseRetriever  # noqa: E402
+from src.rag.retrievers.hybrid_retriever import HybridRetriever  # noqa: E402
+
+
+class _StubRetriever(BaseRetriever):
+    def __init__(self, ranked: list, delay: float = 0.0) -> None:
+        super().__init__()
+        self.ranked = ranked
+        self.delay = delay
+
+    def build_index(self, documents, **kwargs) -> None:
+        self.documents = documents
+
+    def save_index(self, path, **kwargs) -> None:
+        pass
+
+    def load_index(self, path, **kwargs) -> None:
+        pass
+
+    def retrieve(self, query, top_k=10, **kwargs):
+        time.sleep(self.delay)
+        return [{"id": doc_id, "score": score, "text": doc_id} for doc_id, score in self.ranked[:top_k]]
+
+
+def _hybrid(vector: _StubRetriever, bm25: _StubRetriever, **config) -> HybridRetriever:
+    retriever = HybridRetriever(config, vector_retriever=vector, bm25_retriever=bm25)
+    retriever.build_index([{"id": i} for i in "abcd"])
+    return retriever
+
+
+class HybridRetrieverTests(unittest.TestCase):
+    def test_rrf_ignores_score_scales(self) -> None:
+        vector = _StubRetriever([("a", 0.9), ("b", 0.8), ("c", 0.7)])
+        bm25 = _StubRetriever([("b", 40.0), ("d", 20.0), ("c", 1.0)])
+        results = _hybrid(vector, bm25, fusion="rrf").retrieve("q", top_k=3)
+        self.assertEqual([r["id"] for r in results], ["b", "c", "a"])
+        self.assertEqual(results[0]["retrieval_metadata"]["vector_rank"], 2)
+        self.assertEqual(results[0]["retrieval_metadata"]["bm25_rank"], 1)
+        self.assertIn("fusion", results[0]["retrieval_metadata"]["timings_ms"])
+
+    def test_weighted_sum_stays_the_default(self) -> None:
+        vector = _StubRetriever([("a", 0.9), ("b", 0.8)])
+        bm25 = _StubRetriever([("b", 40.0), ("a", 1.0)])
+        for config in ({}, {"fusion": "unknown"}):
+            retriever = _hybrid(vector, bm25, **config)
+            self.assertEqual(retriever.fusion, "weighted")
+            results = retriever.retrieve("q", top_k=2)
+            self.assertEqual([r["id"] for r in results], ["b", "a"])
+            self.assertAlmostEqual(results[0]["score"], 0.5 * 0.8 + 0.5 * 40.0)
+
+    def test_legacy_saved_config_loads_as_weighted(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)
+            (path / "hybrid_config.json").write_text(
+                json.dumps({"vector_weight": 0.7, "bm25_weight": 0.3, "rerank": False}), encoding="utf-8"
+            )
+            retriever = _hybrid(_StubRetriever([]), _StubRetriever([]), fusion="rrf")
+            retriever.load_index(path)
+            self.assertEqual((retriever.fusion, retriever.vector_weight), ("weighted", 0.7))
+
+            retriever.save_index(path)
+            reloaded = _hybrid(_StubRetriever([]), _StubRetriever([]))
+            reloaded.load_index(path)
+            self.assertEqual(reloaded.fusion, "weighted")
+
+    def test_minmax_mode_normalises_each_side(self) -> None:
+        vector = _StubRetriever([("a", 0.9), ("b", 0.5)])
+        bm25 = _StubRetriever([("b", 100.0), ("a", 10.0)])
+        results = _hybrid(vector, bm25, fusion="minmax", vector_weight=0.6, bm25_weight=0.4).retrieve("q", top_k=2)
+        self.assertEqual([r["id"] for r in results], ["a", "b"])
+        self.assertAlmostEqual(results[0]["score"], 0.6)
+
+    def test_sub_retrievals_run_concurrently(self) -> None:
+        vector = _StubRetriever([("a", 0.9)], delay=0.3)
+        bm25 = _StubRetriever([("b", 1.0)], delay=0.3)
+        retriever = _hybrid(vector, bm25, fusion="rrf")
+        start = time.perf_counter()
+        retriever.retrieve("q", top_k=2)
+        self.assertLess(time.perf_counter() - start, 0.55)
+        self.assertGreaterEqual(retriever.last_metadata["timings_ms"]["vector"], 250)
+
+    def test_confident_side_stops_early(self) -> None:
+        vector = _StubRetriever([("a", 0.95), ("b", 0.9)])
+        bm25 = _StubRetriever([("c", 5.0)], delay=1.0)
+        retriever = _hybrid(vector, bm25, early_stop_scores={"vector": 0.85})
+        start = time.perf_counter()
+        results = retriever.retrieve("q", top_k=2)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual([r["id"] for r in results], ["a", "b"])
+        self.assertEqual(retriever.last_metadata["early_stop"], "vector")
+
+
+if __name__ == "__main__":
+    unittest.main()
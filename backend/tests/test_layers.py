@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.io import layers  # noqa: E402
+from src.utils.io.layers import (  # noqa: E402
+    append_layer,
+    count_layer_rows,
+    find_layer_file,
+    iter_layer_chunks,
+    iter_layer_records,
+    list_layer_files,
+    read_layer,
+    write_layer,
+)
+
+
+def _frame(size: int = 5) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": list(range(1, size + 1)),
+            "contents": [f"内容{index}" for index in range(1, size + 1)],
+            "platform": ["微博"] * size,
+        }
+    )
+
+
+class LayerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+
+
+class WriteLayerTests(LayerTestCase):
+    def test_round_trip_in_both_formats(self) -> None:
+        frame = _frame()
+        for fmt in ("parquet", "jsonl"):
+            with self.subTest(fmt=fmt):
+                path = write_layer(frame, self.directory, "微博", fmt=fmt)
+                self.assertEqual(path, self.directory / f"微博.{fmt}")
+                pd.testing.assert_frame_equal(read_layer(path), frame)
+                self.assertEqual(read_layer(path, columns=["id", "missing"]).columns.tolist(), ["id"])
+
+    def test_dtype_applies_to_both_formats(self) -> None:
+        frame = pd.DataFrame({"id": [101, 102], "post_id": ["7", None], "score": [1, 2]})
+        for fmt in ("parquet", "jsonl"):
+            with self.subTest(fmt=fmt):
+                path = write_layer(frame, self.directory, "总体", fmt=fmt)
+                loaded = read_layer(path, dtype={"id": str, "post_id": str, "missing": str})
+                self.assertEqual(loaded["id"].tolist(), ["101", "102"])
+                self.assertEqual(loaded["post_id"].iloc[0], "7")
+                self.assertTrue(pd.isna(loaded["post_id"].iloc[1]))
+                self.assertEqual(loaded["score"].tolist(), [1, 2])
+        parquet = write_layer(frame, self.directory, "总体", fmt="parquet")
+        with self.assertRaises(TypeError):
+            read_layer(parquet, convert_dates=False)
+
+    def test_mixed_object_columns_are_stored_as_text_in_parquet(self) -> None:
+        frame = pd.DataFrame({"id": [1, 2], "extra": [{"a": 1}, "plain"]})
+        path = write_layer(frame, self.directory, "总体", fmt="parquet")
+        self.assertEqual(read_layer(path)["extra"].tolist(), ["{'a': 1}", "plain"])
+
+    def test_replacing_a_layer_removes_the_other_format(self) -> None:
+        write_layer(_frame(3), self.directory, "总体", fmt="jsonl")
+        parquet = write_layer(_frame(4), self.directory, "总体", fmt="parquet")
+        append_layer(_frame(1), self.directory, "总体")
+        self.assertTrue(layers.layer_parts_dir(parquet).is_dir())
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), [".总体.parts", "总体.parquet"])
+
+        jsonl = write_layer(_frame(2), self.directory, "总体", fmt="jsonl")
+        # The Parquet file and its appended parts go away with the format switch
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["总体.jsonl"])
+        self.assertEqual(len(read_layer(jsonl)), 2)
+
+        write_layer(_frame(6), self.directory, "总体", fmt="parquet")
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["总体.parquet"])
+
+
+class FindLayerTests(LayerTestCase):
+    def test_parquet_is_preferred_over_jsonl(self) -> None:
+        self.assertIsNone(find_layer_file(self.directory, "微博"))
+        _frame(2).to_json(self.directory / "微博.jsonl", orient="records", lines=True, force_ascii=False)
+        self.assertEqual(find_layer_file(self.directory, "微博"), self.directory / "微博.jsonl")
+
+        _frame(3).to_parquet(self.directory / "微博.parquet", index=False)
+        self.assertEqual(find_layer_file(self.directory, "微博"), self.directory / "微博.parquet")
+        self.assertEqual(len(read_layer(find_layer_file(self.directory, "微博"))), 3)
+
+        write_layer(_frame(1), self.directory, "新闻", fmt="jsonl")
+        append_layer(_frame(1), self.directory, "微博")
+        (self.directory / "notes.txt").write_text("x", encoding="utf-8")
+        self.assertEqual(
+            list_layer_files(self.directory),
+            [self.directory / "微博.parquet", self.directory / "新闻.jsonl"],
+        )
+        self.assertEqual(list_layer_files(self.directory, exclude=("微博",)), [self.directory / "新闻.jsonl"])
+
+
+class ChunkedReadTests(LayerTestCase):
+    def test_chunks_and_counts_match_in_both_formats(self) -> None:
+        frame = _frame(5)
+        for fmt in ("parquet", "jsonl"):
+            with self.subTest(fmt=fmt):
+                path = write_layer(frame, self.directory, fmt, fmt=fmt)
+                chunks = list(iter_layer_chunks(path, 2, columns=["id", "missing"]))
+                self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+                self.assertEqual(chunks[0].columns.tolist(), ["id"])
+                self.assertEqual(pd.concat(chunks)["id"].tolist(), [1, 2, 3, 4, 5])
+                self.assertEqual(count_layer_rows(path), 5)
+                self.assertEqual([record["contents"] for record in iter_layer_records(path, 2)][-1], "内容5")
+
+    def test_parquet_parts_are_read_after_the_base_file(self) -> None:
+        path = write_layer(_frame(3), self.directory, "总体", fmt="parquet")
+        append_layer(_frame(2).assign(id=[4, 5]), self.directory, "总体")
+        chunks = list(iter_layer_chunks(path, 10))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 2])
+        self.assertEqual(count_layer_rows(path), 5)
+        self.assertEqual(read_layer(path)["id"].tolist(), [1, 2, 3, 4, 5])
+
+    def test_appending_new_columns_widens_the_parquet_layer(self) -> None:
+        path = write_layer(_frame(2), self.directory, "总体", fmt="parquet")
+        append_layer(_frame(1).assign(id=[3]), self.directory, "总体")
+        append_layer(pd.DataFrame({"id": [4], "contents": ["内容4"], "region": ["北京"]}), self.directory, "总体")
+
+        loaded = read_layer(path)
+        self.assertEqual(loaded.columns.tolist(), ["id", "contents", "platform", "region"])
+        self.assertEqual(loaded["id"].tolist(), [1, 2, 3, 4])
+        self.assertEqual(loaded["region"].tolist()[-1], "北京")
+        self.assertTrue(loaded["region"].iloc[:3].isna().all())
+        self.assertTrue(loaded["platform"].iloc[3:].isna().all())
+        self.assertEqual(count_layer_rows(path), 4)
+        # Existing rows were rewritten once with the wider schema; the new rows went to a part
+        self.assertEqual(len(layers.layer_part_files(path)), 2)
+
+    def test_jsonl_count_skips_blank_lines(self) -> None:
+        path = self.directory / "空行.jsonl"
+        path.write_text('{"id": 1}\n\n{"id": 2}\n   \n', encoding="utf-8")
+        self.assertEqual(count_layer_rows(path), 2)
+        self.assertEqual([record["id"] for record in iter_layer_records(path)], [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.filter.near_duplicates import (  # noqa: E402
+    NearDuplicateClusterer,
+    build_clusterer,
+    cluster_sizes,
+    label_channels,
+)
+
+ORIGINAL = "市卫健委今日发布公共场所控烟新规，要求餐厅、网吧、车站等室内场所全面禁烟，违者最高罚款两百元，并将纳入信用记录。"
+REPOST = "转发：" + ORIGINAL.replace("两百元", "二百元")
+UNRELATED = "厨房油烟困扰多，抽油烟机和文火神器助你轻松去味，本周下单享受限时折扣，赶快来店里看看吧，库存有限先到先得。"
+
+
+class NearDuplicateClustererTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clusterer = NearDuplicateClusterer()
+
+    def test_exact_and_near_duplicates_share_a_cluster(self) -> None:
+        labels = self.clusterer.cluster([ORIGINAL, UNRELATED, f"  {ORIGINAL}\n", REPOST])
+        self.assertEqual(labels.tolist(), [0, 1, 0, 0])
+
+    def test_dissimilar_texts_stay_apart_at_the_threshold(self) -> None:
+        half = ORIGINAL[: len(ORIGINAL) // 2] + UNRELATED[len(UNRELATED) // 2 :]
+        self.assertEqual(self.clusterer.cluster([ORIGINAL, UNRELATED, half]).tolist(), [0, 1, 2])
+        # A loose threshold merges the half-overlapping text with the original again
+        loose = NearDuplicateClusterer(threshold=0.3)
+        self.assertEqual(loose.cluster([ORIGINAL, half]).tolist(), [0, 0])
+
+    def test_short_and_empty_texts(self) -> None:
+        labels = self.clusterer.cluster(["好", "", "好", None, "   ", "坏", "好的", 42])
+        self.assertEqual(labels.tolist(), [0, -1, 0, -1, -1, 1, 2, -1])
+        self.assertEqual(self.clusterer.cluster([]).tolist(), [])
+        self.assertEqual(self.clusterer.cluster(["", None]).tolist(), [-1, -1])
+
+    def test_representative_and_labels_are_deterministic(self) -> None:
+        texts = [UNRELATED, REPOST, ORIGINAL, UNRELATED + "！"]
+        first = self.clusterer.cluster(texts)
+        # Cluster ids follow first appearance, so the first member represents its cluster
+        self.assertEqual(first.tolist(), [0, 1, 1, 0])
+        self.assertTrue(np.array_equal(NearDuplicateClusterer().cluster(texts), first))
+        self.assertTrue(
+            np.array_equal(self.clusterer.signatures([ORIGINAL]), NearDuplicateClusterer().signatures([ORIGINAL]))
+        )
+
+
+class NearDuplicateHelperTests(unittest.TestCase):
+    def test_build_clusterer_reads_config(self) -> None:
+        self.assertIsNone(build_clusterer({"enabled": False}))
+        clusterer = build_clusterer({"threshold": 0.9, "num_perm": 32, "bands": 8})
+        self.assertEqual((clusterer.threshold, clusterer.num_perm, clusterer.rows), (0.9, 32, 4))
+        with self.assertRaises(ValueError):
+            build_clusterer({"num_perm": 30, "bands": 8})
+
+    def test_labels_are_unique_across_channels(self) -> None:
+        labels = label_channels(
+            NearDuplicateClusterer(), {"微博": [ORIGINAL, UNRELATED], "新闻": [REPOST, ""], "抖音": []}
+        )
+        self.assertEqual(
+            {name: values.tolist() for name, values in labels.items()},
+            {"微博": [0, 1], "新闻": [0, -1], "抖音": []},
+        )
+        stats = cluster_sizes(np.concatenate(list(labels.values())))
+        self.assertEqual(stats, {"clusters": 2, "clustered_rows": 2, "redundant_rows": 1})
+        self.assertEqual(cluster_sizes(np.array([-1, -1])), {"clusters": 0, "clustered_rows": 0, "redundant_rows": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.clean import data_clean  # noqa: E402
+from src.merge import data_merge  # noqa: E402
+from src.utils import parallel  # noqa: E402
+from src.utils.io.layers import append_layer, read_layer, write_layer  # noqa: E402
+from src.utils.logging.logging import log_success  # noqa: E402
+
+
+def _square_after(delay: float, value: int) -> tuple:
+    # Later jobs finish first, so completion order differs from submission order
+    time.sleep(delay)
+    return value * value, os.getpid()
+
+
+def _fail_on_odd(value: int) -> int:
+    if value % 2:
+        raise ValueError(f"odd: {value}")
+    return value
+
+
+def _logged_job(value: int, logger=None) -> int:
+    log_success(logger, f"job {value}", "Test")
+    return value
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def _capturing_logger(name: str):
+    logger = logging.Logger(name, logging.DEBUG)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    return logger, handler
+
+
+class ResolveWorkersTests(unittest.TestCase):
+    def test_auto_and_invalid_values_fall_back_to_cpu_count_capped_by_jobs(self) -> None:
+        with patch.object(parallel.os, "cpu_count", return_value=8):
+            self.assertEqual(parallel.resolve_process_workers(0, 3), 3)
+            self.assertEqual(parallel.resolve_process_workers(None, 20), 8)
+            self.assertEqual(parallel.resolve_process_workers("abc", 5), 5)
+        self.assertEqual(parallel.resolve_process_workers(2, 10), 2)
+        self.assertEqual(parallel.resolve_process_workers(4, 0), 1)
+
+
+class RunProcessJobsTests(unittest.TestCase):
+    def test_results_follow_submission_order(self) -> None:
+        jobs = [(0.3, 1), (0.2, 2), (0.0, 3)]
+        results = parallel.run_process_jobs(_square_after, jobs, workers=3)
+        self.assertEqual([value for value, _ in results], [1, 4, 9])
+        self.assertTrue(all(pid != os.getpid() for _, pid in results))
+
+    def test_exceptions_are_returned_per_job(self) -> None:
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = parallel.run_process_jobs(_fail_on_odd, [(0,), (1,), (2,)], workers)
+                self.assertEqual(results[0], 0)
+                self.assertIsInstance(results[1], ValueError)
+                self.assertEqual(str(results[1]), "odd: 1")
+                self.assertEqual(results[2], 2)
+
+    def test_serial_fallback_runs_in_the_current_process(self) -> None:
+        # One worker, one job, or a pool that cannot be created
+        self.assertEqual(parallel.run_process_jobs(_square_after, [(0, 2), (0, 3)], 1)[1], (9, os.getpid()))
+        self.assertEqual(parallel.run_process_jobs(_square_after, [(0, 2)], 4), [(4, os.getpid())])
+        with patch.object(parallel, "ProcessPoolExecutor", side_effect=OSError("no semaphores")):
+            results = parallel.run_process_jobs(_square_after, [(0, 2), (0, 3)], 4)
+        self.assertEqual(results, [(4, os.getpid()), (9, os.getpid())])
+
+    def test_worker_logs_are_written_by_the_parent_logger(self) -> None:
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                logger, handler = _capturing_logger(f"parent-{workers}")
+                results = parallel.run_process_jobs(_logged_job, [(1,), (2,), (3,)], workers, logger=logger)
+                self.assertEqual(results, [1, 2, 3])
+                self.assertEqual(sorted(handler.messages), ["job 1", "job 2", "job 3"])
+
+    def test_on_result_fires_once_per_finished_job(self) -> None:
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                logger, handler = _capturing_logger(f"progress-{workers}")
+                seen = []
+
+                def _on_result(index, outcome):
+                    # The job's own log lines are already written when its result is reported
+                    seen.append((index, outcome, f"job {outcome}" in handler.messages))
+
+                parallel.run_process_jobs(_logged_job, [(1,), (2,), (3,)], workers, logger=logger, on_result=_on_result)
+                self.assertEqual(sorted(seen), [(0, 1, True), (1, 2, True), (2, 3, True)])
+
+    def test_progress_event_status(self) -> None:
+        self.assertEqual(
+            parallel.progress_event("clean", "微博", 1, 4, 10, rows=10),
+            {
+                "phase": "clean",
+                "channel": "微博",
+                "completed": 1,
+                "total": 4,
+                "percentage": 25,
+                "status": "ok",
+                "rows": 10,
+                "message": "",
+            },
+        )
+        self.assertEqual(parallel.progress_event("clean", "微博", 2, 4, None)["status"], "skipped")
+        failed = parallel.progress_event("clean", "微博", 4, 4, ValueError("坏数据"), rows=3)
+        self.assertEqual((failed["status"], failed["rows"], failed["message"]), ("error", 0, "坏数据"))
+
+
+class ParallelMergeTests(unittest.TestCase):
+    def test_merge_matches_serial_output_and_logs_in_the_parent(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            raw_dir = root / "raw"
+            raw_dir.mkdir()
+            rows = [{"platform": "微博", "title": "a"}, {"platform": "微博", "title": "a"}, {"platform": "新闻", "title": "b"}]
+            pd.DataFrame(rows).to_csv(raw_dir / "part1.csv", index=False)
+            pd.DataFrame([{"platform": "微博", "title": "c"}, {"platform": "其他", "title": "d"}]).to_csv(
+                raw_dir / "part2.csv", index=False
+            )
+            settings = MagicMock()
+            settings.get_channel_config.return_value = {"keep": ["微博", "新闻"]}
+
+            outputs = {}
+            for workers in (1, 2):
+                merge_dir = root / f"merge-{workers}"
+                merge_dir.mkdir()
+                logger, handler = _capturing_logger(f"merge-{workers}")
+                with patch.object(data_merge, "settings", settings), patch.object(
+                    data_merge, "bucket", return_value=raw_dir
+                ), patch.object(data_merge, "ensure_bucket", return_value=merge_dir), patch.object(
+                    data_merge, "resolve_layer_format", return_value="jsonl"
+                ):
+                    self.assertTrue(data_merge.merge_trs_data("demo", "2025-01-01", logger, workers=workers))
+                outputs[workers] = {
+                    path.stem: read_layer(path)["title"].tolist() for path in sorted(merge_dir.iterdir())
+                }
+                self.assertTrue(any("其他 不在 keep 列表中" in message for message in handler.messages))
+                self.assertIn("渠道 微博 去重: 3 -> 2", handler.messages)
+
+            self.assertEqual(outputs[1], {"微博": ["a", "c"], "新闻": ["b"]})
+            self.assertEqual(outputs[2], outputs[1])
+
+    def test_merge_reports_progress_per_file_and_channel(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            raw_dir = root / "raw"
+            raw_dir.mkdir()
+            pd.DataFrame([{"platform": "微博", "title": "a"}, {"platform": "新闻", "title": "b"}]).to_csv(
+                raw_dir / "part1.csv", index=False
+            )
+            pd.DataFrame([{"platform": "微博", "title": "c"}]).to_csv(raw_dir / "part2.csv", index=False)
+            (root / "merge").mkdir()
+            settings = MagicMock()
+            settings.get_channel_config.return_value = {"keep": ["微博", "新闻"]}
+            events = []
+            with patch.object(data_merge, "settings", settings), patch.object(
+                data_merge, "bucket", return_value=raw_dir
+            ), patch.object(data_merge, "ensure_bucket", return_value=root / "merge"), patch.object(
+                data_merge, "resolve_layer_format", return_value="jsonl"
+            ):
+                self.assertTrue(data_merge.run_merge("demo", "2025-01-01", workers=2, progress_callback=events.append))
+
+        reads = [event for event in events if event["phase"] == "merge_read"]
+        self.assertEqual(sorted(event["channel"] for event in reads), ["part1.csv", "part2.csv"])
+        self.assertEqual(sorted(event["completed"] for event in reads), [1, 2])
+        writes = [(event["channel"], event["completed"], event["rows"], event["status"]) for event in events[2:]]
+        self.assertEqual(writes, [("微博", 1, 2, "ok"), ("新闻", 2, 1, "ok")])
+
+    def test_parquet_sources_include_appended_parts(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw_dir = Path(temp_dir)
+            write_layer(pd.DataFrame({"platform": ["微博"], "title": ["a"]}), raw_dir, "export", fmt="parquet")
+            append_layer(pd.DataFrame({"platform": ["微博"], "title": ["b"]}), raw_dir, "export")
+            frames = data_merge._read_source_file(raw_dir / "export.parquet", {"微博": "微博"}, {})
+        self.assertEqual([(channel, df["title"].tolist()) for channel, df in frames], [("微博", ["a", "b"])])
+
+
+class ParallelCleanTests(unittest.TestCase):
+    def test_clean_reports_one_event_per_finished_channel(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            merge_dir = root / "merge"
+            clean_dir = root / "clean"
+            merge_dir.mkdir()
+            clean_dir.mkdir()
+            row = {"title": "控烟新规发布", "published_at": "2025-01-01 08:00:00", "author": "甲"}
+            for channel in ("微博", "新闻", "抖音"):
+                pd.DataFrame([row]).to_json(merge_dir / f"{channel}.jsonl", orient="records", lines=True, force_ascii=False)
+            (merge_dir / "空.jsonl").write_text("", encoding="utf-8")
+            settings = MagicMock()
+            settings.get_channel_config.return_value = {}
+            events = []
+            logger, _ = _capturing_logger("clean-progress")
+            with patch.object(data_clean, "settings", settings), patch.object(
+                data_clean, "bucket", return_value=merge_dir
+            ), patch.object(data_clean, "ensure_bucket", return_value=clean_dir), patch.object(
+                data_clean, "resolve_layer_format", return_value="jsonl"
+            ):
+                self.assertTrue(
+                    data_clean.run_clean("demo", "2025-01-01", logger, workers=2, progress_callback=events.append)
+                )
+
+        self.assertEqual([event["completed"] for event in events], [1, 2, 3, 4])
+        self.assertEqual({event["phase"] for event in events}, {"clean"})
+        self.assertEqual({event["total"] for event in events}, {4})
+        statuses = {event["channel"]: (event["status"], event["rows"]) for event in events}
+        self.assertEqual(statuses, {"微博": ("ok", 1), "新闻": ("ok", 1), "抖音": ("ok", 1), "空": ("skipped", 0)})
+        self.assertEqual(events[-1]["percentage"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.ai.rate_limit import RateLimiter, TokenBucket, parse_retry_after  # noqa: E402
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_requests_per_second_is_enforced_after_burst(self) -> None:
+        async def _run() -> float:
+            limiter = RateLimiter(requests_per_second=20)
+            started = time.monotonic()
+            await asyncio.gather(*[limiter.acquire() for _ in range(40)])
+            return time.monotonic() - started
+
+        # 首秒突发 20 个，其余 20 个按 20/s 补充，约 1 秒
+        elapsed = asyncio.run(_run())
+        self.assertGreaterEqual(elapsed, 0.9)
+        self.assertLess(elapsed, 1.6)
+
+    def test_token_budget_blocks_until_refilled(self) -> None:
+        bucket = TokenBucket(rate=100.0, capacity=100.0)
+        bucket.consume(100)
+        self.assertAlmostEqual(bucket.wait_time(50), 0.5, delta=0.05)
+
+    def test_settle_refunds_over_estimate(self) -> None:
+        limiter = RateLimiter(requests_per_second=10, tokens_per_minute=600)
+        assert limiter.tokens is not None
+        limiter.tokens.consume(500)
+        limiter.settle(estimated=500, actual=100)
+        self.assertGreaterEqual(limiter.tokens.tokens, 500)
+
+    def test_rate_limited_halves_rate_and_recovers(self) -> None:
+        limiter = RateLimiter(requests_per_second=10, recovery_step=0.25)
+        pause = limiter.on_rate_limited(retry_after=2)
+        self.assertEqual(pause, 2)
+        self.assertEqual(limiter.rate_factor, 0.5)
+        self.assertEqual(limiter.requests.rate_factor, 0.5)
+        limiter.on_success()
+        limiter.on_success()
+        self.assertEqual(limiter.rate_factor, 1.0)
+
+    def test_rate_factor_has_floor(self) -> None:
+        limiter = RateLimiter(requests_per_second=10, min_rate_ratio=0.2)
+        for _ in range(10):
+            limiter.on_rate_limited(retry_after=0)
+        self.assertEqual(limiter.rate_factor, 0.2)
+
+    def test_parse_retry_after(self) -> None:
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.report import event_log  # noqa: E402
+from src.report import task_queue as task_queue_module  # noqa: E402
+
+
+def _event(event_id: int) -> dict:
+    return {"event_id": event_id, "type": "tool.call", "message": f"事件 {event_id}"}
+
+
+class ReportEventLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "rp-demo.events.jsonl"
+
+    def tearDown(self) -> None:
+        event_log.clear_tail_cache()
+        self._tmp.cleanup()
+
+    def test_read_since_seeks_through_the_index(self) -> None:
+        for event_id in range(1, 501):
+            event_log.append(self.path, _event(event_id))
+        self.assertEqual(event_log.index_path(self.path).stat().st_size, 500 * 16)
+        self.assertEqual([e["event_id"] for e in event_log.read_since(self.path, 497)], [498, 499, 500])
+        self.assertEqual(len(event_log.read_since(self.path, 0)), 500)
+        self.assertEqual(event_log.read_since(self.path, 500), [])
+
+    def test_legacy_log_without_index_is_indexed_on_access(self) -> None:
+        self.path.write_text("".join(json.dumps(_event(i)) + "\n" for i in range(1, 6)), encoding="utf-8")
+        self.assertEqual([e["event_id"] for e in event_log.read_since(self.path, 3)], [4, 5])
+        self.assertEqual(event_log.index_path(self.path).stat().st_size, 5 * 16)
+        event_log.append(self.path, _event(6))
+        self.assertEqual([e["event_id"] for e in event_log.tail(self.path, limit=2)], [5, 6])
+
+    def test_tail_catches_up_with_appends_from_other_writers(self) -> None:
+        for event_id in range(1, 4):
+            event_log.append(self.path, _event(event_id))
+        self.assertEqual([e["event_id"] for e in event_log.tail(self.path, limit=10)], [1, 2, 3])
+
+        # Another process appends a line (and crashes before writing its index record)
+        with self.path.open("a", encoding="utf-8") as stream:
+            stream.write(json.dumps(_event(4)) + "\n")
+            stream.write('{"event_id": 5, "partial')
+        self.assertEqual([e["event_id"] for e in event_log.tail(self.path, limit=10)], [1, 2, 3, 4])
+        self.assertEqual([e["event_id"] for e in event_log.read_since(self.path, 3)], [4])
+
+    def test_reset_log_is_reloaded_by_stale_tails(self) -> None:
+        for event_id in range(1, 4):
+            event_log.append(self.path, _event(event_id))
+        event_log.tail(self.path)
+        # Reset from another process: the ring is not dropped but ids restart
+        self.path.write_text("", encoding="utf-8")
+        event_log.index_path(self.path).write_bytes(b"")
+        for event_id in range(1, 6):
+            event_log.append(self.path, {**_event(event_id), "phase": "prepare"})
+        events = event_log.tail(self.path)
+        self.assertEqual([e["event_id"] for e in events], [1, 2, 3, 4, 5])
+        self.assertTrue(all(e.get("phase") == "prepare" for e in events))
+
+
+class ReportTaskEventTests(unittest.TestCase):
+    def test_mutations_only_attach_events_when_asked(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, ExitStack() as stack:
+            root = Path(temp_dir)
+            stack.enter_context(patch.object(task_queue_module, "STATE_ROOT", root / "_report"))
+            stack.enter_context(patch.object(task_queue_module, "TASK_STATE_DIR", root / "_report" / "tasks"))
+            stack.enter_context(patch.object(task_queue_module, "WORKER_STATUS_PATH", root / "_report" / "worker.json"))
+            task = task_queue_module.create_task(
+                {"topic": "示例专题", "topic_identifier": "demo-topic", "start": "2025-01-01", "end": "2025-01-31"}
+            )
+            for index in range(5):
+                updated = task_queue_module.append_event(
+                    task["id"], event_type="tool.call", title="调用工具", message=f"第 {index} 次"
+                )
+            self.assertNotIn("recent_events", updated)
+            self.assertEqual(updated["event_seq"], 6)
+            self.assertEqual(len(task_queue_module.tail_events(task["id"], limit=3)), 3)
+            self.assertEqual(
+                [e["event_id"] for e in task_queue_module.load_events_since(task["id"], 4)], [5, 6]
+            )
+            self.assertEqual(len(task_queue_module.get_task(task["id"])["recent_events"]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.report import event_log, queue_index  # noqa: E402
+from src.report import task_queue as task_queue_module  # noqa: E402
+
+
+def _request(topic: str, **extra) -> dict:
+    return {"topic": topic, "topic_identifier": topic, "start": "2025-01-01", "end": "2025-01-31", **extra}
+
+
+class ReportQueueIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "_report"
+        self._stack = ExitStack()
+        self._stack.enter_context(patch.object(task_queue_module, "STATE_ROOT", self.root))
+        self._stack.enter_context(patch.object(task_queue_module, "TASK_STATE_DIR", self.root / "tasks"))
+        self._stack.enter_context(patch.object(task_queue_module, "WORKER_STATUS_PATH", self.root / "worker.json"))
+
+    def tearDown(self) -> None:
+        self._stack.close()
+        queue_index.forget()
+        event_log.clear_tail_cache()
+        self._tmp.cleanup()
+
+    def _reserve(self):
+        task = task_queue_module.reserve_next_task(worker_pid=4242)
+        return task["id"] if task else None
+
+    def test_priority_first_and_one_running_task_per_topic(self) -> None:
+        first = task_queue_module.create_task(_request("topic-a"))
+        second = task_queue_module.create_task(_request("topic-a"))
+        urgent = task_queue_module.create_task(_request("topic-b", priority=5))
+
+        self.assertEqual(self._reserve(), urgent["id"])
+        self.assertEqual(self._reserve(), first["id"])
+        # topic-a is busy, topic-b has nothing left
+        self.assertIsNone(self._reserve())
+        self.assertEqual(task_queue_module.get_task(first["id"])["status"], "running")
+
+        task_queue_module.mark_task_completed(first["id"], message="done")
+        self.assertEqual(self._reserve(), second["id"])
+        self.assertEqual(
+            {row["task_id"] for row in queue_index.snapshot(self.root / task_queue_module.QUEUE_INDEX_FILENAME)},
+            {urgent["id"], second["id"]},
+        )
+
+    def test_cancelled_and_requeued_tasks_follow_their_status(self) -> None:
+        task = task_queue_module.create_task(_request("topic-a"))
+        task_queue_module.cancel_task(task["id"])
+        self.assertIsNone(self._reserve())
+
+        failed = task_queue_module.create_task(_request("topic-b"))
+        self.assertEqual(self._reserve(), failed["id"])
+        task_queue_module.mark_task_failed(failed["id"], "boom")
+        task_queue_module.requeue_task(failed["id"])
+        self.assertEqual(self._reserve(), failed["id"])
+
+    def test_stale_reservations_are_released(self) -> None:
+        task = task_queue_module.create_task(_request("topic-a"))
+        path = task_queue_module._queue_index_path()
+        self.assertEqual(queue_index.reserve(path, worker=99999), task["id"])
+        self.assertIsNone(queue_index.reserve(path, worker=99999))
+        with patch.object(task_queue_module, "_is_process_alive", return_value=False):
+            self.assertEqual(task_queue_module.release_stale_reservations(), 1)
+        self.assertEqual(self._reserve(), task["id"])
+
+    def test_tasks_queued_before_the_index_are_seeded(self) -> None:
+        tasks_dir = self.root / "tasks"
+        tasks_dir.mkdir(parents=True)
+        for task_id, status in (("rp-old-1", "queued"), ("rp-old-2", "completed")):
+            payload = {"id": task_id, "topic_identifier": "legacy", "status": status, "created_at": "2025-01-01"}
+            (tasks_dir / f"{task_id}.json").write_text(json.dumps(payload), encoding="utf-8")
+        self.assertEqual(self._reserve(), "rp-old-1")
+        self.assertIsNone(self._reserve())
+
+
+if __name__ == "__main__":
+    unittest.main()
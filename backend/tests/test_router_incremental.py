@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.rag.ragrouter.router_vec_data import LanceDBManager, TextProcessor  # noqa: E402
+from src.utils.rag.ragrouter.time_index import TIME_FIELDS, time_columns  # noqa: E402
+
+_SCHEMA = pa.schema([
+    pa.field("sentence_id", pa.string()),
+    pa.field("sentence_text", pa.string()),
+    pa.field("sentence_vec", pa.list_(pa.float32(), 2)),
+    pa.field("doc_id", pa.string()),
+    pa.field("doc_name", pa.string()),
+    pa.field("time", pa.string()),
+    *TIME_FIELDS,
+])
+
+
+def _sentence(sentence_id: str, doc_id: str, text: str) -> dict:
+    return {"sentence_id": sentence_id, "sentence_text": text, "sentence_vec": [1.0, 0.0],
+            "doc_id": doc_id, "doc_name": "d", "time": "未知", **time_columns("未知")}
+
+
+class TextProcessorIncrementalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self.text_db = self.base / "normal_db" / "text_db"
+        for path in ("text_db", "doc_db", "sentence_db"):
+            (self.base / "normal_db" / path).mkdir(parents=True)
+        self._write("甲_1", "甲文档。第一段。")
+        self._write("乙_1", "乙文档。")
+        self._write("丙_1", "丙文档。")
+        self._process()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, stem: str, text: str) -> None:
+        (self.text_db / f"{stem}.txt").write_text(text, encoding="utf-8")
+
+    def _process(self) -> TextProcessor:
+        processor = TextProcessor(self.base)
+        processor.process_all()
+        # 模拟流水线完成后的 processed_docs 更新
+        mapping_file = processor.log_db / "data_mapping.json"
+        mapping = json.loads(mapping_file.read_text(encoding="utf-8"))
+        mapping["processed_docs"] = list(processor.doc_mapping.keys())
+        mapping_file.write_text(json.dumps(mapping, ensure_ascii=False), encoding="utf-8")
+        return processor
+
+    def test_unchanged_docs_are_skipped(self) -> None:
+        processor = self._process()
+        self.assertEqual(processor.new_doc_ids, [])
+        self.assertEqual(processor.stale_doc_ids, [])
+
+    def test_changed_removed_and_new_docs(self) -> None:
+        ids = {info["name"]: doc_id for doc_id, info in self._process().doc_mapping.items()}
+        self._write("甲_1", "甲文档已修改。")
+        (self.text_db / "乙_1.txt").unlink()
+        self._write("丁_1", "丁文档。")
+
+        processor = self._process()
+        self.assertEqual(sorted(processor.stale_doc_ids), sorted([ids["甲"], ids["乙"]]))
+        self.assertEqual(sorted(processor.new_doc_ids, key=int), [ids["甲"], "4"])
+        self.assertNotIn(ids["乙"], processor.doc_mapping)
+        self.assertEqual(processor.doc_mapping[ids["丙"]]["fingerprint"], processor.fingerprint(
+            [(1, self.text_db / "丙_1.txt")]
+        ))
+
+        sentences = json.loads((processor.sentence_db / "sentences.json").read_text(encoding="utf-8"))
+        by_doc = {}
+        for s in sentences:
+            by_doc.setdefault(s["doc_id"], []).append(s["sentence_text"])
+        self.assertEqual(by_doc[ids["甲"]], ["甲文档已修改"])
+        self.assertNotIn(ids["乙"], by_doc)
+        self.assertEqual(len({s["sentence_id"] for s in sentences}), len(sentences))
+        self.assertEqual(len(list(processor.doc_db.glob(f"doc{ids['甲']}_*.txt"))), 1)
+
+
+class LanceDBIncrementalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manager = LanceDBManager(self._tmp.name)
+        self.manager.upsert_table(
+            "normalrag", [_sentence(str(i), str(i % 2 + 1), f"s{i}") for i in range(1, 5)], _SCHEMA, "sentence_id"
+        )
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_upsert_updates_by_key_and_delete_drops_doc(self) -> None:
+        self.manager.delete_docs(["2"])
+        self.manager.upsert_table(
+            "normalrag", [_sentence("1", "2", "new1"), _sentence("5", "2", "s5")], _SCHEMA, "sentence_id"
+        )
+        table = self.manager.db.open_table("normalrag")
+        rows = {row["sentence_id"]: row for row in table.to_arrow().to_pylist()}
+        self.assertEqual(sorted(rows, key=int), ["1", "2", "4", "5"])
+        self.assertEqual(rows["1"]["sentence_text"], "new1")
+        self.assertEqual(rows["2"]["doc_id"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.rag.ragrouter.router_retrieve_data import AdvancedRAGSearcher, TimeRange  # noqa: E402
+from src.utils.rag.ragrouter.router_vec_data import LanceDBManager  # noqa: E402
+from src.utils.rag.ragrouter.time_index import (  # noqa: E402
+    DOC_ID_LIST_FIELD,
+    TIME_FIELDS,
+    DocTimeIndex,
+    doc_filter,
+    parse_query_time,
+    parse_time_text,
+    time_columns,
+)
+
+_DOC_TIMES = {"1": "2023年5月", "2": "2024年", "3": "未知"}
+
+
+def _vec(i: int) -> list:
+    return [1.0, float(i) / 10]
+
+
+def _build_tables(manager: LanceDBManager) -> None:
+    sentences = [
+        {"sentence_id": str(i), "sentence_text": f"s{i}", "sentence_vec": _vec(i), "doc_id": str(i % 3 + 1),
+         "doc_name": "d", "time": _DOC_TIMES[str(i % 3 + 1)], **time_columns(_DOC_TIMES[str(i % 3 + 1)])}
+        for i in range(12)
+    ]
+    manager.save_table("normalrag", sentences, pa.schema([
+        pa.field("sentence_id", pa.string()),
+        pa.field("sentence_text", pa.string()),
+        pa.field("sentence_vec", pa.list_(pa.float32(), 2)),
+        pa.field("doc_id", pa.string()),
+        pa.field("doc_name", pa.string()),
+        pa.field("time", pa.string()),
+        *TIME_FIELDS,
+    ]))
+    entities = [
+        {"entity_id": str(i), "entity_name": f"e{i}", "entity_name_vec": _vec(i), "type": "t",
+         "description": f"desc{i}", "description_vec": _vec(i), "time": "", "doc_name": "d",
+         "text_ids": "[]", "doc_ids": json.dumps([str(i % 3 + 1)]), "doc_id_list": [str(i % 3 + 1)],
+         **time_columns(_DOC_TIMES[str(i % 3 + 1)])}
+        for i in range(1, 10)
+    ]
+    manager.save_table("graphrag_entities", entities, pa.schema([
+        pa.field("entity_id", pa.string()),
+        pa.field("entity_name", pa.string()),
+        pa.field("entity_name_vec", pa.list_(pa.float32(), 2)),
+        pa.field("type", pa.string()),
+        pa.field("description", pa.string()),
+        pa.field("description_vec", pa.list_(pa.float32(), 2)),
+        pa.field("time", pa.string()),
+        pa.field("doc_name", pa.string()),
+        pa.field("text_ids", pa.string()),
+        pa.field("doc_ids", pa.string()),
+        DOC_ID_LIST_FIELD,
+        *TIME_FIELDS,
+    ]), mode="overwrite")
+    relations = [
+        {"relationship_id": str(i), "source": str(i), "target": str(i + 1), "description": f"r{i}",
+         "description_vec": _vec(i), "time": "", "doc_name": "d", "text_ids": "[]",
+         "doc_ids": json.dumps([str(i % 3 + 1)]), "doc_id_list": [str(i % 3 + 1)],
+         **time_columns(_DOC_TIMES[str(i % 3 + 1)])}
+        for i in range(1, 9)
+    ]
+    manager.save_table("graphrag_relationships", relations, pa.schema([
+        pa.field("relationship_id", pa.string()),
+        pa.field("source", pa.string()),
+        pa.field("target", pa.string()),
+        pa.field("description", pa.string()),
+        pa.field("description_vec", pa.list_(pa.float32(), 2)),
+        pa.field("time", pa.string()),
+        pa.field("doc_name", pa.string()),
+        pa.field("text_ids", pa.string()),
+        pa.field("doc_ids", pa.string()),
+        DOC_ID_LIST_FIELD,
+        *TIME_FIELDS,
+    ]), mode="overwrite")
+
+
+class RouterPrefilterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manager = LanceDBManager(self._tmp.name)
+        _build_tables(self.manager)
+        self.searcher = AdvancedRAGSearcher.__new__(AdvancedRAGSearcher)
+        self.searcher.logger = None
+        self.searcher.tables = {
+            name: self.manager.db.open_table(name)
+            for name in ("normalrag", "graphrag_entities", "graphrag_relationships")
+        }
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_filter_columns_are_indexed(self) -> None:
+        indexed = {
+            column
+            for index in self.searcher.tables["graphrag_entities"].list_indices()
+            for column in index.columns
+        }
+        self.assertTrue({"entity_id", "doc_id_list", "time_start", "time_end"} <= indexed)
+
+    def test_time_filtered_search_only_returns_matching_docs(self) -> None:
+        time_range = TimeRange(has_time=True, time_text="2023年5月", matched_docs=["1"])
+        normal = asyncio.run(self.searcher._normalrag_search(_vec(5), time_range, 3))
+        self.assertEqual(len(normal.sentences), 3)
+        self.assertTrue(all(s["doc_id"] == "1" for s in normal.sentences))
+
+        graph = asyncio.run(self.searcher._graphrag_search(_vec(5), time_range, 2))
+        core = graph.entities["core"]
+        self.assertEqual(len(core), 2)
+        self.assertTrue(all(e["doc_ids"] == ["1"] for e in core))
+        self.assertTrue(all(r["doc_ids"] == ["1"] for r in graph.relationships["top3"]))
+        core_ids = {e["entity_id"] for e in core}
+        self.assertTrue(all(r["source"] in core_ids or r["target"] in core_ids for r in graph.relationships["all"]))
+
+    def test_legacy_json_doc_ids_still_filter(self) -> None:
+        table = self.manager.db.create_table(
+            "legacy", data=[{"doc_ids": json.dumps(["1"])}, {"doc_ids": json.dumps(["11"])}]
+        )
+        rows = table.search().where(doc_filter(table, ["1"])).to_list()
+        self.assertEqual([row["doc_ids"] for row in rows], ['["1"]'])
+
+    def test_parse_time_text(self) -> None:
+        self.assertEqual(parse_time_text("2023年5月"), (date(2023, 5, 1), date(2023, 5, 31)))
+        self.assertEqual(parse_time_text("2024-02-10"), (date(2024, 2, 10), date(2024, 2, 10)))
+        self.assertEqual(parse_time_text("2022年"), (date(2022, 1, 1), date(2022, 12, 31)))
+        self.assertEqual(
+            parse_time_text("2023年11月至2024年1月"), (date(2023, 11, 1), date(2024, 1, 31))
+        )
+        self.assertEqual(parse_time_text("未知"), (None, None))
+
+
+class _StubLLMHelper:
+    def __init__(self, response: dict) -> None:
+        self.response = response
+        self.calls = 0
+
+    async def extract_time_from_query(self, query: str) -> dict:
+        self.calls += 1
+        return self.response
+
+
+class DocTimeIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "doc_time_index.json"
+        index = DocTimeIndex(self.path)
+        for doc_id, time_text in {"1": "2023年5月", "2": "2024年", "10": "2024年3月15日", "3": "未知"}.items():
+            index.set(doc_id, time_text)
+        index.save()
+        self.searcher = AdvancedRAGSearcher.__new__(AdvancedRAGSearcher)
+        self.searcher.logger = None
+        self.searcher.time_index = DocTimeIndex.load(self.path)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_index_round_trip_and_match(self) -> None:
+        index = DocTimeIndex.load(self.path)
+        self.assertEqual(index.get("10"), "2024年3月15日")
+        self.assertEqual(index.match(date(2024, 3, 1), date(2024, 3, 31)), ["2", "10"])
+        self.assertEqual(index.match(None, date(2023, 12, 31)), ["1"])
+
+    def test_query_time_rules(self) -> None:
+        today = date(2024, 8, 20)
+        self.assertEqual(parse_query_time("去年上半年的控烟舆情", today).end, date(2023, 6, 30))
+        recent = parse_query_time("近三个月的讨论", today)
+        self.assertEqual((recent.start, recent.end), (date(2024, 5, 20), today))
+        since = parse_query_time("2023年以来", today)
+        self.assertEqual((since.start, since.end), (date(2023, 1, 1), today))
+        self.assertEqual(parse_query_time("控烟政策有哪些", today).status, "none")
+        self.assertEqual(parse_query_time("疫情期间的讨论", today).status, "ambiguous")
+
+    def test_parsed_query_filters_without_llm(self) -> None:
+        self.searcher.llm_helper = _StubLLMHelper({"has_time": True, "time_text": "2023年"})
+        time_range = asyncio.run(self.searcher._process_time_filter("2024年3月的新规"))
+        self.assertTrue(time_range.has_time)
+        self.assertEqual(time_range.matched_docs, ["2", "10"])
+        self.assertEqual(self.searcher.llm_helper.calls, 0)
+
+    def test_ambiguous_query_falls_back_to_llm(self) -> None:
+        self.searcher.llm_helper = _StubLLMHelper({"has_time": True, "time_text": "2023年"})
+        time_range = asyncio.run(self.searcher._process_time_filter("疫情期间的讨论"))
+        self.assertEqual(time_range.matched_docs, ["1"])
+        self.assertEqual(self.searcher.llm_helper.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
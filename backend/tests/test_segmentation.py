@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils import segmentation  # noqa: E402
+from src.utils.segmentation import TokenCache, segment_texts, token_cache_path  # noqa: E402
+
+_TEXTS = ["控烟条例正式实施", "", "电子烟监管新规出台", "控烟条例正式实施"]
+
+
+class SegmentationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        segmentation.clear_memory_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_path = token_cache_path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        segmentation.clear_memory_cache()
+        self._tmp.cleanup()
+
+    def test_disk_cache_is_reused_across_processes(self) -> None:
+        first = segment_texts(_TEXTS, cache_path=self.cache_path)
+        self.assertEqual(first[1], [])
+        self.assertEqual(first[0], first[3])
+        self.assertEqual("".join(first[2]), _TEXTS[2])
+
+        segmentation.clear_memory_cache()
+        with mock.patch.object(segmentation, "_segment_chunk", side_effect=AssertionError("cache miss")):
+            self.assertEqual(segment_texts(_TEXTS, cache_path=self.cache_path), first)
+
+    def test_pos_and_user_words_use_separate_variants(self) -> None:
+        tagged = segment_texts(_TEXTS[:1], pos=True, cache_path=self.cache_path)[0]
+        self.assertTrue(all(isinstance(item, tuple) and len(item) == 2 for item in tagged))
+        self.assertEqual("".join(word for word, _ in tagged), _TEXTS[0])
+
+        custom = segment_texts(["舆情监测系统上线"], user_words=["舆情监测系统"], cache_path=self.cache_path)[0]
+        self.assertIn("舆情监测系统", custom)
+        cache = TokenCache(self.cache_path)
+        self.addCleanup(cache.close)
+        rows = cache._conn.execute("SELECT DISTINCT variant FROM tokens").fetchall()
+        self.assertEqual(len(rows), 2)
+
+    def test_user_words_do_not_leak_into_the_default_dictionary(self) -> None:
+        text = "舆情监测系统上线"
+        custom = segment_texts([text], user_words=["舆情监测系统"], cache_path=self.cache_path)[0]
+        tagged = segment_texts([text], pos=True, user_words=["舆情监测系统"])[0]
+        self.assertIn("舆情监测系统", custom)
+        self.assertIn("舆情监测系统", [word for word, _ in tagged])
+
+        segmentation.clear_memory_cache()
+        self.assertNotIn("舆情监测系统", segment_texts([text], cache_path=self.cache_path)[0])
+        self.assertNotIn("舆情监测系统", [word for word, _ in segment_texts([text], pos=True)[0]])
+        self.assertNotIn("舆情监测系统", segmentation.jieba.dt.FREQ)
+
+    def test_parallel_path_matches_serial(self) -> None:
+        texts = [f"第{i}号通知：控烟宣传进校园" for i in range(6)]
+        with mock.patch.object(segmentation, "_tokenize_config", return_value={"chunk_size": 2}):
+            parallel = segment_texts(texts, workers=2, min_parallel_texts=0)
+        segmentation.clear_memory_cache()
+        self.assertEqual(parallel, segment_texts(texts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import lancedb
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.utils.rag.embedding as embedding_module  # noqa: E402
+from src.utils.rag.tagrag import tag_retrieve_data as tagrag  # noqa: E402
+
+_QUERIES = {
+    "x": [1.0, 0.0, 0.0],
+    "y": [0.0, 1.0, 0.0],
+    "diag": [1.0, 1.0, 0.0],
+}
+
+
+class TagRetrieverTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tagrag.clear_retriever_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = self._tmp.name
+        self.table_name = tagrag.to_pinyin("测试")
+        db = lancedb.connect(self.db_path)
+        db.create_table(
+            self.table_name,
+            data=[
+                {"id": 1, "text": "a", "tag_vec": [2.0, 0.0, 0.0], "text_vec": [0.0, 1.0, 0.0]},
+                {"id": 2, "text": "b", "tag_vec": [0.0, 3.0, 0.0], "text_vec": [1.0, 0.0, 0.0]},
+                {"id": 3, "text": "c", "tag_vec": [1.0, 1.0, 0.0], "text_vec": [0.0, 0.0, 1.0]},
+                {"id": 4, "text": "d", "tag_vec": [0.0, 0.0, 0.0], "text_vec": [0.0, 0.0, 0.0]},
+            ],
+        )
+        self.embed_calls: list = []
+
+        def _embed(client, text, model):
+            self.embed_calls.append(text)
+            return _QUERIES[text]
+
+        patches = [
+            mock.patch.object(embedding_module, "get_sync_client", return_value=(object(), "stub-model", 3)),
+            mock.patch.object(
+                embedding_module,
+                "get_embedding_client_settings",
+                return_value=("key", "http://stub", "stub-model", "qwen", 3),
+            ),
+            mock.patch.object(embedding_module, "generate_embedding_sync", side_effect=_embed),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        tagrag.clear_retriever_cache()
+        self._tmp.cleanup()
+
+    def test_scores_match_cosine_similarity_and_order(self) -> None:
+        retriever = tagrag.get_retriever("测试", db_path=self.db_path)
+        results = retriever.retrieve("diag", top_k=3)
+        self.assertEqual([item["data"]["id"] for item in results], [3, 1, 2])
+        self.assertAlmostEqual(results[0]["similarity"], 1.0, places=5)
+        self.assertAlmostEqual(results[1]["similarity"], 1 / np.sqrt(2), places=5)
+        self.assertEqual(results[1]["data"]["text"], "a")
+
+        filtered = retriever.retrieve("x", top_k=5, search_column="text_vec", min_similarity=0.5, return_columns=["id"])
+        self.assertEqual(filtered, [{"index": 1, "similarity": 1.0, "data": {"id": 2}}])
+
+    def test_retriever_is_resident_until_table_changes(self) -> None:
+        first = tagrag.get_retriever("测试", db_path=self.db_path)
+        self.assertIs(tagrag.get_retriever("测试", db_path=self.db_path), first)
+
+        table = lancedb.connect(self.db_path).open_table(self.table_name)
+        table.add([{"id": 5, "text": "e", "tag_vec": [0.0, 1.0, 0.0], "text_vec": [0.0, 1.0, 0.0]}])
+        second = tagrag.get_retriever("测试", db_path=self.db_path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.size, 5)
+
+    def test_query_embeddings_are_memoised(self) -> None:
+        retriever = tagrag.get_retriever("测试", db_path=self.db_path)
+        retriever.retrieve("y", top_k=1)
+        retriever.retrieve("y", top_k=2, search_column="text_vec")
+        tagrag.retrieve_documents("y", "测试", top_k=1, db_path=self.db_path)
+        self.assertEqual(self.embed_calls, ["y"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server_support import media_tagging  # noqa: E402
+from src.utils.task_store import TASK_STORE_DIRNAME, TASK_STORE_FILENAME, task_family  # noqa: E402
+
+
+def _task(task_id: str, status: str, created_at: str, topic: str = "demo") -> dict:
+    return {"id": task_id, "status": status, "topic_identifier": topic, "created_at": created_at, "updated_at": created_at}
+
+
+class TaskFamilyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state_root = Path(self._tmp.name) / "_demo"
+        self.task_dir = self.state_root / "tasks"
+        self.task_dir.mkdir(parents=True)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_existing_task_files_are_seeded_once(self) -> None:
+        for task in (_task("t-1", "completed", "2025-01-01"), _task("t-2", "queued", "2025-01-02")):
+            (self.task_dir / f"{task['id']}.json").write_text(json.dumps(task), encoding="utf-8")
+        (self.task_dir / "t-1.events.json").write_text("[]", encoding="utf-8")
+
+        family = task_family("demo", self.state_root)
+        self.assertEqual([task["id"] for task in family.list()], ["t-2", "t-1"])
+        self.assertTrue((Path(self._tmp.name) / TASK_STORE_DIRNAME / TASK_STORE_FILENAME).exists())
+
+        # Files written behind the store's back only show up after an explicit rebuild
+        (self.task_dir / "t-3.json").write_text(json.dumps(_task("t-3", "queued", "2025-01-03")), encoding="utf-8")
+        self.assertEqual(len(family.list()), 2)
+        self.assertEqual(family.rebuild(), 3)
+        self.assertEqual(family.counts(), {"completed": 1, "queued": 2})
+
+    def test_status_topic_and_family_filters(self) -> None:
+        family = task_family("demo", self.state_root)
+        other = task_family("other", self.state_root)
+        family.index(_task("a", "queued", "2025-01-02", topic="alpha"))
+        family.index(_task("b", "queued", "2025-01-01", topic="beta"))
+        family.index(_task("c", "running", "2025-01-03", topic="alpha"))
+        other.index(_task("z", "queued", "2024-12-31"))
+
+        self.assertEqual(family.next_queued()["id"], "b")
+        self.assertEqual([task["id"] for task in family.list(topic="alpha")], ["c", "a"])
+        self.assertEqual([task["id"] for task in family.list(statuses=["running"])], ["c"])
+        self.assertEqual(len(family.list(limit=2)), 2)
+
+        family.index({**_task("b", "completed", "2025-01-01", topic="beta"), "message": "done"})
+        self.assertEqual(family.next_queued()["id"], "a")
+        family.drop("a")
+        self.assertIsNone(family.next_queued())
+        self.assertEqual(other.next_queued()["id"], "z")
+
+
+class TaskFamilyModuleTests(unittest.TestCase):
+    def test_media_tagging_tasks_go_through_the_store(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, ExitStack() as stack:
+            root = Path(temp_dir) / "_media_tagging"
+            stack.enter_context(patch.object(media_tagging, "STATE_ROOT", root))
+            stack.enter_context(patch.object(media_tagging, "TASK_STATE_DIR", root / "tasks"))
+            stack.enter_context(patch.object(media_tagging, "WORKER_STATUS_PATH", root / "worker.json"))
+
+            first = media_tagging.create_task("topic-a", "2025-01-01")
+            second = media_tagging.create_task("topic-b", "2025-01-01")
+            self.assertEqual(media_tagging.reserve_next_task()["id"], first["id"])
+            self.assertEqual(
+                media_tagging.find_latest_task("topic-a", "2025-01-01", statuses=["running"])["id"], first["id"]
+            )
+            self.assertIsNone(media_tagging.find_latest_task("topic-b", "2025-01-01", statuses=["running"]))
+
+            media_tagging.mark_task_failed(first["id"], "boom")
+            media_tagging.delete_task(first["id"])
+            listed = media_tagging.list_tasks(limit=10)["tasks"]
+            self.assertEqual([task["id"] for task in listed], [second["id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
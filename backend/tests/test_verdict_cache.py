@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+from contextlib import closing
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.filter import verdict_cache  # noqa: E402
+from src.filter.verdict_cache import VerdictCache, normalise_text, template_hash, text_hash  # noqa: E402
+
+TEMPLATE = "判断以下文本是否与{topic}相关：{text}"
+
+
+class VerdictKeyTests(unittest.TestCase):
+    def test_normalisation_folds_width_and_whitespace(self) -> None:
+        self.assertEqual(normalise_text("  控烟　新规\n\tＡＢＣ１２３ "), "控烟 新规 ABC123")
+        self.assertEqual(normalise_text(None), "")
+
+    def test_text_hash_is_sha1_of_the_normalised_text(self) -> None:
+        expected = hashlib.sha1("控烟 新规".encode("utf-8")).hexdigest()
+        self.assertEqual(text_hash("控烟   新规"), expected)
+        self.assertEqual(text_hash("控烟　新规"), expected)
+        self.assertNotEqual(text_hash("控烟新规"), expected)
+        self.assertEqual(template_hash(TEMPLATE), hashlib.sha1(TEMPLATE.encode("utf-8")).hexdigest())
+
+
+class VerdictCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "cache" / "verdicts.sqlite3"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _open(self, template: str = TEMPLATE, model: str = "qwen:qwen-plus", **kwargs) -> VerdictCache:
+        cache = VerdictCache(self.path, template, model, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_miss_put_then_hit_round_trip(self) -> None:
+        cache = self._open()
+        key = cache.key_for("市卫健委发布控烟通知")
+        self.assertEqual(cache.get_many([key]), {})
+
+        cache.put_many([(key, '{"related": true}'), (cache.key_for("空响应"), "")])
+        self.assertEqual(cache.get_many([key, key, cache.key_for("未写入")]), {key: '{"related": true}'})
+        # Reposts that differ only in whitespace share the verdict
+        self.assertEqual(cache.get_many([cache.key_for(" 市卫健委发布控烟通知\n")]), {key: '{"related": true}'})
+
+        cache.put_many([(key, '{"related": false}')])
+        self.assertEqual(cache.get_many([key]), {key: '{"related": false}'})
+        # Overwriting resets the hit counter; the lookup above counts once
+        with closing(sqlite3.connect(str(self.path))) as conn:
+            self.assertEqual(conn.execute("SELECT hit_count FROM verdicts").fetchone()[0], 1)
+
+        cache.record(3, 1)
+        self.assertEqual(cache.stats(), {"enabled": True, "hits": 3, "misses": 1, "hit_rate": 0.75})
+
+    def test_prompt_or_model_changes_invalidate_entries(self) -> None:
+        cache = self._open()
+        key = cache.key_for("控烟")
+        cache.put_many([(key, "相关")])
+        self.assertEqual(self._open(template=TEMPLATE + "\n只回答是或否").get_many([key]), {})
+        self.assertEqual(self._open(model="openai:gpt-4o-mini").get_many([key]), {})
+        self.assertEqual(self._open().get_many([key]), {key: "相关"})
+
+    def test_entries_survive_reopening_the_store(self) -> None:
+        cache = self._open()
+        keys = [cache.key_for(f"文本{index}") for index in range(1200)]
+        cache.put_many((key, f"响应{index}") for index, key in enumerate(keys))
+        cache.close()
+
+        reopened = self._open()
+        found = reopened.get_many(keys)
+        self.assertEqual(len(found), 1200)
+        self.assertEqual(found[keys[700]], "响应700")
+
+    def test_ttl_and_max_entries_prune(self) -> None:
+        cache = self._open(ttl_days=1, max_entries=2)
+        with patch.object(verdict_cache.time, "time", return_value=1_000.0):
+            cache.put_many([("old", "a")])
+        now = 1_000.0 + 86400 * 2
+        with patch.object(verdict_cache.time, "time", return_value=now):
+            cache.put_many([("k1", "b"), ("k2", "c"), ("k3", "d")])
+            self.assertEqual(cache.get_many(["old"]), {})
+        with patch.object(verdict_cache.time, "time", return_value=now + 1):
+            cache.get_many(["k1", "k3"])
+            # "old" expired by TTL, then "k2" is the least recently hit past max_entries
+            self.assertEqual(cache.prune(), 2)
+            self.assertEqual(cache.get_many(["k1", "k2", "k3"]), {"k1": "b", "k3": "d"})
+
+
+if __name__ == "__main__":
+    unittest.main()